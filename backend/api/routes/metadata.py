@@ -9,6 +9,14 @@ import os
 import logging
 import io
 
+from ...helpers import (
+    IMAGE_ENCODE_PROFILES,
+    DEFAULT_ENCODE_PROFILE,
+    get_decode_cache_stats,
+    get_prefetch_stats,
+    get_spool_stats,
+)
+
 try:
     from PIL import Image
 
@@ -76,6 +84,70 @@ async def get_categories_handler(request):
         return web.json_response({"error": str(e)}, status=500)
 
 
+async def get_encode_profiles_handler(request):
+    """获取图像编码配置（fastest / balanced / smallest）及各格式参数
+
+    GET /dm/encode/profiles
+    """
+    try:
+        return web.json_response(
+            {
+                "success": True,
+                "default": DEFAULT_ENCODE_PROFILE,
+                "profiles": IMAGE_ENCODE_PROFILES,
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"[DataManager] get_encode_profiles error: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_decode_cache_handler(request):
+    """获取图像解码缓存统计（命中、未命中、淘汰、失效次数及占用字节数）
+
+    GET /dm/cache/decode
+    """
+    try:
+        return web.json_response({"success": True, "stats": get_decode_cache_stats()})
+
+    except Exception as e:
+        logger.error(f"[DataManager] get_decode_cache error: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_prefetch_stats_handler(request):
+    """获取 Match 模式预读统计（命中率、缓冲区占用及当前会话进度）
+
+    GET /dm/cache/prefetch
+    """
+    try:
+        return web.json_response({"success": True, "stats": get_prefetch_stats()})
+
+    except Exception as e:
+        logger.error(f"[DataManager] get_prefetch_stats error: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def get_spool_stats_handler(request):
+    """获取多实例认领进度（已完成数、各实例正在处理的数量、过期认领数）
+
+    GET /dm/spool?path=/path/to/source&pattern=*.png&exclude=
+    """
+    try:
+        source_path = request.query.get("path", "")
+        if not source_path:
+            return web.json_response({"error": "Missing path parameter"}, status=400)
+        pattern = request.query.get("pattern", "*.*")
+        exclude = request.query.get("exclude", "")
+        stats = get_spool_stats(source_path, pattern, exclude)
+        return web.json_response({"success": True, "stats": stats})
+
+    except Exception as e:
+        logger.error(f"[DataManager] get_spool_stats error: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
 async def preview_file_handler(request):
     """预览文件内容（支持图像、音视频、代码等）
 
@@ -375,6 +447,10 @@ def register_metadata_routes(server):
         try:
             server.routes.get("/dm/categories")(get_categories_handler)
             server.routes.get("/dm/preview")(preview_file_handler)
+            server.routes.get("/dm/encode/profiles")(get_encode_profiles_handler)
+            server.routes.get("/dm/cache/decode")(get_decode_cache_handler)
+            server.routes.get("/dm/cache/prefetch")(get_prefetch_stats_handler)
+            server.routes.get("/dm/spool")(get_spool_stats_handler)
             logger.info("[DataManager] Metadata routes registered (PromptServer.routes)")
             return
         except Exception as e:
@@ -385,4 +461,8 @@ def register_metadata_routes(server):
     if app and hasattr(app, "router"):
         app.router.add_get("/dm/categories", get_categories_handler)
         app.router.add_get("/dm/preview", preview_file_handler)
+        app.router.add_get("/dm/encode/profiles", get_encode_profiles_handler)
+        app.router.add_get("/dm/cache/decode", get_decode_cache_handler)
+        app.router.add_get("/dm/cache/prefetch", get_prefetch_stats_handler)
+        app.router.add_get("/dm/spool", get_spool_stats_handler)
         logger.info("[DataManager] Metadata routes registered (app.router fallback)")
@@ -10,7 +10,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-from ...helpers import save_file, create_file, create_directory, delete_file
+from ...helpers import (
+    save_file,
+    create_file,
+    create_directory,
+    delete_file,
+    get_job,
+    clear_decode_cache,
+    reset_scan_cursor,
+    get_cursor_path,
+)
 
 
 async def save_file_handler(request):
@@ -184,6 +193,70 @@ async def delete_file_handler(request):
         return web.json_response({"error": str(e)}, status=500)
 
 
+async def get_job_handler(request):
+    """查询异步保存任务状态
+
+    GET /dm/jobs/{job_id}
+    """
+    try:
+        job_id = request.match_info.get("job_id", "")
+        job = get_job(job_id)
+
+        if job is None:
+            return web.json_response({"error": "Job not found", "id": job_id}, status=404)
+
+        return web.json_response({"success": True, "job": job})
+
+    except Exception as e:
+        logger.error(f"[DataManager] get_job error: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def clear_decode_cache_handler(request):
+    """清空图像解码缓存
+
+    POST /dm/cache/decode/clear
+    Body: {"reset_stats": false}
+    """
+    try:
+        data = await request.json() if request.can_read_body else {}
+        cleared = clear_decode_cache(reset_stats=bool(data.get("reset_stats", False)))
+        return web.json_response({"success": True, "cleared": cleared})
+
+    except Exception as e:
+        logger.error(f"[DataManager] clear_decode_cache error: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
+async def reset_scan_cursor_handler(request):
+    """重置增量扫描游标，下次增量扫描重新输出所有匹配文件
+
+    POST /dm/scan/cursor/reset
+    Body: {
+        "path": "/path/to/source",
+        "pattern": "*.png",
+        "exclude": ""
+    }
+    """
+    try:
+        data = await request.json() if request.can_read_body else {}
+        source_path = data.get("path", "")
+        if not source_path:
+            return web.json_response({"error": "Path is required"}, status=400)
+
+        # 未指定 pattern 时删除该目录的整个游标文件
+        pattern = data.get("pattern") or None
+        exclude = data.get("exclude") or None
+        reset = reset_scan_cursor(source_path, pattern, exclude)
+        return web.json_response(
+            {"success": True, "reset": reset, "cursor_path": get_cursor_path(source_path)}
+        )
+
+    except Exception as e:
+        logger.error(f"[DataManager] reset_scan_cursor error: {e}")
+        return web.json_response({"error": str(e)}, status=500)
+
+
 def register_operation_routes(server):
     """注册文件操作路由
 
@@ -197,6 +270,9 @@ def register_operation_routes(server):
             server.routes.post("/dm/create/file")(create_file_handler)
             server.routes.post("/dm/create/directory")(create_directory_handler)
             server.routes.post("/dm/delete")(delete_file_handler)
+            server.routes.get("/dm/jobs/{job_id}")(get_job_handler)
+            server.routes.post("/dm/cache/decode/clear")(clear_decode_cache_handler)
+            server.routes.post("/dm/scan/cursor/reset")(reset_scan_cursor_handler)
             logger.info("[DataManager] Operation routes registered (PromptServer.routes)")
             return
         except Exception as e:
@@ -209,4 +285,7 @@ def register_operation_routes(server):
         app.router.add_post("/dm/create/file", create_file_handler)
         app.router.add_post("/dm/create/directory", create_directory_handler)
         app.router.add_post("/dm/delete", delete_file_handler)
+        app.router.add_get("/dm/jobs/{job_id}", get_job_handler)
+        app.router.add_post("/dm/cache/decode/clear", clear_decode_cache_handler)
+        app.router.add_post("/dm/scan/cursor/reset", reset_scan_cursor_handler)
         logger.info("[DataManager] Operation routes registered (app.router fallback)")
@@ -14,7 +14,14 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from backend.helpers import save_file, list_files, get_file_info
+from backend.helpers import (
+    save_file,
+    list_files,
+    get_file_info,
+    listing_fingerprint,
+    INCREMENTAL_MODES,
+    SORT_KEYS,
+)
 
 
 class DataManagerCore:
@@ -205,10 +212,10 @@ class BatchPathLoader:
     """
 
     CATEGORY = "Data Manager"
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("paths",)
+    RETURN_TYPES = ("STRING", "INT")
+    RETURN_NAMES = ("paths", "next_offset")
     FUNCTION = "load_batch"
-    OUTPUT_IS_LIST = (True,)  # 关键：触发 ComfyUI 自动迭代
+    OUTPUT_IS_LIST = (True, False)  # 关键：paths 触发 ComfyUI 自动迭代
     INPUT_IS_LIST = False
     COLOR = "#e74c3c"
 
@@ -217,54 +224,137 @@ class BatchPathLoader:
         return {
             "required": {
                 "source_path": ("STRING", {"default": "./input", "tooltip": "文件读取的源目录"}),
-                "pattern": ("STRING", {"default": "*.*", "tooltip": "glob 通配符模式"}),
+                "pattern": ("STRING", {"default": "*.*", "tooltip": "glob 通配符模式（多个以 ; 分隔）"}),
+            },
+            "optional": {
+                "exclude": ("STRING", {"default": "", "tooltip": "排除模式（匹配相对路径，多个以 ; 分隔）"}),
+                "file_filter": (
+                    "STRING",
+                    {"default": "", "tooltip": "元数据过滤条件（size/mtime/ctime，如 size>10KB; mtime>7d）"},
+                ),
+                "incremental": (
+                    list(INCREMENTAL_MODES),
+                    {
+                        "default": "off",
+                        "tooltip": "增量扫描：只输出自上次运行以来新增（new）或新增及修改（changed）的文件；"
+                        "游标在扫描时提交，重新处理需调用 POST /dm/scan/cursor/reset",
+                    },
+                ),
+                "offset": (
+                    "INT",
+                    {
+                        "default": 0,
+                        "min": 0,
+                        "max": 0xFFFFFFFF,
+                        "tooltip": "窗口起始位置（填入上次的 next_offset）",
+                    },
+                ),
+                "limit": (
+                    "INT",
+                    {"default": 0, "min": 0, "max": 0xFFFFFFFF, "tooltip": "窗口大小（0 表示全部）"},
+                ),
+                "order_by": (list(SORT_KEYS), {"default": "name", "tooltip": "窗口排序方式（相同时按路径排序）"}),
             },
-            "optional": {},
         }
 
-    def load_batch(self, source_path: str, pattern: str = "*.*") -> Tuple[str]:
+    @classmethod
+    def IS_CHANGED(
+        cls,
+        source_path: str,
+        pattern: str = "*.*",
+        exclude: str = "",
+        file_filter: str = "",
+        incremental: str = "off",
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "name",
+    ):
+        """按目录扫描结果计算变化指纹，文件列表未变化时 ComfyUI 复用上次的输出；增量扫描每次都重新执行"""
+        if incremental != "off":
+            return float("nan")
+        return listing_fingerprint(source_path, pattern, exclude, file_filter)
+
+    def load_batch(
+        self,
+        source_path: str,
+        pattern: str = "*.*",
+        exclude: str = "",
+        file_filter: str = "",
+        incremental: str = "off",
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "name",
+    ) -> Tuple[list, int]:
         """批量加载文件路径
 
         Args:
             source_path: 源目录
             pattern: glob 通配符模式
+            exclude: 排除模式
+            file_filter: 元数据过滤条件
+            incremental: 增量扫描模式（"off" / "new" / "changed"），结果按修改时间排序
+            offset: 窗口起始位置（增量扫描时忽略）
+            limit: 窗口大小（0 表示全部）
+            order_by: 窗口排序方式（"name" / "mtime" / "size"）
 
         Returns:
-            文件路径字符串元组（ComfyUI 会自动迭代处理每个路径）
+            (文件路径列表, 下一个窗口的 offset)：ComfyUI 会自动迭代处理每个路径；
+            next_offset 为 -1 表示没有剩余文件，增量扫描时为 0 表示下一次运行从游标继续
         """
-        from ..helpers.batch_scanner import scan_files
+        from ..helpers.batch_scanner import scan_window, parse_file_filter
+        from ..helpers.scan_cursor import scan_incremental
 
         print(f"[BatchPathLoader] 扫描目录: {source_path}, pattern: {pattern}")
 
         # 检查目录是否存在
         if not os.path.exists(source_path):
             print(f"[BatchPathLoader] 目录不存在: {source_path}")
-            return ("",)
+            return ([], -1)
 
         if not os.path.isdir(source_path):
             print(f"[BatchPathLoader] 路径不是目录: {source_path}")
-            return ("",)
+            return ([], -1)
 
         # 扫描文件
         try:
-            rel_paths = scan_files(source_path, pattern, recursive="**" in pattern)
-            print(f"[BatchPathLoader] 扫描到 {len(rel_paths)} 个文件")
+            metadata_filter = parse_file_filter(file_filter)
+            if incremental != "off":
+                rel_paths = scan_incremental(
+                    source_path,
+                    pattern,
+                    exclude=exclude,
+                    file_filter=metadata_filter,
+                    mode=incremental,
+                    limit=limit,
+                )
+                next_offset = 0 if limit > 0 and len(rel_paths) >= limit else -1
+            else:
+                rel_paths, next_offset = scan_window(
+                    source_path,
+                    pattern,
+                    offset=offset,
+                    limit=limit,
+                    order_by=order_by,
+                    exclude=exclude,
+                    file_filter=metadata_filter,
+                )
+            print(f"[BatchPathLoader] 扫描到 {len(rel_paths)} 个文件 (next_offset={next_offset})")
 
             # 转换为绝对路径
             abs_paths = [os.path.normpath(os.path.join(source_path, p)) for p in rel_paths]
 
             if not abs_paths:
                 print(f"[BatchPathLoader] 未找到匹配的文件")
-                return ("",)
+                return ([], -1)
 
             print(f"[BatchPathLoader] 返回 {len(abs_paths)} 个路径，ComfyUI 将自动迭代处理")
-            return tuple(abs_paths)  # 返回元组，OUTPUT_IS_LIST 会触发迭代
+            return (abs_paths, next_offset)  # paths 为列表，OUTPUT_IS_LIST 会触发迭代
 
         except Exception as e:
             print(f"[BatchPathLoader] 扫描失败: {e}")
             import traceback
             traceback.print_exc()
-            return ("",)
+            return ([], -1)
 
 
 # V1 API 节点映射
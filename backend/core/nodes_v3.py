@@ -8,11 +8,10 @@
 import asyncio
 import json
 import os
-import pickle
 import shutil
 import sys
 from pathlib import Path
-from typing import Dict, Any, Union, Tuple
+from typing import Dict, Any, List, Optional, Sequence, Union, Tuple
 from datetime import datetime
 import numpy as np
 
@@ -29,11 +28,78 @@ from backend.helpers import (
     get_file_info,
     get_file_category,
     # 批量处理
-    scan_files,
     scan_files_absolute,
     validate_glob_pattern,
-    generate_name,
-    validate_naming_rule,
+    parse_file_filter,
+    scan_incremental,
+    scan_window,
+    INCREMENTAL_MODES,
+    SORT_KEYS,
+    claim_files,
+    complete_claimed_file,
+    begin_claimed_write,
+    finish_claimed_write,
+    DEFAULT_LEASE_SECONDS,
+    compile_naming_rule,
+    reserve_path,
+    reserve_paths,
+    release_reserved_paths,
+    TIMESTAMP_MODES,
+    NAME_CONFLICT_MODES,
+    run_batch,
+    EXECUTOR_TYPES,
+    find_produced,
+    save_with_manifest,
+    get_manifest_path,
+    manifest_name,
+    MANIFEST_MODES,
+    to_uint8_array,
+    iter_uint8_chunks,
+    uint8_to_float32,
+    IMAGE_DTYPES,
+    load_image_batch,
+    open_image_region,
+    parse_crop_box,
+    to_rgb,
+    DEFAULT_CHUNK_FRAMES,
+    get_image_save_kwargs,
+    DEFAULT_ENCODE_PROFILE,
+    ENCODE_PROFILE_NAMES,
+    submit_write_job,
+    get_video_source,
+    remux_video,
+    build_video_writer_kwargs,
+    DEFAULT_VIDEO_SETTINGS,
+    VIDEO_PRESETS,
+    VIDEO_PIXEL_FORMATS,
+    write_audio,
+    AUDIO_CODECS,
+    DEFAULT_AUDIO_FRAME_SIZE,
+    save_latent_file,
+    load_latent_file,
+    is_conditioning,
+    save_conditioning_file,
+    load_conditioning_file,
+    read_safetensors,
+    write_safetensors,
+    compute_cache_key,
+    get_cache_entry,
+    store_cache_entry,
+    remove_cache_entry,
+    DEFAULT_CACHE_BYTES,
+    save_tensor_dump,
+    load_tensor_dump,
+    TENSOR_DUMP_FORMATS,
+    load_cached,
+    set_decode_cache_budget,
+    DEFAULT_DECODE_CACHE_BYTES,
+    path_fingerprint,
+    file_fingerprint,
+    start_prefetch,
+    take_prefetched,
+    stop_prefetch,
+    DEFAULT_PREFETCH_WINDOW,
+    DEFAULT_PREFETCH_BYTES,
 )
 
 
@@ -42,7 +108,12 @@ from backend.helpers import (
 # ============================================================================
 
 
-def save_image(tensor: np.ndarray, file_path: str, format: str = "png") -> str:
+def save_image(
+    tensor: np.ndarray,
+    file_path: str,
+    format: str = "png",
+    profile: str = DEFAULT_ENCODE_PROFILE,
+) -> str:
     """保存 ComfyUI 图像张量到文件
 
     支持格式: PNG, JPG/JPEG, WebP, BMP, TIFF/TIF, GIF
@@ -52,6 +123,7 @@ def save_image(tensor: np.ndarray, file_path: str, format: str = "png") -> str:
         tensor: ComfyUI 图像张量 (Numpy array, shape: [H, W, C] 或 [B, H, W, C])
         file_path: 目标文件路径
         format: 图像格式 (png, jpg, jpeg, webp, bmp, tiff, tif, gif)
+        profile: 编码配置 (fastest, balanced, smallest)，决定各格式的压缩参数
 
     Returns:
         保存后的完整文件路径
@@ -75,14 +147,13 @@ def save_image(tensor: np.ndarray, file_path: str, format: str = "png") -> str:
     # 处理张量形状
     if len(tensor.shape) == 4:
         tensor = tensor[0]
-    elif len(tensor.shape) == 3:
+    elif len(tensor.shape) in (2, 3):
         pass
     else:
         raise ValueError(f"不支持的张量形状: {tensor.shape}")
 
-    # 转换为 uint8
-    if tensor.dtype != np.uint8:
-        tensor = (tensor * 255).astype(np.uint8)
+    # 转换为 uint8（调用方通常已通过 to_uint8_array 完成量化，此时为零拷贝）
+    tensor = to_uint8_array(tensor)
 
     # 转换为 PIL Image，根据通道数选择模式
     if len(tensor.shape) == 2:
@@ -106,33 +177,15 @@ def save_image(tensor: np.ndarray, file_path: str, format: str = "png") -> str:
     # 保存图像
     os.makedirs(Path(file_path).parent, exist_ok=True)
 
-    save_kwargs = {}
     # 将格式名转换为 PIL 支持的格式
     pil_format = format.upper()
-
-    # 格式映射和参数配置
     if pil_format == "JPG":
         pil_format = "JPEG"
-        save_kwargs["quality"] = 95
-    elif pil_format == "JPEG":
-        save_kwargs["quality"] = 95
-    elif pil_format == "WEBP":
-        save_kwargs["quality"] = 95
-        save_kwargs["method"] = 6
     elif pil_format == "TIF":
         pil_format = "TIFF"
-    elif pil_format == "TIFF":
-        # TIFF 可以使用压缩
-        save_kwargs["compression"] = "tiff_lzw"
-    elif pil_format == "BMP":
-        # BMP 无需特殊参数
-        pass
-    elif pil_format == "GIF":
-        # GIF 只支持 256 色，PIL 会自动转换
-        pass
-    elif pil_format == "PNG":
-        # PNG 可以使用压缩
-        save_kwargs["optimize"] = True
+
+    # 根据编码配置获取压缩参数（BMP、GIF 无需特殊参数，GIF 由 PIL 自动转换为 256 色）
+    save_kwargs = get_image_save_kwargs(pil_format, profile)
 
     # JPEG 和 BMP 不支持透明通道，如果是 RGBA 需要转换为 RGB
     if pil_format in ["JPEG", "JPG", "BMP"] and img.mode == "RGBA":
@@ -146,9 +199,11 @@ def save_image(tensor: np.ndarray, file_path: str, format: str = "png") -> str:
     return file_path
 
 
-def save_latent(latent_data: Dict[str, np.ndarray], file_path: str) -> str:
+def save_latent(latent_data: Dict[str, Any], file_path: str) -> str:
     """保存 Latent 数据到文件
 
+    使用 safetensors 格式（不执行代码、可内存映射读取，与 ComfyUI LoadLatent 兼容）
+
     Args:
         latent_data: Latent 数据字典，通常包含 "samples" 键
         file_path: 目标文件路径
@@ -161,29 +216,37 @@ def save_latent(latent_data: Dict[str, np.ndarray], file_path: str) -> str:
     if path.suffix.lower() != ".latent":
         file_path = str(path.with_suffix(".latent"))
 
-    # 保存为 pickle 格式
-    os.makedirs(Path(file_path).parent, exist_ok=True)
-
-    with open(file_path, "wb") as f:
-        pickle.dump(latent_data, f)
+    return save_latent_file(latent_data, file_path)
 
-    return file_path
 
-
-def save_conditioning(cond_data: Any, file_path: str) -> str:
+def save_conditioning(cond_data: Any, file_path: str, format: str = "cond") -> str:
     """保存 Conditioning 数据到文件
 
+    cond 格式将 [[tensor, dict], ...] 无损保存为 safetensors 容器（可直接重新加载替代文本编码），
+    json 格式只保存文本描述
+
     Args:
         cond_data: Conditioning 数据
         file_path: 目标文件路径
+        format: 文件格式（cond 或 json）
 
     Returns:
         保存后的完整文件路径
     """
+    format = format.lower()
+    if format not in TYPE_FORMAT_MAP["CONDITIONING"]["formats"]:
+        format = TYPE_FORMAT_MAP["CONDITIONING"]["default"]
+    if format == "cond" and not is_conditioning(cond_data):
+        # 非 [[tensor, dict], ...] 结构只能保存为文本
+        format = "json"
+
     # 确保 file_path 有正确的扩展名
     path = Path(file_path)
-    if path.suffix.lower() != ".json":
-        file_path = str(path.with_suffix(".json"))
+    if path.suffix.lower() != f".{format}":
+        file_path = str(path.with_suffix(f".{format}"))
+
+    if format == "cond":
+        return save_conditioning_file(cond_data, file_path)
 
     # 尝试转换为可序列化的格式
     os.makedirs(Path(file_path).parent, exist_ok=True)
@@ -205,15 +268,27 @@ def save_conditioning(cond_data: Any, file_path: str) -> str:
     return file_path
 
 
-def save_video(data: Any, file_path: str, format: str = "mp4") -> str:
+def save_video(
+    data: Any,
+    file_path: str,
+    format: str = "mp4",
+    chunk_size: int = DEFAULT_CHUNK_FRAMES,
+    video_settings: Optional[Dict[str, Any]] = None,
+) -> str:
     """保存 ComfyUI 视频数据到文件
 
     支持格式: MP4, WebM, AVI, MOV, MKV, FLV
 
+    帧序列按 chunk_size 分块量化为 uint8 并传输到主机后逐帧送入编码器，
+    峰值内存与视频长度无关
+
     Args:
         data: ComfyUI io.Video 类型数据
         file_path: 目标文件路径
         format: 视频格式 (mp4, webm, avi, mov, mkv, flv)
+        chunk_size: 每次量化和传输的帧数
+        video_settings: 编码设置（preset, crf, bitrate, threads, gop, pixel_format），
+            缺省项使用 TYPE_FORMAT_MAP["VIDEO"]["encode_settings"]
 
     Returns:
         保存后的完整文件路径
@@ -239,18 +314,6 @@ def save_video(data: Any, file_path: str, format: str = "mp4") -> str:
         frames = data.images
         frame_rate = getattr(data, "frame_rate", 24)
 
-        # 转换为 numpy
-        import torch
-
-        if isinstance(frames, torch.Tensor):
-            frames_np = frames.cpu().numpy()
-        else:
-            frames_np = frames
-
-        # 转换为 uint8
-        if frames_np.dtype != np.uint8:
-            frames_np = (frames_np * 255).astype(np.uint8)
-
         # 使用 imageio 保存视频（比 OpenCV 更可靠）
         try:
             import imageio
@@ -260,70 +323,101 @@ def save_video(data: Any, file_path: str, format: str = "mp4") -> str:
             )
 
         # 格式对应的编码器配置
-        codec_map = {
-            "mp4": "libx264",  # H.264，最兼容
-            "mov": "libx264",  # MOV 使用 H.264
-            "avi": "mpeg4",  # MPEG-4 Part 2，AVI 更兼容
-            "mkv": "libx264",  # MKV 使用 H.264
-            "webm": "libvpx-vp9",  # WebM 使用 VP9
-        }
-
-        # 格式支持的 pixelformat (注意：imageio 使用 pixelformat 不是 pixel_format)
-        pixelformat_map = {
-            "mp4": "yuv420p",  # 最兼容
-            "mov": "yuv420p",
-            "avi": "yuv420p",
-            "mkv": "yuv420p",
-            "webm": "yuv420p",
-        }
+        codec_map = TYPE_FORMAT_MAP["VIDEO"]["codecs"]
 
         if format not in codec_map:
             raise ValueError(f"不支持的视频格式: {format}。支持的格式: {list(codec_map.keys())}")
 
         codec = codec_map[format]
-        pixelformat = pixelformat_map[format]
-
-        print(f"[DataManager] Using imageio: format={format}, codec={codec}")
 
-        # 使用 imageio-ffmpeg 的参数
-        writer_kwargs = {
-            "fps": float(frame_rate),
-            "codec": codec,
-            "quality": 8,  # 用于 libx264 (0-10, 10是最佳质量)
-            "pixelformat": pixelformat,
-            "macro_block_size": 8,  # 避免尺寸不是16倍数的问题
-        }
+        # 使用 imageio-ffmpeg 的参数（preset、CRF/码率、线程数、GOP、像素格式）
+        writer_kwargs = build_video_writer_kwargs(codec, frame_rate, video_settings)
 
-        # WebM 格式特殊处理
-        if format == "webm":
-            writer_kwargs["quality"] = 9  # VP9 质量设置
+        print(
+            f"[DataManager] Using imageio: format={format}, codec={codec}, "
+            f"params={writer_kwargs.get('ffmpeg_params', [])}"
+        )
 
         writer = imageio.get_writer(file_path, **writer_kwargs)
 
-        # 写入每一帧（imageio 使用 RGB 格式，不需要转换）
-        for frame in frames_np:
-            writer.append_data(frame)
-
-        writer.close()
+        # 分块量化并写入每一帧（imageio 使用 RGB 格式，不需要转换）
+        try:
+            for chunk in iter_uint8_chunks(frames, chunk_size):
+                for frame in chunk:
+                    writer.append_data(frame)
+        finally:
+            writer.close()
         print(f"[DataManager] Video saved successfully: {file_path}")
 
     return file_path
 
 
+def save_video_input(
+    video: Any,
+    file_path: str,
+    format: str = "mp4",
+    video_settings: Optional[Dict[str, Any]] = None,
+) -> str:
+    """保存 ComfyUI VideoInput / VideoComponents 到文件
+
+    从文件加载且未经修改的视频（VideoFromFile）优先走直通复制或按数据包封装转换，
+    不解码任何帧；编码与目标容器不兼容或封装失败时回退到 save_video 完整转码
+
+    Args:
+        video: ComfyUI 视频数据（VideoInput 或 VideoComponents）
+        file_path: 目标文件路径
+        format: 视频格式 (mp4, webm, avi, mov, mkv)
+        video_settings: 转码时使用的编码设置（直通/封装转换不重新编码，不使用该设置）
+
+    Returns:
+        保存后的完整文件路径
+    """
+    # 解析格式字符串
+    if " - " in format:
+        format = format.split(" - ")[-1].lower()
+    else:
+        format = format.lower()
+
+    source = get_video_source(video)
+    if source is not None:
+        try:
+            saved_path = remux_video(source, file_path, format)
+            if saved_path:
+                print(f"[DataManager] Video remuxed without re-encoding: {saved_path}")
+                return saved_path
+        except Exception as e:
+            print(f"[DataManager] Remux failed, falling back to transcode: {e}")
+
+    # 完整转码：解码为帧序列后重新编码
+    if hasattr(video, "get_components"):
+        video = video.get_components()
+    return save_video(video, file_path, format, video_settings=video_settings)
+
+
 # ============================================================================
 # 音频保存功能
 # ============================================================================
 
 
-def save_audio(data: Any, file_path: str, format: str = "mp3") -> str:
+def save_audio(
+    data: Any,
+    file_path: str,
+    format: str = "mp3",
+    frame_size: int = DEFAULT_AUDIO_FRAME_SIZE,
+) -> str:
     """保存 ComfyUI 音频数据到文件
 
     支持格式: MP3, WAV, FLAC, OGG
 
+    WAV/FLAC 直接写入 16 位 PCM（soundfile 或标准库 wave），
+    MP3/OGG 使用 PyAV 按 frame_size 采样分帧编码
+
     Args:
         data: ComfyUI 音频数据，格式为 {"waveform": Tensor, "sample_rate": int}
+            （[B, C, T] 批次只保存第一段并打印警告）
         file_path: 目标文件路径
         format: 音频格式 (mp3, wav, flac, ogg)
+        frame_size: PyAV 编码时每帧的采样数
 
     Returns:
         保存后的完整文件路径
@@ -334,6 +428,9 @@ def save_audio(data: Any, file_path: str, format: str = "mp3") -> str:
     else:
         format = format.lower()
 
+    if format not in AUDIO_CODECS:
+        raise ValueError(f"不支持的音频格式: {format}")
+
     # 确保 file_path 有正确的扩展名
     path = Path(file_path)
     if path.suffix.lower() != f".{format}":
@@ -353,102 +450,18 @@ def save_audio(data: Any, file_path: str, format: str = "mp3") -> str:
     else:
         raise ValueError(f"不支持的音频数据类型: {type(data)}")
 
-    # 转换为 numpy
-    if hasattr(waveform, "cpu"):  # torch.Tensor
-        waveform_np = waveform.cpu().numpy()
-    else:
-        waveform_np = waveform
-
-    # 转换为 float32 并归一化到 [-1, 1] 范围
-    if waveform_np.dtype != np.float32:
-        waveform_np = waveform_np.astype(np.float32)
-
-    # 确保波形在 [-1, 1] 范围内
-    if np.abs(waveform_np).max() > 1.0:
-        waveform_np = waveform_np / np.abs(waveform_np).max()
-
-    # PyAV 保存音频
-    try:
-        import av
-    except ImportError:
-        raise ImportError("PyAV (av) 未安装，无法保存音频。请运行: pip install av")
-
-    # 格式对应的编码器配置
-    codec_map = {
-        "mp3": "libmp3lame",
-        "wav": "pcm_s16le",
-        "flac": "flac",
-        "ogg": "libvorbis",
-    }
-
-    if format not in codec_map:
-        raise ValueError(f"不支持的音频格式: {format}")
-
-    codec = codec_map[format]
-
-    print(f"[DataManager] Saving audio: format={format}, codec={codec}, sample_rate={sample_rate}")
-
-    # 处理批次维度
-    if len(waveform_np.shape) == 3:
+    # 处理批次维度（批次拆分为多个文件见 save_audio_clips）
+    if len(waveform.shape) == 3:
+        if waveform.shape[0] > 1:
+            print(
+                f"[DataManager] 警告: 音频批次包含 {waveform.shape[0]} 段，save_audio 只保存第一段到 {file_path}"
+            )
         # [B, C, T] -> 取第一个批次
-        waveform_np = waveform_np[0]
-
-    # 确保是 [C, T] 格式 (通道数, 样本数)
-    if len(waveform_np.shape) != 2:
-        raise ValueError(f"不支持的音频形状: {waveform_np.shape}，期望 [C, T] 格式")
-
-    num_channels = waveform_np.shape[0]
-    num_samples = waveform_np.shape[1]
-
-    # PyAV 需要交错格式数据: [1, C*T]
-    # 将 [C, T] 转换为交错格式 [T*C]
-    interleaved_data = waveform_np.T.flatten()  # [T*C]
-
-    # 创建输出容器
-    try:
-        output_container = av.open(file_path, mode="w")
-        stream = output_container.add_stream(codec, rate=sample_rate)
-        print(f"[DataManager] Created output container: {file_path}")
-    except Exception as e:
-        print(f"[DataManager] ERROR: Failed to create output container: {e}")
-        raise
-
-    # 设置编码质量
-    if format == "mp3":
-        stream.codec_context.qscale = 2  # 高质量 (0-9, 越小质量越高)
+        waveform = waveform[0]
 
-    # PyAV 需要 layout='mono'，因为数据是交错的
-    # stereo 会在编码时自动处理
-    layout = "mono" if num_channels == 1 else "stereo"
-
-    # 分帧写入音频
-    frame_size = 1024
-    frames_written = 0
-    for i in range(0, num_samples, frame_size):
-        try:
-            # PyAV 要求 [1, samples*channels] 格式
-            start = i * num_channels
-            end = (i + frame_size) * num_channels
-            frame_data = interleaved_data[start:end].reshape(1, -1)
-            frame = av.AudioFrame.from_ndarray(frame_data, format="flt", layout=layout)
-            frame.sample_rate = sample_rate
-            for packet in stream.encode(frame):
-                output_container.mux(packet)
-                frames_written += 1
-        except Exception as e:
-            print(f"[DataManager] ERROR: Failed to encode frame at {i}: {e}")
-            raise
-
-    # 写入剩余的帧
-    try:
-        for packet in stream.encode():
-            output_container.mux(packet)
-            frames_written += 1
-        output_container.close()
-        print(f"[DataManager] Audio saved successfully: {file_path}, frames={frames_written}")
-    except Exception as e:
-        print(f"[DataManager] ERROR: Failed to finalize audio: {e}")
-        raise
+    # 向量化转换并写入（峰值归一化、PCM 转换均为整段数组运算）
+    write_audio(waveform, sample_rate, file_path, format, frame_size)
+    print(f"[DataManager] Audio saved: {file_path} (format={format}, sample_rate={sample_rate})")
 
     return file_path
 
@@ -458,7 +471,12 @@ def save_audio(data: Any, file_path: str, format: str = "mp3") -> str:
 # ============================================================================
 
 
-def load_image(file_path: str) -> tuple:
+def load_image(
+    file_path: str,
+    dtype: str = "float32",
+    max_side: int = 0,
+    crop_box: Optional[Tuple[int, int, int, int]] = None,
+) -> tuple:
     """加载图像文件为 ComfyUI Tensor 格式
 
     支持格式: PNG, JPG/JPEG, WebP, BMP, TIFF, TIF, GIF
@@ -466,11 +484,15 @@ def load_image(file_path: str) -> tuple:
 
     Args:
         file_path: 图像文件路径
+        dtype: "float32"（ComfyUI 标准格式，范围 0-1）或 "uint8"（范围 0-255，内存为 float32 的 1/4，
+            只适合直接保存或支持 uint8 的下游节点）
+        max_side: 输出的最长边上限（0 表示原始尺寸）；JPEG 直接以 DCT 缩放解码
+        crop_box: 只加载的区域 (left, top, right, bottom)，按 EXIF 旋转后的方向
 
     Returns:
         (image_tensor, mask_tensor) - ComfyUI 标准图像格式
-        - image_tensor: [1, H, W, 3] RGB torch.Tensor (float32, 范围 0-1)
-        - mask_tensor: [1, H, W] 或 None
+        - image_tensor: [1, H, W, 3] RGB torch.Tensor (float32 范围 0-1，或 uint8 范围 0-255)
+        - mask_tensor: [1, H, W] 或 None（与 image_tensor 数据类型相同）
 
     Raises:
         FileNotFoundError: 文件不存在
@@ -486,41 +508,67 @@ def load_image(file_path: str) -> tuple:
     except ImportError:
         raise ImportError("PIL/Pillow 未安装，无法加载图像")
 
+    if dtype not in IMAGE_DTYPES:
+        raise ValueError(f"不支持的图像数据类型: {dtype}，可选: {IMAGE_DTYPES}")
+
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"图像文件不存在: {file_path}")
 
     img = Image.open(file_path)
 
-    # 处理 EXIF 旋转
-    from PIL import ImageOps
-
-    img = ImageOps.exif_transpose(img)
+    # 处理 EXIF 旋转，只解码需要的分辨率和区域
+    img = open_image_region(img, max_side=max_side, crop_box=crop_box)
 
     # 转换为 RGB
-    if img.mode == "I":
-        img = img.point(lambda i: i * (1 / 255))
-    image = img.convert("RGB")
+    image = to_rgb(img)
 
     # 转换为 numpy array，然后转为 torch.Tensor
-    # ComfyUI 格式: [1, H, W, 3], float32, 范围 0-1
-    image = np.array(image).astype(np.float32) / 255.0
+    # ComfyUI 格式: [1, H, W, 3], float32, 范围 0-1（uint8 模式不做转换）
+    if dtype == "float32":
+        image = uint8_to_float32(np.asarray(image))
+    else:
+        image = np.array(image)  # 可写副本（np.asarray 返回只读数组）
     image = torch.from_numpy(image)[None,]  # [1, H, W, 3]
 
-    # 处理 mask (alpha 通道)
+    # 处理 mask (alpha 通道)，ComfyUI mask 是反向的
     if "A" in img.getbands():
-        mask = np.array(img.getchannel("A")).astype(np.float32) / 255.0
-        mask = 1.0 - torch.from_numpy(mask)  # ComfyUI mask 是反向的
+        alpha = np.asarray(img.getchannel("A"))
     elif img.mode == "P" and "transparency" in img.info:
-        mask = np.array(img.convert("RGBA").getchannel("A")).astype(np.float32) / 255.0
-        mask = 1.0 - torch.from_numpy(mask)
+        alpha = np.asarray(img.convert("RGBA").getchannel("A"))
     else:
+        alpha = None
+
+    if alpha is None:
         mask = None
+    elif dtype == "float32":
+        mask = uint8_to_float32(alpha)
+        np.subtract(np.float32(1.0), mask, out=mask)
+        mask = torch.from_numpy(mask)
+    else:
+        mask = torch.from_numpy(255 - alpha)
 
     img.close()
 
     return (image, mask)
 
 
+def load_tensor(file_path: str) -> Any:
+    """加载 .npy 张量转储（IMAGE/MASK 批次）
+
+    内存映射直接返回保存时的张量，不解码、不转换为 RGB/float32
+
+    Args:
+        file_path: .npy 文件路径
+
+    Returns:
+        torch.Tensor，dtype 和形状与保存时一致
+
+    Raises:
+        FileNotFoundError: 文件不存在
+    """
+    return load_tensor_dump(file_path)
+
+
 def load_video(file_path: str):
     """加载视频文件为 ComfyUI VideoInput 格式
 
@@ -597,34 +645,32 @@ def load_audio(file_path: str) -> dict:
     }
 
 
-def load_latent(file_path: str) -> dict:
+def load_latent(file_path: str, index: Optional[int] = None) -> dict:
     """加载 .latent 文件为 ComfyUI LATENT 格式
 
+    safetensors 格式使用内存映射按需读取，旧版 pickle 格式仍可加载
+
     Args:
         file_path: .latent 文件路径
+        index: 只加载批次中的第 index 个样本（None 表示全部）
 
     Returns:
         {"samples": tensor} - ComfyUI latent 格式
 
     Raises:
         FileNotFoundError: 文件不存在
-        pickle.PickleError: 文件格式错误
+        IndexError: index 超出批次范围
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Latent 文件不存在: {file_path}")
-
-    # 使用 pickle 加载
-    with open(file_path, "rb") as f:
-        latent_data = pickle.load(f)
-
-    return latent_data
+    return load_latent_file(file_path, index=index)
 
 
 def load_conditioning(file_path: str) -> list:
-    """加载 JSON 格式的 conditioning 数据
+    """加载 conditioning 数据
+
+    .cond 文件使用内存映射无损加载，.json 文件按旧版文本格式加载
 
     Args:
-        file_path: JSON 文件路径
+        file_path: .cond 或 JSON 文件路径
 
     Returns:
         [[cond_data, ...]] - ComfyUI conditioning 格式
@@ -636,6 +682,9 @@ def load_conditioning(file_path: str) -> list:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Conditioning 文件不存在: {file_path}")
 
+    if Path(file_path).suffix.lower() == ".cond":
+        return load_conditioning_file(file_path)
+
     with open(file_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
@@ -673,12 +722,42 @@ def parse_target_path(target_path: str, detected_type: str, format: str) -> Tupl
     return directory, filename
 
 
+def resolve_generated_path(target_path: str, generated_name: str) -> Tuple[str, str]:
+    """解析命名规则生成的文件名，返回目录和完整文件路径
+
+    Args:
+        target_path: 目标保存目录
+        generated_name: 命名规则生成的文件名（可能包含相对或绝对路径）
+
+    Returns:
+        (目录, 完整文件路径)
+    """
+    if "/" in generated_name or "\\" in generated_name:
+        # 使用生成的路径结构
+        generated_path = os.path.normpath(generated_name)
+        if os.path.isabs(generated_path):
+            # 绝对路径：直接使用
+            full_path = generated_path
+            directory = os.path.dirname(full_path)
+        else:
+            # 相对路径：基于 target_path
+            directory = os.path.join(target_path, os.path.dirname(generated_name))
+            full_path = os.path.join(directory, os.path.basename(generated_name))
+    else:
+        # 只有文件名，使用 target_path 作为目录
+        directory = target_path
+        full_path = os.path.join(directory, generated_name)
+
+    return directory, full_path
+
+
 # ============================================================================
 # 类型到文件格式的映射配置
 # ============================================================================
 TYPE_FORMAT_MAP = {
     "IMAGE": {
-        "formats": ["png", "jpg", "jpeg", "webp", "bmp", "tiff", "tif", "gif"],
+        # npy: 原样转储整个批次（保留 dtype 和形状，不编码），用于工作流之间的检查点
+        "formats": ["png", "jpg", "jpeg", "webp", "bmp", "tiff", "tif", "gif", "npy"],
         "default": "png",
         "description": "图像格式",
     },
@@ -686,6 +765,16 @@ TYPE_FORMAT_MAP = {
         "formats": ["mp4", "webm", "avi", "mov", "mkv"],
         "default": "mp4",
         "description": "视频格式",
+        # 格式对应的编码器
+        "codecs": {
+            "mp4": "libx264",  # H.264，最兼容
+            "mov": "libx264",  # MOV 使用 H.264
+            "avi": "mpeg4",  # MPEG-4 Part 2，AVI 更兼容
+            "mkv": "libx264",  # MKV 使用 H.264
+            "webm": "libvpx-vp9",  # WebM 使用 VP9
+        },
+        # 默认编码设置（InputPathConfig 的视频编码输入）
+        "encode_settings": DEFAULT_VIDEO_SETTINGS,
     },
     "AUDIO": {
         "formats": ["mp3", "wav", "flac", "ogg"],
@@ -694,11 +783,15 @@ TYPE_FORMAT_MAP = {
     },
     "LATENT": {"formats": ["latent"], "default": "latent", "description": "Latent 数据"},
     "MASK": {
-        "formats": ["png", "jpg", "jpeg", "webp", "bmp", "tiff", "tif"],
+        "formats": ["png", "jpg", "jpeg", "webp", "bmp", "tiff", "tif", "npy"],
         "default": "png",
         "description": "遮罩格式",
     },
-    "CONDITIONING": {"formats": ["json"], "default": "json", "description": "Conditioning 数据"},
+    "CONDITIONING": {
+        "formats": ["cond", "json"],
+        "default": "cond",
+        "description": "Conditioning 数据",
+    },
     "STRING": {"formats": ["txt", "json"], "default": "txt", "description": "文本格式"},
 }
 
@@ -718,6 +811,8 @@ EXTENSION_TO_TYPE_MAP = {
     "tiff": "IMAGE",
     "tif": "IMAGE",
     "gif": "IMAGE",
+    # 张量转储（IMAGE/MASK 原样保存）
+    "npy": "IMAGE",
     # 视频格式
     "mp4": "VIDEO",
     "webm": "VIDEO",
@@ -731,7 +826,8 @@ EXTENSION_TO_TYPE_MAP = {
     "ogg": "AUDIO",
     # Latent 格式（自定义格式）
     "latent": "LATENT",
-    # Conditioning 格式
+    # Conditioning 格式（cond 为 safetensors 容器，json 为旧版文本格式）
+    "cond": "CONDITIONING",
     "json": "CONDITIONING",
     # 文本格式
     "txt": "STRING",
@@ -761,6 +857,8 @@ def _detect_input_type(file_input: Any) -> str:
     Returns:
         类型名称（如 "IMAGE", "VIDEO", "AUDIO", "STRING" 等）
     """
+    if is_conditioning(file_input):
+        return "CONDITIONING"
     if isinstance(file_input, dict):
         if "waveform" in file_input:
             return "AUDIO"
@@ -784,48 +882,60 @@ def _detect_input_type(file_input: Any) -> str:
     return type(file_input).__name__.upper()
 
 
-def _save_by_type(file_input: Any, full_path: str, format: str) -> str:
+def _save_by_type(
+    file_input: Any,
+    full_path: str,
+    format: str,
+    encode_profile: str = DEFAULT_ENCODE_PROFILE,
+    video_settings: Optional[Dict[str, Any]] = None,
+) -> Union[str, List[str]]:
     """根据类型保存数据到文件
 
     Args:
         file_input: 输入数据
         full_path: 完整的目标文件路径
         format: 文件格式
+        encode_profile: 图像编码配置 (fastest, balanced, smallest)
+        video_settings: 视频编码设置（见 TYPE_FORMAT_MAP["VIDEO"]["encode_settings"]）
 
     Returns:
-        保存后的文件路径
+        保存后的文件路径；音频批次拆分为多个文件时为路径列表（按批次顺序）
 
     Raises:
         Exception: 保存失败时抛出异常
     """
     detected_type = _detect_input_type(file_input)
 
+    # 张量转储：整个批次原样保存
+    if format in TENSOR_DUMP_FORMATS and detected_type in ("IMAGE", "TENSOR"):
+        if isinstance(file_input, dict):
+            file_input = file_input["tensor"]
+        return save_tensor_dump(file_input, full_path)
+
     if detected_type == "AUDIO":
-        return save_audio(file_input, full_path, format)
+        # 音频批次拆分为多个文件时返回全部路径
+        saved_paths = save_audio_clips(file_input, full_path, format)
+        return saved_paths if len(saved_paths) > 1 else saved_paths[0]
     elif detected_type == "LATENT":
         return save_latent(file_input, full_path)
     elif detected_type == "CONDITIONING":
-        return save_conditioning(file_input, full_path)
+        return save_conditioning(file_input, full_path, format)
     elif detected_type == "IMAGE" or detected_type == "TENSOR":
         # 处理张量类型
         if hasattr(file_input, "shape"):
-            import torch
-            if isinstance(file_input, torch.Tensor):
-                tensor = file_input.cpu().numpy()
-            else:
-                tensor = file_input
+            tensor = file_input
 
-            # 处理不同形状
+            # 处理不同形状（先取出单帧，只量化和传输需要保存的数据）
             if len(tensor.shape) == 4:
                 if tensor.shape[1] == 3:  # [B, C, H, W]
-                    tensor = tensor[0].transpose(1, 2, 0)
+                    tensor = to_uint8_array(tensor[0]).transpose(1, 2, 0)
                 elif tensor.shape[3] == 3:  # [B, H, W, C]
                     tensor = tensor[0]
             elif len(tensor.shape) == 3:
                 if tensor.shape[0] == 1:  # [1, H, W]
                     tensor = tensor[0]
 
-            return save_image(tensor, full_path, format)
+            return save_image(to_uint8_array(tensor), full_path, format, encode_profile)
     elif detected_type == "STRING":
         if os.path.exists(file_input):
             shutil.copy2(file_input, full_path)
@@ -835,11 +945,7 @@ def _save_by_type(file_input: Any, full_path: str, format: str) -> str:
                 f.write(file_input)
             return full_path
     elif detected_type == "VIDEO":
-        if hasattr(file_input, "get_components"):
-            video_data = file_input.get_components()
-        else:
-            video_data = file_input
-        return save_video(video_data, full_path, format)
+        return save_video_input(file_input, full_path, format, video_settings)
     else:
         # 其他类型转为字符串保存
         with open(full_path, "w", encoding="utf-8") as f:
@@ -847,6 +953,228 @@ def _save_by_type(file_input: Any, full_path: str, format: str) -> str:
         return full_path
 
 
+def _split_latent_batch(latent: Dict[str, Any]) -> list:
+    """将 Latent 批次拆分为单项 Latent 列表
+
+    批次维度与 samples 一致的张量（如 noise_mask）按项切分，batch_index 同步拆分，
+    其他键原样保留。切分结果复制到主机内存，不与原批次共享存储（进程池序列化时只传输单项数据）
+
+    Args:
+        latent: {"samples": [B, C, H, W], ...}
+
+    Returns:
+        B 个 {"samples": [1, C, H, W], ...} 字典
+    """
+    batch_size = latent["samples"].shape[0]
+    items = []
+    for i in range(batch_size):
+        item = {}
+        for key, value in latent.items():
+            if hasattr(value, "shape") and len(value.shape) > 0 and value.shape[0] == batch_size:
+                part = value[i : i + 1]
+                item[key] = (
+                    part.detach().cpu().clone() if hasattr(part, "detach") else np.array(part)
+                )
+            elif key == "batch_index" and isinstance(value, list) and len(value) == batch_size:
+                item[key] = [value[i]]
+            else:
+                item[key] = value
+        items.append(item)
+    return items
+
+
+def _split_batch(file_input: Any) -> Union[Tuple[str, list], None]:
+    """将批次输入拆分为逐项保存的数据
+
+    - IMAGE [N, H, W, C] 张量：一次性量化为 uint8 并整体传输到主机，各项为同一缓冲区的零拷贝视图
+    - AUDIO {"waveform": [B, C, T]}（B > 1）：波形整体传输到主机一次，各项为 [C, T] 视图
+    - LATENT {"samples": [B, ...]}（B > 1）：按项拆分为 [1, ...] 的 Latent
+
+    Args:
+        file_input: 输入数据
+
+    Returns:
+        (类型, 数据列表)；非批次输入返回 None
+    """
+    if hasattr(file_input, "dim") and file_input.dim() == 4:
+        batch_np = to_uint8_array(file_input)
+        return "IMAGE", [batch_np[i] for i in range(batch_np.shape[0])]
+
+    if not isinstance(file_input, dict):
+        return None
+
+    waveform = file_input.get("waveform")
+    if waveform is not None and len(waveform.shape) == 3 and waveform.shape[0] > 1:
+        if hasattr(waveform, "detach"):
+            waveform = waveform.detach().cpu().numpy()
+        return "AUDIO", [{**file_input, "waveform": waveform[i]} for i in range(waveform.shape[0])]
+
+    samples = file_input.get("samples")
+    if samples is not None and len(samples.shape) > 0 and samples.shape[0] > 1:
+        return "LATENT", _split_latent_batch(file_input)
+
+    return None
+
+
+def save_audio_clips(file_input: Dict[str, Any], full_path: str, format: str = "mp3") -> List[str]:
+    """保存音频，[B, C, T] 批次（B > 1）按段拆分为 B 个文件
+
+    各段保存为 <文件名>_0001.<扩展名>、<文件名>_0002.<扩展名> ...（与 Batch 模式默认命名规则的序号一致），
+    非批次或 B = 1 时与 save_audio 相同
+
+    Args:
+        file_input: ComfyUI 音频数据 {"waveform": Tensor, "sample_rate": int}
+        full_path: 目标文件路径
+        format: 音频格式
+
+    Returns:
+        保存后的文件路径列表（按批次顺序）
+    """
+    batch = _split_batch(file_input)
+    if batch is None:
+        return [save_audio(file_input, full_path, format)]
+
+    _, clips = batch
+    path = Path(full_path)
+    saved_paths = [
+        save_audio(clip, str(path.with_name(f"{path.stem}_{i + 1:04d}{path.suffix}")), format)
+        for i, clip in enumerate(clips)
+    ]
+    print(f"[DataManager] 音频批次已拆分保存为 {len(saved_paths)} 个文件")
+    return saved_paths
+
+
+def _write_job_finisher(original_path: str, reserved: Sequence[str] = ()):
+    """异步保存提交时取得 Match 模式认领的源文件，返回写入任务结束回调
+
+    回调删除没有写入内容的占位文件（name_conflict=unique 预占的文件名），
+    写入全部成功时将认领的源文件标记为完成，失败时释放认领；都不需要时返回 None
+    """
+    claim = begin_claimed_write(original_path) if original_path else None
+    if claim is None and not reserved:
+        return None
+
+    def on_finish(job: Dict[str, Any]) -> None:
+        if reserved:
+            release_reserved_paths(reserved, job["saved_paths"])
+        if claim is not None:
+            finish_claimed_write(claim, job["status"] == "success")
+
+    return on_finish
+
+
+# Match 模式批次输出可用的尺寸策略（都只产出一个批次）
+MATCH_BATCH_POLICIES = ("pad", "resize")
+
+# 单文件模式下支持异步保存的类型（编码耗时的图像/音视频）
+ASYNC_SAVE_TYPES = ("IMAGE", "TENSOR", "AUDIO", "VIDEO")
+
+
+def _snapshot_for_async(file_input: Any, format: str = "") -> Any:
+    """异步保存前复制输入中的张量数据
+
+    张量在当前线程中一次性量化为主机 uint8 缓冲区（4D 批次只保留第一帧，与单文件模式一致），
+    音频波形复制到主机内存，后台写入线程不再访问上游的 GPU 张量。
+    张量转储格式（npy）保留整个批次和原始 dtype，只复制到主机内存
+
+    Args:
+        file_input: 输入数据
+        format: 文件格式
+
+    Returns:
+        可交给后台线程保存的数据
+    """
+    if format in TENSOR_DUMP_FORMATS and _detect_input_type(file_input) in ("IMAGE", "TENSOR"):
+        if isinstance(file_input, dict):
+            file_input = file_input["tensor"]
+        if hasattr(file_input, "detach"):
+            return file_input.detach().cpu().clone()
+        return np.array(file_input)
+
+    if isinstance(file_input, dict):
+        if "tensor" in file_input:
+            file_input = file_input["tensor"]
+        elif "waveform" in file_input and hasattr(file_input["waveform"], "cpu"):
+            return {**file_input, "waveform": file_input["waveform"].detach().cpu()}
+        else:
+            return file_input
+
+    if hasattr(file_input, "shape") and not isinstance(file_input, str):
+        if len(file_input.shape) == 4:
+            file_input = file_input[:1]
+        return to_uint8_array(file_input)
+
+    return file_input
+
+
+# 缓存节点可保存的类型
+CACHEABLE_TYPES = ("IMAGE", "TENSOR", "MASK", "LATENT", "CONDITIONING", "AUDIO", "STRING", "VIDEO")
+
+
+def _write_cache_value(value: Any, entry_dir: str) -> Tuple[str, str]:
+    """将缓存节点的值写入条目目录
+
+    张量和音频波形以 safetensors 原样保存（不经过 8 位量化，加载时内存映射），
+    Latent/Conditioning 使用对应的无损格式，视频优先直通复制
+
+    Args:
+        value: 上游输出
+        entry_dir: 条目目录
+
+    Returns:
+        (数据类型, 数据文件路径)
+
+    Raises:
+        TypeError: 不支持缓存的类型
+    """
+    detected_type = _detect_input_type(value)
+    if detected_type not in CACHEABLE_TYPES:
+        raise TypeError(f"不支持缓存的类型: {detected_type}")
+
+    if detected_type in ("IMAGE", "TENSOR", "MASK"):
+        file_path = os.path.join(entry_dir, "data.safetensors")
+        write_safetensors({"tensor": value}, file_path)
+    elif detected_type == "AUDIO":
+        file_path = os.path.join(entry_dir, "data.safetensors")
+        write_safetensors(
+            {"waveform": value["waveform"]},
+            file_path,
+            {"sample_rate": str(int(value["sample_rate"]))},
+        )
+    elif detected_type == "LATENT":
+        file_path = save_latent(value, os.path.join(entry_dir, "data.latent"))
+    elif detected_type == "CONDITIONING":
+        file_path = save_conditioning(value, os.path.join(entry_dir, "data.cond"), "cond")
+    elif detected_type == "STRING":
+        file_path = os.path.join(entry_dir, "data.txt")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(value)
+    else:
+        file_path = save_video_input(value, os.path.join(entry_dir, "data.mp4"), "mp4")
+
+    return detected_type, file_path
+
+
+def _read_cache_value(entry: Dict[str, Any]) -> Any:
+    """从缓存条目加载值（get_cache_entry 的返回结果）"""
+    detected_type = entry["type"]
+    file_path = entry["path"]
+
+    if detected_type in ("IMAGE", "TENSOR", "MASK"):
+        return read_safetensors(file_path)[0]["tensor"]
+    if detected_type == "AUDIO":
+        tensors, metadata = read_safetensors(file_path)
+        return {"waveform": tensors["waveform"], "sample_rate": int(metadata["sample_rate"])}
+    if detected_type == "LATENT":
+        return load_latent(file_path)
+    if detected_type == "CONDITIONING":
+        return load_conditioning(file_path)
+    if detected_type == "STRING":
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+    return load_video(file_path)
+
+
 # ============================================================================
 # 定义所有支持的 ComfyUI 数据类型
 # ============================================================================
@@ -1026,6 +1354,105 @@ class InputPathConfig(io.ComfyNode):
                     display_name="原始路径（可选）",
                     optional=True,
                 ),
+                io.Combo.Input(
+                    "timestamp_mode",
+                    options=TIMESTAMP_MODES,
+                    default="batch",
+                    display_name="时间戳取值（batch=整批相同）",
+                    optional=True,
+                ),
+                io.Combo.Input(
+                    "name_conflict",
+                    options=NAME_CONFLICT_MODES,
+                    default="overwrite",
+                    display_name="重名处理（unique=追加序号）",
+                    optional=True,
+                ),
+                # 批量并行保存选项
+                io.Int.Input(
+                    "batch_workers",
+                    default=0,
+                    min=0,
+                    max=64,
+                    display_name="并行数（0=自动）",
+                    optional=True,
+                ),
+                io.Combo.Input(
+                    "batch_executor",
+                    options=EXECUTOR_TYPES,
+                    default="thread",
+                    display_name="并行方式",
+                    optional=True,
+                ),
+                # 图像编码配置（速度/体积权衡）
+                io.Combo.Input(
+                    "encode_profile",
+                    options=ENCODE_PROFILE_NAMES,
+                    default=DEFAULT_ENCODE_PROFILE,
+                    display_name="编码配置",
+                    optional=True,
+                ),
+                # 异步保存：交给后台写入队列后立即返回任务 ID
+                io.Boolean.Input(
+                    "async_save",
+                    default=False,
+                    display_name="异步保存",
+                    optional=True,
+                ),
+                # Batch 模式保存清单：记录已产出的文件，重新运行时跳过
+                io.Combo.Input(
+                    "manifest_mode",
+                    options=MANIFEST_MODES,
+                    default="off",
+                    display_name="保存清单（skip=跳过已产出）",
+                    optional=True,
+                ),
+                # 视频编码设置（仅在需要转码时生效）
+                io.Combo.Input(
+                    "video_preset",
+                    options=VIDEO_PRESETS,
+                    default=DEFAULT_VIDEO_SETTINGS["preset"],
+                    display_name="视频编码预设",
+                    optional=True,
+                ),
+                io.Int.Input(
+                    "video_crf",
+                    default=DEFAULT_VIDEO_SETTINGS["crf"],
+                    min=-1,
+                    max=63,
+                    display_name="视频 CRF（-1=默认质量）",
+                    optional=True,
+                ),
+                io.String.Input(
+                    "video_bitrate",
+                    default=DEFAULT_VIDEO_SETTINGS["bitrate"],
+                    multiline=False,
+                    display_name="视频码率（如 8M，优先于 CRF）",
+                    optional=True,
+                ),
+                io.Int.Input(
+                    "video_threads",
+                    default=DEFAULT_VIDEO_SETTINGS["threads"],
+                    min=0,
+                    max=64,
+                    display_name="编码线程数（0=自动）",
+                    optional=True,
+                ),
+                io.Int.Input(
+                    "video_gop",
+                    default=DEFAULT_VIDEO_SETTINGS["gop"],
+                    min=0,
+                    max=1000,
+                    display_name="关键帧间隔 GOP（0=默认）",
+                    optional=True,
+                ),
+                io.Combo.Input(
+                    "video_pixel_format",
+                    options=VIDEO_PIXEL_FORMATS,
+                    default=DEFAULT_VIDEO_SETTINGS["pixel_format"],
+                    display_name="像素格式",
+                    optional=True,
+                ),
             ],
             outputs=[
                 io.String.Output("output", display_name="Output"),
@@ -1041,6 +1468,19 @@ class InputPathConfig(io.ComfyNode):
         enable_batch: bool = False,
         naming_rule: str = "result_{index:04d}",
         original_path: str = "",
+        timestamp_mode: str = "batch",
+        name_conflict: str = "overwrite",
+        batch_workers: int = 0,
+        batch_executor: str = "thread",
+        encode_profile: str = DEFAULT_ENCODE_PROFILE,
+        async_save: bool = False,
+        manifest_mode: str = "off",
+        video_preset: str = DEFAULT_VIDEO_SETTINGS["preset"],
+        video_crf: int = DEFAULT_VIDEO_SETTINGS["crf"],
+        video_bitrate: str = DEFAULT_VIDEO_SETTINGS["bitrate"],
+        video_threads: int = DEFAULT_VIDEO_SETTINGS["threads"],
+        video_gop: int = DEFAULT_VIDEO_SETTINGS["gop"],
+        video_pixel_format: str = DEFAULT_VIDEO_SETTINGS["pixel_format"],
     ) -> io.NodeOutput:
         """处理动态类型的输入并保存文件
 
@@ -1055,6 +1495,22 @@ class InputPathConfig(io.ComfyNode):
             enable_batch: 是否启用 Batch 模式
             naming_rule: 批量保存的命名规则（如 "result_{:04d}", "{original_name}"）
             original_path: 原始文件路径（用于保留原文件名或目录结构）
+            timestamp_mode: 命名规则中时间戳的取值方式（"batch" 整批取一次 / "item" 每个文件取值）
+            name_conflict: 重名处理（"overwrite" 覆盖 / "unique" 以 O_EXCL 预占文件名，已存在时追加 _1、_2…）
+            batch_workers: 批次张量并行保存的并发数（0 表示使用 CPU 核心数）
+            batch_executor: 并行方式（"thread" 线程池 / "process" 进程池）
+            encode_profile: 图像编码配置（fastest / balanced / smallest）
+            async_save: 是否异步保存（写入任务交给后台队列，立即返回 job_id，
+                可通过 GET /dm/jobs/{job_id} 查询进度）
+            manifest_mode: Batch 模式保存清单（off / record / skip / verify）：
+                每个输出写入后追加到 target_path 下的 .dm_manifest.jsonl，批次结果引用清单而不是内嵌路径列表；
+                skip 跳过清单中来源相同且文件大小一致的输出，verify 另外核对 sha256
+            video_preset: 视频编码速度预设（ultrafast ~ veryslow）
+            video_crf: 视频 CRF（-1 表示使用默认质量）
+            video_bitrate: 视频码率（如 "8M"，设置后优先于 CRF）
+            video_threads: 视频编码线程数（0 表示自动）
+            video_gop: 关键帧间隔（0 表示编码器默认）
+            video_pixel_format: 视频像素格式
 
         Returns:
             JSON 格式的保存结果信息
@@ -1065,10 +1521,21 @@ class InputPathConfig(io.ComfyNode):
         else:
             format = format.lower()
 
+        # 视频编码设置（仅在视频需要转码时使用）
+        video_settings = {
+            "preset": video_preset,
+            "crf": video_crf,
+            "bitrate": video_bitrate,
+            "threads": video_threads,
+            "gop": video_gop,
+            "pixel_format": video_pixel_format,
+        }
+
         print(f"[DataManager] Saving file: target_path={target_path}, format={format}, enable_batch={enable_batch}")
 
         detected_type = "unknown"
         saved_path = None
+        saved_paths = None
         error_msg = None
 
         if file_input is None or file_input == "":
@@ -1086,9 +1553,15 @@ class InputPathConfig(io.ComfyNode):
         if enable_batch:
             print(f"[DataManager] Batch 模式: naming_rule={naming_rule}, original_path={original_path}")
 
-            # 验证命名规则
-            is_valid, error_msg_rule = validate_naming_rule(naming_rule)
-            if not is_valid:
+            # 验证并编译命名规则（每个规则只解析一次）
+            try:
+                rule = compile_naming_rule(
+                    naming_rule, output_ext=format, timestamp_mode=timestamp_mode
+                )
+                error_msg_rule = None
+            except ValueError as e:
+                error_msg_rule = str(e)
+            if error_msg_rule:
                 config = {
                     "type": "input",
                     "target_path": target_path,
@@ -1100,75 +1573,148 @@ class InputPathConfig(io.ComfyNode):
                 }
                 return io.NodeOutput(json.dumps(config, ensure_ascii=False))
 
-            # 检测输入是否为批次张量 [N, H, W, C]
-            import torch
-            if isinstance(file_input, torch.Tensor) and file_input.dim() == 4:
-                # 批次张量：手动迭代保存
-                batch_size = file_input.shape[0]
-                print(f"[DataManager] 检测到批次张量，形状: {file_input.shape}，将保存 {batch_size} 个文件")
+            # 检测输入是否为批次数据：图像 [N, H, W, C]、音频 [B, C, T]、Latent [B, C, H, W]
+            # 张量转储格式不拆分批次，整个批次写入一个文件
+            try:
+                batch = None if format in TENSOR_DUMP_FORMATS else _split_batch(file_input)
+            except Exception as e:
+                batch = None
+                print(f"[DataManager] 拆分批次失败，按单项保存: {e}")
 
-                saved_paths = []
-                try:
-                    for i in range(batch_size):
-                        # 提取单个图像 [H, W, C]
-                        single_image = file_input[i]
-
-                        # 生成文件名
-                        generated_name = generate_name(
-                            naming_rule,
-                            index=i,
-                            original_path=original_path or None,
-                            output_ext=format,
-                        )
+            if batch is not None:
+                detected_type, items = batch
+                batch_size = len(items)
+                print(f"[DataManager] 检测到 {detected_type} 批次，将保存 {batch_size} 个文件")
 
-                        # 确定保存路径
-                        if "/" in generated_name or "\\" in generated_name:
-                            generated_path = os.path.normpath(generated_name)
-                            if os.path.isabs(generated_path):
-                                full_path = generated_path
-                                directory = os.path.dirname(full_path)
-                                filename = os.path.basename(full_path)
-                            else:
-                                directory = os.path.join(target_path, os.path.dirname(generated_name))
-                                filename = os.path.basename(generated_name)
-                                full_path = os.path.join(directory, filename)
-                        else:
-                            directory = target_path
-                            filename = generated_name
-                            full_path = os.path.join(directory, filename)
+                # 图像帧直接编码；音频、Latent 按类型保存
+                if detected_type == "IMAGE":
+                    save_func, extra_args = save_image, (format, encode_profile)
+                else:
+                    save_func, extra_args = _save_by_type, (format, encode_profile, video_settings)
 
-                        # 创建目录
+                saved_paths = []
+                reserved = []
+                try:
+                    manifest_path = None
+                    if manifest_mode != "off":
+                        os.makedirs(target_path, exist_ok=True)
+                        manifest_path = get_manifest_path(target_path)
+                    skipped = 0
+
+                    # 在主线程中一次生成整批文件名，保证命名顺序确定
+                    generated_names = rule.names(batch_size, original_path=original_path or None)
+                    planned = []
+                    for item, generated_name in zip(items, generated_names):
+                        directory, full_path = resolve_generated_path(target_path, generated_name)
+                        name = None
+                        if manifest_path is not None:
+                            # 清单模式：已产出的输出不再编码，其余输出写入后逐个追加到清单
+                            name = manifest_name(manifest_path, full_path)
+                            if manifest_mode in ("skip", "verify") and find_produced(
+                                manifest_path, name, original_path, verify=manifest_mode == "verify"
+                            ):
+                                skipped += 1
+                                continue
+                        planned.append((item, name, directory, full_path))
+
+                    for directory in {entry[2] for entry in planned}:
                         os.makedirs(directory, exist_ok=True)
+                    full_paths = [entry[3] for entry in planned]
+                    if name_conflict == "unique":
+                        # 预占文件名，并发保存到同一目录的批次不会互相覆盖
+                        full_paths = reserved = reserve_paths(full_paths)
+
+                    jobs = []
+                    for (item, name, _, _), full_path in zip(planned, full_paths):
+                        if manifest_path is None:
+                            jobs.append((item, full_path) + extra_args)
+                        else:
+                            jobs.append(
+                                (save_func, manifest_path, name, original_path, item, full_path)
+                                + extra_args
+                            )
 
-                        # 保存文件
-                        saved_path = _save_by_type(single_image, full_path, format)
+                    job_func = save_func if manifest_path is None else save_with_manifest
+                    if skipped:
+                        print(f"[DataManager] 跳过清单中已产出的 {skipped} 个文件")
+
+                    # 异步模式：交给后台写入队列后立即返回
+                    if async_save:
+                        job_id = submit_write_job(
+                            job_func,
+                            jobs,
+                            {"target_path": target_path, "format": format},
+                            on_finish=_write_job_finisher(original_path, reserved),
+                        )
+                        print(f"[DataManager] 批次已提交到后台写入队列: job_id={job_id}")
+
+                        config = {
+                            "type": "input",
+                            "mode": "batch",
+                            "target_path": target_path,
+                            "detected_type": detected_type,
+                            "format": format,
+                            "saved_path": None,
+                            "count": len(jobs),
+                            "job_id": job_id,
+                            "status": "queued",
+                            "error": None,
+                        }
+                        if manifest_path:
+                            config.update({"manifest": manifest_path, "skipped": skipped})
+                        return io.NodeOutput(json.dumps(config, ensure_ascii=False))
+
+                    # 并行编码并写入，结果顺序与批次顺序一致
+                    results = run_batch(job_func, jobs, batch_workers, batch_executor)
+                    if reserved:
+                        release_reserved_paths(reserved, results)
+                    for i, saved_path in enumerate(results):
                         if saved_path:
                             saved_paths.append(saved_path)
-                            print(f"[DataManager] 保存 [{i+1}/{batch_size}]: {os.path.basename(saved_path)}")
+                            print(
+                                f"[DataManager] 保存 [{i+1}/{len(jobs)}]: "
+                                f"{os.path.basename(saved_path)}"
+                            )
+                    if original_path and len(saved_paths) == len(jobs):
+                        # 整个批次保存成功：确认 Match 模式认领的源文件已完成
+                        complete_claimed_file(original_path)
 
                     config = {
                         "type": "input",
                         "mode": "batch",
                         "target_path": target_path,
-                        "detected_type": "IMAGE",
+                        "detected_type": detected_type,
                         "format": format,
                         "saved_path": json.dumps(saved_paths),
                         "count": len(saved_paths),
                         "status": "success" if saved_paths else "error",
                         "error": None,
                     }
+                    if manifest_path:
+                        # 输出路径记录在清单中，不再内嵌到结果
+                        config.update(
+                            {
+                                "saved_path": None,
+                                "manifest": manifest_path,
+                                "skipped": skipped,
+                                "status": "success" if saved_paths or skipped else "error",
+                            }
+                        )
                     return io.NodeOutput(json.dumps(config, ensure_ascii=False))
 
                 except Exception as e:
                     error_msg = str(e)
                     import traceback
                     traceback.print_exc()
+                    if reserved:
+                        # 失败的输出留下的空占位文件
+                        release_reserved_paths(reserved)
 
                     config = {
                         "type": "input",
                         "mode": "batch",
                         "target_path": target_path,
-                        "detected_type": "IMAGE",
+                        "detected_type": detected_type,
                         "format": format,
                         "saved_path": None,
                         "status": "error",
@@ -1176,46 +1722,104 @@ class InputPathConfig(io.ComfyNode):
                     }
                     return io.NodeOutput(json.dumps(config, ensure_ascii=False))
 
-            # 单个图像（非批次）：使用原有逻辑
+            # 单项数据（非批次）：使用原有逻辑
+            reserved = []
             try:
                 # 使用命名规则生成文件名
-                generated_name = generate_name(
-                    naming_rule,
-                    index=0,
-                    original_path=original_path or None,
-                    output_ext=format,
-                )
+                generated_name = rule.generate(0, original_path=original_path or None)
 
                 print(f"[DataManager] Batch 模式生成文件名: {generated_name}")
 
                 # 如果生成的文件名包含路径，需要分离目录和文件名
-                if "/" in generated_name or "\\" in generated_name:
-                    # 使用生成的路径结构
-                    generated_path = os.path.normpath(generated_name)
-                    if os.path.isabs(generated_path):
-                        # 绝对路径：直接使用
-                        full_path = generated_path
-                        directory = os.path.dirname(full_path)
-                        filename = os.path.basename(full_path)
-                    else:
-                        # 相对路径：基于 target_path
-                        directory = os.path.join(target_path, os.path.dirname(generated_name))
-                        filename = os.path.basename(generated_name)
-                        full_path = os.path.join(directory, filename)
-                else:
-                    # 只有文件名，使用 target_path 作为目录
-                    directory = target_path
-                    filename = generated_name
-                    full_path = os.path.join(directory, filename)
+                directory, full_path = resolve_generated_path(target_path, generated_name)
+
+                detected_type = _detect_input_type(file_input)
+
+                # 清单模式：已产出时直接返回，不再编码
+                manifest_path = None
+                manifest_args = ()
+                if manifest_mode != "off":
+                    os.makedirs(target_path, exist_ok=True)
+                    manifest_path = get_manifest_path(target_path)
+                    name = manifest_name(manifest_path, full_path)
+                    produced = None
+                    if manifest_mode in ("skip", "verify"):
+                        produced = find_produced(
+                            manifest_path, name, original_path, verify=manifest_mode == "verify"
+                        )
+                    if produced:
+                        print(f"[DataManager] 清单中已产出，跳过: {produced}")
+                        if original_path:
+                            complete_claimed_file(original_path)
+                        config = {
+                            "type": "input",
+                            "mode": "batch",
+                            "target_path": target_path,
+                            "detected_type": detected_type,
+                            "format": format,
+                            "saved_path": produced,
+                            "generated_name": generated_name,
+                            "manifest": manifest_path,
+                            "status": "skipped",
+                            "error": None,
+                        }
+                        return io.NodeOutput(json.dumps(config, ensure_ascii=False))
+                    manifest_args = (_save_by_type, manifest_path, name, original_path)
+                save_func = save_with_manifest if manifest_path else _save_by_type
 
                 # 创建目录
                 os.makedirs(directory, exist_ok=True)
+                if name_conflict == "unique":
+                    full_path = reserve_path(full_path)
+                    reserved = [full_path]
+
+                # 异步模式：交给后台写入队列后立即返回
+                if async_save:
+                    job_id = submit_write_job(
+                        save_func,
+                        [
+                            manifest_args
+                            + (
+                                _snapshot_for_async(file_input, format),
+                                full_path,
+                                format,
+                                encode_profile,
+                                video_settings,
+                            )
+                        ],
+                        {"target_path": target_path, "format": format},
+                        on_finish=_write_job_finisher(original_path, reserved),
+                    )
+                    print(f"[DataManager] 已提交到后台写入队列: job_id={job_id}")
 
-                # 根据输入类型保存文件
-                saved_path = _save_by_type(file_input, full_path, format)
-                detected_type = _detect_input_type(file_input)
+                    config = {
+                        "type": "input",
+                        "mode": "batch",
+                        "target_path": target_path,
+                        "detected_type": detected_type,
+                        "format": format,
+                        "saved_path": None,
+                        "generated_name": generated_name,
+                        "job_id": job_id,
+                        "status": "queued",
+                        "error": None,
+                    }
+                    return io.NodeOutput(json.dumps(config, ensure_ascii=False))
+
+                # 根据输入类型保存文件（清单模式下写入后追加记录）
+                saved_path = save_func(
+                    *manifest_args, file_input, full_path, format, encode_profile, video_settings
+                )
+                if reserved:
+                    release_reserved_paths(reserved, [saved_path])
+                saved_paths = None
+                if isinstance(saved_path, list):
+                    # 音频批次拆分保存为多个文件
+                    saved_paths, saved_path = saved_path, saved_path[0]
 
                 print(f"[DataManager] Batch 模式保存成功: {saved_path}")
+                if saved_path and original_path:
+                    complete_claimed_file(original_path)
 
                 config = {
                     "type": "input",
@@ -1228,12 +1832,18 @@ class InputPathConfig(io.ComfyNode):
                     "status": "success" if saved_path else "error",
                     "error": error_msg,
                 }
+                if saved_paths:
+                    config["saved_paths"] = saved_paths
+                if manifest_path:
+                    config["manifest"] = manifest_path
                 return io.NodeOutput(json.dumps(config, ensure_ascii=False))
 
             except Exception as e:
                 error_msg = str(e)
                 import traceback
                 traceback.print_exc()
+                if reserved:
+                    release_reserved_paths(reserved)
 
                 config = {
                     "type": "input",
@@ -1248,9 +1858,75 @@ class InputPathConfig(io.ComfyNode):
                 return io.NodeOutput(json.dumps(config, ensure_ascii=False))
 
         # ========== 单文件模式：保存单个文件 ==========
+        # 异步模式：图像/音视频交给后台写入队列后立即返回，其他类型仍同步保存
+        if async_save and _detect_input_type(file_input) in ASYNC_SAVE_TYPES:
+            try:
+                detected_type = _detect_input_type(file_input)
+                directory, filename = parse_target_path(target_path, detected_type, format)
+                os.makedirs(directory, exist_ok=True)
+                full_path = os.path.join(directory, filename)
+                job_id = submit_write_job(
+                    _save_by_type,
+                    [
+                        (
+                            _snapshot_for_async(file_input, format),
+                            full_path,
+                            format,
+                            encode_profile,
+                            video_settings,
+                        )
+                    ],
+                    {"target_path": target_path, "format": format},
+                )
+                print(f"[DataManager] 已提交到后台写入队列: job_id={job_id}")
+
+                config = {
+                    "type": "input",
+                    "mode": "single",
+                    "target_path": target_path,
+                    "detected_type": detected_type,
+                    "format": format,
+                    "saved_path": None,
+                    "job_id": job_id,
+                    "status": "queued",
+                    "error": None,
+                }
+                return io.NodeOutput(json.dumps(config, ensure_ascii=False))
+
+            except Exception as e:
+                error_msg = str(e)
+                import traceback
+
+                traceback.print_exc()
+
+                config = {
+                    "type": "input",
+                    "mode": "single",
+                    "target_path": target_path,
+                    "detected_type": detected_type,
+                    "format": format,
+                    "saved_path": None,
+                    "status": "error",
+                    "error": error_msg,
+                }
+                return io.NodeOutput(json.dumps(config, ensure_ascii=False))
+
         try:
+            # 张量转储：IMAGE/MASK 批次原样保存，不编码为图像
+            input_type = _detect_input_type(file_input)
+            if format in TENSOR_DUMP_FORMATS and input_type in ("IMAGE", "TENSOR"):
+                tensor = file_input["tensor"] if isinstance(file_input, dict) else file_input
+                detected_type = "IMAGE" if len(tensor.shape) == 4 else "MASK"
+                directory, filename = parse_target_path(target_path, detected_type, format)
+                full_path = os.path.join(directory, filename)
+                saved_path = save_tensor_dump(tensor, full_path)
+                print(
+                    f"[DataManager] Saved {detected_type} tensor {tuple(tensor.shape)} "
+                    f"to: {saved_path}"
+                )
+
             # 处理字典类型（ComfyUI 特殊格式）
-            if isinstance(file_input, dict):
+            elif isinstance(file_input, dict):
                 # 检查是否是 AUDIO (必须在最前面)
                 if "waveform" in file_input:
                     detected_type = "AUDIO"
@@ -1258,8 +1934,9 @@ class InputPathConfig(io.ComfyNode):
 
                     directory, filename = parse_target_path(target_path, detected_type, format)
                     full_path = os.path.join(directory, filename)
-                    saved_path = save_audio(file_input, full_path, format)
-                    print(f"[DataManager] Saved AUDIO to: {saved_path}")
+                    saved_paths = save_audio_clips(file_input, full_path, format)
+                    saved_path = saved_paths[0]
+                    print(f"[DataManager] Saved AUDIO to: {', '.join(saved_paths)}")
                 # 检查是否是 LATENT
                 elif "samples" in file_input:
                     detected_type = "LATENT"
@@ -1280,10 +1957,10 @@ class InputPathConfig(io.ComfyNode):
                 elif "tensor" in file_input:
                     detected_type = "IMAGE"
                     print(f"[DataManager] Detected IMAGE (dict with tensor)")
-                    tensor = file_input["tensor"]
+                    tensor = to_uint8_array(file_input["tensor"])
                     directory, filename = parse_target_path(target_path, detected_type, format)
                     full_path = os.path.join(directory, filename)
-                    saved_path = save_image(tensor, full_path, format)
+                    saved_path = save_image(tensor, full_path, format, encode_profile)
                     print(f"[DataManager] Saved IMAGE to: {saved_path}")
                 else:
                     error_msg = f"未知的字典类型，键: {list(file_input.keys())}"
@@ -1332,10 +2009,10 @@ class InputPathConfig(io.ComfyNode):
                         # 4D 张量
                         if shape[1] == 3:  # [B, C, H, W]
                             detected_type = "IMAGE"
-                            tensor_np = file_input.cpu().numpy()[0].transpose(1, 2, 0)
+                            tensor_np = to_uint8_array(file_input[0]).transpose(1, 2, 0)
                         elif shape[3] == 3:  # [B, H, W, C]
                             detected_type = "IMAGE"
-                            tensor_np = file_input.cpu().numpy()[0]
+                            tensor_np = to_uint8_array(file_input[0])
                         else:
                             detected_type = "TENSOR"
                             error_msg = f"不支持的 4D 张量形状: {shape}"
@@ -1345,28 +2022,28 @@ class InputPathConfig(io.ComfyNode):
                                 target_path, detected_type, format
                             )
                             full_path = os.path.join(directory, filename)
-                            saved_path = save_image(tensor_np, full_path, format)
+                            saved_path = save_image(tensor_np, full_path, format, encode_profile)
                             print(f"[DataManager] Saved IMAGE to: {saved_path}")
 
                     elif len(shape) == 3:
                         # 3D 张量
                         if shape[0] == 1:  # [1, H, W] - MASK
                             detected_type = "MASK"
-                            tensor_np = file_input.cpu().numpy()[0]
+                            tensor_np = to_uint8_array(file_input[0])
                             directory, filename = parse_target_path(
                                 target_path, detected_type, format
                             )
                             full_path = os.path.join(directory, filename)
-                            saved_path = save_image(tensor_np, full_path, format)
+                            saved_path = save_image(tensor_np, full_path, format, encode_profile)
                             print(f"[DataManager] Saved MASK to: {saved_path}")
                         elif shape[2] == 3 or shape[2] == 4:  # [H, W, C] - IMAGE
                             detected_type = "IMAGE"
-                            tensor_np = file_input.cpu().numpy()
+                            tensor_np = to_uint8_array(file_input)
                             directory, filename = parse_target_path(
                                 target_path, detected_type, format
                             )
                             full_path = os.path.join(directory, filename)
-                            saved_path = save_image(tensor_np, full_path, format)
+                            saved_path = save_image(tensor_np, full_path, format, encode_profile)
                             print(f"[DataManager] Saved IMAGE to: {saved_path}")
                         else:
                             detected_type = "TENSOR"
@@ -1374,10 +2051,10 @@ class InputPathConfig(io.ComfyNode):
 
                     elif len(shape) == 2:  # [H, W] - MASK
                         detected_type = "MASK"
-                        tensor_np = file_input.cpu().numpy()
+                        tensor_np = to_uint8_array(file_input)
                         directory, filename = parse_target_path(target_path, detected_type, format)
                         full_path = os.path.join(directory, filename)
-                        saved_path = save_image(tensor_np, full_path, format)
+                        saved_path = save_image(tensor_np, full_path, format, encode_profile)
                         print(f"[DataManager] Saved MASK to: {saved_path}")
 
                     else:
@@ -1411,7 +2088,7 @@ class InputPathConfig(io.ComfyNode):
                     if detected_type in ("IMAGE", "MASK"):
                         directory, filename = parse_target_path(target_path, detected_type, format)
                         full_path = os.path.join(directory, filename)
-                        saved_path = save_image(tensor_np, full_path, format)
+                        saved_path = save_image(tensor_np, full_path, format, encode_profile)
                         print(f"[DataManager] Saved {detected_type} to: {saved_path}")
 
             # 处理视频类型 - 使用属性检测而不是 isinstance(io.Video)
@@ -1422,19 +2099,24 @@ class InputPathConfig(io.ComfyNode):
                 detected_type = "VIDEO"
                 print(f"[DataManager] Detected VIDEO type")
 
-                # 如果是 VideoInput，先获取 components
-                if hasattr(file_input, "get_components"):
-                    video_data = file_input.get_components()
-                    print(f"[DataManager] Got VideoComponents from VideoInput")
-                else:
-                    video_data = file_input
-                    print(f"[DataManager] Using data as VideoComponents directly")
-
+                # VideoFromFile 优先直通/封装转换，否则解码为 components 后转码
                 directory, filename = parse_target_path(target_path, detected_type, format)
                 full_path = os.path.join(directory, filename)
-                saved_path = save_video(video_data, full_path, format)
+                saved_path = save_video_input(file_input, full_path, format, video_settings)
                 print(f"[DataManager] Saved VIDEO to: {saved_path}")
 
+            # 处理 CONDITIONING 类型（[[tensor, dict], ...] 列表）
+            elif is_conditioning(file_input):
+                detected_type = "CONDITIONING"
+                print(f"[DataManager] Detected CONDITIONING type")
+                cond_format = format
+                if cond_format not in TYPE_FORMAT_MAP["CONDITIONING"]["formats"]:
+                    cond_format = TYPE_FORMAT_MAP["CONDITIONING"]["default"]
+                directory, filename = parse_target_path(target_path, detected_type, cond_format)
+                full_path = os.path.join(directory, filename)
+                saved_path = save_conditioning(file_input, full_path, cond_format)
+                print(f"[DataManager] Saved CONDITIONING to: {saved_path}")
+
             # 其他类型，转为字符串保存
             else:
                 detected_type = type(file_input).__name__
@@ -1463,9 +2145,82 @@ class InputPathConfig(io.ComfyNode):
             "status": "success" if saved_path else "error",
             "error": error_msg,
         }
+        if saved_paths and len(saved_paths) > 1:
+            config["saved_paths"] = saved_paths
         return io.NodeOutput(json.dumps(config, ensure_ascii=False))
 
 
+def _resolve_file_path(source_path: str, input: Any = None) -> str:
+    """解析 OutputPathConfig 单文件模式要加载的路径（优先使用 input 端口，否则使用 source_path）"""
+    file_path = None
+
+    if input is not None and input != "":
+        # 处理 input：可能是字符串、列表或其他类型
+        if isinstance(input, str):
+            try:
+                parsed = json.loads(input)
+                if isinstance(parsed, dict) and "path" in parsed:
+                    file_path = parsed["path"]
+                else:
+                    file_path = input
+            except:
+                file_path = input
+        elif isinstance(input, list):
+            # ComfyUI 迭代时可能传递列表，取第一个元素
+            if len(input) > 0:
+                file_path = str(input[0])
+            else:
+                file_path = None
+        else:
+            file_path = str(input)
+
+    # 如果没有 input，使用 source_path
+    if not file_path:
+        file_path = source_path
+    return file_path
+
+
+def _decode_variant(options: Dict[str, Any]) -> str:
+    """图像解码方式标识（解码缓存和预读按此区分同一文件的不同解码结果）"""
+    return f"{options['dtype']}:{options['max_side']}:{options['crop_box']}"
+
+
+def _load_image_cached(file_path: str, options: Dict[str, Any]) -> Any:
+    """通过解码缓存加载图像（预读线程与单文件模式共用，预读结果同时进入解码缓存）
+
+    options: {"dtype", "max_side", "crop_box"}，传给 load_image
+    """
+    return load_cached(
+        file_path, lambda path: load_image(path, **options), variant=_decode_variant(options)
+    )
+
+
+def _decodable_image_paths(abs_paths: list) -> list:
+    """筛选需要解码的图像路径（.npy 转储为内存映射，不解码）"""
+    return [
+        p
+        for p in abs_paths
+        if detect_type_from_extension(p) == "IMAGE" and Path(p).suffix.lower() != ".npy"
+    ]
+
+
+def _prefetch_image_paths(
+    abs_paths: list, window: int, max_bytes: int, options: Dict[str, Any]
+) -> int:
+    """为 Match 模式返回的路径列表中的图像开始预读"""
+    image_paths = _decodable_image_paths(abs_paths)
+    if window <= 0 or not image_paths:
+        stop_prefetch()
+        return 0
+    return start_prefetch(
+        image_paths,
+        lambda path: _load_image_cached(path, options),
+        window=window,
+        max_bytes=max_bytes,
+        tag=_decode_variant(options),
+    )
+
+
 class OutputPathConfig(io.ComfyNode):
     """输出路径配置节点 - 配置文件读取的源目录，支持所有 ComfyUI 数据类型输出（动态端口）
 
@@ -1518,18 +2273,238 @@ class OutputPathConfig(io.ComfyNode):
                     "pattern",
                     default="*.*",
                     multiline=False,
-                    display_name="通配符模式",
+                    display_name="通配符模式 (多个以 ; 分隔)",
+                    optional=True,
+                ),
+                io.String.Input(
+                    "exclude",
+                    default="",
+                    multiline=False,
+                    display_name="排除模式 (多个以 ; 分隔)",
+                    optional=True,
+                ),
+                io.String.Input(
+                    "file_filter",
+                    default="",
+                    multiline=False,
+                    display_name="元数据过滤 (如 size>10KB; mtime>7d)",
+                    optional=True,
+                ),
+                # 增量扫描：只输出自上次运行以来新增（或修改）的文件
+                io.Combo.Input(
+                    "incremental",
+                    options=list(INCREMENTAL_MODES),
+                    default="off",
+                    display_name="增量扫描",
+                    optional=True,
+                ),
+                # 窗口：每次只输出排序后的 [offset, offset + limit) 部分，配合 next_offset 分多次提交处理
+                io.Int.Input(
+                    "offset",
+                    default=0,
+                    min=0,
+                    max=0xFFFFFFFF,
+                    display_name="窗口起始位置 (offset)",
+                    optional=True,
+                ),
+                io.Int.Input(
+                    "limit",
+                    default=0,
+                    min=0,
+                    max=0xFFFFFFFF,
+                    display_name="窗口大小 (0=全部)",
+                    optional=True,
+                ),
+                io.Combo.Input(
+                    "order_by",
+                    options=list(SORT_KEYS),
+                    default="name",
+                    display_name="排序方式",
+                    optional=True,
+                ),
+                # 多实例分工：多个 ComfyUI 实例共享同一源目录时，每个实例只处理自己认领的文件
+                io.Boolean.Input(
+                    "work_claim",
+                    default=False,
+                    display_name="多实例认领模式",
+                    optional=True,
+                ),
+                io.String.Input(
+                    "worker_id",
+                    default="",
+                    multiline=False,
+                    display_name="实例 ID (空=主机名-进程号)",
+                    optional=True,
+                ),
+                io.Int.Input(
+                    "claim_lease_s",
+                    default=DEFAULT_LEASE_SECONDS,
+                    min=10,
+                    max=7 * 86400,
+                    display_name="认领租期 (秒)",
+                    optional=True,
+                ),
+                # Latent 选项
+                io.Int.Input(
+                    "latent_index",
+                    default=-1,
+                    min=-1,
+                    max=0xFFFFFFFF,
+                    display_name="Latent 样本索引 (-1=全部)",
+                    optional=True,
+                ),
+                # 解码缓存选项
+                io.Int.Input(
+                    "decode_cache_mb",
+                    default=DEFAULT_DECODE_CACHE_BYTES // 1024**2,
+                    min=0,
+                    max=1024 * 1024,
+                    display_name="解码缓存上限 (MB, 0=禁用)",
+                    optional=True,
+                ),
+                # 预读选项（Match 模式）
+                io.Int.Input(
+                    "prefetch_window",
+                    default=DEFAULT_PREFETCH_WINDOW,
+                    min=0,
+                    max=256,
+                    display_name="预读文件数 (0=禁用)",
+                    optional=True,
+                ),
+                io.Int.Input(
+                    "prefetch_mb",
+                    default=DEFAULT_PREFETCH_BYTES // 1024**2,
+                    min=0,
+                    max=1024 * 1024,
+                    display_name="预读缓冲上限 (MB)",
+                    optional=True,
+                ),
+                # 图像数据类型（uint8 只适合直接保存或支持 uint8 的下游节点）
+                io.Combo.Input(
+                    "image_dtype",
+                    options=list(IMAGE_DTYPES),
+                    default="float32",
+                    display_name="图像数据类型",
+                    optional=True,
+                ),
+                # 缩小分辨率/区域解码（只解码需要的像素）
+                io.Int.Input(
+                    "max_side",
+                    default=0,
+                    min=0,
+                    max=65536,
+                    display_name="最长边上限 (0=原始尺寸)",
+                    optional=True,
+                ),
+                io.String.Input(
+                    "crop_box",
+                    default="",
+                    multiline=False,
+                    display_name="裁剪区域 (left,top,right,bottom)",
+                    optional=True,
+                ),
+                # Match 模式输出方式：路径列表（逐个执行）或图像批次（一次执行）
+                io.Combo.Input(
+                    "match_output",
+                    options=["paths", "batch"],
+                    default="paths",
+                    display_name="Match 输出方式",
+                    optional=True,
+                ),
+                # 批次输出只有一个 IMAGE 端口，尺寸策略必须产出单个 [B, H, W, 3] 张量（不提供 bucket）
+                io.Combo.Input(
+                    "batch_policy",
+                    options=list(MATCH_BATCH_POLICIES),
+                    default="pad",
+                    display_name="批次尺寸策略",
+                    optional=True,
+                ),
+                io.Int.Input(
+                    "batch_workers",
+                    default=0,
+                    min=0,
+                    max=64,
+                    display_name="批量解码线程数 (0=自动)",
                     optional=True,
                 ),
             ],
             outputs=[
                 # 使用 MatchType.Output 实现动态输出端口
                 io.MatchType.Output(template=template, id="output", display_name="Output"),
+                # 下一个窗口的 offset（-1 表示已处理到末尾）
+                io.Int.Output("next_offset", display_name="next_offset"),
             ],
         )
 
     @classmethod
-    def execute(cls, source_path: str, input=None, enable_match: bool = True, pattern: str = "*.*") -> io.NodeOutput:
+    def fingerprint_inputs(
+        cls,
+        source_path: str,
+        input=None,
+        enable_match: bool = True,
+        pattern: str = "*.*",
+        exclude: str = "",
+        file_filter: str = "",
+        incremental: str = "off",
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "name",
+        work_claim: bool = False,
+        worker_id: str = "",
+        claim_lease_s: int = DEFAULT_LEASE_SECONDS,
+        latent_index: int = -1,
+        decode_cache_mb: int = DEFAULT_DECODE_CACHE_BYTES // 1024**2,
+        prefetch_window: int = DEFAULT_PREFETCH_WINDOW,
+        prefetch_mb: int = DEFAULT_PREFETCH_BYTES // 1024**2,
+        image_dtype: str = "float32",
+        max_side: int = 0,
+        crop_box: str = "",
+        match_output: str = "paths",
+        batch_policy: str = "pad",
+        batch_workers: int = 0,
+    ) -> Union[str, float]:
+        """计算变化指纹（ComfyUI 节点缓存使用，指纹不变时跳过重新加载）
+
+        Match 模式按目录扫描结果计算，单文件模式按 source_path 指向的文件 stat 计算，不读取文件内容；
+        其他输入的变化由 ComfyUI 自身比较。ComfyUI 只传入控件值，连接到 input 端口的路径在这里
+        始终为 None，无法按文件计算指纹（路径本身的变化由 ComfyUI 比较上游输出）。
+        增量扫描和认领模式由游标/spool 决定输出，每次都重新执行（返回 NaN）
+        """
+        if enable_match:
+            if work_claim or incremental != "off":
+                return float("nan")
+            return path_fingerprint(source_path, pattern, exclude, file_filter)
+        if os.path.isfile(source_path):
+            return file_fingerprint(source_path)
+        return ""
+
+    @classmethod
+    def execute(
+        cls,
+        source_path: str,
+        input=None,
+        enable_match: bool = True,
+        pattern: str = "*.*",
+        exclude: str = "",
+        file_filter: str = "",
+        incremental: str = "off",
+        offset: int = 0,
+        limit: int = 0,
+        order_by: str = "name",
+        work_claim: bool = False,
+        worker_id: str = "",
+        claim_lease_s: int = DEFAULT_LEASE_SECONDS,
+        latent_index: int = -1,
+        decode_cache_mb: int = DEFAULT_DECODE_CACHE_BYTES // 1024**2,
+        prefetch_window: int = DEFAULT_PREFETCH_WINDOW,
+        prefetch_mb: int = DEFAULT_PREFETCH_BYTES // 1024**2,
+        image_dtype: str = "float32",
+        max_side: int = 0,
+        crop_box: str = "",
+        match_output: str = "paths",
+        batch_policy: str = "pad",
+        batch_workers: int = 0,
+    ) -> io.NodeOutput:
         """根据文件路径加载文件并转换为对应的 ComfyUI 数据类型
 
         支持两种模式：
@@ -1540,37 +2515,111 @@ class OutputPathConfig(io.ComfyNode):
             source_path: 源目录路径
             input: 可选的文件路径输入（单文件模式下优先使用）
             enable_match: 是否启用 Match 模式
-            pattern: glob 通配符模式（Match 模式下使用）
+            pattern: glob 通配符模式（Match 模式下使用，多个模式以 ; 分隔）
+            exclude: 排除模式（匹配相对路径，如 "**/thumbs/**"，多个模式以 ; 分隔）
+            file_filter: 元数据过滤条件（size/mtime/ctime，如 "size>10KB; mtime>7d"，多个条件以 ; 分隔）
+            incremental: 增量扫描模式（"off" 输出所有匹配文件，"new" 只输出新文件，"changed" 同时输出修改过的文件），
+                增量扫描的结果按修改时间排序，游标保存在源目录旁并在扫描时提交，
+                运行失败需要重新处理时通过 POST /dm/scan/cursor/reset 重置
+            offset: Match 模式窗口的起始位置（增量扫描时忽略，由游标决定起点）
+            limit: Match 模式窗口大小（0 表示全部），超大目录可分多次提交，每次只排队 limit 个文件
+            order_by: 窗口的排序键（"name" / "mtime" / "size"，相同时按路径排序，多次扫描之间顺序稳定）
+            work_claim: 多实例认领模式：每次认领最多 limit 个未被其他实例认领的文件，
+                文件在 Input Path（连接 original_path）保存成功后标记为完成，
+                再次执行时释放上一批中未确认完成的认领（优先于增量扫描和窗口）
+            worker_id: 实例 ID（同时运行的实例必须不同，空表示 主机名-进程号）
+            claim_lease_s: 认领租期（秒），实例崩溃后其认领在租期过后由其他实例接管
+            latent_index: 只加载 Latent 批次中的指定样本（-1 表示全部）
+            decode_cache_mb: 图像解码缓存的字节预算（MB，进程内共享，0 表示禁用）
+            prefetch_window: Match 模式下在后台提前解码的图像数（0 表示禁用）
+            prefetch_mb: 预读缓冲区的字节上限（MB）
+            image_dtype: 图像张量的数据类型（"float32" 或 "uint8"，uint8 内存为 1/4）
+            max_side: 图像最长边上限（0 表示原始尺寸），缩小在解码阶段完成
+            crop_box: 只加载的图像区域 "left,top,right,bottom"（空表示整幅图像）
+            match_output: Match 模式输出方式（"paths" 返回路径列表，"batch" 将匹配的图像并行解码为批次）
+            batch_policy: batch 输出的尺寸策略（"pad" 填充到最大尺寸，"resize" 缩放到第一张的尺寸）；
+                旧工作流中保存的 "bucket" 按 "pad" 处理
+            batch_workers: batch 输出的解码线程数（0 表示自动）
 
         Returns:
-            单文件模式：对应类型的 ComfyUI 数据（IMAGE/VIDEO/AUDIO/LATENT/CONDITIONING/STRING）
-            Match 模式：文件路径字符串列表（触发下游节点自动迭代）
+            (output, next_offset)
+            output 单文件模式：对应类型的 ComfyUI 数据（IMAGE/VIDEO/AUDIO/LATENT/CONDITIONING/STRING）
+            output Match 模式：文件路径字符串列表（触发下游节点自动迭代）；
+                match_output="batch" 时为单个 [B, H, W, 3] 图像批次
+            next_offset: 下一个窗口的 offset，没有剩余文件或不是 Match 模式时为 -1
+                （增量扫描和认领模式时为 0，表示下一次运行继续认领/从游标继续）
         """
         # ========== Match 模式：批量扫描并返回文件路径列表 ==========
         # 策略：返回路径字符串列表，让 ComfyUI 自动迭代处理每个文件
         # 这样可以保持原图大小，不会占用大量内存
         if enable_match:
-            print(f"[DataManager] Match 模式: source_path={source_path}, pattern={pattern}")
+            print(
+                f"[DataManager] Match 模式: source_path={source_path}, "
+                f"pattern={pattern}, exclude={exclude}"
+            )
 
             # 检查目录是否存在
             if not os.path.exists(source_path):
                 print(f"[DataManager] 目录不存在: {source_path}")
-                return io.NodeOutput(None)
+                return io.NodeOutput(None, -1)
 
             if not os.path.isdir(source_path):
                 print(f"[DataManager] 路径不是目录: {source_path}")
-                return io.NodeOutput(None)
+                return io.NodeOutput(None, -1)
 
             # 验证通配符模式
             is_valid, error_msg = validate_glob_pattern(pattern)
             if not is_valid:
                 print(f"[DataManager] 无效的通配符模式: {error_msg}")
-                return io.NodeOutput(None)
+                return io.NodeOutput(None, -1)
+
+            try:
+                metadata_filter = parse_file_filter(file_filter)
+            except ValueError as e:
+                print(f"[DataManager] 无效的元数据过滤条件: {e}")
+                return io.NodeOutput(None, -1)
 
             # 扫描文件（返回相对路径）
             try:
-                rel_paths = scan_files(source_path, pattern, recursive="**" in pattern)
-                print(f"[DataManager] Match 模式扫描到 {len(rel_paths)} 个文件")
+                if work_claim:
+                    rel_paths = claim_files(
+                        source_path,
+                        pattern,
+                        worker_id=worker_id or None,
+                        limit=limit,
+                        exclude=exclude,
+                        file_filter=metadata_filter,
+                        order_by=order_by,
+                        lease_seconds=claim_lease_s,
+                    )
+                    next_offset = 0 if limit > 0 and len(rel_paths) >= limit else -1
+                    print(f"[DataManager] Match 模式认领 {len(rel_paths)} 个文件")
+                elif incremental != "off":
+                    rel_paths = scan_incremental(
+                        source_path,
+                        pattern,
+                        exclude=exclude,
+                        file_filter=metadata_filter,
+                        mode=incremental,
+                        limit=limit,
+                    )
+                    # 达到 limit 时可能还有未输出的新文件
+                    next_offset = 0 if limit > 0 and len(rel_paths) >= limit else -1
+                    print(f"[DataManager] Match 模式增量扫描到 {len(rel_paths)} 个新文件")
+                else:
+                    rel_paths, next_offset = scan_window(
+                        source_path,
+                        pattern,
+                        offset=offset,
+                        limit=limit,
+                        order_by=order_by,
+                        exclude=exclude,
+                        file_filter=metadata_filter,
+                    )
+                    print(
+                        f"[DataManager] Match 模式扫描到 {len(rel_paths)} 个文件 "
+                        f"(offset={offset}, next_offset={next_offset})"
+                    )
 
                 # 转换为绝对路径
                 abs_paths = [os.path.normpath(os.path.join(source_path, p)) for p in rel_paths]
@@ -1580,60 +2629,98 @@ class OutputPathConfig(io.ComfyNode):
                     print(f"[DataManager] 提示：请检查 source_path 是否正确")
                     print(f"[DataManager]   当前路径: {source_path}")
                     print(f"[DataManager]   通配符: {pattern}")
-                    return io.NodeOutput([])  # 返回空列表而不是 None
+                    return io.NodeOutput([], -1)  # 返回空列表而不是 None
+
+                # ========== 批次输出：并行解码到预分配的 [B, H, W, 3] 张量 ==========
+                if match_output == "batch":
+                    import torch
+
+                    image_paths = _decodable_image_paths(abs_paths)
+                    if not image_paths:
+                        print(f"[DataManager] 未找到可解码的图像文件")
+                        return io.NodeOutput([], -1)
+
+                    if batch_policy not in MATCH_BATCH_POLICIES:
+                        # bucket 会产生多个批次，IMAGE 端口只能输出一个张量
+                        print(f"[DataManager] 批次尺寸策略 {batch_policy} 不支持单个批次输出，改用 pad")
+                        batch_policy = "pad"
+                    batches = load_image_batch(
+                        image_paths,
+                        policy=batch_policy,
+                        dtype=image_dtype,
+                        workers=batch_workers,
+                        max_side=max_side,
+                        crop_box=parse_crop_box(crop_box),
+                    )
+                    image = torch.from_numpy(batches[0][0])
+                    print(f"[DataManager] 批量加载 {len(image_paths)} 张图像: {tuple(image.shape)}")
+                    return io.NodeOutput(image, next_offset)
+
+                # 后台提前解码接下来的图像，下游单文件加载时直接取出
+                set_decode_cache_budget(decode_cache_mb * 1024**2)
+                _prefetch_image_paths(
+                    abs_paths,
+                    prefetch_window,
+                    prefetch_mb * 1024**2,
+                    {
+                        "dtype": image_dtype,
+                        "max_side": max_side,
+                        "crop_box": parse_crop_box(crop_box),
+                    },
+                )
 
                 # ========== 关键：返回文件路径字符串列表，触发 ComfyUI 自动迭代 ==========
                 print(f"[DataManager] 返回文件路径列表，ComfyUI 将自动迭代处理每个文件")
                 print(f"[DataManager]   工作流: OutputPathConfig → LoadImage → 处理节点")
                 print(f"[DataManager]   保持原图大小，自动执行 {len(abs_paths)} 次")
-                return io.NodeOutput(abs_paths)  # 返回路径列表！
+                return io.NodeOutput(abs_paths, next_offset)  # 返回路径列表！
 
             except Exception as e:
                 print(f"[DataManager] Match 模式扫描失败: {e}")
                 import traceback
                 traceback.print_exc()
-                return io.NodeOutput([])
+                return io.NodeOutput([], -1)
 
         # ========== 单文件模式：加载单个文件 ==========
         # 1. 解析文件路径（优先使用 input 端口）
-        file_path = None
-
-        if input is not None and input != "":
-            # 处理 input：可能是字符串、列表或其他类型
-            if isinstance(input, str):
-                try:
-                    parsed = json.loads(input)
-                    if isinstance(parsed, dict) and "path" in parsed:
-                        file_path = parsed["path"]
-                    else:
-                        file_path = input
-                except:
-                    file_path = input
-            elif isinstance(input, list):
-                # ComfyUI 迭代时可能传递列表，取第一个元素
-                if len(input) > 0:
-                    file_path = str(input[0])
-                else:
-                    file_path = None
-            else:
-                file_path = str(input)
-
-        # 如果没有 input，使用 source_path
-        if not file_path:
-            file_path = source_path
+        file_path = _resolve_file_path(source_path, input)
 
         # ========== 自动检测：如果 file_path 是目录，自动启用 Match 模式 ==========
         if os.path.isdir(file_path):
             print(f"[DataManager] 检测到路径是目录，自动启用 Match 模式: {file_path}")
             # 递归调用 Match 模式
-            return cls.execute(source_path=file_path, input=input, enable_match=True, pattern=pattern)
+            return cls.execute(
+                source_path=file_path,
+                input=input,
+                enable_match=True,
+                pattern=pattern,
+                exclude=exclude,
+                file_filter=file_filter,
+                incremental=incremental,
+                offset=offset,
+                limit=limit,
+                order_by=order_by,
+                work_claim=work_claim,
+                worker_id=worker_id,
+                claim_lease_s=claim_lease_s,
+                latent_index=latent_index,
+                decode_cache_mb=decode_cache_mb,
+                prefetch_window=prefetch_window,
+                prefetch_mb=prefetch_mb,
+                image_dtype=image_dtype,
+                max_side=max_side,
+                crop_box=crop_box,
+                match_output=match_output,
+                batch_policy=batch_policy,
+                batch_workers=batch_workers,
+            )
 
         # 2. 检查文件是否存在
         if not file_path or not os.path.exists(file_path):
             print(f"[DataManager] 文件不存在: {file_path}")
             print(f"[DataManager] 提示：如果 source_path 是目录，请设置 enable_match=true")
             # 返回空字符串而不是 None
-            return io.NodeOutput("")
+            return io.NodeOutput("", -1)
 
         # 3. 根据扩展名检测文件类型
         detected_type = detect_type_from_extension(file_path)
@@ -1642,34 +2729,48 @@ class OutputPathConfig(io.ComfyNode):
         # 4. 根据类型加载文件
         try:
             if detected_type == "IMAGE":
-                image, mask = load_image(file_path)
-                return io.NodeOutput(image)
+                if Path(file_path).suffix.lower() == ".npy":
+                    return io.NodeOutput(load_tensor(file_path), -1)
+                # 同一文件（路径、修改时间、大小不变）重复加载时直接返回已解码的张量
+                set_decode_cache_budget(decode_cache_mb * 1024**2)
+                # Match 模式预读过的文件直接取出（正在解码时等待其完成）
+                options = {
+                    "dtype": image_dtype,
+                    "max_side": max_side,
+                    "crop_box": parse_crop_box(crop_box),
+                }
+                prefetched = take_prefetched(file_path, tag=_decode_variant(options))
+                if prefetched is not None:
+                    image, mask = prefetched
+                else:
+                    image, mask = _load_image_cached(file_path, options)
+                return io.NodeOutput(image, -1)
 
             elif detected_type == "VIDEO":
                 video = load_video(file_path)
-                return io.NodeOutput(video)
+                return io.NodeOutput(video, -1)
 
             elif detected_type == "AUDIO":
                 audio = load_audio(file_path)
-                return io.NodeOutput(audio)
+                return io.NodeOutput(audio, -1)
 
             elif detected_type == "LATENT":
-                latent = load_latent(file_path)
-                return io.NodeOutput(latent)
+                latent = load_latent(file_path, index=latent_index if latent_index >= 0 else None)
+                return io.NodeOutput(latent, -1)
 
             elif detected_type == "CONDITIONING":
                 conditioning = load_conditioning(file_path)
-                return io.NodeOutput(conditioning)
+                return io.NodeOutput(conditioning, -1)
 
             elif detected_type == "STRING":
                 # 读取文本文件内容并返回
                 with open(file_path, "r", encoding="utf-8") as f:
                     content = f.read()
-                return io.NodeOutput(content)
+                return io.NodeOutput(content, -1)
 
             else:
                 # 默认返回文件路径字符串
-                return io.NodeOutput(file_path)
+                return io.NodeOutput(file_path, -1)
 
         except Exception as e:
             print(f"[DataManager] 加载文件失败: {e}")
@@ -1681,11 +2782,174 @@ class OutputPathConfig(io.ComfyNode):
                 try:
                     with open(file_path, "r", encoding="utf-8") as f:
                         content = f.read()
-                    return io.NodeOutput(content)
+                    return io.NodeOutput(content, -1)
                 except:
                     pass
             # 加载失败，返回文件路径字符串
-            return io.NodeOutput(file_path)
+            return io.NodeOutput(file_path, -1)
+
+
+class DataCache(io.ComfyNode):
+    """持久化缓存节点 - 按键输入的内容缓存上游输出，命中时跳过上游计算
+
+    value 为惰性输入：键输入（提示词、种子、图像等）计算出的缓存键在磁盘缓存中命中时，
+    直接加载保存的结果，不执行连接到 value 的上游节点；未命中时计算、保存并返回。
+    缓存以内容哈希寻址，保存在磁盘上，ComfyUI 重启或复制到其他机器后仍然有效。
+    """
+
+    @classmethod
+    def define_schema(cls) -> io.Schema:
+        template = io.MatchType.Template(
+            template_id="cache_value",
+            allowed_types=[
+                io.Image,
+                io.Mask,
+                io.Latent,
+                io.Conditioning,
+                io.Audio,
+                io.Video,
+                io.String,
+            ],
+        )
+
+        return io.Schema(
+            node_id="DataCache",
+            display_name="Data Manager - Cache",
+            category="Data Manager/Cache",
+            description="按键输入的内容持久化缓存上游输出。缓存命中时直接从磁盘加载，跳过上游节点的计算；"
+            "缓存目录按字节预算进行 LRU 淘汰。",
+            inputs=[
+                io.MatchType.Input("value", template=template, lazy=True),
+                io.String.Input(
+                    "namespace",
+                    default="default",
+                    multiline=False,
+                    display_name="命名空间",
+                ),
+                io.MultiType.Input("key_1", ALL_SUPPORTED_TYPES, optional=True),
+                io.MultiType.Input("key_2", ALL_SUPPORTED_TYPES, optional=True),
+                io.MultiType.Input("key_3", ALL_SUPPORTED_TYPES, optional=True),
+                io.String.Input(
+                    "cache_dir",
+                    default="./cache/data_manager",
+                    multiline=False,
+                    display_name="缓存目录",
+                    optional=True,
+                ),
+                io.Float.Input(
+                    "max_cache_gb",
+                    default=DEFAULT_CACHE_BYTES / 1024**3,
+                    min=0.0,
+                    max=4096.0,
+                    step=0.5,
+                    display_name="缓存上限 (GB, 0=不限)",
+                    optional=True,
+                ),
+                io.Boolean.Input(
+                    "enabled",
+                    default=True,
+                    display_name="启用缓存",
+                    optional=True,
+                ),
+            ],
+            outputs=[
+                io.MatchType.Output(template=template, id="output", display_name="Output"),
+            ],
+        )
+
+    @staticmethod
+    def _cache_key(namespace: str, key_1=None, key_2=None, key_3=None) -> Optional[str]:
+        """计算缓存键，键输入无法哈希时返回 None（不使用缓存）"""
+        try:
+            return compute_cache_key([key_1, key_2, key_3], namespace)
+        except (TypeError, OSError) as e:
+            print(f"[DataManager] 无法计算缓存键，跳过缓存: {e}")
+            return None
+
+    @classmethod
+    def check_lazy_status(
+        cls,
+        namespace: str = "default",
+        value=None,
+        key_1=None,
+        key_2=None,
+        key_3=None,
+        cache_dir: str = "./cache/data_manager",
+        max_cache_gb: float = DEFAULT_CACHE_BYTES / 1024**3,
+        enabled: bool = True,
+    ) -> list:
+        """缓存命中且条目完整（数据文件可读、大小与写入时一致）时不需要计算 value 的上游节点"""
+        if value is not None:
+            return []
+        if enabled:
+            key = cls._cache_key(namespace, key_1, key_2, key_3)
+            if key is not None and get_cache_entry(cache_dir, key, touch=False) is not None:
+                return []
+        return ["value"]
+
+    @classmethod
+    def execute(
+        cls,
+        namespace: str = "default",
+        value=None,
+        key_1=None,
+        key_2=None,
+        key_3=None,
+        cache_dir: str = "./cache/data_manager",
+        max_cache_gb: float = DEFAULT_CACHE_BYTES / 1024**3,
+        enabled: bool = True,
+    ) -> io.NodeOutput:
+        """返回缓存的结果，未命中时保存上游计算的结果
+
+        Args:
+            namespace: 命名空间（区分相同键输入的不同计算阶段）
+            value: 上游输出（惰性输入，缓存命中时为 None）
+            key_1, key_2, key_3: 参与计算缓存键的输入（张量按字节内容、字符串、数值等）
+            cache_dir: 缓存目录
+            max_cache_gb: 缓存字节预算（GB），0 表示不限制
+            enabled: 是否启用缓存
+
+        Returns:
+            缓存或计算得到的值
+        """
+        if not enabled:
+            return io.NodeOutput(value)
+
+        key = cls._cache_key(namespace, key_1, key_2, key_3)
+        if key is None:
+            return io.NodeOutput(value)
+
+        entry = get_cache_entry(cache_dir, key)
+        if entry is not None:
+            try:
+                cached = _read_cache_value(entry)
+                print(f"[DataManager] 缓存命中: {key[:12]} ({entry['type']})")
+                return io.NodeOutput(cached)
+            except Exception as e:
+                # 损坏的条目删除后，下次运行未命中并重新计算
+                remove_cache_entry(cache_dir, key)
+                if value is None:
+                    raise RuntimeError(
+                        f"缓存条目 {key[:12]} 读取失败，已删除损坏的条目，重新运行即可重新计算: {e}"
+                    ) from e
+                print(f"[DataManager] 读取缓存失败，已删除条目并重新写入: {e}")
+
+        if value is None:
+            # 检查惰性输入时命中、执行前条目被淘汰：上游没有计算，不能输出 None
+            raise RuntimeError(f"缓存条目 {key[:12]} 在执行前被删除或淘汰，重新运行即可重新计算")
+
+        try:
+            store_cache_entry(
+                cache_dir,
+                key,
+                lambda entry_dir: _write_cache_value(value, entry_dir),
+                int(max_cache_gb * 1024**3),
+            )
+            print(f"[DataManager] 已写入缓存: {key[:12]}")
+        except Exception as e:
+            print(f"[DataManager] 写入缓存失败: {e}")
+
+        return io.NodeOutput(value)
 
 
 class DataManagerExtension(ComfyExtension):
@@ -1698,6 +2962,7 @@ class DataManagerExtension(ComfyExtension):
             DataManagerCore,
             InputPathConfig,
             OutputPathConfig,
+            DataCache,
         ]
 
 
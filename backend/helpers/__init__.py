@@ -18,8 +18,110 @@ from .path_utils import (
 )
 from .formatters import human_readable_size
 from .info import get_file_info, get_file_category
-from .batch_scanner import scan_files, scan_files_absolute, validate_glob_pattern, get_pattern_info
-from .batch_namer import generate_name, validate_naming_rule, get_naming_rule_info, create_naming_rule_presets
+from .batch_scanner import (
+    scan_files,
+    scan_files_absolute,
+    scan_window,
+    validate_glob_pattern,
+    get_pattern_info,
+    iter_matching_files,
+    split_patterns,
+    parse_file_filter,
+    PathMatcher,
+    FileFilter,
+    SORT_KEYS,
+    CASE_SENSITIVE_DEFAULT,
+)
+from .scan_cursor import scan_incremental, reset_scan_cursor, get_cursor_path, INCREMENTAL_MODES
+from .work_claim import (
+    claim_files,
+    complete_claims,
+    complete_claimed_file,
+    begin_claimed_write,
+    finish_claimed_write,
+    release_claims,
+    get_spool_stats,
+    get_spool_dir,
+    default_worker_id,
+    DEFAULT_LEASE_SECONDS,
+)
+from .batch_namer import (
+    generate_name,
+    validate_naming_rule,
+    get_naming_rule_info,
+    create_naming_rule_presets,
+    compile_naming_rule,
+    CompiledNamingRule,
+    reserve_path,
+    reserve_paths,
+    release_reserved_paths,
+    TIMESTAMP_MODES,
+    NAME_CONFLICT_MODES,
+)
+from .batch_saver import run_batch, resolve_worker_count, EXECUTOR_TYPES
+from .save_manifest import (
+    load_manifest,
+    record_output,
+    find_produced,
+    save_with_manifest,
+    get_manifest_path,
+    manifest_name,
+    MANIFEST_MODES,
+    MANIFEST_FILENAME,
+)
+from .image_decode import open_image_region, parse_crop_box, read_region_size, to_rgb
+from .batch_loader import load_image_batch, read_image_size, BATCH_SIZE_POLICIES
+from .tensor_convert import (
+    to_uint8_array,
+    iter_uint8_chunks,
+    uint8_to_float32,
+    DEFAULT_CHUNK_FRAMES,
+    IMAGE_DTYPES,
+)
+from .encode_profiles import (
+    get_image_save_kwargs,
+    IMAGE_ENCODE_PROFILES,
+    ENCODE_PROFILE_NAMES,
+    DEFAULT_ENCODE_PROFILE,
+)
+from .write_queue import submit_write_job, get_job, wait_for_job
+from .video_remux import get_video_source, remux_video, is_remux_compatible, REMUX_COMPATIBLE_CODECS
+from .video_settings import (
+    build_video_writer_kwargs,
+    resolve_video_settings,
+    DEFAULT_VIDEO_SETTINGS,
+    VIDEO_PRESETS,
+    VIDEO_PIXEL_FORMATS,
+)
+from .audio_writer import write_audio, AUDIO_CODECS, DEFAULT_AUDIO_FRAME_SIZE
+from .latent_io import save_latent_file, load_latent_file, read_safetensors, write_safetensors
+from .conditioning_io import is_conditioning, save_conditioning_file, load_conditioning_file
+from .tensor_dump import save_tensor_dump, load_tensor_dump, TENSOR_DUMP_FORMATS
+from .decode_cache import (
+    load_cached,
+    set_decode_cache_budget,
+    clear_decode_cache,
+    get_decode_cache_stats,
+    DEFAULT_DECODE_CACHE_BYTES,
+)
+from .prefetch import (
+    start_prefetch,
+    take_prefetched,
+    stop_prefetch,
+    get_prefetch_stats,
+    DEFAULT_PREFETCH_WINDOW,
+    DEFAULT_PREFETCH_BYTES,
+)
+from .fingerprint import file_fingerprint, listing_fingerprint, path_fingerprint
+from .memo_cache import (
+    compute_cache_key,
+    get_cache_entry,
+    store_cache_entry,
+    remove_cache_entry,
+    list_cache_entries,
+    evict_cache,
+    DEFAULT_CACHE_BYTES,
+)
 
 # SSH 远程访问（可选依赖）
 try:
@@ -68,12 +170,129 @@ __all__ = [
     # 批量处理
     "scan_files",
     "scan_files_absolute",
+    "scan_window",
     "validate_glob_pattern",
     "get_pattern_info",
+    "iter_matching_files",
+    "split_patterns",
+    "parse_file_filter",
+    "PathMatcher",
+    "FileFilter",
+    "SORT_KEYS",
+    "CASE_SENSITIVE_DEFAULT",
+    "scan_incremental",
+    "reset_scan_cursor",
+    "get_cursor_path",
+    "INCREMENTAL_MODES",
+    # 多实例认领
+    "claim_files",
+    "complete_claims",
+    "complete_claimed_file",
+    "begin_claimed_write",
+    "finish_claimed_write",
+    "release_claims",
+    "get_spool_stats",
+    "get_spool_dir",
+    "default_worker_id",
+    "DEFAULT_LEASE_SECONDS",
     "generate_name",
     "validate_naming_rule",
     "get_naming_rule_info",
     "create_naming_rule_presets",
+    "compile_naming_rule",
+    "CompiledNamingRule",
+    "reserve_path",
+    "reserve_paths",
+    "release_reserved_paths",
+    "TIMESTAMP_MODES",
+    "NAME_CONFLICT_MODES",
+    "run_batch",
+    "resolve_worker_count",
+    "EXECUTOR_TYPES",
+    # 保存清单
+    "load_manifest",
+    "record_output",
+    "find_produced",
+    "save_with_manifest",
+    "get_manifest_path",
+    "manifest_name",
+    "MANIFEST_MODES",
+    "MANIFEST_FILENAME",
+    "open_image_region",
+    "parse_crop_box",
+    "read_region_size",
+    "to_rgb",
+    "load_image_batch",
+    "read_image_size",
+    "BATCH_SIZE_POLICIES",
+    # 张量转换
+    "to_uint8_array",
+    "iter_uint8_chunks",
+    "uint8_to_float32",
+    "DEFAULT_CHUNK_FRAMES",
+    "IMAGE_DTYPES",
+    # 编码配置
+    "get_image_save_kwargs",
+    "IMAGE_ENCODE_PROFILES",
+    "ENCODE_PROFILE_NAMES",
+    "DEFAULT_ENCODE_PROFILE",
+    # 异步写入队列
+    "submit_write_job",
+    "get_job",
+    "wait_for_job",
+    # 视频直通/封装转换
+    "get_video_source",
+    "remux_video",
+    "is_remux_compatible",
+    "REMUX_COMPATIBLE_CODECS",
+    # 视频编码设置
+    "build_video_writer_kwargs",
+    "resolve_video_settings",
+    "DEFAULT_VIDEO_SETTINGS",
+    "VIDEO_PRESETS",
+    "VIDEO_PIXEL_FORMATS",
+    # 音频写入
+    "write_audio",
+    "AUDIO_CODECS",
+    "DEFAULT_AUDIO_FRAME_SIZE",
+    # Latent 读写
+    "save_latent_file",
+    "load_latent_file",
+    "read_safetensors",
+    "write_safetensors",
+    # Conditioning 读写
+    "is_conditioning",
+    "save_conditioning_file",
+    "load_conditioning_file",
+    # 张量转储
+    "save_tensor_dump",
+    "load_tensor_dump",
+    "TENSOR_DUMP_FORMATS",
+    # 解码缓存
+    "load_cached",
+    "set_decode_cache_budget",
+    "clear_decode_cache",
+    "get_decode_cache_stats",
+    "DEFAULT_DECODE_CACHE_BYTES",
+    # 预读解码
+    "start_prefetch",
+    "take_prefetched",
+    "stop_prefetch",
+    "get_prefetch_stats",
+    "DEFAULT_PREFETCH_WINDOW",
+    "DEFAULT_PREFETCH_BYTES",
+    # 变化指纹
+    "file_fingerprint",
+    "listing_fingerprint",
+    "path_fingerprint",
+    # 持久化缓存
+    "compute_cache_key",
+    "get_cache_entry",
+    "store_cache_entry",
+    "list_cache_entries",
+    "remove_cache_entry",
+    "evict_cache",
+    "DEFAULT_CACHE_BYTES",
     # SSH 远程访问
     "ssh_is_available",
     "ssh_connect",
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""helpers/audio_writer.py - 音频写入模块
+
+提供向量化的音频写入功能：
+- WAV/FLAC：直接写入 PCM（soundfile，或标准库 wave 写 WAV），不经过逐帧编码循环
+- MP3/OGG 等有损格式：一次性生成交错缓冲区，按较大的帧长度切片送入 PyAV 编码器
+"""
+
+import wave
+import logging
+from fractions import Fraction
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# 格式对应的 PyAV 编码器
+AUDIO_CODECS = {
+    "mp3": "libmp3lame",
+    "wav": "pcm_s16le",
+    "flac": "flac",
+    "ogg": "libvorbis",
+}
+
+# PyAV 编码时每个 AudioFrame 的采样数（编码器内部会按自身帧长重新分块）
+DEFAULT_AUDIO_FRAME_SIZE = 16384
+
+
+def normalize_waveform(waveform: Any) -> np.ndarray:
+    """将波形转换为 [C, T] float32 数组，峰值超过 1.0 时整体归一化
+
+    Args:
+        waveform: [C, T] 的 torch.Tensor 或 np.ndarray
+
+    Returns:
+        [C, T] float32 数组，取值范围 [-1, 1]
+
+    Raises:
+        ValueError: 不是二维 [C, T] 数据
+    """
+    if hasattr(waveform, "detach"):  # torch.Tensor
+        waveform = waveform.detach().cpu().numpy()
+
+    waveform_np = np.asarray(waveform, dtype=np.float32)
+    if waveform_np.ndim != 2:
+        raise ValueError(f"不支持的音频形状: {waveform_np.shape}，期望 [C, T] 格式")
+
+    # 只计算一次峰值
+    peak = float(np.abs(waveform_np).max()) if waveform_np.size else 0.0
+    if peak > 1.0:
+        waveform_np = waveform_np / peak
+
+    return waveform_np
+
+
+def to_pcm16(waveform_np: np.ndarray) -> np.ndarray:
+    """将 [C, T] float 波形向量化转换为交错的 [T, C] int16 PCM
+
+    Args:
+        waveform_np: [C, T] 数组，取值范围 [-1, 1]
+
+    Returns:
+        [T, C] 的 C 连续小端 int16 数组
+
+    Examples:
+        >>> to_pcm16(np.array([[0.0, 1.0, -1.0]], dtype=np.float32)).ravel().tolist()
+        [0, 32767, -32767]
+    """
+    scaled = np.multiply(waveform_np.T, 32767.0, dtype=np.float32)
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    return np.ascontiguousarray(scaled.astype("<i2"))
+
+
+def write_pcm_native(
+    waveform_np: np.ndarray, sample_rate: int, file_path: str, format: str
+) -> bool:
+    """不经过 PyAV，直接写入 16 位 PCM 的 WAV/FLAC 文件
+
+    优先使用 soundfile（支持 WAV 和 FLAC），未安装时使用标准库 wave 写 WAV
+
+    Args:
+        waveform_np: [C, T] float32 数组，取值范围 [-1, 1]
+        sample_rate: 采样率
+        file_path: 目标文件路径
+        format: 音频格式（wav 或 flac）
+
+    Returns:
+        写入成功返回 True；当前环境无法直接写入该格式时返回 False
+    """
+    if format not in ("wav", "flac"):
+        return False
+
+    try:
+        import soundfile as sf
+    except ImportError:
+        sf = None
+
+    if sf is not None:
+        # 传入已转换的 int16 数据，与 wave 路径的量化结果一致
+        sf.write(
+            file_path,
+            to_pcm16(waveform_np),
+            int(sample_rate),
+            format=format.upper(),
+            subtype="PCM_16",
+        )
+        return True
+
+    if format != "wav":
+        return False
+
+    num_channels = waveform_np.shape[0]
+    with wave.open(file_path, "wb") as wav_file:
+        wav_file.setnchannels(num_channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(int(sample_rate))
+        wav_file.writeframes(to_pcm16(waveform_np).tobytes())
+    return True
+
+
+def write_av(
+    waveform_np: np.ndarray,
+    sample_rate: int,
+    file_path: str,
+    format: str,
+    frame_size: int = DEFAULT_AUDIO_FRAME_SIZE,
+) -> int:
+    """使用 PyAV 编码写入音频
+
+    整段波形只转换一次为交错的 float32 缓冲区，各 AudioFrame 由该缓冲区的切片视图生成
+
+    Args:
+        waveform_np: [C, T] float32 数组，取值范围 [-1, 1]
+        sample_rate: 采样率
+        file_path: 目标文件路径
+        format: 音频格式（mp3, wav, flac, ogg）
+        frame_size: 每个 AudioFrame 的采样数
+
+    Returns:
+        写入的数据包数量
+
+    Raises:
+        ImportError: PyAV 未安装
+        ValueError: 不支持的音频格式
+    """
+    try:
+        import av
+    except ImportError:
+        raise ImportError("PyAV (av) 未安装，无法保存音频。请运行: pip install av")
+
+    if format not in AUDIO_CODECS:
+        raise ValueError(f"不支持的音频格式: {format}")
+
+    num_channels, num_samples = waveform_np.shape
+    frame_size = max(1, int(frame_size))
+
+    # PyAV 的 packed 格式需要 [1, T*C] 的交错数据，整段只生成一次
+    interleaved = np.ascontiguousarray(waveform_np.T, dtype=np.float32).reshape(1, -1)
+
+    # PyAV 需要 layout='mono'，因为数据是交错的
+    # stereo 会在编码时自动处理
+    layout = "mono" if num_channels == 1 else "stereo"
+    time_base = Fraction(1, int(sample_rate))
+
+    packets_written = 0
+    with av.open(file_path, mode="w") as output_container:
+        stream = output_container.add_stream(AUDIO_CODECS[format], rate=int(sample_rate))
+
+        # 设置编码质量
+        if format == "mp3":
+            stream.codec_context.qscale = 2  # 高质量 (0-9, 越小质量越高)
+
+        for start in range(0, num_samples, frame_size):
+            chunk = interleaved[:, start * num_channels : (start + frame_size) * num_channels]
+            frame = av.AudioFrame.from_ndarray(chunk, format="flt", layout=layout)
+            frame.sample_rate = int(sample_rate)
+            frame.time_base = time_base
+            frame.pts = start
+            for packet in stream.encode(frame):
+                output_container.mux(packet)
+                packets_written += 1
+
+        # 写入剩余的帧
+        for packet in stream.encode():
+            output_container.mux(packet)
+            packets_written += 1
+
+    return packets_written
+
+
+def write_audio(
+    waveform: Any,
+    sample_rate: int,
+    file_path: str,
+    format: str,
+    frame_size: int = DEFAULT_AUDIO_FRAME_SIZE,
+) -> str:
+    """写入 [C, T] 波形到音频文件
+
+    WAV/FLAC 优先直接写入 PCM，其他格式（或缺少 soundfile 的 FLAC）使用 PyAV 编码
+
+    Args:
+        waveform: [C, T] 的 torch.Tensor 或 np.ndarray
+        sample_rate: 采样率
+        file_path: 目标文件路径（扩展名需已与 format 一致）
+        format: 音频格式（mp3, wav, flac, ogg）
+        frame_size: PyAV 编码时每个 AudioFrame 的采样数
+
+    Returns:
+        保存后的文件路径
+    """
+    format = format.lower()
+    if format not in AUDIO_CODECS:
+        raise ValueError(f"不支持的音频格式: {format}")
+
+    waveform_np = normalize_waveform(waveform)
+
+    if write_pcm_native(waveform_np, sample_rate, file_path, format):
+        logger.debug(f"[DataManager] Audio written as native PCM: {file_path}")
+        return file_path
+
+    write_av(waveform_np, sample_rate, file_path, format, frame_size)
+    return file_path
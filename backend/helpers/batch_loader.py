@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""helpers/batch_loader.py - 批量图像加载模块
+
+将多个图像文件并行解码到预分配的 [B, H, W, 3] 数组中，下游节点可一次处理整个批次，
+避免逐文件执行节点的开销：
+- 先只读取文件头获得尺寸（考虑 EXIF 旋转），按尺寸策略规划批次并一次性分配输出数组
+- 各文件在线程池中解码，直接写入输出数组的对应切片（不生成逐帧张量再拼接）
+
+尺寸策略：
+    bucket   按尺寸分组，每种尺寸一个批次
+    resize   全部缩放到第一个文件的尺寸（与 ComfyUI 图像批次节点一致）
+    pad      全部放入最大宽高的画布左上角，其余区域填 0
+"""
+
+import logging
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .batch_saver import run_batch
+from .image_decode import open_image_region, read_region_size, to_rgb
+from .tensor_convert import IMAGE_DTYPES, uint8_to_float32
+
+logger = logging.getLogger(__name__)
+
+
+# 批量加载的尺寸策略
+BATCH_SIZE_POLICIES = ("bucket", "resize", "pad")
+
+
+def read_image_size(
+    file_path: str,
+    max_side: int = 0,
+    crop_box: Optional[Tuple[int, int, int, int]] = None,
+) -> Tuple[int, int]:
+    """只读取文件头获得解码后的图像尺寸（按 EXIF 旋转后的方向，应用裁剪和最长边上限）
+
+    Args:
+        file_path: 图像文件路径
+        max_side: 最长边上限（0 表示原始尺寸）
+        crop_box: 裁剪区域 (left, top, right, bottom)
+
+    Returns:
+        (高, 宽)
+    """
+    from PIL import Image
+
+    with Image.open(file_path) as img:
+        width, height = read_region_size(img, max_side=max_side, crop_box=crop_box)
+    return height, width
+
+
+def _decode_into(
+    file_path: str,
+    out: np.ndarray,
+    resize_to: Tuple[int, int] = None,
+    max_side: int = 0,
+    crop_box: Optional[Tuple[int, int, int, int]] = None,
+) -> None:
+    """解码图像并写入 out（[H, W, 3]），图像小于 out 时写入左上角"""
+    from PIL import Image
+
+    with Image.open(file_path) as img:
+        # 与 load_image 共用旋转、缩小分辨率/区域解码和 RGB 转换
+        image = to_rgb(open_image_region(img, max_side=max_side, crop_box=crop_box))
+        if resize_to is not None and image.size != (resize_to[1], resize_to[0]):
+            image = image.resize((resize_to[1], resize_to[0]), Image.BILINEAR)
+
+        pixels = np.asarray(image)
+        target = out[: pixels.shape[0], : pixels.shape[1]]
+        if out.dtype == np.float32:
+            uint8_to_float32(pixels, out=target)
+        else:
+            target[...] = pixels
+
+
+def load_image_batch(
+    file_paths: Sequence[str],
+    policy: str = "bucket",
+    dtype: str = "float32",
+    workers: int = 0,
+    max_side: int = 0,
+    crop_box: Optional[Tuple[int, int, int, int]] = None,
+) -> List[Tuple[np.ndarray, List[str]]]:
+    """并行解码多个图像文件到预分配的批次数组
+
+    Args:
+        file_paths: 图像文件路径（批次内顺序与输入顺序一致）
+        policy: 尺寸策略（"bucket" / "resize" / "pad"）
+        dtype: "float32"（范围 0-1）或 "uint8"（范围 0-255）
+        workers: 解码线程数（<= 0 表示自动）
+        max_side: 每张图像的最长边上限（0 表示原始尺寸）；JPEG 直接以 DCT 缩放解码
+        crop_box: 每张图像只加载的区域 (left, top, right, bottom)，按 EXIF 旋转后的方向
+
+    Returns:
+        [(批次数组 [B, H, W, 3], 对应文件路径列表), ...]；bucket 策略按尺寸首次出现的顺序返回多个批次，
+        其他策略只返回一个批次
+
+    Raises:
+        ValueError: 不支持的尺寸策略或数据类型
+    """
+    if policy not in BATCH_SIZE_POLICIES:
+        raise ValueError(f"不支持的尺寸策略: {policy}。支持的策略: {BATCH_SIZE_POLICIES}")
+    if dtype not in IMAGE_DTYPES:
+        raise ValueError(f"不支持的图像数据类型: {dtype}，可选: {IMAGE_DTYPES}")
+
+    if not file_paths:
+        return []
+
+    sizes = run_batch(
+        read_image_size, [(path, max_side, crop_box) for path in file_paths], workers=workers
+    )
+
+    # 规划批次：{批次尺寸: [序号, ...]}
+    groups: "OrderedDict[Tuple[int, int], List[int]]" = OrderedDict()
+    if policy == "bucket":
+        for i, size in enumerate(sizes):
+            groups.setdefault(size, []).append(i)
+    elif policy == "resize":
+        groups[sizes[0]] = list(range(len(file_paths)))
+    else:
+        canvas = (max(h for h, _ in sizes), max(w for _, w in sizes))
+        groups[canvas] = list(range(len(file_paths)))
+
+    np_dtype = np.float32 if dtype == "float32" else np.uint8
+    allocate = np.zeros if policy == "pad" else np.empty
+
+    batches = []
+    jobs = []
+    for (height, width), indices in groups.items():
+        batch = allocate((len(indices), height, width, 3), dtype=np_dtype)
+        resize_to = (height, width) if policy == "resize" else None
+        for slot, i in enumerate(indices):
+            jobs.append((file_paths[i], batch[slot], resize_to, max_side, crop_box))
+        batches.append((batch, [file_paths[i] for i in indices]))
+
+    run_batch(_decode_into, jobs, workers=workers)
+
+    logger.info(
+        f"[DataManager] 批量加载图像: files={len(file_paths)}, policy={policy}, "
+        f"batches={[b.shape for b, _ in batches]}"
+    )
+    return batches
@@ -1,14 +1,20 @@
 # -*- coding: utf-8 -*-
 """helpers/batch_namer.py - 批量文件命名模块
 
-提供批量保存时的文件命名规则生成功能
+提供批量保存时的文件命名规则生成功能：
+- 命名规则编译为 CompiledNamingRule（每个规则解析一次），按索引批量生成文件名
+- 时间戳占位符按批次（整批相同）或按文件取值，由调用方显式选择
+- reserve_paths 以 O_EXCL 预占文件名，重名时追加 _1、_2…，并发保存的批次互不覆盖
 """
 
 import os
 import re
+import time
+import uuid
 import logging
-from pathlib import Path
-from typing import Optional, Dict, Any
+import functools
+from string import Formatter
+from typing import Optional, Dict, Any, List, Sequence
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -28,6 +34,266 @@ PLACEHOLDERS = {
     "{uuid}": "唯一标识符",
 }
 
+# 时间戳取值方式："batch" 每批生成时取一次（整批相同），"item" 每个文件生成时取值
+TIMESTAMP_MODES = ("batch", "item")
+
+# 重名处理："overwrite" 覆盖已有文件，"unique" 预占文件名，已存在时追加序号
+NAME_CONFLICT_MODES = ("overwrite", "unique")
+
+_TIME_FIELDS = ("timestamp", "datetime", "date", "time")
+_ORIGINAL_FIELDS = ("original_name", "original_ext", "original_path")
+_FIELDS = frozenset(("index", "uuid") + _TIME_FIELDS + _ORIGINAL_FIELDS)
+
+# 校验格式规范时使用的示例值
+_SAMPLE_VALUES = {
+    "index": 1,
+    "uuid": "0" * 8,
+    "timestamp": 0,
+    "datetime": "",
+    "date": "",
+    "time": "",
+    "original_name": "",
+    "original_ext": "",
+    "original_path": "",
+}
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def _time_values(now: float) -> Dict[str, Any]:
+    moment = datetime.fromtimestamp(now)
+    return {
+        "timestamp": int(now),
+        "datetime": moment.strftime("%Y%m%d_%H%M%S"),
+        "date": moment.strftime("%Y%m%d"),
+        "time": moment.strftime("%H%M%S"),
+    }
+
+
+def _dir_prefix(directory: str) -> str:
+    """目录部分转换为文件名前缀（为空时没有前缀，与 os.path.join 一致）"""
+    directory = directory.replace("\\", "/").rstrip("/")
+    return f"{directory}/" if directory else ""
+
+
+class CompiledNamingRule:
+    """编译后的命名规则
+
+    规则在构造时解析一次：上下文变量直接写入格式串，每个文件只填入索引、原文件信息、时间和 UUID 中
+    规则实际用到的部分；目录部分不含逐文件变化的占位符时每批只格式化一次
+
+    Args:
+        naming_rule: 命名规则（占位符见 PLACEHOLDERS，{:04d} 等同于 {index:04d}）
+        output_ext: 输出扩展名（None 时使用原文件扩展名）
+        timestamp_mode: 时间戳取值方式（"batch" / "item"）
+        context: 额外的上下文变量（编译时写入）
+
+    Raises:
+        ValueError: 规则语法错误或 timestamp_mode 无效
+
+    Examples:
+        >>> rule = CompiledNamingRule("result_{index:04d}", output_ext="png")
+        >>> rule.names(3)
+        ['result_0001.png', 'result_0002.png', 'result_0003.png']
+    """
+
+    def __init__(
+        self,
+        naming_rule: str,
+        output_ext: Optional[str] = None,
+        timestamp_mode: str = "batch",
+        context: Optional[Dict[str, Any]] = None,
+    ):
+        if timestamp_mode not in TIMESTAMP_MODES:
+            raise ValueError(f"无效的时间戳模式: {timestamp_mode}。支持的模式: {TIMESTAMP_MODES}")
+
+        self.rule = naming_rule
+        self.output_ext = output_ext.lstrip(".") if output_ext else output_ext
+        self.timestamp_mode = timestamp_mode
+        self._context = dict(context or {})
+
+        # 分离目录和文件名部分（在最后一个路径分隔符处）
+        sep = "/" if "/" in naming_rule else "\\" if "\\" in naming_rule else None
+        dir_part, name_part = naming_rule.rsplit(sep, 1) if sep else ("", naming_rule)
+
+        self._dir_format, dir_fields = self._compile(dir_part)
+        self._name_format, name_fields = self._compile(name_part)
+        self.fields = dir_fields | name_fields
+        # 目录部分只含每批不变的占位符时整批共用
+        self._dir_varies = bool(dir_fields & {"index", "uuid"}) or (
+            timestamp_mode == "item" and bool(dir_fields & set(_TIME_FIELDS))
+        )
+        self._uses_time = bool(self.fields & set(_TIME_FIELDS))
+        self._uses_uuid = "uuid" in self.fields
+
+    def _compile(self, template: str):
+        """转换为只含命名字段的格式串，返回 (格式串, 用到的占位符)"""
+        if not template:
+            return "", set()
+        pieces = []
+        fields = set()
+        try:
+            for literal, field, spec, conversion in Formatter().parse(template):
+                pieces.append(_escape(literal))
+                if field is None:
+                    continue
+                name = field.strip() or "index"
+                suffix = (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "")
+                if name in self._context:
+                    # 上下文变量在编译时写入
+                    value = self._context[name]
+                    pieces.append(_escape(f"{{0{suffix}}}".format(value)))
+                elif name in _FIELDS:
+                    pieces.append(f"{{{name}{suffix}}}")
+                    fields.add(name)
+                else:
+                    # 未知占位符原样保留
+                    pieces.append(_escape(f"{{{field}{suffix}}}"))
+            compiled = "".join(pieces)
+            compiled.format_map(_SAMPLE_VALUES)
+        except (ValueError, TypeError, KeyError, IndexError, AttributeError) as e:
+            raise ValueError(f"命名规则语法错误: {e}") from e
+        return compiled, fields
+
+    def _base_values(self, original_path: Optional[str], now: float) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        if original_path:
+            directory, filename = os.path.split(original_path.rstrip("\\/"))
+            stem, ext = os.path.splitext(filename)
+            values.update(
+                original_name=stem,
+                original_ext=ext.lstrip("."),
+                original_path=os.path.basename(directory),
+            )
+        else:
+            values.update(original_name="", original_ext="", original_path="")
+        if self._uses_time:
+            values.update(_time_values(now))
+        return values
+
+    def names(
+        self,
+        count: int,
+        start: int = 0,
+        original_path: Optional[str] = None,
+    ) -> List[str]:
+        """批量生成文件名
+
+        Args:
+            count: 生成数量
+            start: 起始索引（{index} 为索引 + 1）
+            original_path: 原始文件路径（整批相同）
+
+        Returns:
+            生成的文件名列表（包含扩展名，路径分隔符统一为 /）
+        """
+        now = time.time()
+        values = self._base_values(original_path, now)
+
+        ext = self.output_ext
+        if ext is None and original_path:
+            ext = values["original_ext"]
+        suffix = f".{ext}" if ext else ""
+        suffix_lower = suffix.lower()
+
+        name_format = self._name_format.format_map
+        dir_format = self._dir_format.format_map
+        per_item_time = self._uses_time and self.timestamp_mode == "item"
+        uses_uuid = self._uses_uuid
+        last_second = int(now)
+
+        prefix = ""
+        if self._dir_format and not self._dir_varies:
+            values["index"] = start + 1
+            prefix = _dir_prefix(dir_format(values))
+
+        result = []
+        append = result.append
+        for index in range(start + 1, start + count + 1):
+            values["index"] = index
+            if per_item_time:
+                second = int(time.time())
+                if second != last_second:
+                    last_second = second
+                    values.update(_time_values(second))
+            if uses_uuid:
+                values["uuid"] = uuid.uuid4().hex[:8]
+            filename = name_format(values)
+            if suffix and not filename.lower().endswith(suffix_lower):
+                filename += suffix
+            if self._dir_varies:
+                filename = _dir_prefix(dir_format(values)) + filename
+            else:
+                filename = prefix + filename
+            if "\\" in filename:
+                filename = filename.replace("\\", "/")
+            append(filename)
+        return result
+
+    def generate(self, index: int = 0, original_path: Optional[str] = None) -> str:
+        """生成单个文件名（索引 index 对应 {index} = index + 1）"""
+        return self.names(1, start=index, original_path=original_path)[0]
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_cached(
+    naming_rule: str, output_ext: Optional[str], timestamp_mode: str
+) -> CompiledNamingRule:
+    return CompiledNamingRule(naming_rule, output_ext=output_ext, timestamp_mode=timestamp_mode)
+
+
+def _check_rule_safety(naming_rule: str) -> Optional[str]:
+    """检查规则文本中的路径遍历和非法字符，返回错误消息"""
+    if not naming_rule:
+        return "命名规则不能为空"
+
+    # 检查不安全的路径遍历
+    if "../" in naming_rule or "..\\" in naming_rule:
+        return "命名规则包含不安全的路径遍历"
+
+    # 检查是否包含非法字符（Windows）
+    # 注意：冒号用于 Python 格式字符串（如 {index:04d}），需要特殊处理
+    invalid_chars = ['<', '>', '"', '|']
+    for char in invalid_chars:
+        if char in naming_rule:
+            return f"命名规则包含非法字符: '{char}'"
+
+    # 检查冒号是否在非法位置（不在格式字符串的花括号内）
+    # 允许：{index:04d}, {name:format}
+    # 不允许：file:name, C:\path
+    if ':' in naming_rule:
+        # 先移除所有 {xxx:yyy} 格式的内容，再检查剩余部分
+        temp = re.sub(r'\{[^}]*:[^}]*\}', '', naming_rule)
+        if ':' in temp:
+            return "命名规则包含非法字符: ':' (仅在格式字符串 {var:format} 中允许)"
+    return None
+
+
+def compile_naming_rule(
+    naming_rule: str,
+    output_ext: Optional[str] = None,
+    timestamp_mode: str = "batch",
+) -> CompiledNamingRule:
+    """校验并编译命名规则（相同参数复用已编译的规则）
+
+    Args:
+        naming_rule: 命名规则
+        output_ext: 输出扩展名
+        timestamp_mode: 时间戳取值方式（"batch" / "item"）
+
+    Returns:
+        CompiledNamingRule
+
+    Raises:
+        ValueError: 规则不安全、语法错误或 timestamp_mode 无效
+    """
+    error = _check_rule_safety(naming_rule)
+    if error:
+        raise ValueError(error)
+    return _compile_cached(naming_rule, output_ext, timestamp_mode)
+
 
 def generate_name(
     naming_rule: str,
@@ -38,12 +304,14 @@ def generate_name(
 ) -> str:
     """根据命名规则生成文件名
 
+    单次生成；批量生成时使用 compile_naming_rule(...).names()。时间戳取生成时的时间
+
     Args:
         naming_rule: 命名规则，支持占位符
             - 基础格式：`result_{:04d}` -> `result_0001.png`
             - 保留原文件名：`{original_name}` -> `photo.png`
             - 保留目录结构：`{original_path}/{original_name}` -> `subdir/photo.png`
-        index: 当前索引（从 0 或 1 开始，取决于规则）
+        index: 当前索引（{index} 为 index + 1）
         original_path: 原始文件路径（用于提取原文件名、扩展名、目录）
         output_ext: 输出文件的扩展名（如 "png", "jpg"）
         context: 额外上下文变量
@@ -53,184 +321,109 @@ def generate_name(
 
     Examples:
         >>> generate_name("result_{:04d}", index=0, output_ext="png")
-        'result_0000.png'
+        'result_0001.png'
 
         >>> generate_name("result_{index:04d}", index=1, output_ext="png")
-        'result_0001.png'
+        'result_0002.png'
 
         >>> generate_name("{original_name}", original_path="/path/to/photo.jpg", output_ext="png")
         'photo.png'
 
         >>> generate_name("{original_path}/result_{index:04d}", index=1, original_path="/path/to/subdir/photo.jpg", output_ext="png")
-        'subdir/result_0001.png'
+        'subdir/result_0002.png'
     """
-    context = context or {}
-
-    # 解析原始文件信息
-    original_info = _parse_original_path(original_path) if original_path else {}
-
-    # 获取输出扩展名
-    if output_ext is None and original_info:
-        # 如果没有指定输出扩展名，使用原文件的扩展名
-        output_ext = original_info.get("ext", "").lstrip(".")
-
-    # 确保 output_ext 不包含点号
-    if output_ext and output_ext.startswith("."):
-        output_ext = output_ext.lstrip(".")
-
-    # 处理目录部分（如果规则包含路径分隔符）
-    if "/" in naming_rule or "\\" in naming_rule:
-        dir_part, name_part = _split_path_and_name(naming_rule)
-    else:
-        dir_part = ""
-        name_part = naming_rule
-
-    # 生成文件名部分
-    filename = _apply_name_format(
-        name_part,
-        index=index,
-        original_info=original_info,
-        context=context,
-    )
-
-    # 添加扩展名
-    if output_ext and not filename.lower().endswith(f".{output_ext.lower()}"):
-        filename = f"{filename}.{output_ext}"
-
-    # 组合目录和文件名
-    if dir_part:
-        result = os.path.join(dir_part, filename)
+    if context:
+        rule = CompiledNamingRule(
+            naming_rule, output_ext=output_ext, timestamp_mode="item", context=context
+        )
     else:
-        result = filename
-
-    # 标准化路径
-    result = result.replace("\\", "/")
+        rule = _compile_cached(naming_rule, output_ext, "item")
+    result = rule.generate(index, original_path=original_path)
 
     logger.debug(f"[DataManager] 生成文件名: rule='{naming_rule}', index={index}, result='{result}'")
 
     return result
 
 
-def _parse_original_path(original_path: str) -> Dict[str, Any]:
-    """解析原始文件路径
+def reserve_path(full_path: str, taken: Optional[set] = None) -> str:
+    """以 O_CREAT | O_EXCL 预占文件路径，已存在时在扩展名前追加 _1、_2…
+
+    预占成功时创建空的占位文件，随后的保存直接覆盖；同一路径只有一个调用方能预占成功，
+    并发保存的批次不会互相覆盖
 
     Args:
-        original_path: 原始文件路径
+        full_path: 期望的文件路径
+        taken: 已知已存在的文件名集合（同一目录，可选），用于跳过必然失败的尝试；预占成功的文件名会加入其中
 
     Returns:
-        包含原始文件信息的字典
+        实际预占的文件路径
     """
-    path = Path(original_path)
-
-    return {
-        "name": path.stem,  # 文件名（不含扩展名）
-        "ext": path.suffix,  # 扩展名（包含点号，如 ".png"）
-        "ext_without_dot": path.suffix.lstrip("."),  # 扩展名（不含点号）
-        "parent": path.parent.name if path.parent.name else "",  # 父目录名
-        "parent_path": str(path.parent),  # 父目录完整路径
-    }
-
-
-def _split_path_and_name(naming_rule: str) -> tuple[str, str]:
-    """分离命名规则中的路径和文件名部分
+    directory, filename = os.path.split(full_path)
+    stem, ext = os.path.splitext(filename)
+    candidate, counter = filename, 0
+    while True:
+        if taken is None or candidate not in taken:
+            path = os.path.join(directory, candidate)
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+                if taken is not None:
+                    taken.add(candidate)
+                return path
+            except FileExistsError:
+                if taken is not None:
+                    taken.add(candidate)
+        counter += 1
+        candidate = f"{stem}_{counter}{ext}"
+
+
+def reserve_paths(full_paths: Sequence[str]) -> List[str]:
+    """批量预占文件路径（每个目录只列出一次，见 reserve_path）
 
     Args:
-        naming_rule: 命名规则
+        full_paths: 期望的文件路径列表（目录必须已存在）
 
     Returns:
-        (目录部分, 文件名部分) 元组
+        与输入顺序一致的实际预占路径
     """
-    # 查找最后一个路径分隔符
-    if "/" in naming_rule:
-        sep = "/"
-    elif "\\" in naming_rule:
-        sep = "\\"
-    else:
-        return "", naming_rule
-
-    parts = naming_rule.rsplit(sep, 1)
-
-    if len(parts) == 2:
-        return parts[0], parts[1]
-    return "", naming_rule
+    taken_by_dir: Dict[str, set] = {}
+    result = []
+    for full_path in full_paths:
+        directory = os.path.dirname(full_path)
+        taken = taken_by_dir.get(directory)
+        if taken is None:
+            taken = set(os.listdir(directory or "."))
+            taken_by_dir[directory] = taken
+        result.append(reserve_path(full_path, taken))
+    return result
 
 
-def _apply_name_format(
-    format_template: str,
-    index: int = 0,
-    original_info: Optional[Dict[str, Any]] = None,
-    context: Optional[Dict[str, Any]] = None,
-) -> str:
-    """应用命名格式
+def release_reserved_paths(reserved: Sequence[str], saved_paths: Sequence[Any] = ()) -> int:
+    """删除没有写入内容的占位文件（保存失败，或保存到了其他文件名）
 
     Args:
-        format_template: 格式模板
-        index: 当前索引
-        original_info: 原始文件信息
-        context: 额外上下文
+        reserved: reserve_path / reserve_paths 预占的路径
+        saved_paths: 实际保存的文件路径或路径列表（其中的路径即使为空文件也保留）
 
     Returns:
-        格式化后的字符串
+        删除的占位文件数
     """
-    original_info = original_info or {}
-    context = context or {}
-
-    # 合并上下文
-    vars = {
-        "index": index + 1,  # 索引从 1 开始
-        "original_name": original_info.get("name", ""),
-        "original_ext": original_info.get("ext_without_dot", ""),
-        "original_path": original_info.get("parent", ""),
-        **context,
-    }
-
-    # 添加时间戳
-    now = datetime.now()
-    vars.update({
-        "timestamp": int(now.timestamp()),
-        "datetime": now.strftime("%Y%m%d_%H%M%S"),
-        "date": now.strftime("%Y%m%d"),
-        "time": now.strftime("%H%M%S"),
-    })
-
-    # 添加 UUID
-    import uuid
-    vars["uuid"] = str(uuid.uuid4())[:8]  # 短 UUID
-
-    # 处理 Python 格式字符串（如 {:04d}）
-    try:
-        # 检查是否包含 Python 格式占位符
-        if re.search(r"\{[^}]*:[^}]*\}", format_template):
-            # 提取格式规范
-            match = re.search(r"\{([^}]*):([^}]*)\}", format_template)
-            if match:
-                var_name = match.group(1).strip() or "index"
-                format_spec = match.group(2)
-
-                # 获取变量值
-                value = vars.get(var_name, index)
-
-                # 应用格式
-                formatted_value = f"{value:{format_spec}}"
-
-                # 替换格式字符串
-                format_template = re.sub(
-                    r"\{[^}]*:[^}]*\}",
-                    formatted_value,
-                    format_template,
-                    count=1
-                )
-    except Exception as e:
-        logger.warning(f"[DataManager] 格式化失败: {e}")
-
-    # 替换简单的占位符（如 {index}, {original_name}）
-    try:
-        result = format_template.format(**vars)
-    except KeyError as e:
-        logger.warning(f"[DataManager] 占位符未找到: {e}")
-        result = format_template
-
-    return result
+    kept = set()
+    for saved in saved_paths:
+        for path in saved if isinstance(saved, list) else [saved]:
+            if path:
+                kept.add(os.path.abspath(path))
+    removed = 0
+    for path in reserved:
+        if os.path.abspath(path) in kept:
+            continue
+        try:
+            if os.path.getsize(path) == 0:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            # 已被删除或不可访问
+            pass
+    return removed
 
 
 def validate_naming_rule(naming_rule: str) -> tuple[bool, Optional[str]]:
@@ -252,39 +445,10 @@ def validate_naming_rule(naming_rule: str) -> tuple[bool, Optional[str]]:
         >>> validate_naming_rule("../../../etc/passwd")
         (False, "命名规则包含不安全的路径遍历")
     """
-    if not naming_rule:
-        return False, "命名规则不能为空"
-
-    # 检查不安全的路径遍历
-    if "../" in naming_rule or "..\\" in naming_rule:
-        return False, "命名规则包含不安全的路径遍历"
-
-    # 检查是否包含非法字符（Windows）
-    # 注意：冒号用于 Python 格式字符串（如 {index:04d}），需要特殊处理
-    invalid_chars = ['<', '>', '"', '|']
-    for char in invalid_chars:
-        if char in naming_rule:
-            return False, f"命名规则包含非法字符: '{char}'"
-
-    # 检查冒号是否在非法位置（不在格式字符串的花括号内）
-    # 允许：{index:04d}, {name:format}
-    # 不允许：file:name, C:\path
-    if ':' in naming_rule:
-        # 检查冒号是否在花括号内（格式字符串）
-        import re
-        # 找出所有不在花括号内的冒号
-        # 先移除所有 {xxx:yyy} 格式的内容
-        temp = re.sub(r'\{[^}]*:[^}]*\}', '', naming_rule)
-        if ':' in temp:
-            return False, f"命名规则包含非法字符: ':' (仅在格式字符串 {var:format} 中允许)"
-
-    # 检查占位符语法
     try:
-        # 尝试解析格式字符串
-        _apply_name_format(naming_rule, index=0)
-    except Exception as e:
-        return False, f"命名规则语法错误: {e}"
-
+        compile_naming_rule(naming_rule)
+    except ValueError as e:
+        return False, str(e)
     return True, None
 
 
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""helpers/batch_saver.py - 批量并行保存模块
+
+提供批量保存时的并行编码/写入功能，结果顺序与任务顺序严格一致
+"""
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+# 支持的并发方式
+#   thread:  线程池（PIL 编码时释放 GIL，适合大多数格式）
+#   process: 进程池（适合 PNG optimize 等 zlib 重负载格式）
+EXECUTOR_TYPES = ["thread", "process"]
+
+
+def resolve_worker_count(workers: int, job_count: int) -> int:
+    """计算实际使用的并发数
+
+    Args:
+        workers: 用户配置的并发数（<= 0 表示自动，使用 CPU 核心数）
+        job_count: 任务数量
+
+    Returns:
+        实际并发数（至少为 1，且不超过任务数量）
+    """
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, job_count))
+
+
+def run_batch(
+    func: Callable[..., Any],
+    jobs: Sequence[tuple],
+    workers: int = 0,
+    executor: str = "thread",
+) -> List[Any]:
+    """并行执行批量保存任务
+
+    每个任务以 func(*job) 的形式执行，返回结果的顺序与 jobs 的顺序一致，
+    与任务实际完成的先后无关。
+
+    Args:
+        func: 保存函数（使用 process 方式时必须是模块级函数，以便序列化）
+        jobs: 参数元组列表
+        workers: 并发数（<= 0 表示自动）
+        executor: 并发方式（"thread" 或 "process"）
+
+    Returns:
+        与 jobs 顺序一致的结果列表
+
+    Raises:
+        ValueError: 不支持的并发方式
+        Exception: 任一任务失败时，按任务顺序抛出第一个异常
+
+    Examples:
+        >>> run_batch(pow, [(2, 3), (3, 2)], workers=2)
+        [8, 9]
+    """
+    if executor not in EXECUTOR_TYPES:
+        raise ValueError(f"不支持的并发方式: {executor}。支持的方式: {EXECUTOR_TYPES}")
+
+    if not jobs:
+        return []
+
+    worker_count = resolve_worker_count(workers, len(jobs))
+
+    # 单任务或单并发时直接串行执行，避免线程/进程池开销
+    if worker_count == 1:
+        return [func(*job) for job in jobs]
+
+    logger.info(
+        f"[DataManager] 并行保存: jobs={len(jobs)}, workers={worker_count}, executor={executor}"
+    )
+
+    pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_cls(max_workers=worker_count) as pool:
+        futures = [pool.submit(func, *job) for job in jobs]
+        # 按提交顺序收集结果，保证输出顺序确定
+        return [future.result() for future in futures]
@@ -1,34 +1,360 @@
 # -*- coding: utf-8 -*-
 """helpers/batch_scanner.py - 批量文件扫描模块
 
-提供基于 glob 模式的文件扫描功能，用于批量加载文件
+提供基于 glob 模式的文件扫描功能，用于批量加载文件。
+扫描基于 os.scandir：include/exclude 模式预先编译为逐段匹配器，遍历时只进入可能匹配的子目录，
+文件类型直接使用 DirEntry 缓存的结果，不对每个条目额外调用 stat
 """
 
 import os
-import glob
+import re
+import time
+import heapq
 import logging
+import operator
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
 
+# 多个模式的分隔符（如 "*.png;*.jpg"）
+PATTERN_SEPARATOR = ";"
+
+# 递归通配符段
+_RECURSIVE = "**"
+
+# 元数据过滤条件：字段 → os.stat_result 属性
+FILTER_FIELDS = {"size": "st_size", "mtime": "st_mtime", "ctime": "st_ctime"}
+
+_FILTER_OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+_FILTER_CONDITION = re.compile(r"^(size|mtime|ctime)\s*(>=|<=|>|<)\s*(.+)$", re.IGNORECASE)
+_SIZE_VALUE = re.compile(r"^(\d+(?:\.\d+)?)\s*(b|kb|mb|gb|tb)?$", re.IGNORECASE)
+_DURATION_VALUE = re.compile(r"^(\d+(?:\.\d+)?)\s*(s|m|h|d|w)$", re.IGNORECASE)
+# 默认是否区分大小写：与平台文件名规则一致（Windows 不区分，POSIX 区分），与原 glob 实现的匹配结果相同
+CASE_SENSITIVE_DEFAULT = os.path.normcase("A") == "A"
+
+# Match 模式窗口的排序键（相同时按路径排序，保证多次扫描之间顺序稳定）
+SORT_KEYS = ("name", "mtime", "size")
+
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024**2, "gb": 1024**3, "tb": 1024**4}
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def split_patterns(patterns: Union[str, Sequence[str], None]) -> List[str]:
+    """将模式字符串（以 ; 分隔）或模式列表拆分为模式列表，去除空项
+
+    Examples:
+        >>> split_patterns("*.png; *.jpg")
+        ['*.png', '*.jpg']
+    """
+    if patterns is None:
+        return []
+    items = patterns.split(PATTERN_SEPARATOR) if isinstance(patterns, str) else list(patterns)
+    return [item.strip() for item in items if item and item.strip()]
+
+
+def _split_segments(pattern: str) -> List[str]:
+    """将模式拆分为路径段（统一分隔符，去除空段和 "."，合并连续的 **）"""
+    segments = []
+    for segment in pattern.replace("\\", "/").split("/"):
+        if segment in ("", "."):
+            continue
+        if segment == _RECURSIVE and segments and segments[-1] == _RECURSIVE:
+            continue
+        segments.append(segment)
+    return segments
+
+
+def _translate_segment(segment: str) -> str:
+    """将单个路径段的通配符转换为正则（* 和 ? 不跨越路径分隔符，规则与 fnmatch 一致）"""
+    parts = []
+    i, n = 0, len(segment)
+    while i < n:
+        char = segment[i]
+        i += 1
+        if char == "*":
+            while i < n and segment[i] == "*":
+                i += 1
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            j = i
+            if j < n and segment[j] == "!":
+                j += 1
+            if j < n and segment[j] == "]":
+                j += 1
+            while j < n and segment[j] != "]":
+                j += 1
+            if j >= n:
+                # 未闭合的 [ 按字面匹配
+                parts.append("\\[")
+            else:
+                stuff = segment[i:j].replace("\\", "\\\\")
+                i = j + 1
+                if stuff.startswith("!"):
+                    stuff = "^" + stuff[1:]
+                elif stuff.startswith("^"):
+                    stuff = "\\" + stuff
+                parts.append(f"[{stuff}]")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+class PathMatcher:
+    """编译后的 include/exclude 路径匹配器
+
+    - include 模式按路径段逐段匹配，"**" 匹配零个或多个目录；通配符段不匹配以 "." 开头的隐藏文件/目录
+      （与 glob 一致，模式段本身以 "." 开头时除外）
+    - exclude 模式匹配相对路径，命中的文件被排除，命中的目录（如 "**/cache"、"tmp/**"）不再进入
+    """
+
+    def __init__(
+        self,
+        include: Union[str, Sequence[str]],
+        exclude: Union[str, Sequence[str], None] = None,
+        case_sensitive: bool = CASE_SENSITIVE_DEFAULT,
+    ):
+        flags = 0 if case_sensitive else re.IGNORECASE
+        self.include_patterns = split_patterns(include)
+        self.exclude_patterns = split_patterns(exclude)
+
+        # include：[(段, ...)]，段为 _RECURSIVE 或 (正则, 是否允许匹配隐藏名称)
+        self._includes = []
+        for pattern in self.include_patterns:
+            segments = _split_segments(pattern)
+            if not segments:
+                continue
+            if segments[-1] == _RECURSIVE:
+                # "**" 结尾时匹配任意深度的所有文件
+                segments.append("*")
+            self._includes.append(
+                tuple(
+                    _RECURSIVE
+                    if segment == _RECURSIVE
+                    else (re.compile(_translate_segment(segment), flags), segment.startswith("."))
+                    for segment in segments
+                )
+            )
+
+        # exclude：完整相对路径的正则
+        self._excludes = []
+        for pattern in self.exclude_patterns:
+            segments = _split_segments(pattern)
+            if not segments:
+                continue
+            regex = ""
+            for k, segment in enumerate(segments):
+                last = k == len(segments) - 1
+                if segment == _RECURSIVE:
+                    regex += ".*" if last else "(?:[^/]+/)*"
+                else:
+                    regex += _translate_segment(segment) + ("" if last else "/")
+            self._excludes.append(re.compile(regex, flags))
+
+    def _closure(self, states) -> frozenset:
+        """展开 "**" 匹配零个目录的情况"""
+        closed = set(states)
+        for p, i in states:
+            if self._includes[p][i] == _RECURSIVE:
+                closed.add((p, i + 1))
+        return frozenset(closed)
+
+    def initial_states(self) -> frozenset:
+        return self._closure([(p, 0) for p in range(len(self._includes))])
+
+    def is_excluded(self, rel_path: str, is_dir: bool = False) -> bool:
+        """相对路径（/ 分隔）是否被 exclude 模式排除"""
+        for regex in self._excludes:
+            if regex.fullmatch(rel_path) or (is_dir and regex.fullmatch(rel_path + "/")):
+                return True
+        return False
+
+    def step(self, states: frozenset, name: str) -> Tuple[bool, frozenset]:
+        """用一个目录条目名推进匹配状态
+
+        Returns:
+            (作为文件是否匹配, 作为目录进入后的状态集合)
+        """
+        hidden = name.startswith(".")
+        file_match = False
+        child_states = set()
+        for p, i in states:
+            segments = self._includes[p]
+            segment = segments[i]
+            if segment == _RECURSIVE:
+                if not hidden:
+                    child_states.add((p, i))
+                continue
+            regex, hidden_ok = segment
+            if (hidden and not hidden_ok) or regex.fullmatch(name) is None:
+                continue
+            if i == len(segments) - 1:
+                file_match = True
+            else:
+                child_states.add((p, i + 1))
+        return file_match, self._closure(child_states) if child_states else frozenset()
+
+
+class FileFilter:
+    """文件元数据过滤条件（大小、修改时间、ctime），所有条件同时满足时匹配
+
+    ctime 在 Windows 上为创建时间，在 Linux/macOS 上为元数据变更时间
+    """
+
+    def __init__(self, conditions: Optional[Sequence[Tuple[str, str, float]]] = None):
+        """
+        Args:
+            conditions: [(字段, 运算符, 值)]，字段为 size/mtime/ctime，运算符为 > >= < <=，
+                size 的值为字节数，mtime/ctime 的值为 Unix 时间戳（秒）
+        """
+        self.conditions = []
+        for field, op, value in conditions or ():
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"未知的过滤字段: {field}")
+            if op not in _FILTER_OPERATORS:
+                raise ValueError(f"未知的比较运算符: {op}")
+            self.conditions.append((field, op, value))
+
+    def __bool__(self) -> bool:
+        return bool(self.conditions)
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """文件的 stat 结果是否满足所有条件"""
+        for field, op, value in self.conditions:
+            if not _FILTER_OPERATORS[op](getattr(stat, FILTER_FIELDS[field]), value):
+                return False
+        return True
+
+
+def _parse_filter_value(field: str, text: str, now: float) -> float:
+    """解析过滤条件的值：size 为带单位的大小，mtime/ctime 为 ISO 日期时间或距今时长（如 7d）"""
+    if field == "size":
+        match = _SIZE_VALUE.match(text)
+        if not match:
+            raise ValueError(f"无效的大小: {text}")
+        return float(match.group(1)) * _SIZE_UNITS[(match.group(2) or "b").lower()]
+
+    match = _DURATION_VALUE.match(text)
+    if match:
+        return now - float(match.group(1)) * _DURATION_UNITS[match.group(2).lower()]
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise ValueError(f"无效的时间: {text}（应为 ISO 日期时间或时长，如 2024-01-01、12h、7d）")
+
+
+def parse_file_filter(text: Optional[str], now: Optional[float] = None) -> FileFilter:
+    """解析元数据过滤表达式
+
+    条件以 ; 分隔，全部满足时匹配。时长表示距当前时间，"mtime>7d" 即最近 7 天内修改过
+
+    Args:
+        text: 过滤表达式（空表示不过滤）
+        now: 计算时长使用的当前时间戳（默认 time.time()）
+
+    Returns:
+        FileFilter
+
+    Raises:
+        ValueError: 表达式无效
+
+    Examples:
+        >>> parse_file_filter("size>=10KB; mtime>2024-06-01")
+        >>> parse_file_filter("size<2GB; ctime<1h")
+    """
+    now = time.time() if now is None else now
+    conditions = []
+    for item in split_patterns(text):
+        match = _FILTER_CONDITION.match(item)
+        if not match:
+            raise ValueError(f"无效的过滤条件: {item}（应为 字段 运算符 值，如 size>10KB）")
+        field = match.group(1).lower()
+        value = _parse_filter_value(field, match.group(3).strip(), now)
+        conditions.append((field, match.group(2), value))
+    return FileFilter(conditions)
+
+
+def iter_matching_files(
+    base_dir: str,
+    matcher: PathMatcher,
+    list_files: Optional[Callable[[str, str], bool]] = None,
+) -> Iterator[Tuple[str, os.DirEntry]]:
+    """遍历 base_dir 下匹配的文件（不排序）
+
+    只进入可能匹配的子目录；无法读取的目录被跳过
+
+    Args:
+        base_dir: 基础目录
+        matcher: 编译后的匹配器
+        list_files: 可选回调 (相对目录（/ 分隔，根目录为 ""）, 目录路径) -> bool，
+            返回 False 时跳过该目录中的文件（仍进入其子目录），用于增量扫描跳过未变化的目录
+
+    Yields:
+        (相对路径（/ 分隔）, DirEntry)
+    """
+    stack = [(base_dir, "", matcher.initial_states())]
+    while stack:
+        dir_path, prefix, states = stack.pop()
+        try:
+            iterator = os.scandir(dir_path)
+        except OSError as e:
+            logger.debug(f"[DataManager] 跳过无法读取的目录: {dir_path}, {e}")
+            continue
+        with_files = list_files is None or list_files(prefix[:-1], dir_path)
+        with iterator:
+            for entry in iterator:
+                if not with_files:
+                    # 只需要子目录：先用 DirEntry 缓存的类型跳过文件，不做模式匹配
+                    try:
+                        if not entry.is_dir():
+                            continue
+                    except OSError:
+                        continue
+                file_match, child_states = matcher.step(states, entry.name)
+                file_match = file_match and with_files
+                if not file_match and not child_states:
+                    continue
+                rel_path = prefix + entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    if child_states and not matcher.is_excluded(rel_path, is_dir=True):
+                        stack.append((entry.path, rel_path + "/", child_states))
+                elif file_match and not matcher.is_excluded(rel_path):
+                    try:
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    yield rel_path, entry
+
+
 def scan_files(
     base_dir: str,
-    pattern: str,
+    pattern: Union[str, Sequence[str]],
     recursive: bool = False,
-    case_sensitive: bool = False,
+    case_sensitive: bool = CASE_SENSITIVE_DEFAULT,
+    exclude: Union[str, Sequence[str], None] = None,
+    file_filter: Optional[FileFilter] = None,
 ) -> List[str]:
     """使用 glob 模式扫描文件
 
     Args:
         base_dir: 基础目录路径
-        pattern: glob 模式（如 "*.png", "**/*.jpg", "input/*.png"）
-        recursive: 是否递归扫描子目录
-        case_sensitive: 是否区分大小写（Windows 默认不区分）
+        pattern: glob 模式（如 "*.png", "**/*.jpg", "input/*.png"），多个模式以 ; 分隔或传入列表
+        recursive: 保留参数（是否递归由模式中的 "**" 决定）
+        case_sensitive: 是否区分大小写（默认与平台一致：Windows 不区分，其他平台区分）
+        exclude: 排除模式（匹配相对路径，如 "**/thumbs/**"），多个模式以 ; 分隔或传入列表
+        file_filter: 元数据过滤条件（见 parse_file_filter），只对匹配模式的文件调用 stat
 
     Returns:
-        匹配的文件路径列表（相对于 base_dir 的路径）
+        匹配的文件路径列表（相对于 base_dir 的路径，按小写路径排序）
 
     Raises:
         FileNotFoundError: 如果 base_dir 不存在
@@ -41,8 +367,8 @@ def scan_files(
         >>> scan_files("/path/to/dir", "**/*.jpg", recursive=True)
         ['photo1.jpg', 'subdir/photo2.jpg']
 
-        >>> scan_files("/path/to/dir", "input/*.png")
-        ['input/image1.png']
+        >>> scan_files("/path/to/dir", "*.png;*.jpg", exclude="*_mask.png")
+        ['image1.png', 'photo1.jpg']
     """
     # 验证基础目录
     if not os.path.exists(base_dir):
@@ -54,37 +380,23 @@ def scan_files(
     # 标准化路径
     base_dir = os.path.normpath(base_dir)
 
-    # 构建完整的 glob 模式
-    full_pattern = os.path.join(base_dir, pattern)
-
-    # 确定是否使用递归 glob
-    use_recursive = recursive or "**" in pattern
-
-    # 执行 glob 扫描
     try:
-        if use_recursive:
-            # 递归扫描：** 可以匹配任意层级子目录
-            matches = glob.glob(full_pattern, recursive=True)
-        else:
-            # 非递归扫描：只匹配当前目录
-            matches = glob.glob(full_pattern, recursive=False)
-
-    except Exception as e:
-        logger.error(f"[DataManager] glob 扫描失败: {e}")
+        matcher = PathMatcher(pattern, exclude, case_sensitive=case_sensitive)
+    except re.error as e:
         raise ValueError(f"无效的 glob 模式 '{pattern}': {e}")
 
-    # 过滤出文件（排除目录）
     file_paths = []
-    for match in matches:
-        if os.path.isfile(match):
-            # 返回相对于 base_dir 的路径
+    for rel_path, entry in iter_matching_files(base_dir, matcher):
+        if file_filter:
             try:
-                rel_path = os.path.relpath(match, base_dir)
-                file_paths.append(rel_path)
-            except ValueError:
-                # 在 Windows 上，不同驱动器之间无法计算相对路径
-                # 直接返回绝对路径
-                file_paths.append(match)
+                if not file_filter.matches(entry.stat()):
+                    continue
+            except OSError:
+                # 扫描后被删除
+                continue
+        file_paths.append(rel_path)
+    if os.sep != "/":
+        file_paths = [p.replace("/", os.sep) for p in file_paths]
 
     # 按文件名排序（确保顺序一致）
     file_paths.sort(key=lambda x: x.lower())
@@ -94,10 +406,106 @@ def scan_files(
     return file_paths
 
 
+def _sort_key(order_by: str, rel_path: str, stat: Optional[os.stat_result]) -> tuple:
+    name_key = (rel_path.lower(), rel_path)
+    if order_by == "mtime":
+        return (stat.st_mtime_ns,) + name_key
+    if order_by == "size":
+        return (stat.st_size,) + name_key
+    return name_key
+
+
+def scan_window(
+    base_dir: str,
+    pattern: Union[str, Sequence[str]],
+    offset: int = 0,
+    limit: int = 0,
+    order_by: str = "name",
+    exclude: Union[str, Sequence[str], None] = None,
+    file_filter: Optional[FileFilter] = None,
+    case_sensitive: bool = CASE_SENSITIVE_DEFAULT,
+) -> Tuple[List[str], int]:
+    """按稳定顺序扫描文件并只返回 [offset, offset + limit) 窗口
+
+    limit > 0 时只保留排序后的前 offset + limit 项（堆选择），不对全部匹配文件排序
+
+    Args:
+        base_dir: 基础目录路径
+        pattern: glob 模式，多个模式以 ; 分隔或传入列表
+        offset: 窗口起始位置
+        limit: 窗口大小（0 表示到末尾）
+        order_by: 排序键（"name" 按路径，"mtime" 按修改时间，"size" 按大小；相同时按路径）
+        exclude: 排除模式
+        file_filter: 元数据过滤条件
+        case_sensitive: 是否区分大小写
+
+    Returns:
+        (窗口内的相对路径列表, 下一个窗口的 offset；已到末尾时为 -1)
+
+    Raises:
+        FileNotFoundError: 如果 base_dir 不存在
+        ValueError: 如果 pattern 或 order_by 无效
+    """
+    if order_by not in SORT_KEYS:
+        raise ValueError(f"无效的排序键: {order_by}，可选: {', '.join(SORT_KEYS)}")
+    if not os.path.exists(base_dir):
+        raise FileNotFoundError(f"基础目录不存在: {base_dir}")
+    if not os.path.isdir(base_dir):
+        raise ValueError(f"路径不是目录: {base_dir}")
+
+    base_dir = os.path.normpath(base_dir)
+    offset = max(0, offset)
+    try:
+        matcher = PathMatcher(pattern, exclude, case_sensitive=case_sensitive)
+    except re.error as e:
+        raise ValueError(f"无效的 glob 模式 '{pattern}': {e}")
+
+    need_stat = order_by != "name" or bool(file_filter)
+
+    def keyed():
+        for rel_path, entry in iter_matching_files(base_dir, matcher):
+            stat = None
+            if need_stat:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if file_filter and not file_filter.matches(stat):
+                    continue
+            yield _sort_key(order_by, rel_path, stat), rel_path
+
+    total = 0
+
+    def counted(items):
+        nonlocal total
+        for item in items:
+            total += 1
+            yield item
+
+    if limit > 0:
+        ordered = heapq.nsmallest(offset + limit, counted(keyed()))
+    else:
+        ordered = sorted(counted(keyed()))
+    window = [rel_path for _, rel_path in ordered[offset:]]
+    if os.sep != "/":
+        window = [p.replace("/", os.sep) for p in window]
+
+    end = offset + len(window)
+    next_offset = end if limit > 0 and end < total else -1
+
+    logger.info(
+        f"[DataManager] 窗口扫描完成: base_dir={base_dir}, pattern={pattern}, order_by={order_by}, "
+        f"offset={offset}, returned={len(window)}, total={total}"
+    )
+    return window, next_offset
+
+
 def scan_files_absolute(
     base_dir: str,
-    pattern: str,
+    pattern: Union[str, Sequence[str]],
     recursive: bool = False,
+    exclude: Union[str, Sequence[str], None] = None,
+    file_filter: Optional[FileFilter] = None,
 ) -> List[str]:
     """扫描文件并返回绝对路径
 
@@ -107,12 +515,14 @@ def scan_files_absolute(
         base_dir: 基础目录路径
         pattern: glob 模式
         recursive: 是否递归扫描
+        exclude: 排除模式
+        file_filter: 元数据过滤条件
 
     Returns:
         匹配的文件绝对路径列表
     """
     # 获取相对路径列表
-    rel_paths = scan_files(base_dir, pattern, recursive)
+    rel_paths = scan_files(base_dir, pattern, recursive, exclude=exclude, file_filter=file_filter)
 
     # 转换为绝对路径
     abs_paths = [os.path.normpath(os.path.join(base_dir, p)) for p in rel_paths]
@@ -169,7 +579,7 @@ def validate_glob_pattern(pattern: str) -> Tuple[bool, Optional[str]]:
     """验证 glob 模式是否有效
 
     Args:
-        pattern: glob 模式
+        pattern: glob 模式（多个模式以 ; 分隔时逐个验证）
 
     Returns:
         (是否有效, 错误消息) 元组
@@ -187,6 +597,17 @@ def validate_glob_pattern(pattern: str) -> Tuple[bool, Optional[str]]:
     if not pattern:
         return False, "模式不能为空"
 
+    # 多个模式（以 ; 分隔）逐个验证
+    patterns = split_patterns(pattern)
+    if not patterns:
+        return False, "模式不能为空"
+    if len(patterns) > 1:
+        for item in patterns:
+            is_valid, error_msg = validate_glob_pattern(item)
+            if not is_valid:
+                return False, f"{item}: {error_msg}"
+        return True, None
+
     # 检查不安全的路径遍历
     if "../" in pattern or "..\\" in pattern:
         return False, "模式包含不安全的路径遍历"
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""helpers/conditioning_io.py - Conditioning 文件读写模块
+
+.cond 文件是 safetensors 容器：
+- 张量（embedding、pooled_output、mask 等）以原始数据无损保存
+- 列表/字典结构（area、strength 等字段）以 JSON 写入头部元数据，张量以名称引用
+- 读取时张量由内存映射直接支撑，保存的 conditioning 可直接替代文本编码步骤
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .latent_io import read_safetensors, write_safetensors
+
+logger = logging.getLogger(__name__)
+
+
+# 头部元数据中保存结构 JSON 的键名
+CONDITIONING_METADATA_KEY = "data_manager_conditioning"
+
+# 结构格式版本
+CONDITIONING_FORMAT_VERSION = 1
+
+# 结构 JSON 中的特殊标记
+_TENSOR_TAG = "__tensor__"
+_TUPLE_TAG = "__tuple__"
+_DICT_TAG = "__dict__"
+
+_SKIP = object()
+
+
+def is_conditioning(value: Any) -> bool:
+    """判断是否为 ComfyUI CONDITIONING（[[tensor, dict], ...] 列表）"""
+    return (
+        isinstance(value, list)
+        and len(value) > 0
+        and all(
+            isinstance(item, (list, tuple))
+            and len(item) == 2
+            and hasattr(item[0], "shape")
+            and isinstance(item[1], dict)
+            for item in value
+        )
+    )
+
+
+class _Encoder:
+    """将嵌套结构编码为可 JSON 序列化的描述，张量收集到 tensors 中（同一张量只保存一次）"""
+
+    def __init__(self):
+        self.tensors: Dict[str, Any] = {}
+        self.skipped: List[str] = []
+        self._names: Dict[int, str] = {}
+
+    def encode(self, value: Any, path: str) -> Any:
+        if (
+            hasattr(value, "shape")
+            and hasattr(value, "dtype")
+            and not isinstance(value, (str, bytes))
+        ):
+            name = self._names.get(id(value))
+            if name is None:
+                name = f"t{len(self.tensors)}"
+                self._names[id(value)] = name
+                self.tensors[name] = value
+            return {_TENSOR_TAG: name}
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, tuple):
+            items = [self.encode(v, f"{path}[{i}]") for i, v in enumerate(value)]
+            return {_TUPLE_TAG: [None if v is _SKIP else v for v in items]}
+        if isinstance(value, list):
+            items = [self.encode(v, f"{path}[{i}]") for i, v in enumerate(value)]
+            return [None if v is _SKIP else v for v in items]
+        if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+            encoded = {}
+            for key, item in value.items():
+                item = self.encode(item, f"{path}.{key}")
+                if item is not _SKIP:
+                    encoded[key] = item
+            # 键名与标记冲突的字典需要包装
+            if any(k in (_TENSOR_TAG, _TUPLE_TAG, _DICT_TAG) for k in encoded):
+                return {_DICT_TAG: encoded}
+            return encoded
+
+        # 模型对象、回调等无法离线保存的字段
+        self.skipped.append(path)
+        return _SKIP
+
+
+def _decode(value: Any, tensors: Dict[str, Any]) -> Any:
+    if isinstance(value, list):
+        return [_decode(v, tensors) for v in value]
+    if isinstance(value, dict):
+        if _TENSOR_TAG in value:
+            return tensors[value[_TENSOR_TAG]]
+        if _TUPLE_TAG in value:
+            return tuple(_decode(v, tensors) for v in value[_TUPLE_TAG])
+        if _DICT_TAG in value:
+            value = value[_DICT_TAG]
+        return {k: _decode(v, tensors) for k, v in value.items()}
+    return value
+
+
+def save_conditioning_file(conditioning: List[Any], file_path: str) -> str:
+    """将 ComfyUI CONDITIONING 无损保存为 .cond 文件
+
+    无法序列化的字段（如 ControlNet 对象、hooks）会被跳过并记录警告
+
+    Args:
+        conditioning: [[tensor, dict], ...]
+        file_path: 目标文件路径
+
+    Returns:
+        保存后的文件路径
+
+    Raises:
+        ValueError: 不是 CONDITIONING 数据
+    """
+    if not is_conditioning(conditioning):
+        raise ValueError("不是有效的 Conditioning 数据，期望 [[tensor, dict], ...] 格式")
+
+    encoder = _Encoder()
+    structure = {
+        "version": CONDITIONING_FORMAT_VERSION,
+        "conditioning": [
+            [encoder.encode(cond, f"[{i}][0]"), encoder.encode(extra, f"[{i}][1]")]
+            for i, (cond, extra) in enumerate(conditioning)
+        ],
+    }
+    if encoder.skipped:
+        logger.warning(f"[DataManager] Conditioning 中以下字段无法保存，已跳过: {encoder.skipped}")
+
+    os.makedirs(Path(file_path).parent, exist_ok=True)
+    write_safetensors(
+        encoder.tensors,
+        file_path,
+        {"format": "pt", CONDITIONING_METADATA_KEY: json.dumps(structure)},
+    )
+    return file_path
+
+
+def load_conditioning_file(file_path: str, mmap: bool = True) -> List[Any]:
+    """加载 .cond 文件为 ComfyUI CONDITIONING
+
+    Args:
+        file_path: 文件路径
+        mmap: 是否使用内存映射
+
+    Returns:
+        [[tensor, dict], ...]
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件中没有 Conditioning 结构或版本不受支持
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Conditioning 文件不存在: {file_path}")
+
+    tensors, metadata = read_safetensors(file_path, mmap=mmap)
+    raw = metadata.get(CONDITIONING_METADATA_KEY)
+    if raw is None:
+        raise ValueError(f"文件中没有 Conditioning 数据: {file_path}")
+
+    structure = json.loads(raw)
+    version: Optional[int] = structure.get("version")
+    if version != CONDITIONING_FORMAT_VERSION:
+        raise ValueError(f"不支持的 Conditioning 格式版本: {version}")
+
+    return [
+        [_decode(cond, tensors), _decode(extra, tensors)]
+        for cond, extra in structure["conditioning"]
+    ]
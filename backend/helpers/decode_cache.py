@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""helpers/decode_cache.py - 解码结果 LRU 缓存模块
+
+在进程内缓存图像解码后的张量，同一文件被反复加载时（如多次排队的提示词使用相同的参考图）
+直接返回已解码的结果：
+- 以 (绝对路径, st_mtime_ns, st_size) 判断缓存是否有效，文件修改后自动失效
+- 按字节预算进行 LRU 淘汰
+- 统计命中、未命中、淘汰和失效次数，用于调整预算
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# 默认字节预算（512 MB）
+DEFAULT_DECODE_CACHE_BYTES = 512 * 1024**2
+
+# 缓存条目 {(绝对路径, 变体): ((st_mtime_ns, st_size), 值, 字节数)}，按访问顺序排列（最近访问的在末尾）
+_entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], Any, int]]" = OrderedDict()
+_lock = threading.Lock()
+_max_bytes = DEFAULT_DECODE_CACHE_BYTES
+_total_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+def value_nbytes(value: Any) -> int:
+    """估算值占用的字节数（张量按元素大小计算，元组/列表累加，其他对象计为 0）"""
+    if value is None:
+        return 0
+    if hasattr(value, "element_size") and hasattr(value, "nelement"):  # torch.Tensor
+        return int(value.element_size() * value.nelement())
+    if hasattr(value, "nbytes"):  # np.ndarray
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(value_nbytes(item) for item in value)
+    return 0
+
+
+def _evict_to(max_bytes: int) -> int:
+    """按 LRU 淘汰条目直到总大小不超过 max_bytes（调用方需持有 _lock）"""
+    global _total_bytes
+
+    evicted = 0
+    while _entries and _total_bytes > max_bytes:
+        _, (_, _, nbytes) = _entries.popitem(last=False)
+        _total_bytes -= nbytes
+        evicted += 1
+    _stats["evictions"] += evicted
+    return evicted
+
+
+def load_cached(file_path: str, loader: Callable[[str], Any], variant: str = "") -> Any:
+    """通过缓存加载文件
+
+    缓存返回的是同一个对象，调用方（及下游节点）不应原地修改
+
+    Args:
+        file_path: 文件路径
+        loader: 未命中时调用的加载函数 loader(file_path)
+        variant: 加载方式标识（同一文件以不同方式加载时分别缓存，如 "float32" / "uint8"）
+
+    Returns:
+        加载结果
+
+    Raises:
+        FileNotFoundError: 文件不存在
+    """
+    global _total_bytes
+
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = (path, variant)
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            if entry[0] == signature:
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+                return entry[1]
+            # 文件已修改，旧结果失效
+            del _entries[key]
+            _total_bytes -= entry[2]
+            _stats["invalidations"] += 1
+        _stats["misses"] += 1
+
+    value = loader(file_path)
+    nbytes = value_nbytes(value)
+
+    with _lock:
+        # 超过整个预算的结果不缓存，避免清空其他条目
+        if 0 < nbytes <= _max_bytes:
+            previous = _entries.pop(key, None)
+            if previous is not None:
+                _total_bytes -= previous[2]
+            _entries[key] = (signature, value, nbytes)
+            _total_bytes += nbytes
+            _evict_to(_max_bytes)
+
+    return value
+
+
+def set_decode_cache_budget(max_bytes: int) -> None:
+    """设置缓存字节预算（超出时立即淘汰，0 表示禁用缓存）
+
+    Args:
+        max_bytes: 字节预算
+    """
+    global _max_bytes
+
+    with _lock:
+        _max_bytes = max(0, int(max_bytes))
+        evicted = _evict_to(_max_bytes)
+    if evicted:
+        logger.info(f"[DataManager] 解码缓存预算调整为 {_max_bytes} 字节，淘汰 {evicted} 个条目")
+
+
+def clear_decode_cache(reset_stats: bool = False) -> int:
+    """清空缓存
+
+    Args:
+        reset_stats: 是否同时清零统计计数
+
+    Returns:
+        清除的条目数
+    """
+    global _total_bytes
+
+    with _lock:
+        count = len(_entries)
+        _entries.clear()
+        _total_bytes = 0
+        if reset_stats:
+            for key in _stats:
+                _stats[key] = 0
+    return count
+
+
+def get_decode_cache_stats() -> Dict[str, Any]:
+    """获取缓存统计
+
+    Returns:
+        {"hits", "misses", "evictions", "invalidations", "hit_rate",
+         "entries", "bytes", "max_bytes"}
+    """
+    with _lock:
+        stats: Dict[str, Any] = dict(_stats)
+        stats["entries"] = len(_entries)
+        stats["bytes"] = _total_bytes
+        stats["max_bytes"] = _max_bytes
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
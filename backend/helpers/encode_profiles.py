@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""helpers/encode_profiles.py - 图像编码配置模块
+
+提供命名的编码速度/体积配置（fastest / balanced / smallest），
+每个配置映射为各图像格式的 PIL 保存参数
+"""
+
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+# 默认编码配置
+# 参数取自 tests/tools/benchmark_encode_profiles.py 的测试结果：
+# balanced 的体积与 smallest 相差在 5% 左右，编码吞吐量约为其 1.5~6 倍
+# （PNG compress_level 4 与 6 体积基本一致；WebP method 2 比 4 更快且更小；
+#  TIFF LZW 无预测器时对照片类数据反而膨胀，改用 packbits）
+DEFAULT_ENCODE_PROFILE = "balanced"
+
+# 编码配置：配置名 -> PIL 格式名 -> 保存参数
+IMAGE_ENCODE_PROFILES: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "fastest": {
+        "PNG": {"compress_level": 1},
+        "JPEG": {"quality": 95, "subsampling": "4:2:0", "optimize": False},
+        "WEBP": {"quality": 95, "method": 0},
+        "TIFF": {"compression": "raw"},
+    },
+    "balanced": {
+        "PNG": {"compress_level": 4},
+        "JPEG": {"quality": 95, "subsampling": "4:2:0", "optimize": True},
+        "WEBP": {"quality": 95, "method": 2},
+        "TIFF": {"compression": "packbits"},
+    },
+    "smallest": {
+        "PNG": {"optimize": True},
+        "JPEG": {"quality": 95, "subsampling": "4:2:0", "optimize": True, "progressive": True},
+        "WEBP": {"quality": 95, "method": 6},
+        "TIFF": {"compression": "tiff_adobe_deflate"},
+    },
+}
+
+ENCODE_PROFILE_NAMES = list(IMAGE_ENCODE_PROFILES.keys())
+
+
+def get_image_save_kwargs(pil_format: str, profile: str = DEFAULT_ENCODE_PROFILE) -> Dict[str, Any]:
+    """获取指定配置下某个图像格式的 PIL 保存参数
+
+    Args:
+        pil_format: PIL 格式名（如 "PNG", "JPEG", "WEBP", "TIFF"）
+        profile: 编码配置名（fastest / balanced / smallest）
+
+    Returns:
+        PIL Image.save 的关键字参数（BMP、GIF 等无参数格式返回空字典）
+
+    Raises:
+        ValueError: 不支持的编码配置
+
+    Examples:
+        >>> get_image_save_kwargs("PNG", "fastest")
+        {'compress_level': 1}
+
+        >>> get_image_save_kwargs("BMP", "smallest")
+        {}
+    """
+    if profile not in IMAGE_ENCODE_PROFILES:
+        raise ValueError(f"不支持的编码配置: {profile}。支持的配置: {ENCODE_PROFILE_NAMES}")
+
+    # 返回副本，避免调用方修改全局配置
+    return dict(IMAGE_ENCODE_PROFILES[profile].get(pil_format.upper(), {}))
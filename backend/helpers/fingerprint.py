@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""helpers/fingerprint.py - 输入变化指纹模块
+
+为加载节点计算廉价的变化指纹，交给 ComfyUI 的节点缓存机制（V3 fingerprint_inputs / V1 IS_CHANGED）：
+指纹不变时 ComfyUI 直接复用上次的输出，不重新执行节点；文件被修改、新增或删除时指纹改变，节点重新执行。
+- 单个文件：(绝对路径, st_mtime_ns, st_size)，只需一次 stat，不读取文件内容
+- Match 模式：目录扫描结果（相对路径及每个文件的 mtime/大小）的 SHA-256
+"""
+
+import os
+import re
+import hashlib
+import logging
+from typing import Optional
+
+from .batch_scanner import PathMatcher, iter_matching_files, parse_file_filter
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(file_path: str) -> str:
+    """计算单个文件的指纹
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        "绝对路径:st_mtime_ns:st_size"；文件不存在时为 "missing:绝对路径"
+    """
+    path = os.path.abspath(file_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return f"missing:{path}"
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def listing_fingerprint(
+    base_dir: str, pattern: str, exclude: Optional[str] = None, file_filter: Optional[str] = None
+) -> str:
+    """计算目录扫描结果的指纹
+
+    文件列表按路径排序，与扫描顺序无关；任一匹配文件被修改、新增或删除时指纹改变
+
+    Args:
+        base_dir: 扫描目录
+        pattern: glob 通配符模式（与 Match 模式一致，包含 "**" 时递归扫描）
+        exclude: 排除模式
+        file_filter: 元数据过滤表达式（见 parse_file_filter，按当前时间计算时长，文件超出时间范围时指纹改变）
+
+    Returns:
+        十六进制 SHA-256；目录不存在或模式无效时返回 "missing:..." / "invalid:..." 形式的固定字符串
+    """
+    base = os.path.abspath(base_dir)
+    if not os.path.isdir(base):
+        return f"missing:{base}"
+
+    try:
+        matcher = PathMatcher(pattern, exclude)
+        metadata_filter = parse_file_filter(file_filter)
+    except (re.error, ValueError) as e:
+        logger.warning(f"[DataManager] 计算目录指纹失败: {e}")
+        return f"invalid:{base}:{pattern}"
+
+    hasher = hashlib.sha256()
+    hasher.update(f"{base}\0{pattern}\0{exclude or ''}\0{file_filter or ''}\0".encode("utf-8"))
+    for rel_path, entry in sorted(iter_matching_files(base, matcher), key=lambda item: item[0]):
+        try:
+            stat = entry.stat()
+            if metadata_filter and not metadata_filter.matches(stat):
+                continue
+            signature = f"{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            # 扫描后被删除
+            signature = "missing"
+        hasher.update(f"{rel_path}\0{signature}\n".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def path_fingerprint(
+    path: str,
+    pattern: str = "*.*",
+    exclude: Optional[str] = None,
+    file_filter: Optional[str] = None,
+) -> str:
+    """计算路径的指纹：目录按扫描结果计算，其他按单个文件计算
+
+    Args:
+        path: 文件或目录路径
+        pattern: 目录扫描使用的 glob 通配符模式
+        exclude: 目录扫描使用的排除模式
+        file_filter: 目录扫描使用的元数据过滤表达式
+
+    Returns:
+        指纹字符串
+    """
+    if os.path.isdir(path):
+        return listing_fingerprint(path, pattern, exclude, file_filter)
+    return file_fingerprint(path)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""helpers/image_decode.py - 缩小分辨率与区域解码模块
+
+加载后立即缩小或裁剪的图像不需要完整解码原图：
+- JPEG：通过 Image.draft() 让解码器直接以 1/2、1/4、1/8 的 DCT 缩放解码
+- 其他格式：解码后用 resize(box=..., reducing_gap=...) 一步完成裁剪和缩小，
+  先以整数倍 reduce() 快速缩小再精确缩放，避免对整幅原图做高质量重采样
+缩小后的图像再转换为 float32，张量内存按输出尺寸计算而不是原图尺寸
+"""
+
+import math
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# EXIF 方向标签中需要交换宽高的取值（旋转 90/270 度）
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+# resize 的 reducing_gap：先 reduce() 到目标尺寸的 2 倍以内，再精确重采样
+_REDUCING_GAP = 2.0
+
+
+def parse_crop_box(text: str) -> Optional[Tuple[int, int, int, int]]:
+    """解析裁剪区域字符串
+
+    Args:
+        text: "left,top,right,bottom"（像素坐标，按 EXIF 旋转后的方向），空字符串表示不裁剪
+
+    Returns:
+        (left, top, right, bottom) 或 None
+
+    Raises:
+        ValueError: 格式错误或区域为空
+
+    Examples:
+        >>> parse_crop_box("0, 0, 512, 256")
+        (0, 0, 512, 256)
+    """
+    if text is None or not str(text).strip():
+        return None
+    parts = [p.strip() for p in str(text).split(",")]
+    if len(parts) != 4:
+        raise ValueError(f"裁剪区域格式应为 left,top,right,bottom: {text}")
+    left, top, right, bottom = (int(float(p)) for p in parts)
+    if right <= left or bottom <= top:
+        raise ValueError(f"裁剪区域为空: {text}")
+    return left, top, right, bottom
+
+
+def get_oriented_size(img) -> Tuple[int, int]:
+    """按 EXIF 旋转后的尺寸（只读取文件头，不解码）
+
+    Returns:
+        (宽, 高)
+    """
+    width, height = img.size
+    try:
+        orientation = img.getexif().get(0x0112)
+    except Exception:
+        orientation = None
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    return width, height
+
+
+def _plan_region(
+    width: int,
+    height: int,
+    max_side: int = 0,
+    crop_box: Optional[Tuple[int, int, int, int]] = None,
+) -> Tuple[Tuple[int, int, int, int], Tuple[int, int], float]:
+    """计算裁剪区域（截断到图像范围内）、输出尺寸和缩放比例"""
+    if crop_box is None:
+        box = (0, 0, width, height)
+    else:
+        box = (
+            max(0, crop_box[0]),
+            max(0, crop_box[1]),
+            min(width, crop_box[2]),
+            min(height, crop_box[3]),
+        )
+        if box[2] <= box[0] or box[3] <= box[1]:
+            raise ValueError(f"裁剪区域超出图像范围: {crop_box}, 图像尺寸 {width}x{height}")
+
+    box_width, box_height = box[2] - box[0], box[3] - box[1]
+    scale = 1.0
+    if max_side and max(box_width, box_height) > max_side:
+        scale = max_side / max(box_width, box_height)
+    target = (max(1, round(box_width * scale)), max(1, round(box_height * scale)))
+    return box, target, scale
+
+
+def read_region_size(
+    img,
+    max_side: int = 0,
+    crop_box: Optional[Tuple[int, int, int, int]] = None,
+) -> Tuple[int, int]:
+    """open_image_region 的输出尺寸（只读取文件头，不解码）
+
+    Returns:
+        (宽, 高)
+
+    Raises:
+        ValueError: 裁剪区域与图像没有交集
+    """
+    width, height = get_oriented_size(img)
+    return _plan_region(width, height, max_side, crop_box)[1]
+
+
+def to_rgb(img):
+    """转换为 RGB（32 位整数图像先缩放到 0-255）"""
+    if img.mode == "I":
+        img = img.point(lambda i: i * (1 / 255))
+    return img.convert("RGB")
+
+
+def open_image_region(img, max_side: int = 0, crop_box: Optional[Tuple[int, int, int, int]] = None):
+    """按 EXIF 旋转图像，并只解码需要的分辨率和区域
+
+    Args:
+        img: Image.open() 返回的尚未加载的 PIL 图像
+        max_side: 输出的最长边上限（0 表示不缩小，不会放大）
+        crop_box: 裁剪区域 (left, top, right, bottom)，按旋转后的方向，超出图像的部分被截断
+
+    Returns:
+        旋转、裁剪、缩小后的 PIL 图像（未指定任何选项时等同于 ImageOps.exif_transpose）
+
+    Raises:
+        ValueError: 裁剪区域与图像没有交集
+    """
+    from PIL import Image, ImageOps
+
+    if not max_side and crop_box is None:
+        return ImageOps.exif_transpose(img)
+
+    # 旋转后的尺寸（只读取文件头，不解码）
+    width, height = get_oriented_size(img)
+    box, target, scale = _plan_region(width, height, max_side, crop_box)
+
+    # JPEG：解码器直接按 DCT 缩放输出（结果不小于请求的尺寸）
+    if scale < 1.0 and img.format == "JPEG":
+        raw_width, raw_height = img.size
+        img.draft(img.mode, (math.ceil(raw_width * scale), math.ceil(raw_height * scale)))
+
+    img = ImageOps.exif_transpose(img)
+
+    # draft 后的实际缩放比例
+    ratio = img.width / width
+    scaled_box = tuple(v * ratio for v in box)
+    if scaled_box == (0, 0, img.width, img.height) and target == img.size:
+        return img
+
+    if img.mode in ("P", "1"):
+        # 调色板/二值图像无法插值，先展开（保留透明度供 mask 使用）
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+    return img.resize(target, Image.BILINEAR, box=scaled_box, reducing_gap=_REDUCING_GAP)
@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+"""helpers/latent_io.py - Latent 文件读写模块
+
+.latent 文件使用 safetensors 格式保存（与 ComfyUI 自带的 SaveLatent/LoadLatent 兼容）：
+- 写入：头部 JSON + 连续的原始张量数据，不执行任何代码
+- 读取：内存映射（copy-on-write），只在访问时按页读取；可只读取批次中的单个样本
+- 兼容：旧版 pickle 格式的 .latent 文件仍可读取（受限反序列化，只允许张量和基础容器）
+"""
+
+import io
+import os
+import json
+import pickle
+import struct
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# ComfyUI LoadLatent 通过该键判断 samples 是否已经是未缩放的格式
+LATENT_FORMAT_MARKER = "latent_format_version_0"
+
+# 没有格式标记的旧版 ComfyUI latent 需要乘以的系数（1 / 0.18215）
+LEGACY_LATENT_SCALE = 1.0 / 0.18215
+
+# samples 在文件中的键名（与 ComfyUI SaveLatent 一致）
+LATENT_TENSOR_KEY = "latent_tensor"
+
+# safetensors 元数据中保存非张量字段（如 batch_index）的键名
+_EXTRA_METADATA_KEY = "data_manager_extra"
+
+# safetensors dtype 名称 -> numpy dtype（BF16 没有对应的 numpy 类型，按 int16 读取后在 torch 中转换）
+SAFETENSORS_DTYPES: Dict[str, str] = {
+    "F64": "<f8",
+    "F32": "<f4",
+    "F16": "<f2",
+    "BF16": "<i2",
+    "I64": "<i8",
+    "I32": "<i4",
+    "I16": "<i2",
+    "I8": "i1",
+    "U8": "u1",
+    "BOOL": "?",
+}
+
+_NUMPY_TO_SAFETENSORS = {
+    np.dtype("float64"): "F64",
+    np.dtype("float32"): "F32",
+    np.dtype("float16"): "F16",
+    np.dtype("int64"): "I64",
+    np.dtype("int32"): "I32",
+    np.dtype("int16"): "I16",
+    np.dtype("int8"): "I8",
+    np.dtype("uint8"): "U8",
+    np.dtype("bool"): "BOOL",
+}
+
+# 头部长度上限（与 safetensors 库一致，防止读取损坏文件时分配过大内存）
+_MAX_HEADER_SIZE = 100 * 1024 * 1024
+
+
+def _to_numpy(value: Any) -> Tuple[np.ndarray, str]:
+    """将张量转换为 C 连续的小端 numpy 数组，返回 (数组, safetensors dtype)"""
+    if hasattr(value, "detach"):  # torch.Tensor
+        tensor = value.detach().cpu().contiguous()
+        if str(tensor.dtype) == "torch.bfloat16":
+            import torch
+
+            return tensor.view(torch.int16).numpy(), "BF16"
+        value = tensor.numpy()
+
+    array = np.ascontiguousarray(value)
+    dtype = _NUMPY_TO_SAFETENSORS.get(array.dtype.newbyteorder("="))
+    if dtype is None:
+        raise ValueError(f"不支持的张量类型: {array.dtype}")
+    return array.astype(array.dtype.newbyteorder("<"), copy=False), dtype
+
+
+def write_safetensors(
+    tensors: Dict[str, Any], file_path: str, metadata: Optional[Dict[str, str]] = None
+) -> int:
+    """将张量字典写入 safetensors 文件
+
+    张量按元素大小从大到小排列，数据区起始位置按 8 字节对齐，保证读取时各张量地址对齐
+
+    Args:
+        tensors: {名称: torch.Tensor 或 np.ndarray}
+        file_path: 目标文件路径
+        metadata: 字符串元数据（写入头部的 __metadata__）
+
+    Returns:
+        写入的字节数
+    """
+    arrays = {name: _to_numpy(value) for name, value in tensors.items()}
+    order = sorted(arrays, key=lambda name: (-arrays[name][0].dtype.itemsize, name))
+
+    header: Dict[str, Any] = {}
+    if metadata:
+        header["__metadata__"] = {str(k): str(v) for k, v in metadata.items()}
+
+    offset = 0
+    for name in order:
+        array, dtype = arrays[name]
+        header[name] = {
+            "dtype": dtype,
+            "shape": list(array.shape),
+            "data_offsets": [offset, offset + array.nbytes],
+        }
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * (-(8 + len(header_bytes)) % 8)
+
+    with open(file_path, "wb") as f:
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name in order:
+            array = arrays[name][0]
+            if array.nbytes:
+                f.write(memoryview(array.reshape(-1)).cast("B"))
+
+    return 8 + len(header_bytes) + offset
+
+
+def read_safetensors_header(file_path: str) -> Tuple[Dict[str, Any], int]:
+    """读取 safetensors 文件头部
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        (头部字典, 数据区起始偏移)
+
+    Raises:
+        ValueError: 不是有效的 safetensors 文件
+    """
+    with open(file_path, "rb") as f:
+        prefix = f.read(8)
+        if len(prefix) != 8:
+            raise ValueError(f"不是有效的 safetensors 文件: {file_path}")
+        (header_size,) = struct.unpack("<Q", prefix)
+        if header_size > _MAX_HEADER_SIZE:
+            raise ValueError(f"safetensors 头部过大: {header_size}")
+        header_bytes = f.read(header_size)
+
+    if len(header_bytes) != header_size:
+        raise ValueError(f"safetensors 头部不完整: {file_path}")
+    return json.loads(header_bytes.decode("utf-8")), 8 + header_size
+
+
+def is_safetensors_file(file_path: str) -> bool:
+    """根据文件头判断是否为 safetensors 格式（pickle 文件以 0x80 开头）"""
+    try:
+        with open(file_path, "rb") as f:
+            prefix = f.read(9)
+    except OSError:
+        return False
+    if len(prefix) < 9 or prefix[8:9] != b"{":
+        return False
+    (header_size,) = struct.unpack("<Q", prefix[:8])
+    return 0 < header_size <= min(_MAX_HEADER_SIZE, os.path.getsize(file_path) - 8)
+
+
+def _to_torch(array: np.ndarray, dtype: str) -> Any:
+    """numpy 数组（可能是内存映射）零拷贝转换为 torch.Tensor；torch 未安装时原样返回"""
+    try:
+        import torch
+    except ImportError:
+        return array
+
+    tensor = torch.from_numpy(array)
+    if dtype == "BF16":
+        tensor = tensor.view(torch.bfloat16)
+    return tensor
+
+
+def read_safetensors(
+    file_path: str,
+    keys: Optional[List[str]] = None,
+    index: Optional[int] = None,
+    mmap: bool = True,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """读取 safetensors 文件中的张量
+
+    mmap=True 时张量由 copy-on-write 内存映射直接支撑：打开文件不读取数据，
+    访问时按页从磁盘加载，修改不会写回文件
+
+    Args:
+        file_path: 文件路径
+        keys: 只读取指定的张量（None 表示全部）
+        index: 只读取第一维的第 index 项（保留批次维度，形状为 [1, ...]），标量张量不受影响
+        mmap: 是否使用内存映射（False 时一次性读入内存）
+
+    Returns:
+        ({名称: 张量}, 元数据)；已安装 torch 时返回 torch.Tensor，否则返回 np.ndarray
+
+    Raises:
+        ValueError: 文件格式错误
+        IndexError: index 超出批次范围
+    """
+    header, data_start = read_safetensors_header(file_path)
+    metadata = header.pop("__metadata__", None) or {}
+
+    tensors: Dict[str, Any] = {}
+    with open(file_path, "rb") as f:
+        for name, info in header.items():
+            if keys is not None and name not in keys:
+                continue
+
+            if info["dtype"] not in SAFETENSORS_DTYPES:
+                raise ValueError(f"不支持的张量类型: {info['dtype']}")
+            np_dtype = np.dtype(SAFETENSORS_DTYPES[info["dtype"]])
+            shape = tuple(info["shape"])
+            start, end = info["data_offsets"]
+            offset = data_start + start
+
+            # 只读取批次中的单项：按第一维计算该项的字节范围
+            if index is not None and shape:
+                if not -shape[0] <= index < shape[0]:
+                    raise IndexError(f"索引 {index} 超出批次大小 {shape[0]}")
+                item_bytes = (end - start) // shape[0] if shape[0] else 0
+                offset += (index % shape[0]) * item_bytes
+                shape = (1,) + shape[1:]
+
+            count = int(np.prod(shape)) if shape else 1
+            if count == 0:
+                array = np.empty(shape, dtype=np_dtype)
+            elif mmap:
+                array = np.memmap(f, dtype=np_dtype, mode="c", offset=offset, shape=shape)
+            else:
+                f.seek(offset)
+                array = np.fromfile(f, dtype=np_dtype, count=count).reshape(shape)
+
+            tensors[name] = _to_torch(array, info["dtype"])
+
+    return tensors, metadata
+
+
+def save_latent_file(latent: Dict[str, Any], file_path: str) -> str:
+    """将 ComfyUI LATENT 字典保存为 safetensors 格式的 .latent 文件
+
+    samples 以 latent_tensor 键保存并写入格式标记（ComfyUI LoadLatent 可直接读取），
+    其他张量（如 noise_mask）按原键名保存，batch_index 等可 JSON 序列化的字段写入元数据
+
+    Args:
+        latent: {"samples": [B, C, H, W], ...}
+        file_path: 目标文件路径
+
+    Returns:
+        保存后的文件路径
+
+    Raises:
+        ValueError: 缺少 samples 或包含不支持的张量类型
+    """
+    if "samples" not in latent:
+        raise ValueError("Latent 数据缺少 samples")
+
+    tensors: Dict[str, Any] = {LATENT_TENSOR_KEY: latent["samples"]}
+    tensors[LATENT_FORMAT_MARKER] = np.empty((0,), dtype=np.float32)
+
+    extra: Dict[str, Any] = {}
+    for key, value in latent.items():
+        if key == "samples":
+            continue
+        if hasattr(value, "shape") and not isinstance(value, (str, bytes)):
+            tensors[key] = value
+        else:
+            try:
+                json.dumps(value)
+                extra[key] = value
+            except (TypeError, ValueError):
+                logger.warning(f"[DataManager] Latent 字段 {key} 无法序列化，已跳过")
+
+    metadata = {"format": "pt"}
+    if extra:
+        metadata[_EXTRA_METADATA_KEY] = json.dumps(extra)
+
+    os.makedirs(Path(file_path).parent, exist_ok=True)
+    write_safetensors(tensors, file_path, metadata)
+    return file_path
+
+
+def _load_storage_bytes(data: bytes) -> Any:
+    """还原 pickle 中以 torch.save 字节保存的张量存储（代替 torch.storage._load_from_bytes）"""
+    import torch
+
+    return torch.load(io.BytesIO(data), weights_only=True)
+
+
+# 旧版 pickle Latent 允许引用的全局对象：张量/数组重建函数和基础容器
+_LEGACY_PICKLE_GLOBALS = {
+    ("builtins", "set"),
+    ("builtins", "frozenset"),
+    ("builtins", "complex"),
+    ("collections", "OrderedDict"),
+    ("torch", "Tensor"),
+    ("torch._utils", "_rebuild_tensor"),
+    ("torch._utils", "_rebuild_tensor_v2"),
+    ("torch._utils", "_rebuild_parameter"),
+    ("torch._tensor", "_rebuild_from_type_v2"),
+    ("torch.nn.parameter", "Parameter"),
+    ("numpy", "ndarray"),
+    ("numpy", "dtype"),
+    ("numpy.core.multiarray", "_reconstruct"),
+    ("numpy.core.multiarray", "scalar"),
+    ("numpy._core.multiarray", "_reconstruct"),
+    ("numpy._core.multiarray", "scalar"),
+}
+
+
+class _LegacyLatentUnpickler(pickle.Unpickler):
+    """旧版 .latent 文件的受限反序列化器
+
+    与 torch.load(weights_only=True) 类似，只允许重建张量、numpy 数组和基础容器，
+    引用其他全局对象（可执行任意代码的函数、类）的文件被拒绝
+    """
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) == ("torch.storage", "_load_from_bytes"):
+            # 张量存储为 torch.save 的字节，同样以 weights_only 方式还原
+            return _load_storage_bytes
+        if (module, name) in _LEGACY_PICKLE_GLOBALS:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"旧版 Latent 文件包含不允许的对象: {module}.{name}")
+
+
+def load_latent_file(
+    file_path: str, index: Optional[int] = None, mmap: bool = True
+) -> Dict[str, Any]:
+    """加载 .latent 文件为 ComfyUI LATENT 字典
+
+    safetensors 格式使用内存映射读取；旧版 pickle 格式整体反序列化，
+    只允许张量、numpy 数组和基础容器（见 _LegacyLatentUnpickler）
+
+    Args:
+        file_path: 文件路径
+        index: 只读取批次中的第 index 个样本（None 表示全部）
+        mmap: 是否使用内存映射
+
+    Returns:
+        {"samples": tensor, ...}
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        IndexError: index 超出批次范围
+        pickle.UnpicklingError: 旧版文件包含张量和基础容器以外的对象
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Latent 文件不存在: {file_path}")
+
+    if not is_safetensors_file(file_path):
+        logger.info(f"[DataManager] 读取旧版 pickle 格式 Latent: {file_path}")
+        with open(file_path, "rb") as f:
+            latent = _LegacyLatentUnpickler(f).load()
+        if index is not None:
+            batch_size = latent["samples"].shape[0]
+            if not -batch_size <= index < batch_size:
+                raise IndexError(f"索引 {index} 超出批次大小 {batch_size}")
+            i = index % batch_size
+            latent = {
+                key: (
+                    value[i : i + 1]
+                    if hasattr(value, "shape")
+                    and len(value.shape) > 0
+                    and value.shape[0] == batch_size
+                    else value
+                )
+                for key, value in latent.items()
+            }
+        return latent
+
+    # 批次维度在读取 samples 前未知，先读取头部确定哪些张量需要按项切分
+    header, _ = read_safetensors_header(file_path)
+    samples_key = LATENT_TENSOR_KEY if LATENT_TENSOR_KEY in header else "samples"
+    if samples_key not in header:
+        raise ValueError(f"文件中没有 Latent 数据: {file_path}")
+
+    batch_size = header[samples_key]["shape"][0] if header[samples_key]["shape"] else None
+    batched = [
+        name
+        for name, info in header.items()
+        if name != "__metadata__" and info["shape"] and info["shape"][0] == batch_size
+    ]
+
+    if index is None:
+        tensors, metadata = read_safetensors(file_path, mmap=mmap)
+    else:
+        tensors, metadata = read_safetensors(file_path, keys=batched, index=index, mmap=mmap)
+        others = [n for n in header if n != "__metadata__" and n not in batched]
+        if others:
+            tensors.update(read_safetensors(file_path, keys=others, mmap=mmap)[0])
+
+    has_marker = tensors.pop(LATENT_FORMAT_MARKER, None) is not None
+    samples = tensors.pop(samples_key)
+    if samples_key == LATENT_TENSOR_KEY and not has_marker:
+        # 旧版 ComfyUI 保存的 latent 是缩放后的数据
+        if hasattr(samples, "float"):
+            samples = samples.float() * LEGACY_LATENT_SCALE
+        else:
+            samples = samples.astype(np.float32) * LEGACY_LATENT_SCALE
+
+    latent: Dict[str, Any] = {"samples": samples}
+    latent.update(tensors)
+
+    extra = metadata.get(_EXTRA_METADATA_KEY)
+    if extra:
+        latent.update(json.loads(extra))
+        if index is not None and isinstance(latent.get("batch_index"), list):
+            if len(latent["batch_index"]) == batch_size:
+                latent["batch_index"] = [latent["batch_index"][index % batch_size]]
+
+    return latent
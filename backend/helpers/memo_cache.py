@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""helpers/memo_cache.py - 持久化内容寻址缓存模块
+
+为缓存节点提供：
+- 缓存键：对输入内容（张量字节、字符串、数值、嵌套结构）计算 SHA-256
+- 磁盘缓存：每个条目一个目录（数据文件 + meta.json），原子写入，ComfyUI 重启后仍然有效
+- 按字节预算的 LRU 淘汰：命中时更新 meta.json 的修改时间，超出预算时删除最久未访问的条目
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# 条目元数据文件名
+CACHE_META_FILE = "meta.json"
+
+# 默认缓存字节预算（10 GB）
+DEFAULT_CACHE_BYTES = 10 * 1024**3
+
+# 缓存键格式版本（序列化方式变化时递增，使旧条目失效）
+CACHE_KEY_VERSION = 1
+
+# 正在写入的临时目录前缀（淘汰和查询时忽略）
+_TMP_PREFIX = ".tmp-"
+
+_cache_lock = threading.Lock()
+
+
+def _update_tensor(hasher: Any, value: Any) -> None:
+    """将张量的类型、形状和原始字节写入哈希"""
+    if hasattr(value, "detach"):  # torch.Tensor
+        tensor = value.detach().cpu().contiguous()
+        dtype = str(tensor.dtype)
+        if dtype == "torch.bfloat16":
+            import torch
+
+            tensor = tensor.view(torch.int16)
+        array = tensor.numpy()
+    else:
+        import numpy as np
+
+        array = np.ascontiguousarray(value)
+        dtype = str(array.dtype)
+
+    hasher.update(f"T{dtype}{tuple(array.shape)}".encode("utf-8"))
+    if array.nbytes:
+        hasher.update(memoryview(array.reshape(-1)).cast("B"))
+
+
+def update_hash(hasher: Any, value: Any) -> None:
+    """将值的内容写入哈希（同样内容的输入在不同会话、不同机器上得到相同结果）
+
+    Args:
+        hasher: hashlib 哈希对象
+        value: 张量、字符串、数值、None、列表/元组/字典，或来自文件的视频
+
+    Raises:
+        TypeError: 值的内容无法确定（如模型对象），不能作为缓存键
+    """
+    if value is None:
+        hasher.update(b"N")
+    elif isinstance(value, bool):
+        hasher.update(b"B1" if value else b"B0")
+    elif isinstance(value, (int, float)):
+        hasher.update(f"{type(value).__name__[0]}{value!r};".encode("utf-8"))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        hasher.update(f"S{len(data)};".encode("utf-8"))
+        hasher.update(data)
+    elif isinstance(value, bytes):
+        hasher.update(f"Y{len(value)};".encode("utf-8"))
+        hasher.update(value)
+    elif hasattr(value, "shape") and hasattr(value, "dtype"):
+        _update_tensor(hasher, value)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{'L' if isinstance(value, list) else 'U'}{len(value)};".encode("utf-8"))
+        for item in value:
+            update_hash(hasher, item)
+    elif isinstance(value, dict):
+        hasher.update(f"D{len(value)};".encode("utf-8"))
+        for key in sorted(value, key=str):
+            update_hash(hasher, str(key))
+            update_hash(hasher, value[key])
+    elif hasattr(value, "get_stream_source"):
+        # 来自文件的视频：按路径、大小和修改时间识别
+        source = value.get_stream_source()
+        if not isinstance(source, str):
+            raise TypeError(f"无法计算 {type(value).__name__} 的缓存键")
+        stat = os.stat(source)
+        hasher.update(
+            f"V{os.path.abspath(source)};{stat.st_size};{stat.st_mtime_ns};".encode("utf-8")
+        )
+    else:
+        raise TypeError(f"无法计算 {type(value).__name__} 的缓存键")
+
+
+def compute_cache_key(values: List[Any], namespace: str = "") -> str:
+    """计算一组输入的缓存键
+
+    Args:
+        values: 参与计算的输入（顺序有意义）
+        namespace: 命名空间（区分使用相同输入的不同计算阶段）
+
+    Returns:
+        64 位十六进制 SHA-256 字符串
+
+    Raises:
+        TypeError: 输入中包含无法计算缓存键的值
+
+    Examples:
+        >>> key = compute_cache_key(["a photo of a cat", 42])
+        >>> key == compute_cache_key(["a photo of a cat", 42])
+        True
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f"data-manager-cache-v{CACHE_KEY_VERSION};".encode("utf-8"))
+    update_hash(hasher, namespace)
+    update_hash(hasher, list(values))
+    return hasher.hexdigest()
+
+
+def _entry_dir(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key)
+
+
+def get_cache_entry(cache_dir: str, key: str, touch: bool = True) -> Optional[Dict[str, Any]]:
+    """查询缓存条目
+
+    Args:
+        cache_dir: 缓存目录
+        key: 缓存键
+        touch: 命中时是否更新访问时间（用于 LRU 淘汰）
+
+    Returns:
+        条目元数据（含数据文件的绝对路径 path）；未命中或条目损坏（数据文件缺失、不可读、
+        大小与写入时不一致）时返回 None
+    """
+    entry_dir = _entry_dir(cache_dir, key)
+    meta_path = os.path.join(entry_dir, CACHE_META_FILE)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    data_path = os.path.join(entry_dir, meta.get("file", ""))
+    if not meta.get("file") or not os.path.isfile(data_path) or not os.access(data_path, os.R_OK):
+        return None
+    if "file_size" in meta and os.path.getsize(data_path) != meta["file_size"]:
+        logger.warning(f"[DataManager] 缓存条目数据文件大小不一致（可能被截断）: {key[:12]}")
+        return None
+
+    if touch:
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+    meta["path"] = data_path
+    return meta
+
+
+def store_cache_entry(
+    cache_dir: str,
+    key: str,
+    writer: Callable[[str], Tuple[str, str]],
+    max_bytes: int = DEFAULT_CACHE_BYTES,
+) -> Optional[Dict[str, Any]]:
+    """写入缓存条目
+
+    writer 在临时目录中写入数据，完成后整个目录原子重命名为条目目录，
+    中途失败或进程退出不会留下不完整的条目
+
+    Args:
+        cache_dir: 缓存目录
+        key: 缓存键
+        writer: writer(临时目录) -> (数据类型, 数据文件名)
+        max_bytes: 缓存字节预算（写入后按 LRU 淘汰，<= 0 表示不限制）
+
+    Returns:
+        条目元数据（含 path）；条目已存在时返回已有条目
+    """
+    existing = get_cache_entry(cache_dir, key)
+    if existing is not None:
+        return existing
+    # 损坏的条目目录会阻止新条目重命名到位，先删除
+    remove_cache_entry(cache_dir, key)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = os.path.join(cache_dir, f"{_TMP_PREFIX}{uuid.uuid4().hex}")
+    os.makedirs(tmp_dir)
+    try:
+        data_type, filename = writer(tmp_dir)
+        size = sum(entry.stat().st_size for entry in os.scandir(tmp_dir) if entry.is_file())
+        meta = {
+            "key": key,
+            "type": data_type,
+            "file": os.path.basename(filename),
+            "file_size": os.path.getsize(os.path.join(tmp_dir, os.path.basename(filename))),
+            "size": size,
+            "created_at": time.time(),
+        }
+        with open(os.path.join(tmp_dir, CACHE_META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        try:
+            os.rename(tmp_dir, _entry_dir(cache_dir, key))
+        except OSError:
+            # 其他进程已写入同一条目
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if max_bytes > 0:
+        evict_cache(cache_dir, max_bytes, keep=key)
+
+    return get_cache_entry(cache_dir, key, touch=False)
+
+
+def remove_cache_entry(cache_dir: str, key: str) -> bool:
+    """删除缓存条目（如读取失败的损坏条目），下次查询时未命中并重新计算
+
+    Returns:
+        条目存在并已删除时返回 True
+    """
+    entry_dir = _entry_dir(cache_dir, key)
+    with _cache_lock:
+        if not os.path.isdir(entry_dir):
+            return False
+        shutil.rmtree(entry_dir, ignore_errors=True)
+    logger.info(f"[DataManager] 已删除缓存条目: {key[:12]}")
+    return True
+
+
+def list_cache_entries(cache_dir: str) -> List[Dict[str, Any]]:
+    """列出缓存条目（按最近访问时间从旧到新排序）
+
+    Args:
+        cache_dir: 缓存目录
+
+    Returns:
+        [{"key", "type", "size", "last_access", ...}] 列表
+    """
+    entries = []
+    if not os.path.isdir(cache_dir):
+        return entries
+
+    for entry in os.scandir(cache_dir):
+        if not entry.is_dir() or entry.name.startswith(_TMP_PREFIX):
+            continue
+        meta_path = os.path.join(entry.path, CACHE_META_FILE)
+        try:
+            last_access = os.stat(meta_path).st_mtime
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        meta["key"] = entry.name
+        meta["last_access"] = last_access
+        entries.append(meta)
+
+    entries.sort(key=lambda meta: meta["last_access"])
+    return entries
+
+
+def evict_cache(cache_dir: str, max_bytes: int, keep: Optional[str] = None) -> List[str]:
+    """按 LRU 淘汰缓存条目，直到总大小不超过字节预算
+
+    Args:
+        cache_dir: 缓存目录
+        max_bytes: 字节预算
+        keep: 不淘汰的条目（刚写入的条目）
+
+    Returns:
+        被删除的缓存键列表
+    """
+    with _cache_lock:
+        entries = list_cache_entries(cache_dir)
+        total = sum(meta.get("size", 0) for meta in entries)
+
+        removed = []
+        for meta in entries:
+            if total <= max_bytes:
+                break
+            if meta["key"] == keep:
+                continue
+            shutil.rmtree(_entry_dir(cache_dir, meta["key"]), ignore_errors=True)
+            total -= meta.get("size", 0)
+            removed.append(meta["key"])
+
+    if removed:
+        logger.info(f"[DataManager] 缓存淘汰 {len(removed)} 个条目，当前大小 {total} 字节")
+    return removed
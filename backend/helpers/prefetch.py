@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""helpers/prefetch.py - Match 模式预读解码模块
+
+Match 模式返回路径列表后，下游按顺序逐个加载文件，磁盘读取和图像解码都在执行线程上串行进行。
+本模块在后台线程池中提前解码列表中接下来的若干个文件，放入有界缓冲区，
+单文件加载时直接取出已解码的结果：
+- 预读窗口：每取出第 i 项，保证 i+1 … i+window 已提交解码
+- 内存上限：缓冲区中已解码结果的字节数达到上限时暂停提交新的解码，取出后恢复
+- 统计命中（已就绪或等待中的解码）、未命中、丢弃和失败次数
+
+同一时间只有一个预读会话，新的 Match 列表会替换旧会话并丢弃其未使用的结果
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from .decode_cache import value_nbytes
+
+logger = logging.getLogger(__name__)
+
+
+# 默认预读窗口（提前解码的文件数）
+DEFAULT_PREFETCH_WINDOW = 4
+
+# 默认缓冲区字节上限（1 GB）
+DEFAULT_PREFETCH_BYTES = 1024**3
+
+# 预读解码线程数（PIL 解码时释放 GIL，少量线程即可与下游计算重叠）
+DEFAULT_PREFETCH_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_session: Optional[Dict[str, Any]] = None
+_session_counter = 0
+_stats = {"hits": 0, "waits": 0, "misses": 0, "discarded": 0, "errors": 0, "scheduled": 0}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """按需创建预读线程池（调用方需持有 _lock）"""
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=DEFAULT_PREFETCH_WORKERS, thread_name_prefix="DataManagerPrefetch"
+        )
+    return _executor
+
+
+def _decode(session: Dict[str, Any], index: int) -> Any:
+    """后台线程：解码第 index 项并放入会话缓冲区"""
+    try:
+        value = session["loader"](session["paths"][index])
+    except Exception as e:
+        logger.warning(f"[DataManager] 预读解码失败: {session['paths'][index]}, error={e}")
+        with _lock:
+            session["pending"].pop(index, None)
+            _stats["errors"] += 1
+        raise
+
+    with _lock:
+        session["pending"].pop(index, None)
+        if session is not _session or index < session["position"]:
+            # 会话已被替换或下游已越过该项
+            _stats["discarded"] += 1
+        else:
+            nbytes = value_nbytes(value)
+            session["ready"][index] = (value, nbytes)
+            session["bytes"] += nbytes
+    return value
+
+
+def _schedule(session: Dict[str, Any], upto: int) -> int:
+    """提交解码任务直到第 upto 项（不含）或缓冲区达到上限（调用方需持有 _lock）"""
+    upto = min(upto, len(session["paths"]))
+    submitted = 0
+    while session["next"] < upto and session["bytes"] < session["max_bytes"]:
+        index = session["next"]
+        session["next"] += 1
+        session["pending"][index] = _get_executor().submit(_decode, session, index)
+        submitted += 1
+    _stats["scheduled"] += submitted
+    return submitted
+
+
+def _discard_session(session: Dict[str, Any]) -> None:
+    """取消会话中未开始的解码并丢弃未使用的结果（调用方需持有 _lock）"""
+    for future in list(session["pending"].values()):
+        if future.cancel():
+            _stats["discarded"] += 1
+    session["pending"].clear()
+    _stats["discarded"] += len(session["ready"])
+    session["ready"].clear()
+    session["bytes"] = 0
+
+
+def start_prefetch(
+    paths: Sequence[str],
+    loader: Callable[[str], Any],
+    window: int = DEFAULT_PREFETCH_WINDOW,
+    max_bytes: int = DEFAULT_PREFETCH_BYTES,
+    tag: str = "",
+) -> int:
+    """开始新的预读会话（替换当前会话）
+
+    Args:
+        paths: 按下游加载顺序排列的文件路径
+        loader: 解码函数 loader(file_path)，在后台线程中调用
+        window: 预读窗口（<= 0 时只停止当前会话）
+        max_bytes: 缓冲区字节上限
+        tag: 解码方式标识（如数据类型、缩小尺寸），取出时只匹配相同标识的会话
+
+    Returns:
+        立即提交的解码任务数
+    """
+    global _session, _session_counter
+
+    with _lock:
+        if _session is not None:
+            _discard_session(_session)
+            _session = None
+
+        if window <= 0 or not paths:
+            return 0
+
+        _session_counter += 1
+        index: Dict[str, int] = {}
+        for i, path in enumerate(paths):
+            index.setdefault(os.path.abspath(path), i)
+
+        _session = {
+            "id": _session_counter,
+            "paths": list(paths),
+            "index": index,
+            "loader": loader,
+            "tag": tag,
+            "window": int(window),
+            "max_bytes": max(0, int(max_bytes)),
+            "next": 0,  # 下一个待提交的序号
+            "position": -1,  # 下游最近取出的序号
+            "pending": {},  # {序号: Future}
+            "ready": {},  # {序号: (值, 字节数)}
+            "bytes": 0,
+        }
+        return _schedule(_session, _session["window"])
+
+
+def take_prefetched(
+    file_path: str, timeout: Optional[float] = None, tag: Optional[str] = None
+) -> Optional[Any]:
+    """取出文件的预读结果，并推进预读窗口
+
+    文件正在解码时等待其完成；文件不在当前会话中（或解码方式标识不同）时返回 None 且不计入统计
+
+    Args:
+        file_path: 文件路径
+        timeout: 等待解码完成的最长秒数（None 表示一直等待）
+        tag: 需要的解码方式标识（None 表示不检查）
+
+    Returns:
+        解码结果；未预读、解码失败或等待超时时返回 None（调用方应自行加载）
+    """
+    with _lock:
+        session = _session
+        if session is None or (tag is not None and tag != session["tag"]):
+            return None
+        index = session["index"].get(os.path.abspath(file_path))
+        if index is None:
+            return None
+
+        # 丢弃下游已越过的结果
+        session["position"] = max(session["position"], index)
+        for skipped in [i for i in session["ready"] if i < index]:
+            _, nbytes = session["ready"].pop(skipped)
+            session["bytes"] -= nbytes
+            _stats["discarded"] += 1
+
+        entry = session["ready"].pop(index, None)
+        future: Optional[Future] = None
+        if entry is not None:
+            session["bytes"] -= entry[1]
+            _stats["hits"] += 1
+        else:
+            future = session["pending"].get(index)
+            if future is None:
+                _stats["misses"] += 1
+
+        # 未提交的项直接跳过，由调用方加载
+        session["next"] = max(session["next"], index + 1)
+        _schedule(session, index + 1 + session["window"])
+
+    if entry is not None:
+        return entry[0]
+    if future is None:
+        return None
+
+    try:
+        value = future.result(timeout=timeout)
+    except Exception:
+        with _lock:
+            _stats["misses"] += 1
+        return None
+
+    with _lock:
+        entry = session["ready"].pop(index, None)
+        if entry is not None:
+            session["bytes"] -= entry[1]
+        _stats["hits"] += 1
+        _stats["waits"] += 1
+    return value
+
+
+def stop_prefetch() -> int:
+    """停止当前预读会话
+
+    Returns:
+        丢弃的已解码结果数
+    """
+    global _session
+
+    with _lock:
+        if _session is None:
+            return 0
+        count = len(_session["ready"])
+        _discard_session(_session)
+        _session = None
+    return count
+
+
+def get_prefetch_stats(reset: bool = False) -> Dict[str, Any]:
+    """获取预读统计
+
+    Args:
+        reset: 是否在读取后清零计数
+
+    Returns:
+        {"hits", "waits", "misses", "discarded", "errors", "scheduled", "hit_rate",
+         "active", "total", "position", "buffered", "in_flight", "bytes", "window", "max_bytes"}
+        其中 waits 为命中时仍需等待解码完成的次数（包含在 hits 中）
+    """
+    with _lock:
+        stats: Dict[str, Any] = dict(_stats)
+        session = _session
+        stats["active"] = session is not None
+        stats["total"] = len(session["paths"]) if session else 0
+        stats["position"] = session["position"] if session else -1
+        stats["buffered"] = len(session["ready"]) if session else 0
+        stats["in_flight"] = len(session["pending"]) if session else 0
+        stats["bytes"] = session["bytes"] if session else 0
+        stats["window"] = session["window"] if session else 0
+        stats["max_bytes"] = session["max_bytes"] if session else 0
+        if reset:
+            for key in _stats:
+                _stats[key] = 0
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""helpers/save_manifest.py - 保存清单模块
+
+批量保存时把每个完成的输出追加到目标目录下的 JSONL 清单（.dm_manifest.jsonl），
+长批次中途崩溃后重新运行时可跳过已经产出的文件，只处理剩余部分：
+- 每行一条记录：{"name", "path", "source", "size", "sha256", "time"}，name/path 为相对清单目录的路径
+- 追加以单次 O_APPEND 写入完成，多个线程/进程同时保存到同一目录时记录不会交错
+- 读取时只解析上次读取之后追加的部分，逐项迭代保存时不会重复解析整个清单
+- 同一 name 有多条记录时以最后一条为准；崩溃时写了一半的行被忽略
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# 清单模式："off" 不使用清单，"record" 只记录，"skip" 记录并跳过已产出的文件（按大小核对），
+# "verify" 同 skip 但重新计算已有文件的 sha256 核对
+MANIFEST_MODES = ("off", "record", "skip", "verify")
+
+# 清单文件名（保存在目标目录中）
+MANIFEST_FILENAME = ".dm_manifest.jsonl"
+
+_HASH_CHUNK = 1024 * 1024
+
+# 已读取的清单 {清单路径: (st_ino, 已解析的字节数, {name: 记录})}
+_manifests: Dict[str, Tuple[int, int, Dict[str, Dict[str, Any]]]] = {}
+_lock = threading.Lock()
+
+
+def get_manifest_path(directory: str) -> str:
+    """目标目录对应的清单文件路径"""
+    return os.path.join(os.path.abspath(directory), MANIFEST_FILENAME)
+
+
+def manifest_name(manifest_path: str, file_path: str) -> str:
+    """文件在清单中的名称（相对清单目录，统一使用 /；不在清单目录下时为绝对路径）"""
+    base = os.path.dirname(manifest_path)
+    file_path = os.path.abspath(file_path)
+    try:
+        rel_path = os.path.relpath(file_path, base)
+    except ValueError:
+        # Windows 下不同盘符
+        rel_path = file_path
+    if rel_path.startswith(os.pardir):
+        rel_path = file_path
+    return rel_path.replace(os.sep, "/")
+
+
+def hash_file(file_path: str) -> str:
+    """计算文件内容的 sha256"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_lines(data: bytes, records: Dict[str, Dict[str, Any]]) -> int:
+    """解析完整的行并合并到 records，返回已消费的字节数（末尾不完整的行留待下次读取）"""
+    end = data.rfind(b"\n") + 1
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            logger.warning(f"[DataManager] 忽略清单中无法解析的行: {line[:80]!r}")
+            continue
+        if isinstance(record, dict) and isinstance(record.get("name"), str):
+            records[record["name"]] = record
+    return end
+
+
+def load_manifest(manifest_path: str) -> Dict[str, Dict[str, Any]]:
+    """读取清单，返回 {name: 最后一条记录}
+
+    只解析上次读取之后追加的部分；清单被替换或截断时重新读取。返回的字典由模块缓存，调用方不应修改
+
+    Args:
+        manifest_path: 清单文件路径
+
+    Returns:
+        name 到记录的映射（清单不存在时为空）
+    """
+    with _lock:
+        try:
+            stat = os.stat(manifest_path)
+        except FileNotFoundError:
+            _manifests.pop(manifest_path, None)
+            return {}
+
+        ino, offset, records = _manifests.get(manifest_path, (None, 0, {}))
+        if ino != stat.st_ino or stat.st_size < offset:
+            ino, offset, records = stat.st_ino, 0, {}
+        if stat.st_size > offset:
+            with open(manifest_path, "rb") as f:
+                f.seek(offset)
+                offset += _parse_lines(f.read(), records)
+        _manifests[manifest_path] = (ino, offset, records)
+        return records
+
+
+def append_manifest(manifest_path: str, record: Dict[str, Any]) -> None:
+    """向清单追加一条记录（单次 O_APPEND 写入）"""
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+    fd = os.open(
+        manifest_path, os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644
+    )
+    try:
+        # 上次崩溃留下不完整的行时先换行，避免与新记录拼接成一行
+        size = os.fstat(fd).st_size
+        if size:
+            # O_APPEND 下写入总在末尾，lseek 只影响读取位置（Windows 没有 os.pread）
+            os.lseek(fd, size - 1, os.SEEK_SET)
+            if os.read(fd, 1) != b"\n":
+                line = b"\n" + line
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def record_output(
+    manifest_path: str, name: str, saved_path: str, source: str = ""
+) -> Dict[str, Any]:
+    """计算已保存文件的大小和 sha256 并追加到清单
+
+    Args:
+        manifest_path: 清单文件路径
+        name: 请求保存的路径在清单中的名称（见 manifest_name）
+        saved_path: 实际保存的文件路径
+        source: 源文件路径（可为空）
+
+    Returns:
+        追加的记录
+    """
+    record = {
+        "name": name,
+        "path": manifest_name(manifest_path, saved_path),
+        "source": source,
+        "size": os.path.getsize(saved_path),
+        "sha256": hash_file(saved_path),
+        "time": time.time(),
+    }
+    append_manifest(manifest_path, record)
+    return record
+
+
+def find_produced(
+    manifest_path: str,
+    name: str,
+    source: str = "",
+    verify: bool = False,
+) -> Optional[str]:
+    """检查输出是否已经产出
+
+    清单中存在 name 的记录、来源相同，且记录的文件仍然存在、大小一致（verify 时 sha256 也一致）
+
+    Args:
+        manifest_path: 清单文件路径
+        name: 请求保存的路径在清单中的名称
+        source: 源文件路径（与记录中的来源不同时视为未产出）
+        verify: 是否重新计算 sha256 核对
+
+    Returns:
+        已产出文件的路径；未产出时返回 None
+    """
+    record = load_manifest(manifest_path).get(name)
+    if record is None or record.get("source", "") != source:
+        return None
+    path = record.get("path", name)
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(manifest_path), path)
+    try:
+        if os.path.getsize(path) != record.get("size"):
+            return None
+        if verify and hash_file(path) != record.get("sha256"):
+            return None
+    except OSError:
+        return None
+    return path
+
+
+def save_with_manifest(
+    save_func: Callable[..., Union[str, List[str], None]],
+    manifest_path: str,
+    name: str,
+    source: str,
+    *args: Any,
+) -> Union[str, List[str], None]:
+    """执行 save_func(*args)，保存成功后追加清单记录
+
+    模块级函数，可用于 run_batch 的进程池和后台写入队列；每个输出写完立即记录，
+    批次中途崩溃时已完成的部分也在清单中。save_func 返回路径列表（一个输入保存为多个文件）时，
+    第一个文件记录在 name 下，其余文件以各自的清单名称记录，且先于 name 写入：
+    中途崩溃时 name 没有记录，重新运行时整组重新保存
+
+    Returns:
+        save_func 的返回值（保存后的文件路径或路径列表）
+    """
+    saved_path = save_func(*args)
+    if isinstance(saved_path, list):
+        for path in saved_path[1:]:
+            record_output(manifest_path, manifest_name(manifest_path, path), path, source)
+        if saved_path:
+            record_output(manifest_path, name, saved_path[0], source)
+    elif saved_path:
+        record_output(manifest_path, name, saved_path, source)
+    return saved_path
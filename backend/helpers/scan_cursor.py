@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""helpers/scan_cursor.py - 增量扫描游标模块
+
+为持续写入新文件的目录（热文件夹）提供"自上次运行以来的新文件"扫描：
+- 游标以 JSON 保存在源目录旁（同级的隐藏文件 .<目录名>.dm_scan_cursor.json），跨会话持久化
+- 每个目录记录 st_mtime_ns 和已处理文件的 (st_ino, st_mtime_ns, st_size)
+- "new" 模式：目录 mtime 未变化时（没有新增、删除或重命名的条目）不 stat 其中的文件
+- "changed" 模式：stat 所有匹配文件，原地修改过的文件也会输出
+- 新文件按修改时间排序输出；运行即提交游标（至多一次）：下游保存失败或运行被取消时这些文件不会再次输出，
+  需要重新处理时调用 reset_scan_cursor（或 POST /dm/scan/cursor/reset）
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .batch_scanner import CASE_SENSITIVE_DEFAULT, FileFilter, PathMatcher, iter_matching_files
+
+logger = logging.getLogger(__name__)
+
+
+# 增量扫描模式："off" 不使用游标，"new" 只检查有变化的目录，"changed" 检查所有文件
+INCREMENTAL_MODES = ("off", "new", "changed")
+
+# 游标文件名后缀（源目录为文件系统根目录时游标保存在目录内）
+CURSOR_SUFFIX = ".dm_scan_cursor.json"
+
+CURSOR_VERSION = 1
+
+# mtime 距扫描开始不足该时长的目录下次仍重新列出（文件系统时间戳精度不足时同一时刻的新文件可能被漏掉）
+_RACY_NS = 2 * 10**9
+
+_lock = threading.Lock()
+
+
+def get_cursor_path(base_dir: str) -> str:
+    """源目录对应的游标文件路径"""
+    base = os.path.abspath(base_dir).rstrip("\\/")
+    parent, name = os.path.split(base)
+    if not name:
+        return os.path.join(base, CURSOR_SUFFIX)
+    return os.path.join(parent, f".{name}{CURSOR_SUFFIX}")
+
+
+def cursor_key(
+    pattern: Union[str, Sequence[str]], exclude: Union[str, Sequence[str], None] = None
+) -> str:
+    """同一目录下不同 include/exclude 组合使用各自的游标"""
+    if not isinstance(pattern, str):
+        pattern = ";".join(pattern)
+    if exclude is not None and not isinstance(exclude, str):
+        exclude = ";".join(exclude)
+    return hashlib.sha256(f"{pattern}\0{exclude or ''}".encode("utf-8")).hexdigest()[:16]
+
+
+def _read_cursor(cursor_path: str) -> Dict[str, Any]:
+    """读取游标文件，不存在或无法解析时返回空游标"""
+    try:
+        with open(cursor_path, "r", encoding="utf-8") as f:
+            cursor = json.load(f)
+        if cursor.get("version") == CURSOR_VERSION and isinstance(cursor.get("scans"), dict):
+            return cursor
+        logger.warning(f"[DataManager] 游标版本不兼容，重新开始: {cursor_path}")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"[DataManager] 读取游标失败，重新开始: {cursor_path}, {e}")
+    return {"version": CURSOR_VERSION, "scans": {}}
+
+
+def _write_cursor(cursor_path: str, cursor: Dict[str, Any]) -> bool:
+    """原子写入游标文件（先写临时文件再替换）"""
+    tmp_path = f"{cursor_path}.{os.getpid()}.tmp"
+    try:
+        # json.dumps 使用 C 编码器，比流式的 json.dump 快数倍
+        data = json.dumps(cursor, separators=(",", ":"))
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, cursor_path)
+        return True
+    except OSError as e:
+        logger.warning(
+            f"[DataManager] 保存游标失败（下次运行将重复输出这些文件）: {cursor_path}, {e}"
+        )
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+def scan_incremental(
+    base_dir: str,
+    pattern: Union[str, Sequence[str]],
+    exclude: Union[str, Sequence[str], None] = None,
+    file_filter: Optional[FileFilter] = None,
+    mode: str = "new",
+    case_sensitive: bool = CASE_SENSITIVE_DEFAULT,
+    commit: bool = True,
+    limit: int = 0,
+) -> List[str]:
+    """扫描自上次运行以来新增（或修改）的文件
+
+    不满足 file_filter 的文件不记入游标，之后满足条件（如写入完成后大小超过阈值）时再输出；
+    limit 之外的新文件同样不记入游标，由之后的运行按时间顺序继续输出
+
+    Args:
+        base_dir: 源目录
+        pattern: glob 模式，多个模式以 ; 分隔或传入列表
+        exclude: 排除模式
+        file_filter: 元数据过滤条件
+        mode: "new" 或 "changed"
+        case_sensitive: 是否区分大小写
+        commit: 是否保存游标（False 时只预览）
+        limit: 最多返回的文件数（0 表示不限制）
+
+    Returns:
+        新文件的相对路径列表，按修改时间（相同时按路径）排序
+
+    Raises:
+        FileNotFoundError: 如果 base_dir 不存在
+        ValueError: 如果 base_dir 不是目录或 mode 无效
+    """
+    if mode not in INCREMENTAL_MODES or mode == "off":
+        raise ValueError(f"无效的增量扫描模式: {mode}")
+    if not os.path.exists(base_dir):
+        raise FileNotFoundError(f"基础目录不存在: {base_dir}")
+    if not os.path.isdir(base_dir):
+        raise ValueError(f"路径不是目录: {base_dir}")
+
+    base_dir = os.path.normpath(base_dir)
+    matcher = PathMatcher(pattern, exclude, case_sensitive=case_sensitive)
+    cursor_path = get_cursor_path(base_dir)
+    key = cursor_key(pattern, exclude)
+
+    with _lock:
+        cursor = _read_cursor(cursor_path)
+        previous = cursor["scans"].get(key, {}).get("dirs", {})
+        start_ns = time.time_ns()
+        # {相对目录: {"mtime_ns": int 或 None（下次必须重新列出）, "files": {文件名: [ino, mtime_ns, size]}}}
+        dirs: Dict[str, Dict[str, Any]] = {}
+
+        def list_files(rel_dir: str, dir_path: str) -> bool:
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                return False
+            state = {"mtime_ns": mtime_ns if mtime_ns < start_ns - _RACY_NS else None, "files": {}}
+            dirs[rel_dir] = state
+            old = previous.get(rel_dir)
+            if mode == "new" and old and old.get("mtime_ns") == mtime_ns:
+                # 目录条目未变化：沿用上次记录的文件
+                state["files"] = old.get("files", {})
+                return False
+            return True
+
+        found = []
+        for rel_path, entry in iter_matching_files(base_dir, matcher, list_files):
+            rel_dir, _, name = rel_path.rpartition("/")
+            if not rel_dir and name.endswith(CURSOR_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            state = dirs[rel_dir]
+            if file_filter and not file_filter.matches(stat):
+                state["mtime_ns"] = None
+                continue
+            signature = [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+            state["files"][name] = signature
+            if previous.get(rel_dir, {}).get("files", {}).get(name) != signature:
+                found.append((stat.st_mtime_ns, rel_path))
+
+        found.sort(key=lambda item: (item[0], item[1].lower()))
+        if limit > 0 and len(found) > limit:
+            # 超出窗口的文件恢复为上次的记录，所在目录下次重新列出
+            for _, rel_path in found[limit:]:
+                rel_dir, _, name = rel_path.rpartition("/")
+                state = dirs[rel_dir]
+                old_signature = previous.get(rel_dir, {}).get("files", {}).get(name)
+                if old_signature is None:
+                    state["files"].pop(name, None)
+                else:
+                    state["files"][name] = old_signature
+                state["mtime_ns"] = None
+            found = found[:limit]
+
+        # 没有新文件且目录状态未变化时不重写游标
+        if commit and (found or dirs != previous):
+            cursor["scans"][key] = {"scanned_ns": start_ns, "dirs": dirs}
+            if _write_cursor(cursor_path, cursor) and found:
+                logger.info(
+                    f"[DataManager] 游标已提交 {len(found)} 个文件（重新处理需调用 POST /dm/scan/cursor/reset）: "
+                    f"{cursor_path}"
+                )
+
+    file_paths = [rel_path for _, rel_path in found]
+    if os.sep != "/":
+        file_paths = [p.replace("/", os.sep) for p in file_paths]
+
+    logger.info(
+        f"[DataManager] 增量扫描完成: base_dir={base_dir}, pattern={pattern}, mode={mode}, "
+        f"new={len(file_paths)}, dirs={len(dirs)}"
+    )
+    return file_paths
+
+
+def reset_scan_cursor(
+    base_dir: str,
+    pattern: Union[str, Sequence[str], None] = None,
+    exclude: Union[str, Sequence[str], None] = None,
+) -> bool:
+    """重置游标，下次增量扫描重新输出所有文件
+
+    Args:
+        base_dir: 源目录
+        pattern: 只重置该 include/exclude 组合的游标（None 表示删除整个游标文件）
+        exclude: 排除模式
+
+    Returns:
+        是否存在并重置了游标
+    """
+    cursor_path = get_cursor_path(base_dir)
+    with _lock:
+        if pattern is None:
+            try:
+                os.remove(cursor_path)
+                return True
+            except FileNotFoundError:
+                return False
+        cursor = _read_cursor(cursor_path)
+        if cursor["scans"].pop(cursor_key(pattern, exclude), None) is None:
+            return False
+        return _write_cursor(cursor_path, cursor)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""helpers/tensor_convert.py - 张量转换模块
+
+提供保存前的图像/遮罩张量量化功能：
+在张量一侧一次性量化为 uint8，再整体传输到主机内存，
+各帧编码器直接使用该缓冲区的零拷贝视图；
+视频等长序列按固定帧数分块量化，峰值内存与序列长度无关。
+以及加载时 uint8 到 float32 的反向转换（只分配一次输出）
+"""
+
+import logging
+from typing import Any, Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# 视频逐块编码时每块的默认帧数
+DEFAULT_CHUNK_FRAMES = 16
+
+# 图像加载支持的数据类型（float32 为 ComfyUI 标准格式，uint8 占用 1/4 内存）
+IMAGE_DTYPES = ("float32", "uint8")
+
+
+def to_uint8_array(data: Any) -> np.ndarray:
+    """将图像/遮罩数据量化为 uint8 的 numpy 数组
+
+    - torch.Tensor：在原设备上完成 *255、截断和 uint8 转换，
+      然后只做一次连续的设备到主机拷贝（传输量为 float32 的 1/4）
+    - np.ndarray：uint8 直接返回（零拷贝），其他类型一次性量化
+    - 浮点数据按 [0, 1] 范围映射到 [0, 255]，越界值会被截断
+
+    Args:
+        data: 任意形状的图像/遮罩张量（如 [B, H, W, C]、[H, W, C]、[B, H, W]）
+
+    Returns:
+        与输入形状相同的 C 连续 uint8 数组，按索引取出的单帧是该数组的视图
+
+    Examples:
+        >>> to_uint8_array(np.array([0.0, 0.5, 1.0], dtype=np.float32))
+        array([  0, 127, 255], dtype=uint8)
+    """
+    if isinstance(data, np.ndarray):
+        if data.dtype == np.uint8:
+            return np.ascontiguousarray(data)
+        quantized = np.multiply(data, 255, dtype=np.float32)
+        np.clip(quantized, 0, 255, out=quantized)
+        return quantized.astype(np.uint8)
+
+    # torch.Tensor（延迟导入，避免 helpers 强依赖 torch）
+    if hasattr(data, "detach") and hasattr(data, "cpu"):
+        import torch
+
+        tensor = data.detach()
+        if tensor.dtype != torch.uint8:
+            tensor = tensor.mul(255).clamp_(0, 255).to(torch.uint8)
+        return tensor.contiguous().cpu().numpy()
+
+    raise TypeError(f"不支持的张量类型: {type(data)}")
+
+
+def iter_uint8_chunks(frames: Any, chunk_size: int = DEFAULT_CHUNK_FRAMES) -> Iterator[np.ndarray]:
+    """按固定帧数分块量化帧序列，逐块产出 uint8 数组
+
+    每块独立完成量化和设备到主机的传输，峰值内存只与 chunk_size 有关，
+    与帧序列总长度无关（不会生成整段 float32 或 uint8 副本）
+
+    Args:
+        frames: [F, H, W, C] 的 torch.Tensor 或 np.ndarray
+        chunk_size: 每块帧数（<= 0 时按 1 处理）
+
+    Yields:
+        [n, H, W, C] 的 C 连续 uint8 数组（n <= chunk_size）
+
+    Examples:
+        >>> [c.shape[0] for c in iter_uint8_chunks(np.zeros((5, 2, 2, 3)), 2)]
+        [2, 2, 1]
+    """
+    chunk_size = max(1, int(chunk_size or 1))
+    for start in range(0, len(frames), chunk_size):
+        yield to_uint8_array(frames[start : start + chunk_size])
+
+
+def uint8_to_float32(data: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """将 uint8 数组转换为 [0, 1] 范围的 float32 数组
+
+    直接除法写入输出数组，不生成 astype 的中间副本（结果与 astype(np.float32) / 255.0 一致）
+
+    Args:
+        data: uint8 数组
+        out: 可选的输出数组（float32，形状与 data 相同），可用于写入预分配缓冲区的切片
+
+    Returns:
+        float32 数组（传入 out 时为 out 本身）
+
+    Examples:
+        >>> uint8_to_float32(np.array([0, 255], dtype=np.uint8))
+        array([0., 1.], dtype=float32)
+    """
+    if out is None:
+        out = np.empty(data.shape, dtype=np.float32)
+    np.divide(data, np.float32(255.0), out=out)
+    return out
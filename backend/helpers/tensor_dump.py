@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""helpers/tensor_dump.py - 张量原样转储模块
+
+将 IMAGE/MASK 批次以 .npy 格式原样保存（保留 dtype 和形状，一次写入整个批次），
+加载时通过内存映射直接返回，不经过图像解码、颜色转换或数据复制。
+.npy 没有 bfloat16 类型：bfloat16 张量按位保存为 int16，以结构化 dtype 的字段名标记，加载时还原。
+适用于在工作流之间保存中间结果（检查点），不用于查看或分发
+"""
+
+import os
+import logging
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# 张量转储格式（InputPathConfig 选择这些格式时不编码为图像）
+TENSOR_DUMP_FORMATS = ("npy",)
+
+# bfloat16 张量在文件中的 dtype（int16 位模式，字段名作为类型标记）
+_BFLOAT16_DTYPE = np.dtype([("bfloat16", "<i2")])
+
+
+def save_tensor_dump(tensor: Any, file_path: str) -> str:
+    """将张量整体写入 .npy 文件
+
+    Args:
+        tensor: torch.Tensor 或 np.ndarray（如 [B, H, W, C] 图像批次、[B, H, W] 遮罩）
+        file_path: 目标文件路径（扩展名会被修正为 .npy）
+
+    Returns:
+        保存后的文件路径
+    """
+    path = Path(file_path)
+    if path.suffix.lower() != ".npy":
+        file_path = str(path.with_suffix(".npy"))
+
+    bfloat16 = False
+    if hasattr(tensor, "detach"):  # torch.Tensor
+        import torch
+
+        tensor = tensor.detach().cpu()
+        if tensor.dtype == torch.bfloat16:
+            # .npy 不支持 bfloat16，按位保存为 int16（不改变数据大小和精度）
+            tensor = tensor.contiguous().view(torch.int16)
+            bfloat16 = True
+        tensor = tensor.numpy()
+
+    array = np.ascontiguousarray(tensor)
+    if bfloat16:
+        array = array.view(_BFLOAT16_DTYPE)
+
+    os.makedirs(Path(file_path).parent, exist_ok=True)
+    with open(file_path, "wb") as f:
+        np.save(f, array, allow_pickle=False)
+
+    return file_path
+
+
+def load_tensor_dump(file_path: str, mmap: bool = True) -> Any:
+    """加载 .npy 张量转储
+
+    mmap=True 时返回由 copy-on-write 内存映射支撑的张量：不解码、不复制，访问时按页读取，
+    修改不会写回文件
+
+    Args:
+        file_path: .npy 文件路径
+        mmap: 是否使用内存映射（False 时一次性读入内存）
+
+    Returns:
+        torch.Tensor（torch 未安装时返回 np.ndarray），dtype 和形状与保存时一致；
+        torch 未安装时 bfloat16 转储无损转换为 float32 数组
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 文件不是数值数组（不允许加载 pickle 对象）
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"张量文件不存在: {file_path}")
+
+    array = np.load(file_path, mmap_mode="c" if mmap else None, allow_pickle=False)
+    bfloat16 = array.dtype == _BFLOAT16_DTYPE
+    if bfloat16:
+        array = array.view("<i2")
+
+    try:
+        import torch
+    except ImportError:
+        if bfloat16:
+            # numpy 没有 bfloat16：位模式左移 16 位即为相同数值的 float32
+            return (array.view(np.uint16).astype(np.uint32) << 16).view(np.float32)
+        return array
+
+    tensor = torch.from_numpy(array)
+    return tensor.view(torch.bfloat16) if bfloat16 else tensor
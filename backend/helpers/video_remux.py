@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""helpers/video_remux.py - 视频直通/封装转换模块
+
+为从文件加载的视频（VideoFromFile）提供无需解码的保存路径：
+- 直通：源文件扩展名与目标格式一致时直接复制
+- 封装转换：编码与目标容器兼容时按数据包复制流（无损，毫秒级）
+编码不兼容时由调用方回退到完整转码
+"""
+
+import io
+import os
+import shutil
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+
+# 各容器可直接封装的编码 {容器: {"video": 编码集合, "audio": 编码集合}}
+REMUX_COMPATIBLE_CODECS: Dict[str, Dict[str, Set[str]]] = {
+    "mp4": {
+        "video": {"h264", "hevc", "mpeg4", "av1", "vp9"},
+        "audio": {"aac", "mp3", "opus", "alac", "flac", "ac3"},
+    },
+    "mov": {
+        "video": {"h264", "hevc", "mpeg4", "prores", "mjpeg", "av1"},
+        "audio": {"aac", "mp3", "alac", "pcm_s16le", "pcm_s24le", "ac3"},
+    },
+    "mkv": {
+        "video": {"h264", "hevc", "mpeg4", "av1", "vp8", "vp9", "prores", "mjpeg", "ffv1"},
+        "audio": {"aac", "mp3", "opus", "vorbis", "flac", "alac", "ac3", "pcm_s16le", "pcm_s24le"},
+    },
+    "webm": {
+        "video": {"vp8", "vp9", "av1"},
+        "audio": {"opus", "vorbis"},
+    },
+    "avi": {
+        "video": {"mpeg4", "mjpeg", "h264"},
+        "audio": {"mp3", "ac3", "pcm_s16le"},
+    },
+}
+
+VideoSource = Union[str, io.BytesIO]
+
+# VideoFromFile 保存裁剪区间的私有属性（起始时间、时长，均为 0 表示未裁剪）
+_TRIM_ATTRIBUTES = ("_VideoFromFile__start_time", "_VideoFromFile__duration")
+
+
+def get_video_source(video: Any) -> Optional[VideoSource]:
+    """获取视频输入的原始数据源
+
+    Args:
+        video: ComfyUI VideoInput 对象
+
+    Returns:
+        文件路径或 BytesIO（非文件来源的视频返回 None）
+    """
+    if not hasattr(video, "get_stream_source"):
+        return None
+    # 带裁剪区间的 VideoFromFile 与源文件内容不一致，不能直接复制；
+    # 读取不到裁剪区间（私有属性缺失或改名）时无法确认未裁剪，同样回退到转码
+    for name in _TRIM_ATTRIBUTES:
+        if not hasattr(video, name):
+            logger.debug(f"[DataManager] 视频输入缺少 {name}，无法确认裁剪区间，回退到转码")
+            return None
+        if getattr(video, name):
+            return None
+    try:
+        source = video.get_stream_source()
+    except Exception as e:
+        logger.debug(f"[DataManager] 获取视频数据源失败: {e}")
+        return None
+    if isinstance(source, (str, io.BytesIO)):
+        return source
+    return None
+
+
+def is_remux_compatible(format: str, stream_codecs: List[tuple]) -> bool:
+    """判断一组音视频流是否可直接封装到目标容器
+
+    Args:
+        format: 目标容器格式（mp4, mov, mkv, webm, avi）
+        stream_codecs: [(流类型, 编码名)] 列表，如 [("video", "h264"), ("audio", "aac")]
+
+    Returns:
+        所有流都兼容且至少包含一个视频流时返回 True
+
+    Examples:
+        >>> is_remux_compatible("mp4", [("video", "h264"), ("audio", "aac")])
+        True
+
+        >>> is_remux_compatible("webm", [("video", "h264")])
+        False
+    """
+    allowed = REMUX_COMPATIBLE_CODECS.get(format.lower())
+    if allowed is None:
+        return False
+    if not any(kind == "video" for kind, _ in stream_codecs):
+        return False
+    return all(codec in allowed.get(kind, set()) for kind, codec in stream_codecs)
+
+
+def _rewind(source: VideoSource) -> None:
+    if isinstance(source, io.BytesIO):
+        source.seek(0)
+
+
+def probe_stream_codecs(source: VideoSource) -> List[tuple]:
+    """读取数据源中音视频流的编码（不解码）
+
+    Args:
+        source: 文件路径或 BytesIO
+
+    Returns:
+        [(流类型, 编码名)] 列表（忽略字幕、数据等其他流）
+    """
+    import av
+
+    _rewind(source)
+    with av.open(source, mode="r") as container:
+        return [
+            (stream.type, stream.codec_context.name)
+            for stream in container.streams
+            if stream.type in ("video", "audio")
+        ]
+
+
+def remux_video(source: VideoSource, file_path: str, format: str) -> Optional[str]:
+    """尝试不解码地保存视频（直通复制或按数据包封装转换）
+
+    Args:
+        source: 文件路径或 BytesIO
+        file_path: 目标文件路径（扩展名会被修正为 format）
+        format: 目标容器格式（mp4, mov, mkv, webm, avi）
+
+    Returns:
+        保存后的文件路径；编码与目标容器不兼容时返回 None，由调用方回退到转码
+
+    Raises:
+        ImportError: 需要封装转换但 PyAV 未安装
+    """
+    format = format.lower()
+    path = Path(file_path)
+    if path.suffix.lower() != f".{format}":
+        file_path = str(path.with_suffix(f".{format}"))
+    os.makedirs(Path(file_path).parent, exist_ok=True)
+
+    # 直通：源文件与目标格式相同，直接复制文件
+    if isinstance(source, str) and Path(source).suffix.lower().lstrip(".") == format:
+        if os.path.abspath(source) != os.path.abspath(file_path):
+            shutil.copy2(source, file_path)
+        logger.info(f"[DataManager] 视频直通复制: {source} -> {file_path}")
+        return file_path
+
+    try:
+        import av
+    except ImportError:
+        raise ImportError("PyAV (av) 未安装，无法封装转换视频。请运行: pip install av")
+
+    stream_codecs = probe_stream_codecs(source)
+    if not is_remux_compatible(format, stream_codecs):
+        logger.info(f"[DataManager] 编码 {stream_codecs} 与 {format} 容器不兼容，需要转码")
+        return None
+
+    _rewind(source)
+    try:
+        with av.open(source, mode="r") as input_container:
+            with av.open(file_path, mode="w") as output_container:
+                stream_map = {}
+                for stream in input_container.streams:
+                    if stream.type in ("video", "audio"):
+                        stream_map[stream.index] = output_container.add_stream_from_template(stream)
+
+                input_streams = [s for s in input_container.streams if s.index in stream_map]
+                for packet in input_container.demux(input_streams):
+                    # 分离器在流结束时产出的空包不能写入
+                    if packet.dts is None:
+                        continue
+                    packet.stream = stream_map[packet.stream.index]
+                    output_container.mux(packet)
+    except Exception:
+        # 封装失败时清理不完整的输出文件，由调用方回退到转码
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
+    logger.info(f"[DataManager] 视频封装转换完成: {stream_codecs} -> {file_path}")
+    return file_path
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""helpers/video_settings.py - 视频编码设置模块
+
+提供视频编码设置（preset、CRF/码率、线程数、GOP、像素格式），
+并将其转换为 imageio-ffmpeg 写入器参数
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# x264/x265 编码速度预设（从快到慢）
+VIDEO_PRESETS = [
+    "ultrafast",
+    "superfast",
+    "veryfast",
+    "faster",
+    "fast",
+    "medium",
+    "slow",
+    "slower",
+    "veryslow",
+]
+
+# 支持的像素格式（yuv420p 兼容性最好）
+VIDEO_PIXEL_FORMATS = ["yuv420p", "yuv422p", "yuv444p"]
+
+# 默认编码设置（与旧版 save_video 的输出一致：x264/x265 的 medium 即编码器默认值，
+# VP9 使用默认 preset 时不添加速度参数）
+#   crf < 0:     不使用 CRF，按 quality 参数编码
+#   bitrate "":  不限制码率
+#   threads 0:   由编码器自动决定线程数
+#   gop 0:       使用编码器默认关键帧间隔
+DEFAULT_VIDEO_SETTINGS: Dict[str, Any] = {
+    "preset": "medium",
+    "crf": -1,
+    "bitrate": "",
+    "threads": 0,
+    "gop": 0,
+    "pixel_format": "yuv420p",
+}
+
+# VP9 没有 x264 式的 preset，非默认 preset 按速度映射到 (deadline, cpu-used)
+_VP9_SPEED_MAP = {
+    "ultrafast": ("realtime", 8),
+    "superfast": ("realtime", 7),
+    "veryfast": ("realtime", 6),
+    "faster": ("good", 5),
+    "fast": ("good", 3),
+    "medium": ("good", 1),
+    "slow": ("good", 0),
+    "slower": ("best", 0),
+    "veryslow": ("best", 0),
+}
+
+# 旧版 save_video 使用的 quality 参数（未设置 CRF 和码率时使用）
+_DEFAULT_QUALITY = {"libvpx-vp9": 9}
+
+
+def resolve_video_settings(settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """合并默认设置并校验
+
+    Args:
+        settings: 用户设置（缺省项使用 DEFAULT_VIDEO_SETTINGS）
+
+    Returns:
+        完整的编码设置字典
+
+    Raises:
+        ValueError: preset 或像素格式不受支持
+    """
+    resolved = dict(DEFAULT_VIDEO_SETTINGS)
+    if settings:
+        resolved.update({k: v for k, v in settings.items() if v is not None})
+
+    if resolved["preset"] not in VIDEO_PRESETS:
+        raise ValueError(f"不支持的编码预设: {resolved['preset']}。支持的预设: {VIDEO_PRESETS}")
+    if resolved["pixel_format"] not in VIDEO_PIXEL_FORMATS:
+        raise ValueError(
+            f"不支持的像素格式: {resolved['pixel_format']}。支持的格式: {VIDEO_PIXEL_FORMATS}"
+        )
+
+    resolved["crf"] = int(resolved["crf"])
+    resolved["threads"] = max(0, int(resolved["threads"]))
+    resolved["gop"] = max(0, int(resolved["gop"]))
+    resolved["bitrate"] = str(resolved["bitrate"] or "").strip()
+    return resolved
+
+
+def build_video_writer_kwargs(
+    codec: str,
+    fps: float,
+    settings: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """根据编码设置生成 imageio.get_writer 参数
+
+    Args:
+        codec: FFmpeg 编码器名（libx264, libvpx-vp9, mpeg4 等）
+        fps: 帧率
+        settings: 编码设置（见 DEFAULT_VIDEO_SETTINGS）
+
+    Returns:
+        imageio.get_writer 的关键字参数
+
+    Examples:
+        >>> kwargs = build_video_writer_kwargs("libx264", 24, {"preset": "ultrafast", "crf": 23})
+        >>> kwargs["ffmpeg_params"]
+        ['-preset', 'ultrafast', '-crf', '23']
+    """
+    settings = resolve_video_settings(settings)
+
+    kwargs: Dict[str, Any] = {
+        "fps": float(fps),
+        "codec": codec,
+        "quality": _DEFAULT_QUALITY.get(codec, 8),  # 0-10, 10是最佳质量
+        "pixelformat": settings["pixel_format"],
+        "macro_block_size": 8,  # 避免尺寸不是16倍数的问题
+    }
+    ffmpeg_params: List[str] = []
+
+    # 速度预设
+    if codec in ("libx264", "libx265"):
+        ffmpeg_params += ["-preset", settings["preset"]]
+    elif codec == "libvpx-vp9":
+        # 默认 preset 不添加速度参数，保持与旧版 save_video 相同的编码器默认行为
+        if settings["preset"] != DEFAULT_VIDEO_SETTINGS["preset"]:
+            deadline, cpu_used = _VP9_SPEED_MAP[settings["preset"]]
+            ffmpeg_params += ["-deadline", deadline, "-cpu-used", str(cpu_used)]
+            if settings["threads"] != 1:
+                # VP9 默认单线程编码，开启行级多线程
+                ffmpeg_params += ["-row-mt", "1"]
+
+    # 码率控制：码率优先，其次 CRF，都未设置时使用 quality
+    if settings["bitrate"]:
+        kwargs["quality"] = None
+        kwargs["bitrate"] = settings["bitrate"]
+    elif settings["crf"] >= 0 and codec in ("libx264", "libx265", "libvpx-vp9"):
+        kwargs["quality"] = None
+        ffmpeg_params += ["-crf", str(settings["crf"])]
+        if codec == "libvpx-vp9":
+            # VP9 需要 -b:v 0 才是恒定质量模式
+            ffmpeg_params += ["-b:v", "0"]
+
+    if settings["threads"] > 0:
+        ffmpeg_params += ["-threads", str(settings["threads"])]
+    if settings["gop"] > 0:
+        ffmpeg_params += ["-g", str(settings["gop"])]
+
+    if ffmpeg_params:
+        kwargs["ffmpeg_params"] = ffmpeg_params
+    return kwargs
@@ -0,0 +1,504 @@
+# -*- coding: utf-8 -*-
+"""helpers/work_claim.py - 多实例认领文件模块
+
+多个 ComfyUI 实例（如多台机器上的多块 GPU）读取同一个共享目录（NFS/SMB）时，
+每个实例只处理自己认领的文件，不需要外部消息队列：
+- 认领：在源目录旁的 spool 目录（.<目录名>.dm_spool/<作业键>/）中以 O_CREAT | O_EXCL 创建认领文件，
+  同一文件只有一个实例能创建成功
+- 完成：保存成功后由保存端确认（complete_claimed_file / complete_claims），写入 done/ 标记并删除认领文件；
+  之后任何实例都不再认领该文件。后台写入在提交时取得认领（begin_claimed_write），
+  写入结束后凭该认领确认或释放（finish_claimed_write），不受之后的认领影响
+- 释放：再次认领时，上一批中没有确认完成、也没有写入任务在进行的文件（下游出错或取消）
+  释放后重新参与认领，不会被标记为完成
+- 租期：持有认领期间后台线程每隔租期的 1/3 刷新认领文件的 mtime；进程崩溃后刷新停止，
+  mtime 超过租期的认领视为过期，其他实例通过 rename 抢占后重新认领，rename 只有一个实例能成功
+- 同一实例 ID 在新进程中遇到自己遗留的认领时直接重新认领（上一个进程未完成）
+
+各实例的时钟需要同步（NTP）
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .batch_scanner import FileFilter, scan_window
+from .scan_cursor import cursor_key
+
+logger = logging.getLogger(__name__)
+
+
+# 默认租期（秒）
+DEFAULT_LEASE_SECONDS = 3600
+
+# spool 目录名后缀
+SPOOL_SUFFIX = ".dm_spool"
+
+_CLAIMS_DIR = "claims"
+_DONE_DIR = "done"
+
+# 刷新认领 mtime 的最短间隔（秒）
+_MIN_RENEW_INTERVAL = 1.0
+
+# 本进程认领且尚未完成的文件 {(spool 目录, 实例 ID): [相对路径]}
+_outstanding: Dict[Tuple[str, str], List[str]] = {}
+# 认领的源文件 {规范化的绝对路径: (spool 目录, 实例 ID, 相对路径)}，保存端据此确认完成
+_sources: Dict[str, Tuple[str, str, str]] = {}
+# 各 spool 的租期 {(spool 目录, 实例 ID): 秒}
+_leases: Dict[Tuple[str, str], float] = {}
+# 有后台写入任务在进行的认领 {(spool 目录, 实例 ID, 相对路径): 任务数}，再次认领时不释放
+_in_flight: Dict[Tuple[str, str, str], int] = {}
+# 有写入任务失败的认领（同一文件的全部任务结束后释放而不是完成）
+_failed_writes: set = set()
+_lock = threading.Lock()
+
+_renewer: Optional[threading.Thread] = None
+_renew_wakeup = threading.Event()
+
+
+def default_worker_id() -> str:
+    """默认实例 ID：主机名-进程号"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def get_spool_dir(
+    base_dir: str,
+    pattern: Union[str, Sequence[str]],
+    exclude: Union[str, Sequence[str], None] = None,
+) -> str:
+    """源目录和 include/exclude 组合对应的 spool 目录（与源目录同级的隐藏目录）"""
+    base = os.path.abspath(base_dir).rstrip("\\/")
+    parent, name = os.path.split(base)
+    root = (
+        os.path.join(base, SPOOL_SUFFIX)
+        if not name
+        else os.path.join(parent, f".{name}{SPOOL_SUFFIX}")
+    )
+    return os.path.join(root, cursor_key(pattern, exclude))
+
+
+def _item_name(rel_path: str) -> str:
+    """相对路径对应的认领/完成标记文件名"""
+    return hashlib.sha1(rel_path.replace(os.sep, "/").encode("utf-8")).hexdigest()
+
+
+def _read_claim(claim_path: str) -> Optional[dict]:
+    try:
+        with open(claim_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _create_claim(claim_path: str, rel_path: str, worker_id: str) -> bool:
+    """以 O_EXCL 创建认领文件，已存在或文件已完成时返回 False"""
+    try:
+        fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(
+            {"path": rel_path.replace(os.sep, "/"), "worker": worker_id, "claimed_at": time.time()},
+            f,
+        )
+
+    # 完成时先写 done 标记再删除认领文件：列出 done/ 之后才完成的文件，认领成功后在这里被发现
+    done_path = os.path.join(
+        os.path.dirname(os.path.dirname(claim_path)), _DONE_DIR, os.path.basename(claim_path)
+    )
+    if os.path.exists(done_path):
+        os.remove(claim_path)
+        return False
+    return True
+
+
+def _take_over(claim_path: str, rel_path: str, worker_id: str) -> bool:
+    """抢占过期或本实例遗留的认领：rename 成功的实例重新创建认领文件"""
+    tombstone = f"{claim_path}.{uuid.uuid4().hex}.stale"
+    try:
+        os.rename(claim_path, tombstone)
+    except OSError:
+        # 其他实例已抢占或已完成
+        return False
+    try:
+        os.remove(tombstone)
+    except OSError:
+        pass
+    return _create_claim(claim_path, rel_path, worker_id)
+
+
+def _source_key(file_path: str) -> str:
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def _forget(spool_dir: str, worker_id: str, rel_paths: Sequence[str]) -> None:
+    """从进程内记录中移除（调用方需持有 _lock）"""
+    key = (spool_dir, worker_id)
+    pending = _outstanding.get(key)
+    if pending:
+        finished = set(rel_paths)
+        pending[:] = [p for p in pending if p not in finished]
+        if not pending:
+            _outstanding.pop(key, None)
+            _leases.pop(key, None)
+    forgotten = set(rel_paths)
+    for source, (source_spool, source_worker, rel_path) in list(_sources.items()):
+        if source_spool == spool_dir and source_worker == worker_id and rel_path in forgotten:
+            _sources.pop(source, None)
+
+
+def _release(spool_dir: str, worker_id: str, rel_paths: Sequence[str]) -> int:
+    """删除本实例持有的认领文件（不写完成标记）"""
+    released = 0
+    for rel_path in rel_paths:
+        claim_path = os.path.join(spool_dir, _CLAIMS_DIR, _item_name(rel_path))
+        claim = _read_claim(claim_path)
+        if claim and claim.get("worker") == worker_id:
+            try:
+                os.remove(claim_path)
+                released += 1
+            except OSError:
+                pass
+    return released
+
+
+def _renew_loop() -> None:
+    """后台刷新本进程持有的认领文件的 mtime"""
+    while True:
+        with _lock:
+            held = [(key, list(paths)) for key, paths in _outstanding.items()]
+            interval = min(_leases.values(), default=DEFAULT_LEASE_SECONDS) / 3
+        _renew_wakeup.wait(max(_MIN_RENEW_INTERVAL, interval))
+        _renew_wakeup.clear()
+
+        for (spool_dir, worker_id), rel_paths in held:
+            lost = []
+            for rel_path in rel_paths:
+                claim_path = os.path.join(spool_dir, _CLAIMS_DIR, _item_name(rel_path))
+                claim = _read_claim(claim_path)
+                if claim is None or claim.get("worker") != worker_id:
+                    # 已完成、已释放或已被其他实例抢占
+                    lost.append(rel_path)
+                    continue
+                try:
+                    os.utime(claim_path, None)
+                except OSError:
+                    lost.append(rel_path)
+            if lost:
+                with _lock:
+                    _forget(spool_dir, worker_id, lost)
+
+
+def _ensure_renewer() -> None:
+    global _renewer
+    with _lock:
+        if _renewer is None or not _renewer.is_alive():
+            _renewer = threading.Thread(
+                target=_renew_loop, name="DataManagerClaimRenewer", daemon=True
+            )
+            _renewer.start()
+    # 新的租期可能更短，立即重新计算刷新间隔
+    _renew_wakeup.set()
+
+
+def claim_files(
+    base_dir: str,
+    pattern: Union[str, Sequence[str]],
+    worker_id: Optional[str] = None,
+    limit: int = 0,
+    exclude: Union[str, Sequence[str], None] = None,
+    file_filter: Optional[FileFilter] = None,
+    order_by: str = "name",
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+) -> List[str]:
+    """认领最多 limit 个尚未完成、未被其他实例认领的文件（相对路径，与 scan_files 一致使用 os.sep）
+
+    本进程上一次认领、但保存端没有确认完成的文件先释放（下游出错或被取消），
+    与其他文件一起重新参与认领，不会被标记为完成
+
+    Args:
+        base_dir: 源目录
+        pattern: glob 模式，多个模式以 ; 分隔或传入列表
+        worker_id: 实例 ID（默认 主机名-进程号）
+        limit: 最多认领的文件数（0 表示全部可认领的文件）
+        exclude: 排除模式
+        file_filter: 元数据过滤条件
+        order_by: 认领顺序（"name" / "mtime" / "size"）
+        lease_seconds: 租期（秒），持有期间每隔租期的 1/3 刷新；进程退出后超过租期的认领可被其他实例抢占
+
+    Returns:
+        本次认领的相对路径列表
+
+    Raises:
+        FileNotFoundError: 如果 base_dir 不存在
+        ValueError: 如果 base_dir 不是目录或模式无效
+    """
+    worker_id = worker_id or default_worker_id()
+    spool_dir = get_spool_dir(base_dir, pattern, exclude)
+    claims_dir = os.path.join(spool_dir, _CLAIMS_DIR)
+    done_dir = os.path.join(spool_dir, _DONE_DIR)
+
+    with _lock:
+        previous = _outstanding.pop((spool_dir, worker_id), [])
+        _leases.pop((spool_dir, worker_id), None)
+        # 写入任务仍在进行的文件继续持有，由任务结束时确认或释放
+        writing = [p for p in previous if (spool_dir, worker_id, p) in _in_flight]
+        unconfirmed = [p for p in previous if (spool_dir, worker_id, p) not in _in_flight]
+        _forget(spool_dir, worker_id, unconfirmed)
+    if unconfirmed:
+        released = _release(spool_dir, worker_id, unconfirmed)
+        logger.warning(
+            f"[DataManager] 上一批有 {released} 个文件未确认完成，已释放认领: worker={worker_id}"
+        )
+
+    rel_paths, _ = scan_window(
+        base_dir, pattern, order_by=order_by, exclude=exclude, file_filter=file_filter
+    )
+    os.makedirs(claims_dir, exist_ok=True)
+    os.makedirs(done_dir, exist_ok=True)
+
+    # 每次运行只列出一次 spool 目录，已完成和已认领的文件不再逐个尝试
+    done = set(os.listdir(done_dir))
+    claimed = {name for name in os.listdir(claims_dir) if not name.endswith(".stale")}
+    now = time.time()
+
+    stats = {"taken_over": 0, "busy": 0}
+    result = []
+    for rel_path in rel_paths:
+        if limit > 0 and len(result) >= limit:
+            break
+        name = _item_name(rel_path)
+        if name in done or rel_path in writing:
+            continue
+        claim_path = os.path.join(claims_dir, name)
+        if name not in claimed and _create_claim(claim_path, rel_path, worker_id):
+            result.append(rel_path)
+            continue
+
+        # 已被认领：检查是否过期或为本实例遗留
+        try:
+            mtime = os.stat(claim_path).st_mtime
+        except FileNotFoundError:
+            # 刚被完成或释放
+            if _create_claim(claim_path, rel_path, worker_id):
+                result.append(rel_path)
+            continue
+        claim = _read_claim(claim_path) or {}
+        if now - mtime > lease_seconds or claim.get("worker") == worker_id:
+            if _take_over(claim_path, rel_path, worker_id):
+                stats["taken_over"] += 1
+                result.append(rel_path)
+                continue
+        stats["busy"] += 1
+
+    with _lock:
+        held = writing + result
+        if held:
+            _outstanding[(spool_dir, worker_id)] = held
+            _leases[(spool_dir, worker_id)] = lease_seconds
+        for rel_path in result:
+            _sources[_source_key(os.path.join(base_dir, rel_path))] = (
+                spool_dir,
+                worker_id,
+                rel_path,
+            )
+    if held:
+        _ensure_renewer()
+
+    logger.info(
+        f"[DataManager] 认领完成: base_dir={base_dir}, worker={worker_id}, claimed={len(result)}, "
+        f"taken_over={stats['taken_over']}, busy={stats['busy']}, done={len(done)}"
+    )
+    return result
+
+
+def complete_claims(
+    base_dir: str,
+    pattern: Union[str, Sequence[str]],
+    worker_id: Optional[str] = None,
+    rel_paths: Optional[Sequence[str]] = None,
+    exclude: Union[str, Sequence[str], None] = None,
+) -> int:
+    """将认领的文件标记为完成（应在文件处理结果保存成功后调用）
+
+    Args:
+        base_dir: 源目录
+        pattern: glob 模式
+        worker_id: 实例 ID（默认 主机名-进程号）
+        rel_paths: 要标记的相对路径（None 表示本进程上一次认领的全部文件）
+        exclude: 排除模式
+
+    Returns:
+        标记为完成的文件数
+    """
+    worker_id = worker_id or default_worker_id()
+    spool_dir = get_spool_dir(base_dir, pattern, exclude)
+    with _lock:
+        if rel_paths is None:
+            rel_paths = list(_outstanding.get((spool_dir, worker_id), []))
+        _forget(spool_dir, worker_id, rel_paths)
+    return _complete(spool_dir, worker_id, rel_paths)
+
+
+def complete_claimed_file(file_path: str) -> bool:
+    """保存端确认：将本进程认领的源文件标记为完成
+
+    Args:
+        file_path: 源文件路径（claim_files 输出的文件，绝对路径或相对当前目录）
+
+    Returns:
+        该文件由本进程认领且成功标记为完成时返回 True；不是认领的文件时返回 False
+    """
+    with _lock:
+        entry = _sources.get(_source_key(file_path))
+        if entry is None:
+            return False
+        spool_dir, worker_id, rel_path = entry
+        _forget(spool_dir, worker_id, [rel_path])
+    return _complete(spool_dir, worker_id, [rel_path]) == 1
+
+
+def begin_claimed_write(file_path: str) -> Optional[Tuple[str, str, str]]:
+    """后台写入提交时取得源文件的认领
+
+    写入任务进行期间再次认领不会释放该文件，任务结束后调用 finish_claimed_write
+
+    Args:
+        file_path: 源文件路径（claim_files 输出的文件）
+
+    Returns:
+        认领 (spool 目录, 实例 ID, 相对路径)；不是本进程认领的文件时返回 None
+    """
+    with _lock:
+        entry = _sources.get(_source_key(file_path))
+        if entry is not None:
+            _in_flight[entry] = _in_flight.get(entry, 0) + 1
+        return entry
+
+
+def finish_claimed_write(claim: Tuple[str, str, str], success: bool) -> bool:
+    """后台写入结束：成功时将认领的文件标记为完成，失败时释放认领
+
+    Args:
+        claim: begin_claimed_write 返回的认领
+        success: 写入是否全部成功
+
+    Returns:
+        标记为完成时返回 True
+    """
+    spool_dir, worker_id, rel_path = claim
+    with _lock:
+        if not success:
+            _failed_writes.add(claim)
+        remaining = _in_flight.get(claim, 0) - 1
+        if remaining > 0:
+            # 同一文件还有其他写入任务在进行，全部结束后再确认
+            _in_flight[claim] = remaining
+            return False
+        _in_flight.pop(claim, None)
+        success = claim not in _failed_writes
+        _failed_writes.discard(claim)
+        _forget(spool_dir, worker_id, [rel_path])
+    if success:
+        return _complete(spool_dir, worker_id, [rel_path]) == 1
+    _release(spool_dir, worker_id, [rel_path])
+    return False
+
+
+def _complete(spool_dir: str, worker_id: str, rel_paths: Sequence[str]) -> int:
+    """写入完成标记并删除认领文件，返回标记为完成的文件数"""
+    completed = 0
+    for rel_path in rel_paths:
+        name = _item_name(rel_path)
+        claim_path = os.path.join(spool_dir, _CLAIMS_DIR, name)
+        claim = _read_claim(claim_path)
+        if claim is None or claim.get("worker") != worker_id:
+            # 租期过期后已被其他实例抢占
+            logger.warning(f"[DataManager] 认领已失效，跳过完成标记: {rel_path}")
+            continue
+        try:
+            with open(os.path.join(spool_dir, _DONE_DIR, name), "w", encoding="utf-8") as f:
+                f.write(rel_path.replace(os.sep, "/"))
+            os.remove(claim_path)
+            completed += 1
+        except OSError as e:
+            logger.warning(f"[DataManager] 写入完成标记失败: {rel_path}, {e}")
+    return completed
+
+
+def release_claims(
+    base_dir: str,
+    pattern: Union[str, Sequence[str]],
+    worker_id: Optional[str] = None,
+    exclude: Union[str, Sequence[str], None] = None,
+) -> int:
+    """释放本实例的所有认领（不标记完成），其他实例可立即重新认领
+
+    Returns:
+        释放的认领数
+    """
+    worker_id = worker_id or default_worker_id()
+    spool_dir = get_spool_dir(base_dir, pattern, exclude)
+    claims_dir = os.path.join(spool_dir, _CLAIMS_DIR)
+    with _lock:
+        _forget(spool_dir, worker_id, list(_outstanding.get((spool_dir, worker_id), [])))
+
+    released = 0
+    try:
+        names = os.listdir(claims_dir)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        claim_path = os.path.join(claims_dir, name)
+        claim = _read_claim(claim_path)
+        if claim and claim.get("worker") == worker_id:
+            try:
+                os.remove(claim_path)
+                released += 1
+            except OSError:
+                pass
+    return released
+
+
+def get_spool_stats(
+    base_dir: str,
+    pattern: Union[str, Sequence[str]],
+    exclude: Union[str, Sequence[str], None] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+) -> dict:
+    """获取认领进度：已完成数、各实例正在处理的数量及过期认领数"""
+    spool_dir = get_spool_dir(base_dir, pattern, exclude)
+    claims_dir = os.path.join(spool_dir, _CLAIMS_DIR)
+    done_dir = os.path.join(spool_dir, _DONE_DIR)
+
+    stats = {"spool_dir": spool_dir, "done": 0, "claimed": 0, "stale": 0, "workers": {}}
+    try:
+        stats["done"] = len(os.listdir(done_dir))
+    except FileNotFoundError:
+        pass
+    try:
+        names = os.listdir(claims_dir)
+    except FileNotFoundError:
+        return stats
+
+    now = time.time()
+    for name in names:
+        if name.endswith(".stale"):
+            continue
+        claim_path = os.path.join(claims_dir, name)
+        try:
+            mtime = os.stat(claim_path).st_mtime
+        except OSError:
+            continue
+        claim = _read_claim(claim_path) or {}
+        worker = claim.get("worker", "unknown")
+        stats["claimed"] += 1
+        stats["workers"][worker] = stats["workers"].get(worker, 0) + 1
+        if now - mtime > lease_seconds:
+            stats["stale"] += 1
+    return stats
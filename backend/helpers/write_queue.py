@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""helpers/write_queue.py - 后台异步写入队列模块
+
+提供有界的后台写入队列：保存节点将编码/写入任务交给后台线程后立即返回任务 ID，
+队列满时提交方阻塞等待（背压），任务状态可通过 get_job 查询
+"""
+
+import os
+import uuid
+import queue
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# 队列中最多等待的写入任务数（超过时提交方阻塞，避免未写入的缓冲区无限堆积）
+DEFAULT_QUEUE_SIZE = 64
+
+# 后台写入线程数（PIL/FFmpeg 编码时释放 GIL，少量线程即可与采样重叠）
+DEFAULT_WRITER_COUNT = max(1, min(4, os.cpu_count() or 1))
+
+# 保留的已结束任务记录数（超出时按创建顺序清理最早的记录）
+MAX_FINISHED_JOBS = 256
+
+# 任务记录 {job_id: {"id", "status", "total", "completed", "failed", "bytes_written", ...}}
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+
+# 任务完成事件 {job_id: threading.Event}
+_job_events: Dict[str, threading.Event] = {}
+
+# 任务结束后执行的回调 {job_id: callable(任务快照)}
+_job_callbacks: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+_queue: Optional[queue.Queue] = None
+_writers: List[threading.Thread] = []
+_start_lock = threading.Lock()
+
+
+def _ensure_writers() -> queue.Queue:
+    """按需创建写入队列并启动后台写入线程"""
+    global _queue
+
+    with _start_lock:
+        if _queue is None:
+            _queue = queue.Queue(maxsize=DEFAULT_QUEUE_SIZE)
+
+        alive = [t for t in _writers if t.is_alive()]
+        for i in range(len(alive), DEFAULT_WRITER_COUNT):
+            thread = threading.Thread(
+                target=_writer_loop, args=(_queue,), name=f"DataManagerWriter-{i}", daemon=True
+            )
+            thread.start()
+            alive.append(thread)
+        _writers[:] = alive
+
+        return _queue
+
+
+def _prune_finished_jobs() -> None:
+    """清理超出保留数量的已结束任务记录（调用方需持有 _jobs_lock）"""
+    finished = [job_id for job_id, job in _jobs.items() if job["finished_at"] is not None]
+    for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        _jobs.pop(job_id, None)
+        _job_events.pop(job_id, None)
+        _job_callbacks.pop(job_id, None)
+
+
+def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+    """任务记录的快照（调用方需持有 _jobs_lock）"""
+    snapshot = dict(job)
+    snapshot["saved_paths"] = list(job["saved_paths"])
+    snapshot["errors"] = list(job["errors"])
+    return snapshot
+
+
+def _finish_task(job_id: str) -> Optional[Tuple[Callable[[Dict[str, Any]], Any], Dict[str, Any]]]:
+    """在一个写入任务结束后更新任务状态（调用方需持有 _jobs_lock）
+
+    Returns:
+        任务全部结束且有回调时返回 (回调, 任务快照)（调用方在释放锁后执行）
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        return None
+
+    if job["completed"] + job["failed"] < job["total"]:
+        job["status"] = "running"
+        return None
+
+    if job["failed"] == 0:
+        job["status"] = "success"
+    elif job["completed"] == 0:
+        job["status"] = "error"
+    else:
+        job["status"] = "partial"
+    job["finished_at"] = datetime.now().isoformat()
+
+    logger.info(
+        f"[DataManager] 异步写入任务完成: id={job_id}, status={job['status']}, "
+        f"completed={job['completed']}/{job['total']}, bytes={job['bytes_written']}"
+    )
+
+    callback = _job_callbacks.pop(job_id, None)
+    if callback is not None:
+        # 完成事件在回调执行后再设置，wait_for_job 返回时回调已经结束
+        return callback, _snapshot(job)
+
+    event = _job_events.get(job_id)
+    if event is not None:
+        event.set()
+    return None
+
+
+def _run_callback(
+    job_id: str, pending: Optional[Tuple[Callable[[Dict[str, Any]], Any], Dict[str, Any]]]
+) -> None:
+    """执行任务结束回调并设置完成事件"""
+    if pending is None:
+        return
+    callback, snapshot = pending
+    try:
+        callback(snapshot)
+    except Exception as e:
+        logger.error(f"[DataManager] 异步写入完成回调失败: id={job_id}, error={e}")
+    with _jobs_lock:
+        event = _job_events.get(job_id)
+    if event is not None:
+        event.set()
+
+
+def _writer_loop(task_queue: queue.Queue) -> None:
+    """后台写入线程主循环"""
+    while True:
+        job_id, index, func, args = task_queue.get()
+        pending = None
+        try:
+            saved_path = func(*args)
+            size = sum(
+                os.path.getsize(path)
+                for path in (saved_path if isinstance(saved_path, list) else [saved_path])
+                if path and os.path.isfile(path)
+            )
+            with _jobs_lock:
+                job = _jobs.get(job_id)
+                if job is not None:
+                    job["saved_paths"][index] = saved_path
+                    job["completed"] += 1
+                    job["bytes_written"] += size
+                    pending = _finish_task(job_id)
+        except Exception as e:
+            logger.error(f"[DataManager] 异步写入失败: id={job_id}, index={index}, error={e}")
+            with _jobs_lock:
+                job = _jobs.get(job_id)
+                if job is not None:
+                    job["failed"] += 1
+                    job["errors"].append({"index": index, "error": str(e)})
+                    pending = _finish_task(job_id)
+        finally:
+            _run_callback(job_id, pending)
+            task_queue.task_done()
+
+
+def submit_write_job(
+    func: Callable[..., Union[str, List[str], None]],
+    tasks: Sequence[tuple],
+    metadata: Optional[Dict[str, Any]] = None,
+    on_finish: Optional[Callable[[Dict[str, Any]], Any]] = None,
+) -> str:
+    """提交一组写入任务到后台队列
+
+    每个任务在后台线程中以 func(*task) 的形式执行，func 应返回保存后的文件路径
+    （一个任务保存为多个文件时返回路径列表，saved_paths 中对应项为该列表）。
+    队列已满时本函数阻塞，直到后台线程腾出空间（背压）。
+
+    Args:
+        func: 保存函数（如 save_image）
+        tasks: 参数元组列表，调用方应传入不会被后续修改的缓冲区（如 uint8 数组）
+        metadata: 附加到任务记录中的信息（如 target_path、format）
+        on_finish: 全部任务结束后（无论成功与否）在后台线程中执行的回调，参数为任务状态快照
+            （见 get_job，status 为 success 时全部写入成功）
+
+    Returns:
+        任务 ID
+
+    Examples:
+        >>> job_id = submit_write_job(save_image, [(frame, "out/a.png", "png")])
+        >>> wait_for_job(job_id)
+        True
+    """
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id,
+        "status": "queued",
+        "total": len(tasks),
+        "completed": 0,
+        "failed": 0,
+        "bytes_written": 0,
+        "saved_paths": [None] * len(tasks),
+        "errors": [],
+        "created_at": datetime.now().isoformat(),
+        "finished_at": None,
+    }
+    if metadata:
+        job.update({k: v for k, v in metadata.items() if k not in job})
+
+    event = threading.Event()
+    with _jobs_lock:
+        _jobs[job_id] = job
+        _job_events[job_id] = event
+        _prune_finished_jobs()
+
+        # 空任务直接结束
+        pending = None
+        if not tasks:
+            job["status"] = "success"
+            job["finished_at"] = job["created_at"]
+            if on_finish is None:
+                event.set()
+            else:
+                pending = (on_finish, _snapshot(job))
+        elif on_finish is not None:
+            _job_callbacks[job_id] = on_finish
+
+    if not tasks:
+        _run_callback(job_id, pending)
+        return job_id
+
+    task_queue = _ensure_writers()
+    for index, args in enumerate(tasks):
+        task_queue.put((job_id, index, func, tuple(args)))
+
+    logger.info(f"[DataManager] 异步写入任务已提交: id={job_id}, tasks={len(tasks)}")
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """获取任务状态快照
+
+    Args:
+        job_id: 任务 ID
+
+    Returns:
+        任务信息字典（不存在时返回 None），包含 status（queued / running / success / partial / error）、
+        total、completed、failed、bytes_written、saved_paths、errors 等字段
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        return _snapshot(job)
+
+
+def wait_for_job(job_id: str, timeout: Optional[float] = None) -> bool:
+    """等待任务结束
+
+    Args:
+        job_id: 任务 ID
+        timeout: 超时时间（秒），None 表示一直等待
+
+    Returns:
+        任务在超时前结束返回 True，否则返回 False（任务不存在时返回 False）
+    """
+    with _jobs_lock:
+        event = _job_events.get(job_id)
+    if event is None:
+        return False
+    return event.wait(timeout)
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""音频写入基准测试
+
+对比旧版 save_audio 的写入方式（1024 采样逐帧构造 AudioFrame）与 write_audio
+（WAV/FLAC 直写 PCM，有损格式大帧编码）的吞吐量（秒音频/秒）。
+
+依赖: av（可选 soundfile，用于 FLAC 直写）
+
+用法:
+    python backend/tests/tools/benchmark_audio_writer.py
+    python backend/tests/tools/benchmark_audio_writer.py --seconds 600 --formats wav flac
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "backend" / "helpers"))
+
+from audio_writer import AUDIO_CODECS, DEFAULT_AUDIO_FRAME_SIZE, write_audio
+
+
+def legacy_write(waveform_np: np.ndarray, sample_rate: int, file_path: str, format: str) -> None:
+    """旧版 save_audio 的写入方式"""
+    import av
+
+    if np.abs(waveform_np).max() > 1.0:
+        waveform_np = waveform_np / np.abs(waveform_np).max()
+
+    num_channels, num_samples = waveform_np.shape
+    interleaved_data = waveform_np.T.flatten()
+    layout = "mono" if num_channels == 1 else "stereo"
+
+    output_container = av.open(file_path, mode="w")
+    stream = output_container.add_stream(AUDIO_CODECS[format], rate=sample_rate)
+    if format == "mp3":
+        stream.codec_context.qscale = 2
+
+    frame_size = 1024
+    for i in range(0, num_samples, frame_size):
+        start = i * num_channels
+        end = (i + frame_size) * num_channels
+        frame_data = interleaved_data[start:end].reshape(1, -1)
+        frame = av.AudioFrame.from_ndarray(frame_data, format="flt", layout=layout)
+        frame.sample_rate = sample_rate
+        for packet in stream.encode(frame):
+            output_container.mux(packet)
+    for packet in stream.encode():
+        output_container.mux(packet)
+    output_container.close()
+
+
+def measure(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="音频写入基准测试")
+    parser.add_argument("--seconds", type=float, default=120.0, help="测试音频时长（秒）")
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--channels", type=int, default=2, choices=[1, 2])
+    parser.add_argument(
+        "--formats", nargs="+", default=["wav", "flac", "mp3", "ogg"], choices=list(AUDIO_CODECS)
+    )
+    parser.add_argument("--frame-size", type=int, default=DEFAULT_AUDIO_FRAME_SIZE)
+    args = parser.parse_args()
+
+    try:
+        import av  # noqa: F401
+    except ImportError:
+        print("PyAV 未安装，请运行: pip install av")
+        return False
+
+    num_samples = int(args.seconds * args.sample_rate)
+    t = np.arange(num_samples, dtype=np.float32) / args.sample_rate
+    waveform = np.stack(
+        [0.5 * np.sin(2 * np.pi * 220 * (c + 1) * t) for c in range(args.channels)]
+    ).astype(np.float32)
+
+    print("\n" + "=" * 72)
+    print("音频写入基准测试")
+    print("=" * 72)
+    print(
+        f"时长: {args.seconds:.0f}s, 采样率: {args.sample_rate}, 声道: {args.channels}, "
+        f"帧长: {args.frame_size}"
+    )
+
+    print(f"\n{'格式':<8}{'旧版(s)':>12}{'新版(s)':>12}{'旧版(x实时)':>16}{'新版(x实时)':>16}")
+    print("-" * 72)
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            legacy_path = os.path.join(tmp, f"legacy.{fmt}")
+            new_path = os.path.join(tmp, f"new.{fmt}")
+            try:
+                legacy_time = measure(legacy_write, waveform, args.sample_rate, legacy_path, fmt)
+                new_time = measure(
+                    write_audio, waveform, args.sample_rate, new_path, fmt, args.frame_size
+                )
+            except Exception as e:
+                print(f"{fmt:<8}跳过: {e}")
+                continue
+            print(
+                f"{fmt:<8}{legacy_time:>12.3f}{new_time:>12.3f}"
+                f"{args.seconds / legacy_time:>16.1f}{args.seconds / new_time:>16.1f}"
+            )
+    print("-" * 72)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
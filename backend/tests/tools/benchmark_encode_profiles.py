@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""图像编码配置基准测试
+
+对每个编码配置（fastest / balanced / smallest）× 图像格式，
+统计编码吞吐量（MB/s，按未压缩 RGB 数据量计算）和平均每张图像字节数。
+
+用法:
+    python backend/tests/tools/benchmark_encode_profiles.py
+    python backend/tests/tools/benchmark_encode_profiles.py --size 1024 --formats png webp
+"""
+
+import io
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "backend" / "helpers"))
+
+from encode_profiles import ENCODE_PROFILE_NAMES, get_image_save_kwargs
+
+# 格式名 -> PIL 格式名
+FORMATS = {"png": "PNG", "jpg": "JPEG", "webp": "WEBP", "tiff": "TIFF"}
+
+
+def make_test_images(count: int, size: int) -> list:
+    """生成接近真实生成图像的测试数据（平滑渐变 + 轻微噪声）"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    images = []
+    for i in range(count):
+        phase = i / max(count, 1)
+        base = np.stack(
+            [
+                np.sin((x + phase) * 6.0),
+                np.cos((y - phase) * 4.0),
+                np.sin((x + y) * 3.0 + phase),
+            ],
+            axis=-1,
+        )
+        noise = rng.normal(0, 0.01, base.shape).astype(np.float32)
+        arr = np.clip((base * 0.5 + 0.5 + noise) * 255, 0, 255).astype(np.uint8)
+        images.append(Image.fromarray(arr, "RGB"))
+    return images
+
+
+def benchmark(images: list, pil_format: str, profile: str) -> dict:
+    """对一组图像执行编码并统计结果"""
+    save_kwargs = get_image_save_kwargs(pil_format, profile)
+    raw_bytes = 0
+    encoded_bytes = 0
+
+    start = time.perf_counter()
+    for img in images:
+        buffer = io.BytesIO()
+        img.save(buffer, pil_format, **save_kwargs)
+        encoded_bytes += buffer.tell()
+        raw_bytes += img.width * img.height * 3
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mb_per_s": raw_bytes / (1024 * 1024) / elapsed if elapsed > 0 else float("inf"),
+        "bytes_per_image": encoded_bytes / len(images),
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图像编码配置基准测试")
+    parser.add_argument("--count", type=int, default=8, help="每组测试的图像数量")
+    parser.add_argument("--size", type=int, default=1024, help="测试图像边长（像素）")
+    parser.add_argument(
+        "--formats", nargs="+", default=list(FORMATS.keys()), choices=list(FORMATS.keys())
+    )
+    args = parser.parse_args()
+
+    print("\n" + "=" * 72)
+    print("图像编码配置基准测试")
+    print("=" * 72)
+    print(f"图像数量: {args.count}, 尺寸: {args.size}x{args.size} RGB")
+
+    images = make_test_images(args.count, args.size)
+
+    print(f"\n{'格式':<8}{'配置':<12}{'MB/s':>12}{'字节/张':>16}{'耗时(s)':>12}")
+    print("-" * 72)
+    for fmt in args.formats:
+        pil_format = FORMATS[fmt]
+        for profile in ENCODE_PROFILE_NAMES:
+            result = benchmark(images, pil_format, profile)
+            print(
+                f"{fmt:<8}{profile:<12}{result['mb_per_s']:>12.1f}"
+                f"{result['bytes_per_image']:>16,.0f}{result['seconds']:>12.2f}"
+            )
+        print("-" * 72)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Latent 读写基准测试
+
+对比旧版 pickle 格式与 safetensors 格式（内存映射）的 .latent 冷加载耗时和峰值内存（RSS）。
+每种加载方式在独立子进程中执行，加载前通过 posix_fadvise 清除文件的页缓存。
+
+加载方式:
+    pickle        旧版 pickle.load，整体反序列化
+    mmap_open     safetensors 内存映射打开，不访问数据
+    mmap_full     safetensors 内存映射并访问全部数据
+    mmap_sample   safetensors 只读取批次中的第 0 个样本
+
+依赖: numpy（可选 torch，使用 torch 张量测试）
+
+用法:
+    python backend/tests/tools/benchmark_latent_io.py
+    python backend/tests/tools/benchmark_latent_io.py --size-gb 4 --batch 16
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "backend" / "helpers"))
+
+from latent_io import load_latent_file, save_latent_file
+
+MODES = ["pickle", "mmap_open", "mmap_full", "mmap_sample"]
+
+
+def _drop_page_cache(file_path: str) -> None:
+    """清除文件的页缓存，模拟冷加载（不支持的平台上忽略）"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _peak_rss_mb() -> float:
+    """当前进程的峰值 RSS（MB）
+
+    Linux 上读取 VmHWM（ru_maxrss 会继承父进程 fork 时的峰值，子进程测量不准确）
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # macOS 上 ru_maxrss 单位为字节，其他平台为 KB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode: str, file_path: str) -> None:
+    """子进程：执行一次加载并输出耗时和峰值内存"""
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "pickle":
+        with open(file_path, "rb") as f:
+            latent = pickle.load(f)
+        checksum = float(latent["samples"].sum())
+    elif mode == "mmap_open":
+        latent = load_latent_file(file_path)
+        checksum = 0.0
+    elif mode == "mmap_full":
+        latent = load_latent_file(file_path)
+        checksum = float(latent["samples"].sum())
+    else:
+        latent = load_latent_file(file_path, index=0)
+        checksum = float(latent["samples"].sum())
+    elapsed = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "time": elapsed,
+                "rss_mb": _peak_rss_mb() - baseline,
+                "shape": list(latent["samples"].shape),
+                "checksum": checksum,
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latent 读写基准测试")
+    parser.add_argument("--size-gb", type=float, default=1.0, help="Latent 数据大小（GB）")
+    parser.add_argument("--batch", type=int, default=8, help="批次大小")
+    parser.add_argument("--frames", type=int, default=32, help="视频 latent 帧数")
+    parser.add_argument("--channels", type=int, default=16, help="latent 通道数")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return True
+
+    # 按目标大小计算空间尺寸：[B, C, T, H, W] float32
+    per_pixel = args.batch * args.channels * args.frames * 4
+    side = max(8, int((args.size_gb * 1024**3 / per_pixel) ** 0.5))
+    shape = (args.batch, args.channels, args.frames, side, side)
+    size_gb = np.prod(shape) * 4 / 1024**3
+
+    try:
+        import torch
+
+        samples = torch.randn(shape)
+    except ImportError:
+        samples = np.random.default_rng(0).standard_normal(shape, dtype=np.float32)
+
+    print("\n" + "=" * 72)
+    print("Latent 读写基准测试")
+    print("=" * 72)
+    print(f"形状: {shape}, 大小: {size_gb:.2f} GB, 张量: {type(samples).__module__}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, "legacy.latent")
+        safetensors_path = os.path.join(tmp, "new.latent")
+
+        start = time.perf_counter()
+        with open(pickle_path, "wb") as f:
+            pickle.dump({"samples": samples}, f)
+        pickle_save = time.perf_counter() - start
+
+        start = time.perf_counter()
+        save_latent_file({"samples": samples}, safetensors_path)
+        safetensors_save = time.perf_counter() - start
+        del samples
+
+        print(f"\n保存耗时: pickle {pickle_save:.3f}s, safetensors {safetensors_save:.3f}s")
+        print(f"\n{'加载方式':<16}{'耗时(s)':>12}{'峰值内存(MB)':>18}{'输出形状':>28}")
+        print("-" * 72)
+        for mode in MODES:
+            file_path = pickle_path if mode == "pickle" else safetensors_path
+            _drop_page_cache(file_path)
+            result = subprocess.run(
+                [sys.executable, __file__, "--child", mode, file_path],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                print(f"{mode:<16}失败: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:<16}{stats['time']:>12.3f}{stats['rss_mb']:>18.1f}"
+                f"{str(tuple(stats['shape'])):>28}"
+            )
+        print("-" * 72)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""命名规则基准测试
+
+生成大量文件名（默认 1,000,000 个），对比三种实现的耗时：
+    legacy     原有实现：每个文件重新解析规则（re.search/re.sub + str.format），取 datetime.now() 和 uuid4
+    per-call   generate_name：逐个调用，复用缓存的编译规则
+    compiled   compile_naming_rule(...).names()：整批一次生成
+
+另外测量 reserve_paths 在已有同名文件的目录中预占文件名的耗时
+
+依赖: 无（仅标准库）
+
+用法:
+    python backend/tests/tools/benchmark_naming.py
+    python backend/tests/tools/benchmark_naming.py --names 100000 --reserve 10000
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.batch_namer import compile_naming_rule, generate_name, reserve_paths
+
+RULES = [
+    "result_{index:04d}",
+    "{original_name}_{index:05d}",
+    "{original_path}/{datetime}_{index:06d}",
+    "{uuid}",
+]
+
+ORIGINAL_PATH = "/data/input/batch_01/photo.jpg"
+
+
+def legacy_generate_name(naming_rule: str, index: int, original_path: str, output_ext: str) -> str:
+    """原有实现（每次调用重新解析规则，目录部分不格式化）"""
+    path = Path(original_path)
+    original_info = {
+        "name": path.stem,
+        "ext_without_dot": path.suffix.lstrip("."),
+        "parent": path.parent.name,
+    }
+    if "/" in naming_rule:
+        dir_part, name_part = naming_rule.rsplit("/", 1)
+    else:
+        dir_part, name_part = "", naming_rule
+
+    values = {
+        "index": index + 1,
+        "original_name": original_info["name"],
+        "original_ext": original_info["ext_without_dot"],
+        "original_path": original_info["parent"],
+    }
+    now = datetime.now()
+    values.update(
+        {
+            "timestamp": int(now.timestamp()),
+            "datetime": now.strftime("%Y%m%d_%H%M%S"),
+            "date": now.strftime("%Y%m%d"),
+            "time": now.strftime("%H%M%S"),
+        }
+    )
+    import uuid
+
+    values["uuid"] = str(uuid.uuid4())[:8]
+
+    if re.search(r"\{[^}]*:[^}]*\}", name_part):
+        match = re.search(r"\{([^}]*):([^}]*)\}", name_part)
+        if match:
+            value = values.get(match.group(1).strip() or "index", index)
+            name_part = re.sub(r"\{[^}]*:[^}]*\}", f"{value:{match.group(2)}}", name_part, count=1)
+    filename = name_part.format(**values)
+    if not filename.lower().endswith(f".{output_ext}"):
+        filename = f"{filename}.{output_ext}"
+    result = os.path.join(dir_part, filename) if dir_part else filename
+    return result.replace("\\", "/")
+
+
+def _time(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="命名规则基准测试")
+    parser.add_argument("--names", type=int, default=1_000_000, help="生成的文件名数")
+    parser.add_argument("--reserve", type=int, default=100_000, help="预占的文件名数（0 表示跳过）")
+    args = parser.parse_args()
+    count = args.names
+
+    print("\n" + "=" * 78)
+    print(f"命名规则基准测试（{count} 个文件名）")
+    print("=" * 78)
+    print(f"{'规则':<40}{'legacy(s)':>10}{'per-call(s)':>13}{'compiled(s)':>13}{'加速':>8}")
+    print("-" * 78)
+
+    for naming_rule in RULES:
+        legacy_time, _ = _time(
+            lambda: [
+                legacy_generate_name(naming_rule, i, ORIGINAL_PATH, "png") for i in range(count)
+            ]
+        )
+        call_time, _ = _time(
+            lambda: [
+                generate_name(naming_rule, index=i, original_path=ORIGINAL_PATH, output_ext="png")
+                for i in range(count)
+            ]
+        )
+        rule = compile_naming_rule(naming_rule, output_ext="png")
+        compiled_time, names = _time(rule.names, count, original_path=ORIGINAL_PATH)
+
+        if "{uuid}" not in naming_rule and "{datetime}" not in naming_rule:
+            expected = legacy_generate_name(naming_rule, count - 1, ORIGINAL_PATH, "png")
+            if names[-1] != expected:
+                print(f"{naming_rule:<40}结果不一致: legacy {expected} / compiled {names[-1]}")
+                return False
+        print(
+            f"{naming_rule:<40}{legacy_time:>10.2f}{call_time:>13.2f}{compiled_time:>13.2f}"
+            f"{legacy_time / max(compiled_time, 1e-9):>7.1f}x"
+        )
+    print("-" * 78)
+
+    if args.reserve:
+        # 目录中已有前一半文件名：一半直接预占成功，一半追加序号
+        with tempfile.TemporaryDirectory() as tmp:
+            rule = compile_naming_rule("out_{index:07d}", output_ext="png")
+            paths = [os.path.join(tmp, name) for name in rule.names(args.reserve)]
+            for path in paths[: args.reserve // 2]:
+                open(path, "wb").close()
+            elapsed, reserved = _time(reserve_paths, paths)
+            renamed = sum(1 for a, b in zip(paths, reserved) if a != b)
+            print(
+                f"\nreserve_paths: {args.reserve} 个文件名（{renamed} 个重名追加序号）耗时 {elapsed:.2f}s"
+            )
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
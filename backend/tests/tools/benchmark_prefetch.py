@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""预读解码基准测试
+
+模拟 Match 模式的逐项迭代：每项先加载（PIL 解码并转换为 RGB float32，与 load_image 一致），
+再执行固定耗时的下游计算。对比两种方式的总耗时：
+    serial     在执行线程上按需解码（原有方式）
+    prefetch   后台线程池提前解码接下来的 window 个文件，执行线程直接取出
+
+依赖: numpy, Pillow
+
+用法:
+    python backend/tests/tools/benchmark_prefetch.py
+    python backend/tests/tools/benchmark_prefetch.py --count 32 --size 2048 --work-ms 50 --window 4
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.prefetch import (
+    get_prefetch_stats,
+    start_prefetch,
+    stop_prefetch,
+    take_prefetched,
+)
+
+
+def decode(path: str) -> np.ndarray:
+    """PIL 解码并转换为 [1, H, W, 3] float32（与 load_image 一致）"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        return (np.array(img.convert("RGB")).astype(np.float32) / 255.0)[None]
+
+
+def downstream(work_ms: float) -> None:
+    """模拟下游节点的计算耗时（释放 GIL，相当于 GPU 推理）"""
+    time.sleep(work_ms / 1000.0)
+
+
+def run_serial(paths: list, work_ms: float) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        decode(path)
+        downstream(work_ms)
+    return time.perf_counter() - start
+
+
+def run_prefetch(paths: list, work_ms: float, window: int, max_bytes: int) -> float:
+    start = time.perf_counter()
+    start_prefetch(paths, decode, window=window, max_bytes=max_bytes)
+    for path in paths:
+        image = take_prefetched(path)
+        if image is None:
+            decode(path)
+        downstream(work_ms)
+    elapsed = time.perf_counter() - start
+    stop_prefetch()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预读解码基准测试")
+    parser.add_argument("--count", type=int, default=24, help="文件数")
+    parser.add_argument("--size", type=int, default=2048, help="图像边长")
+    parser.add_argument("--work-ms", type=float, default=50.0, help="每项下游计算耗时 (ms)")
+    parser.add_argument("--window", type=int, default=4, help="预读窗口")
+    parser.add_argument("--max-mb", type=int, default=1024, help="预读缓冲上限 (MB)")
+    args = parser.parse_args()
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("Pillow 未安装，请运行: pip install Pillow")
+        return False
+
+    print("\n" + "=" * 72)
+    print("预读解码基准测试")
+    print("=" * 72)
+    print(
+        f"文件: {args.count} x {args.size}x{args.size} PNG, 下游计算: {args.work_ms:.0f} ms/项, "
+        f"预读窗口: {args.window}"
+    )
+
+    rng = np.random.default_rng(0)
+    y = np.linspace(0, 255, args.size, dtype=np.float32)[:, None, None]
+    x = np.linspace(0, 255, args.size, dtype=np.float32)[None, :, None]
+    base = 0.5 * x + 0.5 * y
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.count):
+            noise = rng.normal(0, 4, (args.size, args.size, 3)).astype(np.float32)
+            frame = np.clip(base + noise + i, 0, 255).astype(np.uint8)
+            path = os.path.join(tmp, f"frame_{i:04d}.png")
+            Image.fromarray(frame, "RGB").save(path, compress_level=1)
+            paths.append(path)
+
+        decode(paths[0])  # 预热
+        serial_time = run_serial(paths, args.work_ms)
+        get_prefetch_stats(reset=True)
+        prefetch_time = run_prefetch(paths, args.work_ms, args.window, args.max_mb * 1024**2)
+        stats = get_prefetch_stats()
+
+    print(f"\n{'方式':<12}{'总耗时(s)':>12}{'每项(ms)':>12}")
+    print("-" * 72)
+    print(f"{'serial':<12}{serial_time:>12.3f}{serial_time / args.count * 1000:>12.1f}")
+    print(f"{'prefetch':<12}{prefetch_time:>12.3f}{prefetch_time / args.count * 1000:>12.1f}")
+    print("-" * 72)
+    print(
+        f"加速比: {serial_time / prefetch_time:.2f}x, 命中率: {stats['hit_rate']:.1%} "
+        f"(等待 {stats['waits']} 次, 未命中 {stats['misses']} 次)"
+    )
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
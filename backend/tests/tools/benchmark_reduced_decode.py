@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""缩小分辨率解码基准测试
+
+对比加载 8K 图像并缩小到 max_side 的两种方式的耗时和峰值内存（RSS）：
+    full      完整解码原图，转换为 float32 张量后再缩小（原有 load_image + 下游缩放节点）
+    reduced   open_image_region 只解码需要的分辨率（JPEG DCT 缩放 / reduce），再转换为 float32
+
+每种方式在独立子进程中执行，JPEG 和 PNG 分别测试。
+
+依赖: numpy, Pillow
+
+用法:
+    python backend/tests/tools/benchmark_reduced_decode.py
+    python backend/tests/tools/benchmark_reduced_decode.py --width 7680 --height 4320
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.image_decode import open_image_region
+from backend.helpers.tensor_convert import uint8_to_float32
+
+MODES = ["full", "reduced"]
+
+
+def _peak_rss_mb() -> float:
+    """当前进程的峰值 RSS（MB，Linux 上读取 VmHWM）"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode: str, file_path: str, max_side: int) -> None:
+    """子进程：执行一次加载并输出耗时、峰值内存和输出尺寸"""
+    from PIL import Image, ImageOps
+
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    with Image.open(file_path) as img:
+        if mode == "full":
+            # 原有方式：完整解码为 float32 张量，下游再缩放
+            image = ImageOps.exif_transpose(img).convert("RGB")
+            tensor = np.array(image).astype(np.float32) / 255.0
+            scale = max_side / max(tensor.shape[:2])
+            size = (round(tensor.shape[1] * scale), round(tensor.shape[0] * scale))
+            channels = [
+                np.asarray(Image.fromarray(tensor[..., c], "F").resize(size, Image.BILINEAR))
+                for c in range(3)
+            ]
+            result = np.stack(channels, axis=-1)
+        else:
+            image = open_image_region(img, max_side=max_side).convert("RGB")
+            result = uint8_to_float32(np.asarray(image))
+    elapsed = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {"time": elapsed, "rss_mb": _peak_rss_mb() - baseline, "shape": list(result.shape)}
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缩小分辨率解码基准测试")
+    parser.add_argument("--width", type=int, default=7680)
+    parser.add_argument("--height", type=int, default=4320)
+    parser.add_argument("--max-side", type=int, default=1024, help="输出最长边")
+    parser.add_argument(
+        "--child", nargs=3, metavar=("MODE", "FILE", "MAX_SIDE"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], int(args.child[2]))
+        return True
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("Pillow 未安装，请运行: pip install Pillow")
+        return False
+
+    print("\n" + "=" * 72)
+    print("缩小分辨率解码基准测试")
+    print("=" * 72)
+    print(f"原图: {args.width}x{args.height}, 输出最长边: {args.max_side}")
+
+    rng = np.random.default_rng(0)
+    y = np.linspace(0, 255, args.height, dtype=np.float32)[:, None, None]
+    x = np.linspace(0, 255, args.width, dtype=np.float32)[None, :, None]
+    pixels = np.clip(0.5 * x + 0.5 * y + rng.normal(0, 4, (args.height, args.width, 3)), 0, 255)
+    image = Image.fromarray(pixels.astype(np.uint8), "RGB")
+    del pixels
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "jpeg": os.path.join(tmp, "source.jpg"),
+            "png": os.path.join(tmp, "source.png"),
+        }
+        image.save(files["jpeg"], quality=90)
+        image.save(files["png"], compress_level=1)
+        del image
+
+        print(f"\n{'格式':<8}{'方式':<10}{'耗时(s)':>12}{'峰值内存(MB)':>18}{'输出形状':>22}")
+        print("-" * 72)
+        for fmt, file_path in files.items():
+            for mode in MODES:
+                result = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, file_path, str(args.max_side)],
+                    capture_output=True,
+                    text=True,
+                )
+                if result.returncode != 0:
+                    print(f"{fmt:<8}{mode:<10}失败: {result.stderr.strip().splitlines()[-1:]}")
+                    continue
+                stats = json.loads(result.stdout.strip().splitlines()[-1])
+                print(
+                    f"{fmt:<8}{mode:<10}{stats['time']:>12.3f}{stats['rss_mb']:>18.1f}"
+                    f"{str(tuple(stats['shape'])):>22}"
+                )
+        print("-" * 72)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
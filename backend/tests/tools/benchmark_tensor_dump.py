@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""张量转储基准测试
+
+对比 IMAGE 批次的两种检查点方式的往返耗时（保存 + 加载）：
+    png   逐帧量化为 uint8 并 PNG 编码，加载时 PIL 解码并转换为 RGB float32（与 load_image 一致）
+    npy   整个批次一次写入 .npy，加载时内存映射（不解码、不复制）
+
+npy 的加载分别统计打开（内存映射）和访问全部数据的耗时。
+
+依赖: numpy, Pillow
+
+用法:
+    python backend/tests/tools/benchmark_tensor_dump.py
+    python backend/tests/tools/benchmark_tensor_dump.py --batch 8 --width 3840 --height 2160
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "backend" / "helpers"))
+
+from encode_profiles import ENCODE_PROFILE_NAMES, get_image_save_kwargs
+from tensor_convert import to_uint8_array
+from tensor_dump import load_tensor_dump, save_tensor_dump
+
+
+def png_save(batch: np.ndarray, directory: str, profile: str) -> list:
+    """逐帧量化并 PNG 编码（与 InputPathConfig Batch 模式一致）"""
+    from PIL import Image
+
+    frames = to_uint8_array(batch)
+    paths = []
+    for i in range(frames.shape[0]):
+        path = os.path.join(directory, f"frame_{i:04d}.png")
+        Image.fromarray(frames[i], "RGB").save(path, **get_image_save_kwargs("PNG", profile))
+        paths.append(path)
+    return paths
+
+
+def png_load(paths: list) -> np.ndarray:
+    """PIL 解码并转换为 [B, H, W, 3] float32（与 load_image 一致）"""
+    from PIL import Image
+
+    frames = []
+    for path in paths:
+        with Image.open(path) as img:
+            frames.append(np.array(img.convert("RGB")).astype(np.float32) / 255.0)
+    return np.stack(frames)
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="张量转储基准测试")
+    parser.add_argument("--batch", type=int, default=4, help="批次大小")
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--profile", default="balanced", choices=ENCODE_PROFILE_NAMES)
+    args = parser.parse_args()
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("Pillow 未安装，请运行: pip install Pillow")
+        return False
+
+    # 平滑渐变加噪声，接近真实图像的 PNG 压缩率
+    rng = np.random.default_rng(0)
+    y = np.linspace(0, 1, args.height, dtype=np.float32)[:, None, None]
+    x = np.linspace(0, 1, args.width, dtype=np.float32)[None, :, None]
+    base = (0.5 * x + 0.5 * y) * np.array([1.0, 0.8, 0.6], dtype=np.float32)
+    batch = np.stack(
+        [
+            np.clip(base + rng.normal(0, 0.02, base.shape).astype(np.float32) + 0.05 * i, 0, 1)
+            for i in range(args.batch)
+        ]
+    )
+    size_mb = batch.nbytes / 1024**2
+
+    print("\n" + "=" * 72)
+    print("张量转储基准测试")
+    print("=" * 72)
+    print(f"批次: {batch.shape}, float32 {size_mb:.0f} MB, PNG 编码配置: {args.profile}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        png_dir = os.path.join(tmp, "png")
+        os.makedirs(png_dir)
+        png_save_time, paths = measure(png_save, batch, png_dir, args.profile)
+        png_load_time, png_loaded = measure(png_load, paths)
+        png_bytes = sum(os.path.getsize(p) for p in paths)
+        png_error = float(np.abs(png_loaded - batch).max())
+
+        npy_save_time, npy_path = measure(save_tensor_dump, batch, os.path.join(tmp, "batch.npy"))
+        npy_open_time, npy_loaded = measure(load_tensor_dump, npy_path)
+        npy_read_time, _ = measure(lambda a: float(np.asarray(a).sum()), npy_loaded)
+        npy_bytes = os.path.getsize(npy_path)
+        npy_error = float(np.abs(np.asarray(npy_loaded) - batch).max())
+
+    print(
+        f"\n{'方式':<8}{'保存(s)':>10}{'加载(s)':>10}{'往返(s)':>10}{'文件(MB)':>12}{'最大误差':>12}"
+    )
+    print("-" * 72)
+    print(
+        f"{'png':<8}{png_save_time:>10.3f}{png_load_time:>10.3f}"
+        f"{png_save_time + png_load_time:>10.3f}"
+        f"{png_bytes / 1024**2:>12.1f}{png_error:>12.5f}"
+    )
+    print(
+        f"{'npy':<8}{npy_save_time:>10.3f}{npy_open_time:>10.3f}"
+        f"{npy_save_time + npy_open_time:>10.3f}"
+        f"{npy_bytes / 1024**2:>12.1f}{npy_error:>12.5f}"
+    )
+    print("-" * 72)
+    print(f"npy 加载为内存映射；首次访问全部数据额外耗时 {npy_read_time:.3f}s")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""视频分块编码内存基准测试
+
+对比旧版整段转换（frames * 255 → uint8 全量副本）与 iter_uint8_chunks 分块转换的峰值内存
+（使用 tracemalloc 统计 numpy 分配，不含输入帧本身），验证分块方式的峰值内存与视频长度无关。
+
+用法:
+    python backend/tests/tools/benchmark_video_memory.py
+    python backend/tests/tools/benchmark_video_memory.py --lengths 24 96 240 --chunk 16
+"""
+
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "backend" / "helpers"))
+
+from tensor_convert import iter_uint8_chunks, DEFAULT_CHUNK_FRAMES
+
+
+def _consume(frame: np.ndarray) -> int:
+    """模拟编码器读取一帧"""
+    return int(frame[0, 0, 0])
+
+
+def legacy_convert(frames: np.ndarray) -> None:
+    """旧版 save_video 的转换方式：整段转换后再逐帧写入"""
+    frames_np = (frames * 255).astype(np.uint8)
+    for frame in frames_np:
+        _consume(frame)
+
+
+def chunked_convert(frames: np.ndarray, chunk_size: int) -> None:
+    """新版 save_video 的转换方式：分块转换并逐帧写入"""
+    for chunk in iter_uint8_chunks(frames, chunk_size):
+        for frame in chunk:
+            _consume(frame)
+
+
+def measure(func, *args) -> tuple:
+    """返回 (峰值内存 MB, 耗时 s)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频分块编码内存基准测试")
+    parser.add_argument("--size", type=int, nargs=2, default=[540, 960], metavar=("H", "W"))
+    parser.add_argument("--lengths", type=int, nargs="+", default=[24, 72, 144], help="测试的帧数")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_FRAMES, help="每块帧数")
+    args = parser.parse_args()
+
+    height, width = args.size
+
+    print("\n" + "=" * 72)
+    print("视频分块编码内存基准测试")
+    print("=" * 72)
+    print(f"帧尺寸: {height}x{width} RGB float32, 每块帧数: {args.chunk}")
+
+    print(
+        f"\n{'帧数':>8}{'输入(MB)':>12}{'整段峰值(MB)':>16}{'分块峰值(MB)':>16}{'整段(s)':>10}{'分块(s)':>10}"
+    )
+    print("-" * 72)
+    for length in args.lengths:
+        frames = np.random.rand(length, height, width, 3).astype(np.float32)
+        input_mb = frames.nbytes / (1024 * 1024)
+
+        legacy_peak, legacy_time = measure(legacy_convert, frames)
+        chunked_peak, chunked_time = measure(chunked_convert, frames, args.chunk)
+
+        print(
+            f"{length:>8}{input_mb:>12.1f}{legacy_peak:>16.1f}{chunked_peak:>16.1f}"
+            f"{legacy_time:>10.2f}{chunked_time:>10.2f}"
+        )
+        del frames
+
+    print("-" * 72)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""视频编码预设基准测试
+
+对每个容器格式（mp4 / webm / mkv）× 编码预设，统计编码速度（fps）和输出文件大小，
+用于为 InputPathConfig 的视频编码设置选择合适的速度/体积档位。
+
+依赖: imageio, imageio-ffmpeg
+
+用法:
+    python backend/tests/tools/benchmark_video_presets.py
+    python backend/tests/tools/benchmark_video_presets.py --frames 96 --crf 23 --threads 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "backend" / "helpers"))
+
+from video_settings import build_video_writer_kwargs, VIDEO_PRESETS
+
+# 与 TYPE_FORMAT_MAP["VIDEO"]["codecs"] 一致
+CODECS = {"mp4": "libx264", "webm": "libvpx-vp9", "mkv": "libx264"}
+
+
+def make_test_frames(count: int, height: int, width: int) -> np.ndarray:
+    """生成带运动的测试帧（平滑渐变随时间平移 + 轻微噪声）"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frames = np.empty((count, height, width, 3), dtype=np.uint8)
+    for i in range(count):
+        shift = i * 4.0
+        base = np.stack(
+            [
+                np.sin((x + shift) / 40.0),
+                np.cos((y - shift) / 30.0),
+                np.sin((x + y + shift) / 60.0),
+            ],
+            axis=-1,
+        )
+        noise = rng.normal(0, 0.02, base.shape).astype(np.float32)
+        frames[i] = np.clip((base * 0.5 + 0.5 + noise) * 255, 0, 255).astype(np.uint8)
+    return frames
+
+
+def benchmark(frames: np.ndarray, fmt: str, settings: dict, output_dir: str) -> dict:
+    """编码一段视频并统计结果"""
+    import imageio
+
+    file_path = os.path.join(output_dir, f"bench_{settings['preset']}.{fmt}")
+    writer_kwargs = build_video_writer_kwargs(CODECS[fmt], 24, settings)
+
+    start = time.perf_counter()
+    writer = imageio.get_writer(file_path, **writer_kwargs)
+    for frame in frames:
+        writer.append_data(frame)
+    writer.close()
+    elapsed = time.perf_counter() - start
+
+    size = os.path.getsize(file_path)
+    os.remove(file_path)
+    return {
+        "fps": len(frames) / elapsed if elapsed > 0 else float("inf"),
+        "bytes": size,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频编码预设基准测试")
+    parser.add_argument("--frames", type=int, default=48, help="帧数")
+    parser.add_argument("--size", type=int, nargs=2, default=[540, 960], metavar=("H", "W"))
+    parser.add_argument(
+        "--formats", nargs="+", default=list(CODECS.keys()), choices=list(CODECS.keys())
+    )
+    parser.add_argument(
+        "--presets",
+        nargs="+",
+        default=["ultrafast", "veryfast", "fast", "medium"],
+        choices=VIDEO_PRESETS,
+    )
+    parser.add_argument("--crf", type=int, default=-1, help="CRF（-1 表示使用默认质量）")
+    parser.add_argument("--threads", type=int, default=0, help="编码线程数（0 表示自动）")
+    args = parser.parse_args()
+
+    try:
+        import imageio  # noqa: F401
+    except ImportError:
+        print("imageio 未安装，请运行: pip install imageio imageio-ffmpeg")
+        return False
+
+    height, width = args.size
+
+    print("\n" + "=" * 72)
+    print("视频编码预设基准测试")
+    print("=" * 72)
+    print(f"帧数: {args.frames}, 尺寸: {height}x{width}, CRF: {args.crf}, 线程数: {args.threads}")
+
+    frames = make_test_frames(args.frames, height, width)
+
+    print(f"\n{'格式':<8}{'预设':<12}{'fps':>12}{'文件大小(KB)':>16}{'耗时(s)':>12}")
+    print("-" * 72)
+    with tempfile.TemporaryDirectory() as output_dir:
+        for fmt in args.formats:
+            for preset in args.presets:
+                settings = {"preset": preset, "crf": args.crf, "threads": args.threads}
+                result = benchmark(frames, fmt, settings, output_dir)
+                print(
+                    f"{fmt:<8}{preset:<12}{result['fps']:>12.1f}"
+                    f"{result['bytes'] / 1024:>16,.1f}{result['seconds']:>12.2f}"
+                )
+            print("-" * 72)
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -246,7 +246,9 @@ def test_operations_routes():
         create_file_handler,
         create_directory_handler,
         delete_file_handler,
+        reset_scan_cursor_handler,
     )
+    from custom_nodes.ComfyUI_Data_Manager.helpers.scan_cursor import scan_incremental
 
     # 创建测试环境
     test_dir = os.path.join(tempfile.gettempdir(), "test_data_manager", "api_operations")
@@ -388,6 +390,31 @@ def test_operations_routes():
 
     asyncio.run(run_test5())
 
+    # 测试 reset_scan_cursor_handler
+    print("\n[测试 6] reset_scan_cursor_handler")
+
+    source_dir = os.path.join(test_dir, "hot")
+    os.makedirs(source_dir)
+    with open(os.path.join(source_dir, "a.png"), "wb") as f:
+        f.write(b"x")
+    assert scan_incremental(source_dir, "*.png") == ["a.png"]
+    assert scan_incremental(source_dir, "*.png") == []
+
+    mock_request = MagicMock()
+    mock_request.can_read_body = True
+    mock_request.json = AsyncMock(return_value={"path": source_dir, "pattern": "*.png"})
+
+    async def run_test6():
+        response = await reset_scan_cursor_handler(mock_request)
+        data = json.loads(response.text)
+
+        assert response.status == 200, f"状态码应为200，实际为{response.status}"
+        assert data.get("reset") == True, "应重置游标"
+        assert scan_incremental(source_dir, "*.png") == ["a.png"], "重置后应重新输出文件"
+        print("  ✓ reset_scan_cursor_handler 测试通过")
+
+    asyncio.run(run_test6())
+
     # 清理
     shutil.rmtree(test_dir)
 
@@ -224,17 +224,27 @@ def test_save_latent():
     # 创建测试 latent 数据
     print("\n[测试 1] save_latent (正常数据)")
     latent_data = {
-        "model": np.random.rand(4, 64, 64).astype(np.float32),
-        "diffusion_model": np.random.rand(4, 64, 64).astype(np.float32),
-        "first_stage_model": np.random.rand(3, 64, 64).astype(np.float32),
+        "samples": np.random.rand(2, 4, 64, 64).astype(np.float32),
+        "noise_mask": np.random.rand(2, 1, 64, 64).astype(np.float32),
+        "batch_index": [0, 1],
     }
     file_path = os.path.join(test_dir, "test.safetensors")
 
     result = save_latent(latent_data, file_path)
     assert os.path.exists(result), f"文件应该被保存: {result}"
+    assert result.endswith(".latent"), f"扩展名应该被修正为 .latent: {result}"
     print(f"  保存路径: {result}")
     print("  ✓ save_latent 测试通过")
 
+    print("\n[测试 2] load_latent (整批与单个样本)")
+    loaded = nodes_v3.load_latent(result)
+    assert np.allclose(np.asarray(loaded["samples"]), latent_data["samples"])
+    assert loaded["batch_index"] == [0, 1]
+    single = nodes_v3.load_latent(result, index=1)
+    assert np.allclose(np.asarray(single["samples"]), latent_data["samples"][1:2])
+    assert single["batch_index"] == [1]
+    print("  ✓ load_latent 测试通过")
+
     # 清理
     shutil.rmtree(test_dir)
 
@@ -280,6 +290,102 @@ def test_save_conditioning():
     return True
 
 
+# ============================================================================
+# 测试 _split_batch
+# ============================================================================
+
+
+def test_split_batch():
+    """测试 _split_batch 函数（Batch 模式逐项保存音频、Latent 批次）"""
+    print("\n" + "=" * 60)
+    print("测试 _split_batch 函数")
+    print("=" * 60)
+
+    import torch
+
+    split_batch = nodes_v3._split_batch
+
+    # 音频批次
+    print("\n[测试 1] _split_batch (AUDIO [B, C, T])")
+    audio = {"waveform": torch.rand(3, 2, 100), "sample_rate": 22050}
+    detected_type, items = split_batch(audio)
+    assert detected_type == "AUDIO", f"应识别为 AUDIO: {detected_type}"
+    assert len(items) == 3, f"应拆分为 3 项: {len(items)}"
+    shape = items[1]["waveform"].shape
+    assert shape == (2, 100), f"单项形状应为 [C, T]: {shape}"
+    assert items[1]["sample_rate"] == 22050
+    np.testing.assert_allclose(items[2]["waveform"], audio["waveform"][2].numpy())
+    print("  ✓ AUDIO 批次拆分测试通过")
+
+    # Latent 批次
+    print("\n[测试 2] _split_batch (LATENT [B, C, H, W])")
+    latent = {
+        "samples": torch.rand(4, 4, 8, 8),
+        "noise_mask": torch.rand(4, 1, 8, 8),
+        "batch_index": [10, 11, 12, 13],
+    }
+    detected_type, items = split_batch(latent)
+    assert detected_type == "LATENT", f"应识别为 LATENT: {detected_type}"
+    assert len(items) == 4
+    assert items[2]["samples"].shape == (1, 4, 8, 8)
+    assert items[2]["noise_mask"].shape == (1, 1, 8, 8)
+    assert items[2]["batch_index"] == [12]
+    assert torch.equal(items[3]["samples"][0], latent["samples"][3])
+    # 单项不应与原批次共享存储
+    assert items[0]["samples"].data_ptr() != latent["samples"].data_ptr()
+    print("  ✓ LATENT 批次拆分测试通过")
+
+    # 图像批次
+    print("\n[测试 3] _split_batch (IMAGE [N, H, W, C])")
+    detected_type, items = split_batch(torch.rand(2, 8, 8, 3))
+    assert detected_type == "IMAGE"
+    assert len(items) == 2 and items[0].dtype == np.uint8
+    print("  ✓ IMAGE 批次拆分测试通过")
+
+    # 非批次输入
+    print("\n[测试 4] _split_batch (非批次输入)")
+    assert split_batch({"waveform": torch.rand(1, 2, 100), "sample_rate": 44100}) is None
+    assert split_batch({"samples": torch.rand(1, 4, 8, 8)}) is None
+    assert split_batch("text") is None
+    print("  ✓ 非批次输入测试通过")
+
+    print("\n✓ _split_batch 函数测试全部通过")
+    return True
+
+
+def test_save_audio_clips():
+    """测试 save_audio_clips 函数（单文件模式下音频批次拆分为多个文件）"""
+    print("\n" + "=" * 60)
+    print("测试 save_audio_clips 函数")
+    print("=" * 60)
+
+    import torch
+
+    test_dir = os.path.join(tempfile.gettempdir(), "test_data_manager", "save_audio_clips")
+    if os.path.exists(test_dir):
+        shutil.rmtree(test_dir)
+    os.makedirs(test_dir)
+
+    print("\n[测试 1] save_audio_clips (AUDIO [3, C, T])")
+    audio = {"waveform": torch.rand(3, 2, 100) * 2 - 1, "sample_rate": 22050}
+    saved_paths = nodes_v3.save_audio_clips(audio, os.path.join(test_dir, "clip.wav"), "wav")
+    expected = [os.path.join(test_dir, f"clip_{i:04d}.wav") for i in range(1, 4)]
+    assert saved_paths == expected, f"应按序号保存 3 个文件: {saved_paths}"
+    assert all(os.path.exists(path) for path in saved_paths)
+    print("  ✓ 音频批次拆分保存测试通过")
+
+    print("\n[测试 2] save_audio_clips (AUDIO [1, C, T])")
+    audio = {"waveform": torch.rand(1, 2, 100) * 2 - 1, "sample_rate": 22050}
+    saved_paths = nodes_v3.save_audio_clips(audio, os.path.join(test_dir, "single.wav"), "wav")
+    expected = [os.path.join(test_dir, "single.wav")]
+    assert saved_paths == expected, f"单段应保存为原文件名: {saved_paths}"
+    print("  ✓ 单段音频保存测试通过")
+
+    shutil.rmtree(test_dir)
+    print("\n✓ save_audio_clips 函数测试全部通过")
+    return True
+
+
 # ============================================================================
 # 主函数
 # ============================================================================
@@ -296,6 +402,8 @@ def main():
     results.append(("parse_target_path", test_parse_target_path()))
     results.append(("save_latent", test_save_latent()))
     results.append(("save_conditioning", test_save_conditioning()))
+    results.append(("_split_batch", test_split_batch()))
+    results.append(("save_audio_clips", test_save_audio_clips()))
 
     print("\n" + "=" * 60)
     print("测试结果总结")
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""音频写入测试
+
+测试波形归一化、向量化 PCM 转换、WAV/FLAC 直写和 PyAV 编码路径
+"""
+
+import os
+import sys
+import wave
+import tempfile
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.audio_writer import (
+    normalize_waveform,
+    to_pcm16,
+    write_audio,
+    write_pcm_native,
+)
+
+
+def _sine(channels: int = 2, samples: int = 48000, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(samples, dtype=np.float32) / 48000
+    return np.stack([amplitude * np.sin(2 * np.pi * 440 * (c + 1) * t) for c in range(channels)])
+
+
+class TestNormalizeWaveform:
+    """测试波形归一化"""
+
+    def test_in_range_unchanged(self):
+        data = _sine()
+        np.testing.assert_array_equal(normalize_waveform(data), data)
+
+    def test_peak_normalized(self):
+        result = normalize_waveform(np.array([[0.5, -2.0, 1.0]]))
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, [[0.25, -1.0, 0.5]])
+
+    def test_rejects_batch(self):
+        with pytest.raises(ValueError):
+            normalize_waveform(np.zeros((1, 2, 10)))
+
+    def test_torch_tensor(self):
+        torch = pytest.importorskip("torch")
+        result = normalize_waveform(torch.zeros(2, 10))
+        assert result.shape == (2, 10)
+
+
+class TestToPcm16:
+    """测试向量化 PCM 转换"""
+
+    def test_interleaves_channels(self):
+        data = np.array([[0.0, 1.0], [-1.0, 0.5]], dtype=np.float32)
+        pcm = to_pcm16(data)
+        assert pcm.dtype == np.dtype("<i2")
+        assert pcm.flags["C_CONTIGUOUS"]
+        assert pcm.tolist() == [[0, -32767], [32767, 16384]]
+
+
+class TestWritePcmNative:
+    """测试 WAV/FLAC 直写"""
+
+    def test_wav_with_stdlib_wave(self, monkeypatch):
+        # 模拟未安装 soundfile，走标准库 wave
+        monkeypatch.setitem(sys.modules, "soundfile", None)
+        data = _sine(channels=2, samples=1000)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.wav")
+            assert write_pcm_native(data, 48000, path, "wav")
+
+            with wave.open(path, "rb") as wav_file:
+                assert wav_file.getnchannels() == 2
+                assert wav_file.getsampwidth() == 2
+                assert wav_file.getframerate() == 48000
+                frames = np.frombuffer(wav_file.readframes(1000), dtype="<i2").reshape(-1, 2)
+            np.testing.assert_array_equal(frames, to_pcm16(data))
+
+    def test_flac_without_soundfile_is_not_handled(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "soundfile", None)
+        with tempfile.TemporaryDirectory() as tmp:
+            assert not write_pcm_native(_sine(), 48000, os.path.join(tmp, "out.flac"), "flac")
+
+    def test_lossy_format_is_not_handled(self):
+        assert not write_pcm_native(_sine(), 48000, "out.mp3", "mp3")
+
+    def test_flac_with_soundfile(self):
+        sf = pytest.importorskip("soundfile")
+        data = _sine(channels=1, samples=2000)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.flac")
+            assert write_pcm_native(data, 48000, path, "flac")
+            decoded, rate = sf.read(path, dtype="int16", always_2d=True)
+            assert rate == 48000
+            np.testing.assert_array_equal(decoded, to_pcm16(data))
+
+
+class TestWriteAudio:
+    """测试统一写入入口"""
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError):
+            write_audio(_sine(), 48000, "out.aac", "aac")
+
+    def test_mp3_with_large_frames(self):
+        av = pytest.importorskip("av")
+        data = _sine(channels=2, samples=48000)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_audio(data, 48000, os.path.join(tmp, "out.mp3"), "mp3", frame_size=20000)
+
+            with av.open(path) as container:
+                stream = container.streams.audio[0]
+                assert stream.channels == 2
+                decoded = sum(frame.samples for frame in container.decode(stream))
+            # MP3 编码会在首尾补齐少量采样
+            assert abs(decoded - 48000) < 4096
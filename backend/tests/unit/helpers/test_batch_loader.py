@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""批量图像加载测试
+
+测试尺寸分组、缩放/填充策略、数据类型、EXIF 旋转、最长边上限/区域解码和批次内顺序
+"""
+
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.batch_loader import load_image_batch, read_image_size
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _make_image(tmp_path, name: str, height: int, width: int, value: int, exif=None) -> str:
+    """生成纯色 PNG（value 为像素值）"""
+    path = str(tmp_path / name)
+    pixels = np.full((height, width, 3), value, dtype=np.uint8)
+    kwargs = {"exif": exif} if exif is not None else {}
+    Image.fromarray(pixels, "RGB").save(path, **kwargs)
+    return path
+
+
+class TestReadImageSize:
+    """测试尺寸读取"""
+
+    def test_size(self, tmp_path):
+        assert read_image_size(_make_image(tmp_path, "a.png", 10, 20, 0)) == (10, 20)
+
+    def test_exif_rotation_swaps(self, tmp_path):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 顺时针旋转 90 度
+        path = str(tmp_path / "r.jpg")
+        Image.fromarray(np.zeros((10, 20, 3), dtype=np.uint8), "RGB").save(path, exif=exif)
+        assert read_image_size(path) == (20, 10)
+
+
+class TestLoadImageBatch:
+    """测试批量加载"""
+
+    def test_bucket_groups_by_size(self, tmp_path):
+        paths = [
+            _make_image(tmp_path, "a.png", 8, 8, 10),
+            _make_image(tmp_path, "b.png", 4, 6, 20),
+            _make_image(tmp_path, "c.png", 8, 8, 30),
+        ]
+        batches = load_image_batch(paths, policy="bucket", workers=2)
+
+        assert [batch.shape for batch, _ in batches] == [(2, 8, 8, 3), (1, 4, 6, 3)]
+        assert batches[0][1] == [paths[0], paths[2]]
+        assert batches[1][1] == [paths[1]]
+        np.testing.assert_allclose(batches[0][0][1], 30 / 255.0)
+
+    def test_float_values_match_load_image(self, tmp_path):
+        pixels = np.random.default_rng(0).integers(0, 256, (5, 7, 3), dtype=np.uint8)
+        path = str(tmp_path / "n.png")
+        Image.fromarray(pixels, "RGB").save(path)
+
+        ((batch, _),) = load_image_batch([path])
+        assert batch.dtype == np.float32
+        np.testing.assert_array_equal(batch[0], pixels.astype(np.float32) / 255.0)
+
+    def test_uint8(self, tmp_path):
+        path = _make_image(tmp_path, "a.png", 4, 4, 200)
+        ((batch, _),) = load_image_batch([path], dtype="uint8")
+        assert batch.dtype == np.uint8
+        assert (batch == 200).all()
+
+    def test_resize_to_first(self, tmp_path):
+        paths = [
+            _make_image(tmp_path, "a.png", 8, 8, 10),
+            _make_image(tmp_path, "b.png", 4, 6, 20),
+        ]
+        batches = load_image_batch(paths, policy="resize")
+        assert len(batches) == 1
+        batch, batch_paths = batches[0]
+        assert batch.shape == (2, 8, 8, 3)
+        assert batch_paths == paths
+        np.testing.assert_allclose(batch[1], 20 / 255.0, atol=1e-6)
+
+    def test_pad_to_largest(self, tmp_path):
+        paths = [
+            _make_image(tmp_path, "a.png", 4, 10, 255),
+            _make_image(tmp_path, "b.png", 6, 3, 255),
+        ]
+        ((batch, _),) = load_image_batch(paths, policy="pad", dtype="uint8")
+        assert batch.shape == (2, 6, 10, 3)
+        assert (batch[0, :4, :10] == 255).all()
+        assert (batch[0, 4:] == 0).all()
+        assert (batch[1, :6, :3] == 255).all()
+        assert (batch[1, :, 3:] == 0).all()
+
+    def test_order_preserved_with_many_workers(self, tmp_path):
+        paths = [_make_image(tmp_path, f"{i:02d}.png", 4, 4, i * 10) for i in range(12)]
+        ((batch, batch_paths),) = load_image_batch(paths, dtype="uint8", workers=4)
+        assert batch_paths == paths
+        assert [int(frame[0, 0, 0]) for frame in batch] == [i * 10 for i in range(12)]
+
+    def test_max_side_reduces_each_image(self, tmp_path):
+        paths = [
+            _make_image(tmp_path, "a.png", 40, 80, 100),
+            _make_image(tmp_path, "b.jpg", 80, 40, 100),
+        ]
+        assert read_image_size(paths[0], max_side=20) == (10, 20)
+        ((batch, _),) = load_image_batch(paths, policy="pad", dtype="uint8", max_side=20)
+        assert batch.shape == (2, 20, 20, 3)
+        assert (batch[0, :10, :20] == 100).all()
+        assert (batch[0, 10:] == 0).all()
+
+    def test_crop_box_loads_region(self, tmp_path):
+        pixels = np.zeros((20, 20, 3), dtype=np.uint8)
+        pixels[5:15, 5:15] = 255
+        path = str(tmp_path / "c.png")
+        Image.fromarray(pixels, "RGB").save(path)
+
+        ((batch, _),) = load_image_batch([path, path], dtype="uint8", crop_box=(5, 5, 15, 15))
+        assert batch.shape == (2, 10, 10, 3)
+        assert (batch == 255).all()
+
+    def test_empty(self):
+        assert load_image_batch([]) == []
+
+    def test_invalid_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            load_image_batch([_make_image(tmp_path, "a.png", 2, 2, 0)], policy="crop")
+
+    def test_invalid_dtype(self, tmp_path):
+        with pytest.raises(ValueError):
+            load_image_batch([_make_image(tmp_path, "a.png", 2, 2, 0)], dtype="float16")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""命名规则编译测试
+
+测试编译后的规则与 generate_name 一致、批量生成、时间戳取值方式、目录占位符、规则校验和文件名预占
+"""
+
+import os
+import sys
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers import batch_namer
+from backend.helpers.batch_namer import (
+    CompiledNamingRule,
+    compile_naming_rule,
+    generate_name,
+    release_reserved_paths,
+    reserve_path,
+    reserve_paths,
+    validate_naming_rule,
+)
+
+
+class TestCompiledRule:
+    """测试编译后的命名规则"""
+
+    def test_bulk_names(self):
+        rule = compile_naming_rule("result_{index:04d}", output_ext="png")
+        names = rule.names(1000)
+        assert names[0] == "result_0001.png"
+        assert names[-1] == "result_1000.png"
+        assert len(set(names)) == 1000
+
+    def test_start_offset(self):
+        rule = compile_naming_rule("r_{index}", output_ext="png")
+        assert rule.names(2, start=5) == ["r_6.png", "r_7.png"]
+        assert rule.generate(5) == "r_6.png"
+
+    def test_matches_generate_name(self):
+        for rule_text in [
+            "result_{:04d}",
+            "{original_name}_{index}",
+            "out/{original_name}",
+            "x{index:03d}.png",
+        ]:
+            rule = compile_naming_rule(rule_text, output_ext="png")
+            for i in range(3):
+                assert rule.generate(i, original_path="/data/in/a.jpg") == generate_name(
+                    rule_text, index=i, original_path="/data/in/a.jpg", output_ext="png"
+                )
+
+    def test_original_placeholders(self):
+        rule = compile_naming_rule("{original_path}/{original_name}_{original_ext}")
+        assert rule.generate(0, original_path="/data/sub/photo.jpg") == "sub/photo_jpg.jpg"
+
+    def test_directory_placeholders_formatted(self):
+        assert generate_name("{index:02d}/x", index=0, output_ext="png") == "01/x.png"
+        rule = compile_naming_rule("{index:02d}/x", output_ext="png")
+        assert rule.names(2) == ["01/x.png", "02/x.png"]
+
+    def test_empty_directory_part_not_absolute(self):
+        assert generate_name("{original_path}/x", output_ext="png") == "x.png"
+
+    def test_extension_not_duplicated(self):
+        assert compile_naming_rule("a_{index}.PNG", output_ext="png").generate(0) == "a_1.PNG"
+
+    def test_unknown_placeholder_kept(self):
+        assert (
+            compile_naming_rule("a_{index}_{bogus}", output_ext="png").generate(0)
+            == "a_1_{bogus}.png"
+        )
+
+    def test_context_compiled_in(self):
+        rule = CompiledNamingRule("{prefix}_{index}", output_ext="png", context={"prefix": "run7"})
+        assert rule.names(2) == ["run7_1.png", "run7_2.png"]
+
+    def test_uuid_unique_per_item(self):
+        names = compile_naming_rule("{uuid}", output_ext="png").names(100)
+        assert len(set(names)) == 100
+
+    def test_compiled_once(self):
+        assert compile_naming_rule("r_{index}", "png") is compile_naming_rule("r_{index}", "png")
+
+
+class TestTimestampMode:
+    """测试时间戳取值方式"""
+
+    def test_batch_mode_shared(self, monkeypatch):
+        clock = iter(range(1_700_000_000, 1_700_001_000))
+        monkeypatch.setattr(batch_namer.time, "time", lambda: float(next(clock)))
+        names = CompiledNamingRule("{timestamp}_{index}", timestamp_mode="batch").names(3)
+        assert {name.split("_")[0] for name in names} == {"1700000000"}
+
+    def test_item_mode_per_file(self, monkeypatch):
+        clock = iter(range(1_700_000_000, 1_700_001_000))
+        monkeypatch.setattr(batch_namer.time, "time", lambda: float(next(clock)))
+        names = CompiledNamingRule("{timestamp}_{index}", timestamp_mode="item").names(3)
+        assert len({name.split("_")[0] for name in names}) == 3
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            CompiledNamingRule("r_{index}", timestamp_mode="never")
+
+
+class TestValidation:
+    """测试规则校验"""
+
+    @pytest.mark.parametrize(
+        "rule", ["", "../../etc/passwd", "a|b", "file:name", "{abc", "{original_name:04d}"]
+    )
+    def test_invalid(self, rule):
+        is_valid, error = validate_naming_rule(rule)
+        assert not is_valid and error
+        with pytest.raises(ValueError):
+            compile_naming_rule(rule)
+
+    @pytest.mark.parametrize(
+        "rule", ["result_{:04d}", "{original_path}/{original_name}", "{datetime}_{index:04d}"]
+    )
+    def test_valid(self, rule):
+        assert validate_naming_rule(rule) == (True, None)
+
+
+class TestReserve:
+    """测试文件名预占"""
+
+    def test_existing_file_gets_suffix(self, tmp_path):
+        (tmp_path / "a.png").write_bytes(b"x")
+        path = reserve_path(str(tmp_path / "a.png"))
+        assert path == str(tmp_path / "a_1.png")
+        assert os.path.exists(path)
+        assert (tmp_path / "a.png").read_bytes() == b"x"
+
+    def test_bulk_reserve_keeps_order(self, tmp_path):
+        (tmp_path / "b.png").write_bytes(b"x")
+        paths = [str(tmp_path / name) for name in ("a.png", "b.png", "a.png")]
+        assert reserve_paths(paths) == [
+            str(tmp_path / name) for name in ("a.png", "b_1.png", "a_1.png")
+        ]
+
+    def test_concurrent_batches_do_not_collide(self, tmp_path):
+        rule = compile_naming_rule("out_{index:03d}", output_ext="png")
+        paths = [str(tmp_path / name) for name in rule.names(50)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(reserve_paths, [paths] * 4))
+        reserved = [path for batch in results for path in batch]
+        assert len(set(reserved)) == 200
+        assert len(os.listdir(tmp_path)) == 200
+
+    def test_release_removes_unfilled_placeholders(self, tmp_path):
+        paths = reserve_paths([str(tmp_path / name) for name in ("a.png", "b.png", "c.png")])
+        # a 写入成功，b 保存失败，c 保存到了其他文件名
+        Path(paths[0]).write_bytes(b"data")
+        assert release_reserved_paths(paths, [paths[0], str(tmp_path / "c.webp")]) == 2
+        assert os.listdir(tmp_path) == ["a.png"]
+
+    def test_release_keeps_saved_and_written_files(self, tmp_path):
+        paths = reserve_paths([str(tmp_path / "a.png"), str(tmp_path / "b.png")])
+        Path(paths[1]).write_bytes(b"data")
+        # 结果中的路径即使为空文件也保留；非空文件不视为占位文件
+        assert release_reserved_paths(paths, [paths[0]]) == 0
+        assert sorted(os.listdir(tmp_path)) == ["a.png", "b.png"]
+
+    def test_release_keeps_multi_file_results(self, tmp_path):
+        paths = reserve_paths([str(tmp_path / "a.wav"), str(tmp_path / "b.wav")])
+        # a 保存为多个文件（结果为路径列表，其中包含占位文件本身）
+        assert release_reserved_paths(paths, [[paths[0], str(tmp_path / "a_0002.wav")], None]) == 1
+        assert os.listdir(tmp_path) == ["a.wav"]
+
+    def test_release_ignores_missing_files(self, tmp_path):
+        path = reserve_path(str(tmp_path / "a.png"))
+        os.remove(path)
+        assert release_reserved_paths([path]) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""批量并行保存测试
+
+测试 run_batch 的并发执行、结果顺序和异常传播
+"""
+
+import os
+import sys
+import time
+import tempfile
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.batch_saver import run_batch, resolve_worker_count
+
+
+def _write_text(path: str, content: str) -> str:
+    """模块级保存函数（进程池需要可序列化的函数）"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+def _slow_identity(value: int, delay: float) -> int:
+    time.sleep(delay)
+    return value
+
+
+class TestResolveWorkerCount:
+    """测试并发数计算"""
+
+    def test_auto_uses_cpu_count(self):
+        assert resolve_worker_count(0, 1000) == max(1, min(os.cpu_count() or 1, 1000))
+
+    def test_capped_by_job_count(self):
+        assert resolve_worker_count(16, 3) == 3
+
+    def test_at_least_one(self):
+        assert resolve_worker_count(4, 0) == 1
+
+
+class TestRunBatch:
+    """测试 run_batch 并行保存"""
+
+    def test_results_keep_job_order(self):
+        """后提交的任务先完成时，结果顺序仍与任务顺序一致"""
+        jobs = [(i, 0.05 * (5 - i)) for i in range(5)]
+        assert run_batch(_slow_identity, jobs, workers=5) == [0, 1, 2, 3, 4]
+
+    def test_empty_jobs(self):
+        assert run_batch(_slow_identity, [], workers=4) == []
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_writes_every_file(self, executor):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jobs = [(os.path.join(tmpdir, f"result_{i:04d}.txt"), str(i)) for i in range(8)]
+            results = run_batch(_write_text, jobs, workers=4, executor=executor)
+
+            assert results == [job[0] for job in jobs]
+            for i, path in enumerate(results):
+                with open(path, encoding="utf-8") as f:
+                    assert f.read() == str(i)
+
+    def test_first_error_is_raised(self):
+        def fail_on_two(value):
+            if value == 2:
+                raise ValueError("boom")
+            return value
+
+        with pytest.raises(ValueError, match="boom"):
+            run_batch(fail_on_two, [(i,) for i in range(4)], workers=2)
+
+    def test_invalid_executor(self):
+        with pytest.raises(ValueError):
+            run_batch(_slow_identity, [(1, 0)], executor="gpu")
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""批量扫描引擎测试
+
+测试 scandir 扫描与 glob 结果一致、多个 include/exclude 模式、目录剪枝、大小写和隐藏文件规则
+"""
+
+import os
+import glob
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers import batch_scanner
+from backend.helpers.batch_scanner import (
+    CASE_SENSITIVE_DEFAULT,
+    PathMatcher,
+    iter_matching_files,
+    scan_files,
+    scan_window,
+    split_patterns,
+    validate_glob_pattern,
+)
+
+
+TREE = [
+    "a.png",
+    "b.jpg",
+    "c.txt",
+    ".hidden.png",
+    "[x].png",
+    "s1/d.png",
+    "s1/e.jpg",
+    "s1/s2/f.png",
+    "s1/s2/g_mask.png",
+    "s3/deep/er/h.png",
+    ".cache/i.png",
+    "thumbs/j.png",
+    "s1/thumbs/k.png",
+]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for rel_path in TREE:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+    (tmp_path / "dir.png").mkdir()
+    return tmp_path
+
+
+def _glob(base, pattern):
+    matches = glob.glob(os.path.join(str(base), pattern), recursive=True)
+    return sorted(
+        (os.path.relpath(m, str(base)) for m in matches if os.path.isfile(m)), key=str.lower
+    )
+
+
+class TestGlobCompatibility:
+    """测试与 glob 的结果一致"""
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            "*.png",
+            "*.*",
+            "**/*.png",
+            "**/*",
+            "**",
+            "s1/*.png",
+            "s1/**/*.png",
+            "**/s2/*.png",
+            "*/*.jpg",
+            "[ab].*",
+            "**/[!a]*.png",
+            "?.png",
+            ".hidden.png",
+            "**/.hidden.png",
+            ".cache/*.png",
+        ],
+    )
+    def test_same_as_glob(self, tree, pattern):
+        assert scan_files(str(tree), pattern, case_sensitive=True) == _glob(tree, pattern)
+
+    def test_directories_excluded(self, tree):
+        assert "dir.png" not in scan_files(str(tree), "*.png")
+
+    def test_sorted_case_insensitive(self, tree):
+        (tree / "B.png").write_bytes(b"x")
+        result = scan_files(str(tree), "*.png")
+        assert result == sorted(result, key=str.lower)
+
+
+class TestPatterns:
+    """测试多个模式、排除模式和大小写"""
+
+    def test_multiple_includes(self, tree):
+        assert scan_files(str(tree), "*.png;*.jpg") == ["[x].png", "a.png", "b.jpg"]
+        assert scan_files(str(tree), ["*.jpg", "s1/*.jpg"]) == [
+            "b.jpg",
+            os.path.join("s1", "e.jpg"),
+        ]
+
+    def test_overlapping_includes_not_duplicated(self, tree):
+        assert scan_files(str(tree), "*.png;a.*") == ["[x].png", "a.png"]
+
+    def test_exclude_files(self, tree):
+        result = scan_files(str(tree), "**/*.png", exclude="**/*_mask.png")
+        assert os.path.join("s1", "s2", "g_mask.png") not in result
+        assert os.path.join("s1", "s2", "f.png") in result
+
+    def test_exclude_directory_anywhere(self, tree):
+        result = scan_files(str(tree), "**/*.png", exclude="**/thumbs")
+        assert os.path.join("thumbs", "j.png") not in result
+        assert os.path.join("s1", "thumbs", "k.png") not in result
+
+    def test_exclude_directory_contents(self, tree):
+        result = scan_files(str(tree), "**/*.png", exclude="s1/**")
+        assert not any(p.startswith("s1") for p in result)
+        assert "a.png" in result
+
+    def test_case_sensitivity(self, tree):
+        (tree / "UPPER.PNG").write_bytes(b"x")
+        assert "UPPER.PNG" in scan_files(str(tree), "*.png", case_sensitive=False)
+        assert "UPPER.PNG" not in scan_files(str(tree), "*.png", case_sensitive=True)
+
+    def test_default_case_sensitivity_follows_platform(self, tree):
+        (tree / "UPPER.PNG").write_bytes(b"x")
+        assert CASE_SENSITIVE_DEFAULT == (os.path.normcase("A") == "A")
+        assert ("UPPER.PNG" in scan_files(str(tree), "*.png")) != CASE_SENSITIVE_DEFAULT
+
+
+class TestPruning:
+    """测试目录剪枝"""
+
+    def _scanned_dirs(self, monkeypatch, base, include, exclude=None):
+        scanned = []
+        real_scandir = os.scandir
+
+        def recording_scandir(path):
+            scanned.append(os.path.relpath(path, str(base)))
+            return real_scandir(path)
+
+        monkeypatch.setattr(batch_scanner.os, "scandir", recording_scandir)
+        list(iter_matching_files(str(base), PathMatcher(include, exclude)))
+        return set(scanned)
+
+    def test_non_recursive_reads_only_base(self, tree, monkeypatch):
+        assert self._scanned_dirs(monkeypatch, tree, "*.png") == {"."}
+
+    def test_prefix_reads_only_matching_branch(self, tree, monkeypatch):
+        scanned = self._scanned_dirs(monkeypatch, tree, "s1/s2/*.png")
+        assert scanned == {".", "s1", os.path.join("s1", "s2")}
+
+    def test_excluded_directory_not_entered(self, tree, monkeypatch):
+        scanned = self._scanned_dirs(monkeypatch, tree, "**/*.png", exclude="**/thumbs")
+        assert "thumbs" not in scanned
+        assert os.path.join("s1", "thumbs") not in scanned
+
+    def test_hidden_directory_not_entered(self, tree, monkeypatch):
+        assert ".cache" not in self._scanned_dirs(monkeypatch, tree, "**/*.png")
+
+
+class TestWindow:
+    """测试 offset/limit 窗口"""
+
+    def test_windows_cover_all_in_order(self, tree):
+        full = scan_files(str(tree), "**/*.png")
+        collected, offset = [], 0
+        while offset != -1:
+            window, offset = scan_window(str(tree), "**/*.png", offset=offset, limit=3)
+            assert len(window) <= 3
+            collected.extend(window)
+        assert collected == full
+
+    def test_no_limit_returns_rest(self, tree):
+        full = scan_files(str(tree), "**/*.png")
+        assert scan_window(str(tree), "**/*.png", offset=2) == (full[2:], -1)
+
+    def test_exact_end(self, tree):
+        total = len(scan_files(str(tree), "*.png"))
+        window, next_offset = scan_window(str(tree), "*.png", offset=0, limit=total)
+        assert len(window) == total
+        assert next_offset == -1
+
+    def test_offset_past_end(self, tree):
+        assert scan_window(str(tree), "*.png", offset=1000, limit=10) == ([], -1)
+
+    def test_order_by_mtime_and_size(self, tree):
+        for i, name in enumerate(["a.png", "[x].png"]):
+            os.utime(tree / name, (1_000_000 + i, 1_000_000 + i))
+        (tree / "[x].png").write_bytes(b"xxxx")
+        os.utime(tree / "[x].png", (1_000_001, 1_000_001))
+        assert scan_window(str(tree), "*.png", order_by="mtime")[0] == ["a.png", "[x].png"]
+        assert scan_window(str(tree), "*.png", order_by="size")[0] == ["a.png", "[x].png"]
+        assert scan_window(str(tree), "*.png", order_by="name")[0] == ["[x].png", "a.png"]
+
+    def test_invalid_order(self, tree):
+        with pytest.raises(ValueError):
+            scan_window(str(tree), "*.png", order_by="random")
+
+
+class TestHelpers:
+    """测试模式拆分与验证"""
+
+    def test_split_patterns(self):
+        assert split_patterns("*.png; *.jpg ;") == ["*.png", "*.jpg"]
+        assert split_patterns(["*.png", ""]) == ["*.png"]
+        assert split_patterns(None) == []
+
+    def test_validate_multiple(self):
+        assert validate_glob_pattern("*.png;*.jpg") == (True, None)
+        is_valid, error = validate_glob_pattern("*.png;../*.jpg")
+        assert not is_valid
+        assert "../*.jpg" in error
+        assert validate_glob_pattern(";")[0] is False
+
+    def test_missing_base_dir(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            scan_files(str(tmp_path / "missing"), "*.png")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Conditioning 读写测试
+
+测试 CONDITIONING 结构检测、张量无损保存、嵌套结构还原和内存映射加载
+"""
+
+import sys
+import json
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.conditioning_io import (
+    CONDITIONING_METADATA_KEY,
+    is_conditioning,
+    load_conditioning_file,
+    save_conditioning_file,
+)
+from backend.helpers.latent_io import read_safetensors_header, write_safetensors
+
+
+def _to_numpy(value):
+    return value.numpy() if hasattr(value, "numpy") else np.asarray(value)
+
+
+def _conditioning():
+    cond = np.random.default_rng(0).standard_normal((1, 77, 768), dtype=np.float32)
+    pooled = np.random.default_rng(1).standard_normal((1, 1280), dtype=np.float32)
+    mask = np.ones((1, 64, 64), dtype=np.float32)
+    return [
+        [cond, {"pooled_output": pooled}],
+        [
+            cond,
+            {
+                "pooled_output": pooled,
+                "mask": mask,
+                "area": (64, 64, 0, 0),
+                "strength": 0.8,
+                "set_area_to_bounds": False,
+                "reference_latents": [np.zeros((1, 4, 8, 8), dtype=np.float32)],
+            },
+        ],
+    ]
+
+
+class TestIsConditioning:
+    """测试 CONDITIONING 结构检测"""
+
+    def test_valid(self):
+        assert is_conditioning(_conditioning())
+
+    def test_invalid(self):
+        assert not is_conditioning([])
+        assert not is_conditioning({"pooled_output": np.zeros(1)})
+        assert not is_conditioning([["text", {}]])
+        assert not is_conditioning([[np.zeros(1)]])
+
+
+class TestConditioningFile:
+    """测试 .cond 文件读写"""
+
+    def test_roundtrip(self, tmp_path):
+        original = _conditioning()
+        path = save_conditioning_file(original, str(tmp_path / "a.cond"))
+        loaded = load_conditioning_file(path)
+
+        assert len(loaded) == 2
+        np.testing.assert_array_equal(_to_numpy(loaded[0][0]), original[0][0])
+        np.testing.assert_array_equal(
+            _to_numpy(loaded[0][1]["pooled_output"]), original[0][1]["pooled_output"]
+        )
+
+        extra = loaded[1][1]
+        assert extra["area"] == (64, 64, 0, 0)
+        assert extra["strength"] == 0.8
+        assert extra["set_area_to_bounds"] is False
+        np.testing.assert_array_equal(_to_numpy(extra["mask"]), original[1][1]["mask"])
+        assert len(extra["reference_latents"]) == 1
+
+    def test_shared_tensors_stored_once(self, tmp_path):
+        path = save_conditioning_file(_conditioning(), str(tmp_path / "a.cond"))
+        header, _ = read_safetensors_header(path)
+        tensor_names = [name for name in header if name != "__metadata__"]
+        # cond、pooled 在两项间共享，只保存一次：cond, pooled, mask, reference_latent
+        assert len(tensor_names) == 4
+
+    def test_skips_unserializable(self, tmp_path):
+        conditioning = [
+            [np.zeros((1, 2, 3), dtype=np.float32), {"control": object(), "strength": 1.0}]
+        ]
+        path = save_conditioning_file(conditioning, str(tmp_path / "a.cond"))
+        loaded = load_conditioning_file(path)
+        assert loaded[0][1] == {"strength": 1.0}
+
+    def test_reserved_keys(self, tmp_path):
+        conditioning = [[np.zeros((1, 2), dtype=np.float32), {"__tensor__": "literal"}]]
+        path = save_conditioning_file(conditioning, str(tmp_path / "a.cond"))
+        assert load_conditioning_file(path)[0][1] == {"__tensor__": "literal"}
+
+    def test_mmap_and_eager_match(self, tmp_path):
+        path = save_conditioning_file(_conditioning(), str(tmp_path / "a.cond"))
+        mapped = load_conditioning_file(path, mmap=True)
+        eager = load_conditioning_file(path, mmap=False)
+        np.testing.assert_array_equal(_to_numpy(mapped[1][0]), _to_numpy(eager[1][0]))
+
+    def test_rejects_non_conditioning(self, tmp_path):
+        with pytest.raises(ValueError):
+            save_conditioning_file({"pooled_output": np.zeros(1)}, str(tmp_path / "a.cond"))
+
+    def test_rejects_plain_safetensors(self, tmp_path):
+        path = str(tmp_path / "plain.cond")
+        write_safetensors({"x": np.zeros(2, dtype=np.float32)}, path)
+        with pytest.raises(ValueError):
+            load_conditioning_file(path)
+
+    def test_rejects_unknown_version(self, tmp_path):
+        path = str(tmp_path / "future.cond")
+        write_safetensors(
+            {"t0": np.zeros((1, 2), dtype=np.float32)},
+            path,
+            {CONDITIONING_METADATA_KEY: json.dumps({"version": 99, "conditioning": []})},
+        )
+        with pytest.raises(ValueError):
+            load_conditioning_file(path)
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_conditioning_file(str(tmp_path / "missing.cond"))
+
+    def test_torch_roundtrip(self, tmp_path):
+        torch = pytest.importorskip("torch")
+        conditioning = [[torch.randn(1, 77, 768).half(), {"pooled_output": torch.randn(1, 1280)}]]
+        path = save_conditioning_file(conditioning, str(tmp_path / "a.cond"))
+        loaded = load_conditioning_file(path)
+        assert loaded[0][0].dtype == torch.float16
+        assert torch.equal(loaded[0][0], conditioning[0][0])
+        assert torch.equal(loaded[0][1]["pooled_output"], conditioning[0][1]["pooled_output"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
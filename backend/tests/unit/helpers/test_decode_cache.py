@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""解码缓存测试
+
+测试命中/未命中计数、文件修改后失效、按字节预算的 LRU 淘汰
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.decode_cache import (
+    DEFAULT_DECODE_CACHE_BYTES,
+    clear_decode_cache,
+    get_decode_cache_stats,
+    load_cached,
+    set_decode_cache_budget,
+    value_nbytes,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    clear_decode_cache(reset_stats=True)
+    set_decode_cache_budget(DEFAULT_DECODE_CACHE_BYTES)
+    yield
+    clear_decode_cache(reset_stats=True)
+    set_decode_cache_budget(DEFAULT_DECODE_CACHE_BYTES)
+
+
+class CountingLoader:
+    """记录调用次数的加载函数，返回 (100 字节的数组, None)"""
+
+    def __init__(self, size: int = 100):
+        self.calls = 0
+        self.size = size
+
+    def __call__(self, file_path):
+        self.calls += 1
+        return np.zeros(self.size, dtype=np.uint8), None
+
+
+def _make_file(tmp_path, name: str, content: bytes = b"x") -> str:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+class TestLoadCached:
+    """测试缓存加载"""
+
+    def test_hit_after_miss(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        loader = CountingLoader()
+
+        first = load_cached(path, loader)
+        second = load_cached(path, loader)
+
+        assert loader.calls == 1
+        assert second is first
+        stats = get_decode_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["bytes"] == 100
+        assert stats["hit_rate"] == 0.5
+
+    def test_relative_and_absolute_paths_share_entry(self, tmp_path, monkeypatch):
+        path = _make_file(tmp_path, "a.png")
+        monkeypatch.chdir(tmp_path)
+        loader = CountingLoader()
+
+        load_cached(path, loader)
+        load_cached("a.png", loader)
+        assert loader.calls == 1
+
+    def test_invalidated_when_file_changes(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        loader = CountingLoader()
+        load_cached(path, loader)
+
+        with open(path, "wb") as f:
+            f.write(b"changed")
+        load_cached(path, loader)
+
+        assert loader.calls == 2
+        stats = get_decode_cache_stats()
+        assert stats["invalidations"] == 1
+        assert stats["entries"] == 1
+
+    def test_invalidated_when_mtime_changes(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        loader = CountingLoader()
+        load_cached(path, loader)
+
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        load_cached(path, loader)
+        assert loader.calls == 2
+
+    def test_variants_cached_separately(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        loader = CountingLoader()
+
+        first = load_cached(path, loader, variant="float32")
+        second = load_cached(path, loader, variant="uint8")
+        assert loader.calls == 2
+        assert second is not first
+        assert load_cached(path, loader, variant="uint8") is second
+        assert get_decode_cache_stats()["entries"] == 2
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_cached(str(tmp_path / "missing.png"), CountingLoader())
+
+    def test_loader_error_not_cached(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+
+        def broken(file_path):
+            raise ValueError("decode failed")
+
+        with pytest.raises(ValueError):
+            load_cached(path, broken)
+        assert get_decode_cache_stats()["entries"] == 0
+
+
+class TestBudget:
+    """测试字节预算与淘汰"""
+
+    def test_lru_eviction(self, tmp_path):
+        set_decode_cache_budget(250)
+        loader = CountingLoader()
+        paths = [_make_file(tmp_path, f"{name}.png") for name in "abc"]
+
+        load_cached(paths[0], loader)
+        load_cached(paths[1], loader)
+        load_cached(paths[0], loader)  # a 成为最近访问
+        load_cached(paths[2], loader)  # 淘汰 b
+
+        stats = get_decode_cache_stats()
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 2
+        assert stats["bytes"] == 200
+
+        calls = loader.calls
+        load_cached(paths[0], loader)
+        assert loader.calls == calls
+        load_cached(paths[1], loader)
+        assert loader.calls == calls + 1
+
+    def test_oversized_value_not_cached(self, tmp_path):
+        set_decode_cache_budget(50)
+        loader = CountingLoader(size=100)
+        path = _make_file(tmp_path, "a.png")
+
+        load_cached(path, loader)
+        load_cached(path, loader)
+        assert loader.calls == 2
+        assert get_decode_cache_stats()["entries"] == 0
+
+    def test_shrinking_budget_evicts(self, tmp_path):
+        loader = CountingLoader()
+        for name in "abc":
+            load_cached(_make_file(tmp_path, f"{name}.png"), loader)
+
+        set_decode_cache_budget(100)
+        stats = get_decode_cache_stats()
+        assert stats["entries"] == 1
+        assert stats["evictions"] == 2
+        assert stats["max_bytes"] == 100
+
+    def test_zero_budget_disables(self, tmp_path):
+        set_decode_cache_budget(0)
+        loader = CountingLoader()
+        path = _make_file(tmp_path, "a.png")
+        load_cached(path, loader)
+        load_cached(path, loader)
+        assert loader.calls == 2
+
+    def test_clear(self, tmp_path):
+        load_cached(_make_file(tmp_path, "a.png"), CountingLoader())
+        assert clear_decode_cache() == 1
+        stats = get_decode_cache_stats()
+        assert stats["entries"] == 0
+        assert stats["misses"] == 1
+
+
+class TestValueNbytes:
+    """测试字节数估算"""
+
+    def test_numpy_and_tuple(self):
+        assert value_nbytes(np.zeros((2, 3), dtype=np.float32)) == 24
+        assert value_nbytes((np.zeros(4, dtype=np.uint8), None)) == 4
+        assert value_nbytes("text") == 0
+
+    def test_torch(self):
+        torch = pytest.importorskip("torch")
+        assert value_nbytes(torch.zeros(2, 3)) == 24
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
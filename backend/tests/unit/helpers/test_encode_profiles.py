@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""编码配置测试
+
+测试 get_image_save_kwargs 的配置查找、默认配置和错误处理
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.encode_profiles import (
+    get_image_save_kwargs,
+    IMAGE_ENCODE_PROFILES,
+    ENCODE_PROFILE_NAMES,
+    DEFAULT_ENCODE_PROFILE,
+)
+
+
+class TestEncodeProfiles:
+    """测试编码配置表"""
+
+    def test_profile_names(self):
+        assert ENCODE_PROFILE_NAMES == ["fastest", "balanced", "smallest"]
+        assert DEFAULT_ENCODE_PROFILE in ENCODE_PROFILE_NAMES
+
+    def test_every_profile_covers_tunable_formats(self):
+        for profile in IMAGE_ENCODE_PROFILES.values():
+            assert set(profile) == {"PNG", "JPEG", "WEBP", "TIFF"}
+
+    def test_smallest_keeps_legacy_settings(self):
+        """smallest 保留旧版 save_image 的硬编码参数"""
+        assert get_image_save_kwargs("PNG", "smallest")["optimize"] is True
+        assert get_image_save_kwargs("WEBP", "smallest")["method"] == 6
+
+    def test_fastest_png_uses_low_compress_level(self):
+        assert get_image_save_kwargs("PNG", "fastest") == {"compress_level": 1}
+
+
+class TestGetImageSaveKwargs:
+    """测试参数查找"""
+
+    def test_format_is_case_insensitive(self):
+        assert get_image_save_kwargs("webp", "balanced") == get_image_save_kwargs(
+            "WEBP", "balanced"
+        )
+
+    def test_default_profile(self):
+        assert get_image_save_kwargs("PNG") == IMAGE_ENCODE_PROFILES[DEFAULT_ENCODE_PROFILE]["PNG"]
+
+    @pytest.mark.parametrize("pil_format", ["BMP", "GIF"])
+    def test_formats_without_params(self, pil_format):
+        assert get_image_save_kwargs(pil_format, "smallest") == {}
+
+    def test_returns_copy(self):
+        kwargs = get_image_save_kwargs("PNG", "fastest")
+        kwargs["compress_level"] = 9
+        assert IMAGE_ENCODE_PROFILES["fastest"]["PNG"]["compress_level"] == 1
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            get_image_save_kwargs("PNG", "ultra")
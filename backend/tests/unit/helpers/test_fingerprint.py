@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""变化指纹测试
+
+测试单文件 stat 指纹、目录扫描指纹对修改/新增/删除的响应
+"""
+
+import os
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.fingerprint import file_fingerprint, listing_fingerprint, path_fingerprint
+
+
+def _make_file(directory, name: str, content: bytes = b"x") -> str:
+    path = directory / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def _bump_mtime(path: str) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestFileFingerprint:
+    """测试单文件指纹"""
+
+    def test_stable(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        assert file_fingerprint(path) == file_fingerprint(path)
+
+    def test_relative_and_absolute_equal(self, tmp_path, monkeypatch):
+        path = _make_file(tmp_path, "a.png")
+        monkeypatch.chdir(tmp_path)
+        assert file_fingerprint("a.png") == file_fingerprint(path)
+
+    def test_changes_with_mtime(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        before = file_fingerprint(path)
+        _bump_mtime(path)
+        assert file_fingerprint(path) != before
+
+    def test_changes_with_size(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        before = file_fingerprint(path)
+        stat = os.stat(path)
+        with open(path, "wb") as f:
+            f.write(b"longer content")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert file_fingerprint(path) != before
+
+    def test_missing(self, tmp_path):
+        assert file_fingerprint(str(tmp_path / "missing.png")).startswith("missing:")
+
+
+class TestListingFingerprint:
+    """测试目录扫描指纹"""
+
+    def test_stable(self, tmp_path):
+        _make_file(tmp_path, "a.png")
+        _make_file(tmp_path, "b.png")
+        assert listing_fingerprint(str(tmp_path), "*.png") == listing_fingerprint(
+            str(tmp_path), "*.png"
+        )
+
+    def test_added_file(self, tmp_path):
+        _make_file(tmp_path, "a.png")
+        before = listing_fingerprint(str(tmp_path), "*.png")
+        _make_file(tmp_path, "b.png")
+        assert listing_fingerprint(str(tmp_path), "*.png") != before
+
+    def test_removed_file(self, tmp_path):
+        _make_file(tmp_path, "a.png")
+        path = _make_file(tmp_path, "b.png")
+        before = listing_fingerprint(str(tmp_path), "*.png")
+        os.remove(path)
+        assert listing_fingerprint(str(tmp_path), "*.png") != before
+
+    def test_modified_file(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        before = listing_fingerprint(str(tmp_path), "*.png")
+        _bump_mtime(path)
+        assert listing_fingerprint(str(tmp_path), "*.png") != before
+
+    def test_unmatched_file_ignored(self, tmp_path):
+        _make_file(tmp_path, "a.png")
+        before = listing_fingerprint(str(tmp_path), "*.png")
+        _make_file(tmp_path, "notes.txt")
+        assert listing_fingerprint(str(tmp_path), "*.png") == before
+
+    def test_recursive_pattern(self, tmp_path):
+        _make_file(tmp_path, "a.png")
+        before = listing_fingerprint(str(tmp_path), "**/*.png")
+        _make_file(tmp_path, "sub/b.png")
+        assert listing_fingerprint(str(tmp_path), "**/*.png") != before
+
+    def test_pattern_changes_fingerprint(self, tmp_path):
+        _make_file(tmp_path, "a.png")
+        assert listing_fingerprint(str(tmp_path), "*.png") != listing_fingerprint(
+            str(tmp_path), "*.*"
+        )
+
+    def test_missing_directory(self, tmp_path):
+        assert listing_fingerprint(str(tmp_path / "missing"), "*.png").startswith("missing:")
+
+
+class TestPathFingerprint:
+    """测试按路径类型分派"""
+
+    def test_dispatch(self, tmp_path):
+        path = _make_file(tmp_path, "a.png")
+        assert path_fingerprint(path) == file_fingerprint(path)
+        assert path_fingerprint(str(tmp_path), "*.png") == listing_fingerprint(
+            str(tmp_path), "*.png"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
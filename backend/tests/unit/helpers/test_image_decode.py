@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""缩小分辨率与区域解码测试
+
+测试裁剪区域解析、最长边限制、JPEG DCT 缩放、EXIF 旋转后的裁剪坐标和调色板图像
+"""
+
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.image_decode import open_image_region, parse_crop_box
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _gradient(height: int, width: int) -> np.ndarray:
+    """左右方向的灰度渐变（R 通道随 x 增大）"""
+    row = np.linspace(0, 255, width, dtype=np.float32)
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    pixels[..., 0] = row[None, :].astype(np.uint8)
+    return pixels
+
+
+def _save(tmp_path, name: str, pixels: np.ndarray, **kwargs) -> str:
+    path = str(tmp_path / name)
+    Image.fromarray(pixels, "RGB").save(path, **kwargs)
+    return path
+
+
+class TestParseCropBox:
+    """测试裁剪区域解析"""
+
+    def test_parse(self):
+        assert parse_crop_box("10, 20, 110, 220") == (10, 20, 110, 220)
+
+    def test_empty(self):
+        assert parse_crop_box("") is None
+        assert parse_crop_box("  ") is None
+        assert parse_crop_box(None) is None
+
+    @pytest.mark.parametrize("text", ["1,2,3", "10,10,5,20", "a,b,c,d"])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_crop_box(text)
+
+
+class TestOpenImageRegion:
+    """测试区域解码"""
+
+    def test_no_options_keeps_size(self, tmp_path):
+        path = _save(tmp_path, "a.png", _gradient(40, 60))
+        with Image.open(path) as img:
+            assert open_image_region(img).size == (60, 40)
+
+    def test_max_side_png(self, tmp_path):
+        path = _save(tmp_path, "a.png", _gradient(400, 800))
+        with Image.open(path) as img:
+            result = open_image_region(img, max_side=200)
+        assert result.size == (200, 100)
+
+    def test_max_side_never_upscales(self, tmp_path):
+        path = _save(tmp_path, "a.png", _gradient(40, 60))
+        with Image.open(path) as img:
+            assert open_image_region(img, max_side=1000).size == (60, 40)
+
+    def test_jpeg_draft_decodes_reduced(self, tmp_path):
+        path = _save(tmp_path, "a.jpg", _gradient(800, 1600), quality=90)
+        with Image.open(path) as img:
+            result = open_image_region(img, max_side=200)
+            # DCT 缩放到 1/8 后恰好为目标尺寸
+            assert img.size == (200, 100)
+        assert result.size == (200, 100)
+
+    def test_crop_box(self, tmp_path):
+        pixels = _gradient(100, 200)
+        path = _save(tmp_path, "a.png", pixels)
+        with Image.open(path) as img:
+            result = open_image_region(img, crop_box=(100, 10, 150, 60))
+        assert result.size == (50, 50)
+        np.testing.assert_array_equal(np.asarray(result), pixels[10:60, 100:150])
+
+    def test_crop_and_max_side(self, tmp_path):
+        path = _save(tmp_path, "a.png", _gradient(400, 400))
+        with Image.open(path) as img:
+            result = open_image_region(img, max_side=50, crop_box=(0, 0, 200, 100))
+        assert result.size == (50, 25)
+
+    def test_crop_clamped_to_image(self, tmp_path):
+        path = _save(tmp_path, "a.png", _gradient(40, 60))
+        with Image.open(path) as img:
+            assert open_image_region(img, crop_box=(50, 30, 100, 100)).size == (10, 10)
+
+    def test_crop_outside_image(self, tmp_path):
+        path = _save(tmp_path, "a.png", _gradient(40, 60))
+        with Image.open(path) as img:
+            with pytest.raises(ValueError):
+                open_image_region(img, crop_box=(100, 100, 200, 200))
+
+    def test_crop_uses_rotated_coordinates(self, tmp_path):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 顺时针旋转 90 度：200x100 → 100x200
+        path = _save(tmp_path, "r.jpg", _gradient(100, 200), exif=exif.tobytes())
+        with Image.open(path) as img:
+            result = open_image_region(img, crop_box=(0, 150, 100, 200))
+        assert result.size == (100, 50)
+
+    def test_palette_with_transparency_keeps_alpha(self, tmp_path):
+        img = Image.new("P", (64, 64), 0)
+        img.info["transparency"] = 0
+        path = str(tmp_path / "p.png")
+        img.save(path, transparency=0)
+        with Image.open(path) as opened:
+            result = open_image_region(opened, max_side=16)
+        assert result.mode == "RGBA"
+        assert result.size == (16, 16)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""Latent 读写测试
+
+测试 safetensors 读写、内存映射加载、单样本读取和旧版 pickle 兼容
+"""
+
+import sys
+import pickle
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.latent_io import (
+    LATENT_FORMAT_MARKER,
+    LATENT_TENSOR_KEY,
+    LEGACY_LATENT_SCALE,
+    is_safetensors_file,
+    load_latent_file,
+    read_safetensors,
+    read_safetensors_header,
+    save_latent_file,
+    write_safetensors,
+)
+
+
+def _samples(batch: int = 4) -> np.ndarray:
+    return np.arange(batch * 4 * 8 * 8, dtype=np.float32).reshape(batch, 4, 8, 8)
+
+
+def _to_numpy(value):
+    return value.numpy() if hasattr(value, "numpy") else np.asarray(value)
+
+
+class _Payload:
+    """反序列化时会调用任意函数的对象"""
+
+    def __reduce__(self):
+        return (print, ("unpickled",))
+
+
+class TestSafetensors:
+    """测试 safetensors 读写"""
+
+    def test_roundtrip_dtypes(self, tmp_path):
+        tensors = {
+            "a": np.arange(6, dtype=np.float16).reshape(2, 3),
+            "b": np.arange(5, dtype=np.int64),
+            "c": np.array([True, False, True]),
+            "d": np.arange(7, dtype=np.uint8),
+        }
+        path = str(tmp_path / "t.safetensors")
+        write_safetensors(tensors, path, {"key": "value"})
+
+        loaded, metadata = read_safetensors(path)
+        assert metadata == {"key": "value"}
+        for name, value in tensors.items():
+            np.testing.assert_array_equal(_to_numpy(loaded[name]), value)
+
+    def test_header_aligned(self, tmp_path):
+        path = str(tmp_path / "t.safetensors")
+        write_safetensors({"x": np.zeros((3,), dtype=np.float32)}, path)
+        header, data_start = read_safetensors_header(path)
+        assert data_start % 8 == 0
+        assert header["x"]["data_offsets"] == [0, 12]
+
+    def test_mmap_is_copy_on_write(self, tmp_path):
+        path = str(tmp_path / "t.safetensors")
+        write_safetensors({"x": np.ones((4,), dtype=np.float32)}, path)
+
+        loaded, _ = read_safetensors(path, mmap=True)
+        array = _to_numpy(loaded["x"])
+        array[0] = 5.0  # 修改不会写回文件
+
+        reloaded, _ = read_safetensors(path, mmap=False)
+        np.testing.assert_array_equal(_to_numpy(reloaded["x"]), np.ones(4))
+
+    def test_index_reads_single_item(self, tmp_path):
+        path = str(tmp_path / "t.safetensors")
+        write_safetensors({"x": _samples()}, path)
+
+        for mmap in (True, False):
+            loaded, _ = read_safetensors(path, index=2, mmap=mmap)
+            np.testing.assert_array_equal(_to_numpy(loaded["x"]), _samples()[2:3])
+
+    def test_index_out_of_range(self, tmp_path):
+        path = str(tmp_path / "t.safetensors")
+        write_safetensors({"x": _samples(2)}, path)
+        with pytest.raises(IndexError):
+            read_safetensors(path, index=2)
+
+    def test_compatible_with_safetensors_library(self, tmp_path):
+        safetensors_numpy = pytest.importorskip("safetensors.numpy")
+        path = str(tmp_path / "t.safetensors")
+        write_safetensors({"x": _samples(), "y": np.arange(3, dtype=np.int32)}, path)
+
+        loaded = safetensors_numpy.load_file(path)
+        np.testing.assert_array_equal(loaded["x"], _samples())
+
+        other = str(tmp_path / "other.safetensors")
+        safetensors_numpy.save_file({"x": _samples()}, other)
+        np.testing.assert_array_equal(_to_numpy(read_safetensors(other)[0]["x"]), _samples())
+
+    def test_bfloat16_roundtrip(self, tmp_path):
+        torch = pytest.importorskip("torch")
+        tensor = torch.randn(2, 3).to(torch.bfloat16)
+        path = str(tmp_path / "t.safetensors")
+        write_safetensors({"x": tensor}, path)
+        loaded, _ = read_safetensors(path)
+        assert loaded["x"].dtype == torch.bfloat16
+        assert torch.equal(loaded["x"], tensor)
+
+
+class TestLatentFile:
+    """测试 .latent 文件读写"""
+
+    def test_comfyui_layout(self, tmp_path):
+        path = save_latent_file({"samples": _samples()}, str(tmp_path / "a.latent"))
+        assert is_safetensors_file(path)
+
+        header, _ = read_safetensors_header(path)
+        assert LATENT_TENSOR_KEY in header
+        assert LATENT_FORMAT_MARKER in header
+
+    def test_roundtrip_with_extra_fields(self, tmp_path):
+        latent = {
+            "samples": _samples(),
+            "noise_mask": np.ones((4, 1, 8, 8), dtype=np.float32),
+            "batch_index": [3, 4, 5, 6],
+        }
+        path = save_latent_file(latent, str(tmp_path / "a.latent"))
+
+        loaded = load_latent_file(path)
+        np.testing.assert_array_equal(_to_numpy(loaded["samples"]), latent["samples"])
+        np.testing.assert_array_equal(_to_numpy(loaded["noise_mask"]), latent["noise_mask"])
+        assert loaded["batch_index"] == [3, 4, 5, 6]
+
+    def test_load_single_sample(self, tmp_path):
+        latent = {
+            "samples": _samples(),
+            "noise_mask": np.ones((4, 1, 8, 8), dtype=np.float32),
+            "batch_index": [3, 4, 5, 6],
+        }
+        path = save_latent_file(latent, str(tmp_path / "a.latent"))
+
+        loaded = load_latent_file(path, index=1)
+        np.testing.assert_array_equal(_to_numpy(loaded["samples"]), latent["samples"][1:2])
+        assert _to_numpy(loaded["noise_mask"]).shape == (1, 1, 8, 8)
+        assert loaded["batch_index"] == [4]
+
+    def test_legacy_pickle(self, tmp_path):
+        path = str(tmp_path / "old.latent")
+        with open(path, "wb") as f:
+            pickle.dump({"samples": _samples()}, f)
+
+        assert not is_safetensors_file(path)
+        np.testing.assert_array_equal(_to_numpy(load_latent_file(path)["samples"]), _samples())
+        np.testing.assert_array_equal(
+            _to_numpy(load_latent_file(path, index=3)["samples"]), _samples()[3:4]
+        )
+
+    def test_legacy_pickle_rejects_other_globals(self, tmp_path):
+        path = str(tmp_path / "evil.latent")
+        with open(path, "wb") as f:
+            pickle.dump({"samples": _samples(), "payload": _Payload()}, f)
+
+        with pytest.raises(pickle.UnpicklingError):
+            load_latent_file(path)
+
+    def test_legacy_comfyui_scale(self, tmp_path):
+        # 没有格式标记的旧版 ComfyUI latent 需要还原缩放
+        path = str(tmp_path / "old_comfy.latent")
+        write_safetensors({LATENT_TENSOR_KEY: np.ones((1, 4, 2, 2), dtype=np.float32)}, path)
+        loaded = load_latent_file(path)
+        np.testing.assert_allclose(_to_numpy(loaded["samples"]), LEGACY_LATENT_SCALE, rtol=1e-6)
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_latent_file(str(tmp_path / "missing.latent"))
+
+    def test_requires_samples(self, tmp_path):
+        with pytest.raises(ValueError):
+            save_latent_file({"noise_mask": np.ones(1)}, str(tmp_path / "a.latent"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
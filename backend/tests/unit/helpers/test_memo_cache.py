@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""持久化缓存测试
+
+测试缓存键计算、条目原子写入、命中查询和按字节预算的 LRU 淘汰
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.memo_cache import (
+    compute_cache_key,
+    evict_cache,
+    get_cache_entry,
+    list_cache_entries,
+    remove_cache_entry,
+    store_cache_entry,
+)
+
+
+def _writer(content: bytes, data_type: str = "STRING"):
+    def write(entry_dir):
+        path = os.path.join(entry_dir, "data.bin")
+        with open(path, "wb") as f:
+            f.write(content)
+        return data_type, path
+
+    return write
+
+
+def _set_access_time(cache_dir, key, timestamp):
+    os.utime(os.path.join(cache_dir, key, "meta.json"), (timestamp, timestamp))
+
+
+class TestComputeCacheKey:
+    """测试缓存键计算"""
+
+    def test_deterministic(self):
+        values = ["a cat", 42, 0.5, None, {"b": 1, "a": [1, 2]}]
+        assert compute_cache_key(values) == compute_cache_key(list(values))
+
+    def test_dict_order_independent(self):
+        assert compute_cache_key([{"a": 1, "b": 2}]) == compute_cache_key([{"b": 2, "a": 1}])
+
+    def test_distinguishes_values(self):
+        keys = {
+            compute_cache_key(["1"]),
+            compute_cache_key([1]),
+            compute_cache_key([1.0]),
+            compute_cache_key([True]),
+            compute_cache_key([[1]]),
+            compute_cache_key([(1,)]),
+            compute_cache_key(["ab", "c"]),
+            compute_cache_key(["a", "bc"]),
+        }
+        assert len(keys) == 8
+
+    def test_namespace(self):
+        assert compute_cache_key([1], "vae") != compute_cache_key([1], "clip")
+
+    def test_tensor_content(self):
+        a = np.zeros((2, 3), dtype=np.float32)
+        assert compute_cache_key([a]) == compute_cache_key([a.copy()])
+        assert compute_cache_key([a]) != compute_cache_key([a.astype(np.float16)])
+        assert compute_cache_key([a]) != compute_cache_key([a.reshape(3, 2)])
+        b = a.copy()
+        b[1, 2] = 1.0
+        assert compute_cache_key([a]) != compute_cache_key([b])
+
+    def test_non_contiguous_tensor(self):
+        a = np.arange(12, dtype=np.float32).reshape(3, 4)
+        assert compute_cache_key([a.T]) == compute_cache_key([np.ascontiguousarray(a.T)])
+
+    def test_torch_matches_content(self):
+        torch = pytest.importorskip("torch")
+        a = torch.arange(6, dtype=torch.float32).reshape(2, 3)
+        assert compute_cache_key([a]) == compute_cache_key([a.clone()])
+        assert compute_cache_key([a]) != compute_cache_key([a + 1])
+
+    def test_rejects_unhashable_objects(self):
+        with pytest.raises(TypeError):
+            compute_cache_key([object()])
+
+
+class TestCacheEntries:
+    """测试条目写入与查询"""
+
+    def test_miss_then_hit(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        key = compute_cache_key(["prompt"])
+        assert get_cache_entry(cache_dir, key) is None
+
+        entry = store_cache_entry(cache_dir, key, _writer(b"hello"))
+        assert entry["type"] == "STRING"
+        assert entry["size"] == 5
+
+        hit = get_cache_entry(cache_dir, key)
+        with open(hit["path"], "rb") as f:
+            assert f.read() == b"hello"
+
+    def test_existing_entry_not_rewritten(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        store_cache_entry(cache_dir, "k", _writer(b"first"))
+        entry = store_cache_entry(cache_dir, "k", _writer(b"second"))
+        with open(entry["path"], "rb") as f:
+            assert f.read() == b"first"
+
+    def test_failed_writer_leaves_nothing(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+
+        def broken(entry_dir):
+            with open(os.path.join(entry_dir, "partial"), "wb") as f:
+                f.write(b"x")
+            raise RuntimeError("encode failed")
+
+        with pytest.raises(RuntimeError):
+            store_cache_entry(cache_dir, "k", broken)
+        assert os.listdir(cache_dir) == []
+        assert get_cache_entry(cache_dir, "k") is None
+
+    def test_corrupt_entry_is_miss(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        entry = store_cache_entry(cache_dir, "k", _writer(b"data"))
+        os.remove(entry["path"])
+        assert get_cache_entry(cache_dir, "k") is None
+
+    def test_truncated_entry_is_miss(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        entry = store_cache_entry(cache_dir, "k", _writer(b"complete data"))
+        with open(entry["path"], "wb") as f:
+            f.write(b"compl")
+        assert get_cache_entry(cache_dir, "k") is None
+
+    def test_broken_entry_replaced_on_store(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        entry = store_cache_entry(cache_dir, "k", _writer(b"old data"))
+        with open(entry["path"], "wb") as f:
+            f.write(b"o")
+        entry = store_cache_entry(cache_dir, "k", _writer(b"new data"))
+        with open(entry["path"], "rb") as f:
+            assert f.read() == b"new data"
+
+    def test_remove_entry(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        store_cache_entry(cache_dir, "k", _writer(b"data"))
+        assert remove_cache_entry(cache_dir, "k")
+        assert not remove_cache_entry(cache_dir, "k")
+        assert get_cache_entry(cache_dir, "k") is None
+
+    def test_persists_across_calls(self, tmp_path):
+        # 条目只依赖磁盘上的文件，新会话可直接命中
+        cache_dir = str(tmp_path / "cache")
+        store_cache_entry(cache_dir, "k", _writer(b"data"))
+        assert [meta["key"] for meta in list_cache_entries(cache_dir)] == ["k"]
+
+
+class TestEviction:
+    """测试 LRU 淘汰"""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        now = time.time()
+        for i, key in enumerate(["a", "b", "c"]):
+            store_cache_entry(cache_dir, key, _writer(b"x" * 100), max_bytes=0)
+            _set_access_time(cache_dir, key, now - 100 + i)
+
+        # 访问 a 后，b 成为最久未访问的条目
+        get_cache_entry(cache_dir, "a")
+
+        removed = evict_cache(cache_dir, max_bytes=200)
+        assert removed == ["b"]
+        assert {meta["key"] for meta in list_cache_entries(cache_dir)} == {"a", "c"}
+
+    def test_store_enforces_budget(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        now = time.time()
+        for i, key in enumerate(["a", "b"]):
+            store_cache_entry(cache_dir, key, _writer(b"x" * 100), max_bytes=0)
+            _set_access_time(cache_dir, key, now - 100 + i)
+
+        store_cache_entry(cache_dir, "c", _writer(b"x" * 100), max_bytes=250)
+        assert {meta["key"] for meta in list_cache_entries(cache_dir)} == {"b", "c"}
+
+    def test_keeps_new_entry_over_budget(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        entry = store_cache_entry(cache_dir, "big", _writer(b"x" * 1000), max_bytes=10)
+        assert entry is not None
+        assert get_cache_entry(cache_dir, "big") is not None
+
+    def test_missing_directory(self, tmp_path):
+        assert evict_cache(str(tmp_path / "none"), max_bytes=0) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
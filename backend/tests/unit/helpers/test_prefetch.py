@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""预读解码测试
+
+测试预读窗口推进、等待进行中的解码、内存上限、会话替换和统计
+"""
+
+import sys
+import threading
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.prefetch import (
+    get_prefetch_stats,
+    start_prefetch,
+    stop_prefetch,
+    take_prefetched,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_prefetch():
+    stop_prefetch()
+    get_prefetch_stats(reset=True)
+    yield
+    stop_prefetch()
+    get_prefetch_stats(reset=True)
+
+
+class RecordingLoader:
+    """记录被解码路径的加载函数，返回 (size 字节的数组, 路径)"""
+
+    def __init__(self, size: int = 100):
+        self.size = size
+        self.loaded = []
+        self.lock = threading.Lock()
+
+    def __call__(self, file_path):
+        with self.lock:
+            self.loaded.append(file_path)
+        return np.zeros(self.size, dtype=np.uint8), file_path
+
+
+def _paths(tmp_path, count: int) -> list:
+    return [str(tmp_path / f"{i:03d}.png") for i in range(count)]
+
+
+def _wait_idle(timeout: float = 5.0) -> None:
+    """等待所有已提交的解码完成"""
+    import time
+
+    deadline = time.monotonic() + timeout
+    while get_prefetch_stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestWindow:
+    """测试预读窗口"""
+
+    def test_initial_window(self, tmp_path):
+        loader = RecordingLoader()
+        paths = _paths(tmp_path, 10)
+        assert start_prefetch(paths, loader, window=3) == 3
+        _wait_idle()
+        assert sorted(loader.loaded) == paths[:3]
+        assert get_prefetch_stats()["buffered"] == 3
+
+    def test_sequential_consumption_all_hits(self, tmp_path):
+        loader = RecordingLoader()
+        paths = _paths(tmp_path, 8)
+        start_prefetch(paths, loader, window=2)
+
+        for path in paths:
+            value = take_prefetched(path)
+            assert value is not None
+            assert value[1] == path
+
+        stats = get_prefetch_stats()
+        assert stats["hits"] == 8
+        assert stats["misses"] == 0
+        assert stats["hit_rate"] == 1.0
+        assert stats["scheduled"] == 8
+        assert sorted(loader.loaded) == paths
+
+    def test_window_advances(self, tmp_path):
+        loader = RecordingLoader()
+        paths = _paths(tmp_path, 10)
+        start_prefetch(paths, loader, window=2)
+        _wait_idle()
+
+        take_prefetched(paths[0])
+        _wait_idle()
+        # 取出第 0 项后，第 1、2 项应已提交
+        assert sorted(loader.loaded) == paths[:3]
+
+    def test_waits_for_in_flight_decode(self, tmp_path):
+        release = threading.Event()
+
+        def slow_loader(file_path):
+            release.wait(5)
+            return file_path
+
+        paths = _paths(tmp_path, 2)
+        start_prefetch(paths, slow_loader, window=1)
+        threading.Timer(0.05, release.set).start()
+
+        assert take_prefetched(paths[0]) == paths[0]
+        stats = get_prefetch_stats()
+        assert stats["hits"] == 1
+        assert stats["waits"] == 1
+
+    def test_unknown_path_not_counted(self, tmp_path):
+        start_prefetch(_paths(tmp_path, 2), RecordingLoader(), window=1)
+        assert take_prefetched(str(tmp_path / "other.png")) is None
+        stats = get_prefetch_stats()
+        assert stats["hits"] == 0
+        assert stats["misses"] == 0
+
+    def test_tag_mismatch_not_counted(self, tmp_path):
+        paths = _paths(tmp_path, 2)
+        start_prefetch(paths, RecordingLoader(), window=2, tag="float32")
+        assert take_prefetched(paths[0], tag="uint8") is None
+        assert get_prefetch_stats()["misses"] == 0
+        assert take_prefetched(paths[0], tag="float32") is not None
+
+    def test_skip_ahead_is_miss_and_discards(self, tmp_path):
+        loader = RecordingLoader()
+        paths = _paths(tmp_path, 10)
+        start_prefetch(paths, loader, window=2)
+        _wait_idle()
+
+        assert take_prefetched(paths[5]) is None
+        stats = get_prefetch_stats()
+        assert stats["misses"] == 1
+        assert stats["discarded"] == 2
+        _wait_idle()
+        assert take_prefetched(paths[6]) is not None
+
+    def test_zero_window_disables(self, tmp_path):
+        loader = RecordingLoader()
+        assert start_prefetch(_paths(tmp_path, 3), loader, window=0) == 0
+        assert not get_prefetch_stats()["active"]
+        assert loader.loaded == []
+
+
+class TestLimits:
+    """测试内存上限与失败处理"""
+
+    def test_memory_cap_pauses_scheduling(self, tmp_path):
+        loader = RecordingLoader(size=100)
+        paths = _paths(tmp_path, 10)
+        # 上限为 150 字节：第一项解码完成后缓冲区达到上限
+        start_prefetch(paths, loader, window=1, max_bytes=150)
+        _wait_idle()
+        take_prefetched(paths[0])
+        _wait_idle()
+        assert get_prefetch_stats()["bytes"] <= 200
+
+        for path in paths[1:]:
+            assert take_prefetched(path) is not None
+        assert get_prefetch_stats()["hits"] == 10
+
+    def test_loader_error_is_miss(self, tmp_path):
+        def broken(file_path):
+            raise ValueError("decode failed")
+
+        paths = _paths(tmp_path, 2)
+        start_prefetch(paths, broken, window=2)
+        assert take_prefetched(paths[0]) is None
+        stats = get_prefetch_stats()
+        assert stats["misses"] == 1
+        assert stats["errors"] >= 1
+
+
+class TestSession:
+    """测试会话替换与停止"""
+
+    def test_new_session_replaces_old(self, tmp_path):
+        old_paths = _paths(tmp_path / "old", 3)
+        new_paths = _paths(tmp_path / "new", 3)
+        start_prefetch(old_paths, RecordingLoader(), window=3)
+        _wait_idle()
+
+        start_prefetch(new_paths, RecordingLoader(), window=3)
+        assert take_prefetched(old_paths[0]) is None
+        assert take_prefetched(new_paths[0]) is not None
+        assert get_prefetch_stats()["discarded"] >= 3
+
+    def test_stop(self, tmp_path):
+        paths = _paths(tmp_path, 3)
+        start_prefetch(paths, RecordingLoader(), window=3)
+        _wait_idle()
+        assert stop_prefetch() == 3
+        stats = get_prefetch_stats()
+        assert not stats["active"]
+        assert stats["bytes"] == 0
+        assert take_prefetched(paths[0]) is None
+
+    def test_reset_stats(self, tmp_path):
+        paths = _paths(tmp_path, 1)
+        start_prefetch(paths, RecordingLoader(), window=1)
+        take_prefetched(paths[0])
+        assert get_prefetch_stats(reset=True)["hits"] == 1
+        assert get_prefetch_stats()["hits"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""保存清单测试
+
+测试清单记录与读取、已产出检查（来源、大小、sha256）、增量读取追加部分、不完整行容错和并行保存
+"""
+
+import os
+import sys
+import json
+import hashlib
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.batch_saver import run_batch
+from backend.helpers.save_manifest import (
+    find_produced,
+    get_manifest_path,
+    load_manifest,
+    manifest_name,
+    record_output,
+    save_with_manifest,
+)
+
+
+def _write_bytes(data: bytes, path: str) -> str:
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return get_manifest_path(str(tmp_path))
+
+
+class TestRecord:
+    """测试记录与读取"""
+
+    def test_record_fields(self, tmp_path, manifest):
+        path = _write_bytes(b"hello", str(tmp_path / "a.png"))
+        record = record_output(manifest, "a.png", path, source="/src/a.jpg")
+        assert record["path"] == "a.png"
+        assert record["size"] == 5
+        assert record["sha256"] == hashlib.sha256(b"hello").hexdigest()
+        assert load_manifest(manifest)["a.png"]["source"] == "/src/a.jpg"
+
+    def test_manifest_in_target_directory(self, tmp_path, manifest):
+        assert os.path.dirname(manifest) == str(tmp_path)
+
+    def test_name_relative_with_forward_slashes(self, tmp_path, manifest):
+        assert manifest_name(manifest, str(tmp_path / "sub" / "b.png")) == "sub/b.png"
+        outside = str(tmp_path.parent / "other.png")
+        assert manifest_name(manifest, outside) == outside.replace(os.sep, "/")
+
+    def test_last_record_wins(self, tmp_path, manifest):
+        path = str(tmp_path / "a.png")
+        record_output(manifest, "a.png", _write_bytes(b"1", path))
+        record_output(manifest, "a.png", _write_bytes(b"22", path))
+        assert load_manifest(manifest)["a.png"]["size"] == 2
+
+    def test_reads_only_appended_part(self, tmp_path, manifest):
+        record_output(manifest, "a.png", _write_bytes(b"a", str(tmp_path / "a.png")))
+        assert set(load_manifest(manifest)) == {"a.png"}
+        record_output(manifest, "b.png", _write_bytes(b"b", str(tmp_path / "b.png")))
+        assert set(load_manifest(manifest)) == {"a.png", "b.png"}
+
+    def test_replaced_manifest_reloaded(self, tmp_path, manifest):
+        record_output(manifest, "a.png", _write_bytes(b"a", str(tmp_path / "a.png")))
+        load_manifest(manifest)
+        os.remove(manifest)
+        assert load_manifest(manifest) == {}
+
+    def test_truncated_line_ignored(self, tmp_path, manifest):
+        record_output(manifest, "a.png", _write_bytes(b"a", str(tmp_path / "a.png")))
+        # 模拟写入中途崩溃
+        with open(manifest, "ab") as f:
+            f.write(b'{"name":"b.pn')
+        assert set(load_manifest(manifest)) == {"a.png"}
+
+        record_output(manifest, "c.png", _write_bytes(b"c", str(tmp_path / "c.png")))
+        assert set(load_manifest(manifest)) == {"a.png", "c.png"}
+        lines = Path(manifest).read_bytes().splitlines()
+        assert json.loads(lines[-1])["name"] == "c.png"
+
+
+class TestFindProduced:
+    """测试已产出检查"""
+
+    def test_produced(self, tmp_path, manifest):
+        path = save_with_manifest(
+            _write_bytes, manifest, "a.png", "src.jpg", b"data", str(tmp_path / "a.png")
+        )
+        assert find_produced(manifest, "a.png", "src.jpg") == path
+        assert find_produced(manifest, "a.png", "src.jpg", verify=True) == path
+
+    def test_not_in_manifest(self, manifest):
+        assert find_produced(manifest, "a.png") is None
+
+    def test_different_source(self, tmp_path, manifest):
+        save_with_manifest(
+            _write_bytes, manifest, "a.png", "src.jpg", b"data", str(tmp_path / "a.png")
+        )
+        assert find_produced(manifest, "a.png", "other.jpg") is None
+
+    def test_missing_or_resized_file(self, tmp_path, manifest):
+        path = save_with_manifest(
+            _write_bytes, manifest, "a.png", "", b"data", str(tmp_path / "a.png")
+        )
+        _write_bytes(b"truncated-and-longer", path)
+        assert find_produced(manifest, "a.png") is None
+        os.remove(path)
+        assert find_produced(manifest, "a.png") is None
+
+    def test_verify_detects_changed_content(self, tmp_path, manifest):
+        path = save_with_manifest(
+            _write_bytes, manifest, "a.png", "", b"data", str(tmp_path / "a.png")
+        )
+        _write_bytes(b"DATA", path)
+        assert find_produced(manifest, "a.png") == path
+        assert find_produced(manifest, "a.png", verify=True) is None
+
+    def test_multi_file_output(self, tmp_path, manifest):
+        def save_clips(path):
+            stem = path[: -len(".wav")]
+            return [_write_bytes(b"clip%d" % i, f"{stem}_{i:04d}.wav") for i in (1, 2)]
+
+        paths = save_with_manifest(
+            save_clips, manifest, "a.wav", "src.wav", str(tmp_path / "a.wav")
+        )
+        assert len(paths) == 2
+        # 第一个文件记录在请求的名称下，其余文件以各自的名称记录
+        assert find_produced(manifest, "a.wav", "src.wav") == paths[0]
+        assert find_produced(manifest, "a_0002.wav", "src.wav") == paths[1]
+
+
+class TestParallel:
+    """测试并行保存时的记录"""
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_all_records_written(self, tmp_path, manifest, executor):
+        jobs = [
+            (
+                _write_bytes,
+                manifest,
+                f"{i:03d}.png",
+                "",
+                bytes([i]) * 100,
+                str(tmp_path / f"{i:03d}.png"),
+            )
+            for i in range(40)
+        ]
+        run_batch(save_with_manifest, jobs, workers=4, executor=executor)
+        records = load_manifest(manifest)
+        assert len(records) == 40
+        assert len(Path(manifest).read_bytes().splitlines()) == 40
+        assert all(find_produced(manifest, f"{i:03d}.png") for i in range(40))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
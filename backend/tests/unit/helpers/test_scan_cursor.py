@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""元数据过滤与增量扫描测试
+
+测试 size/mtime/ctime 过滤条件解析、scan_files 过滤、游标持久化、只输出新文件、按时间排序和目录跳过
+"""
+
+import os
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers import scan_cursor
+from backend.helpers.batch_scanner import FileFilter, parse_file_filter, scan_files
+from backend.helpers.scan_cursor import get_cursor_path, reset_scan_cursor, scan_incremental
+
+NOW = 1_700_000_000.0
+
+
+def _write(path: Path, size: int = 1, mtime: float = None) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def _age_dirs(base: Path) -> None:
+    """把目录 mtime 调到固定的过去时间，避免被当作刚修改过的目录（每次都重新列出）"""
+    old = NOW - 3600
+    for root, dirs, _ in os.walk(base):
+        for name in dirs:
+            os.utime(os.path.join(root, name), (old, old))
+    os.utime(base, (old, old))
+
+
+@pytest.fixture
+def hot_dir(tmp_path):
+    base = tmp_path / "hot"
+    _write(base / "a.png", mtime=NOW + 30)
+    _write(base / "b.png", mtime=NOW + 10)
+    _write(base / "sub" / "c.png", mtime=NOW + 20)
+    _age_dirs(base)
+    return base
+
+
+class TestFileFilter:
+    """测试元数据过滤条件"""
+
+    def test_parse_size(self):
+        file_filter = parse_file_filter("size>=10KB; size<1.5mb")
+        assert file_filter.conditions == [("size", ">=", 10240.0), ("size", "<", 1.5 * 1024**2)]
+
+    def test_parse_duration_relative_to_now(self):
+        file_filter = parse_file_filter("mtime>7d", now=NOW)
+        assert file_filter.conditions == [("mtime", ">", NOW - 7 * 86400)]
+
+    def test_parse_iso_date(self):
+        file_filter = parse_file_filter("ctime<2024-01-01T12:00:00")
+        assert file_filter.conditions[0][0:2] == ("ctime", "<")
+
+    def test_empty_is_falsy(self):
+        assert not parse_file_filter("")
+        assert not parse_file_filter(None)
+
+    @pytest.mark.parametrize("text", ["size>abc", "mtime>yesterday", "name=a.png", "size 10"])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_file_filter(text)
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError):
+            FileFilter([("inode", ">", 1)])
+
+    def test_scan_files_with_filter(self, tmp_path):
+        _write(tmp_path / "small.png", size=10, mtime=NOW)
+        _write(tmp_path / "big.png", size=2048, mtime=NOW)
+        _write(tmp_path / "old.png", size=2048, mtime=NOW - 30 * 86400)
+
+        assert scan_files(str(tmp_path), "*.png", file_filter=parse_file_filter("size>1KB")) == [
+            "big.png",
+            "old.png",
+        ]
+        recent = parse_file_filter("size>1KB; mtime>7d", now=NOW)
+        assert scan_files(str(tmp_path), "*.png", file_filter=recent) == ["big.png"]
+
+
+class TestIncrementalScan:
+    """测试增量扫描"""
+
+    def test_first_run_returns_all_in_time_order(self, hot_dir):
+        result = scan_incremental(str(hot_dir), "**/*.png")
+        assert result == ["b.png", os.path.join("sub", "c.png"), "a.png"]
+
+    def test_cursor_stored_next_to_directory(self, hot_dir):
+        scan_incremental(str(hot_dir), "**/*.png")
+        cursor_path = get_cursor_path(str(hot_dir))
+        assert os.path.dirname(cursor_path) == str(hot_dir.parent)
+        assert os.path.exists(cursor_path)
+        assert not any(name.endswith(".json") for name in os.listdir(hot_dir))
+
+    def test_second_run_returns_only_new(self, hot_dir):
+        scan_incremental(str(hot_dir), "**/*.png")
+        assert scan_incremental(str(hot_dir), "**/*.png") == []
+
+        _write(hot_dir / "sub" / "d.png", mtime=NOW + 50)
+        _write(hot_dir / "e.png", mtime=NOW + 40)
+        assert scan_incremental(str(hot_dir), "**/*.png") == ["e.png", os.path.join("sub", "d.png")]
+        assert scan_incremental(str(hot_dir), "**/*.png") == []
+
+    def test_commit_false_previews(self, hot_dir):
+        assert len(scan_incremental(str(hot_dir), "**/*.png", commit=False)) == 3
+        assert len(scan_incremental(str(hot_dir), "**/*.png")) == 3
+
+    def test_new_mode_skips_unchanged_directories(self, hot_dir, monkeypatch):
+        scan_incremental(str(hot_dir), "**/*.png")
+
+        # 目录 mtime 未变化时，其中的文件不会被产出（也就不会被 stat）
+        yielded = []
+        real_iter = scan_cursor.iter_matching_files
+
+        def recording_iter(base_dir, matcher, list_files=None):
+            for rel_path, entry in real_iter(base_dir, matcher, list_files):
+                yielded.append(rel_path)
+                yield rel_path, entry
+
+        monkeypatch.setattr(scan_cursor, "iter_matching_files", recording_iter)
+        assert scan_incremental(str(hot_dir), "**/*.png") == []
+        assert yielded == []
+
+    def test_modified_file_only_in_changed_mode(self, hot_dir):
+        scan_incremental(str(hot_dir), "**/*.png", mode="changed")
+        _write(hot_dir / "b.png", size=5, mtime=NOW + 60)
+        _age_dirs(hot_dir)
+        assert scan_incremental(str(hot_dir), "**/*.png", mode="new") == []
+        assert scan_incremental(str(hot_dir), "**/*.png", mode="changed") == ["b.png"]
+
+    def test_filtered_file_emitted_once_it_passes(self, hot_dir):
+        size_filter = parse_file_filter("size>100")
+        _write(hot_dir / "partial.png", size=10, mtime=NOW + 70)
+        _age_dirs(hot_dir)
+        assert scan_incremental(str(hot_dir), "*.png", file_filter=size_filter) == []
+
+        # 写入完成：文件变大，目录条目不变
+        _write(hot_dir / "partial.png", size=1000, mtime=NOW + 80)
+        _age_dirs(hot_dir)
+        assert scan_incremental(str(hot_dir), "*.png", file_filter=size_filter) == ["partial.png"]
+
+    def test_limit_defers_rest_in_time_order(self, hot_dir):
+        assert scan_incremental(str(hot_dir), "**/*.png", limit=2) == [
+            "b.png",
+            os.path.join("sub", "c.png"),
+        ]
+        assert scan_incremental(str(hot_dir), "**/*.png", limit=2) == ["a.png"]
+        assert scan_incremental(str(hot_dir), "**/*.png", limit=2) == []
+
+    def test_separate_cursor_per_pattern(self, hot_dir):
+        scan_incremental(str(hot_dir), "*.png")
+        assert len(scan_incremental(str(hot_dir), "**/*.png")) == 3
+
+    def test_reset(self, hot_dir):
+        scan_incremental(str(hot_dir), "**/*.png")
+        assert reset_scan_cursor(str(hot_dir), "**/*.png")
+        assert len(scan_incremental(str(hot_dir), "**/*.png")) == 3
+        assert reset_scan_cursor(str(hot_dir))
+        assert not reset_scan_cursor(str(hot_dir))
+
+    def test_corrupt_cursor_starts_over(self, hot_dir):
+        scan_incremental(str(hot_dir), "**/*.png")
+        Path(get_cursor_path(str(hot_dir))).write_text("{not json")
+        assert len(scan_incremental(str(hot_dir), "**/*.png")) == 3
+
+    def test_invalid_mode(self, hot_dir):
+        with pytest.raises(ValueError):
+            scan_incremental(str(hot_dir), "*.png", mode="off")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""张量转换测试
+
+测试 to_uint8_array 的量化结果、零拷贝视图和 CPU 张量路径，iter_uint8_chunks 的分块量化，
+以及 uint8_to_float32 的反向转换
+"""
+
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.tensor_convert import to_uint8_array, iter_uint8_chunks, uint8_to_float32
+
+
+class TestNumpyInput:
+    """测试 numpy 输入"""
+
+    def test_uint8_is_zero_copy(self):
+        data = np.random.randint(0, 255, (2, 8, 8, 3), dtype=np.uint8)
+        result = to_uint8_array(data)
+        assert np.shares_memory(result, data)
+
+    def test_float_matches_legacy_conversion(self):
+        """在 [0, 1] 范围内与旧的 (x * 255).astype(np.uint8) 结果一致"""
+        data = np.random.rand(4, 16, 16, 3).astype(np.float32)
+        expected = (data * 255).astype(np.uint8)
+        np.testing.assert_array_equal(to_uint8_array(data), expected)
+
+    def test_out_of_range_is_clipped(self):
+        data = np.array([-0.5, 0.0, 1.0, 1.5], dtype=np.float32)
+        np.testing.assert_array_equal(to_uint8_array(data), [0, 0, 255, 255])
+
+    def test_unsupported_type(self):
+        with pytest.raises(TypeError):
+            to_uint8_array([0.0, 1.0])
+
+
+class TestTorchInput:
+    """测试 torch CPU 张量输入"""
+
+    def test_batch_quantized_on_tensor_side(self):
+        torch = pytest.importorskip("torch")
+        batch = torch.rand(4, 16, 16, 3)
+        result = to_uint8_array(batch)
+
+        assert result.dtype == np.uint8
+        assert result.shape == (4, 16, 16, 3)
+        assert result.flags["C_CONTIGUOUS"]
+        np.testing.assert_array_equal(result, (batch.numpy() * 255).astype(np.uint8))
+
+    def test_frames_are_views_of_batch_buffer(self):
+        torch = pytest.importorskip("torch")
+        result = to_uint8_array(torch.rand(3, 8, 8, 3))
+        for i in range(3):
+            assert np.shares_memory(result[i], result)
+
+    def test_mask_batch(self):
+        torch = pytest.importorskip("torch")
+        mask = torch.tensor([[[0.0, 0.25], [0.5, 1.0]]])
+        np.testing.assert_array_equal(to_uint8_array(mask), [[[0, 63], [127, 255]]])
+
+    def test_non_contiguous_tensor(self):
+        torch = pytest.importorskip("torch")
+        chw = torch.rand(3, 8, 10)
+        result = to_uint8_array(chw.permute(1, 2, 0))
+        assert result.shape == (8, 10, 3)
+        assert result.flags["C_CONTIGUOUS"]
+
+
+class TestIterUint8Chunks:
+    """测试分块量化"""
+
+    def test_chunks_cover_all_frames(self):
+        frames = np.random.rand(7, 4, 4, 3).astype(np.float32)
+        chunks = list(iter_uint8_chunks(frames, 3))
+
+        assert [c.shape[0] for c in chunks] == [3, 3, 1]
+        assert all(c.dtype == np.uint8 for c in chunks)
+        np.testing.assert_array_equal(np.concatenate(chunks), to_uint8_array(frames))
+
+    def test_non_positive_chunk_size(self):
+        chunks = list(iter_uint8_chunks(np.zeros((2, 2, 2, 3), dtype=np.uint8), 0))
+        assert len(chunks) == 2
+
+    def test_torch_frames(self):
+        torch = pytest.importorskip("torch")
+        frames = torch.rand(5, 4, 4, 3)
+        chunks = list(iter_uint8_chunks(frames, 2))
+        np.testing.assert_array_equal(np.concatenate(chunks), to_uint8_array(frames))
+
+
+class TestUint8ToFloat32:
+    """测试 uint8 到 float32 的转换"""
+
+    def test_matches_astype_divide(self):
+        data = np.arange(256, dtype=np.uint8).reshape(16, 16)
+        result = uint8_to_float32(data)
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, data.astype(np.float32) / 255.0)
+
+    def test_writes_into_out(self):
+        data = np.full((2, 3), 255, dtype=np.uint8)
+        buffer = np.zeros((4, 2, 3), dtype=np.float32)
+        result = uint8_to_float32(data, out=buffer[1])
+        assert np.shares_memory(result, buffer)
+        np.testing.assert_array_equal(buffer[1], 1.0)
+        np.testing.assert_array_equal(buffer[0], 0.0)
+
+    def test_roundtrip_with_to_uint8_array(self):
+        data = np.random.default_rng(0).integers(0, 256, (4, 5, 3), dtype=np.uint8)
+        np.testing.assert_array_equal(to_uint8_array(uint8_to_float32(data) + 1e-4), data)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""张量转储测试
+
+测试 .npy 转储的 dtype/形状保留、内存映射加载和 pickle 拒绝
+"""
+
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.tensor_dump import load_tensor_dump, save_tensor_dump
+
+
+def _to_numpy(value):
+    return value.numpy() if hasattr(value, "numpy") else np.asarray(value)
+
+
+class TestTensorDump:
+    """测试 .npy 转储读写"""
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float16, np.uint8])
+    def test_roundtrip_keeps_dtype_and_shape(self, tmp_path, dtype):
+        batch = (np.random.default_rng(0).random((3, 16, 24, 3)) * 255).astype(dtype)
+        path = save_tensor_dump(batch, str(tmp_path / "batch.npy"))
+
+        loaded = _to_numpy(load_tensor_dump(path))
+        assert loaded.dtype == batch.dtype
+        assert loaded.shape == batch.shape
+        np.testing.assert_array_equal(loaded, batch)
+
+    def test_mask_batch(self, tmp_path):
+        mask = np.random.default_rng(1).random((2, 8, 8), dtype=np.float32)
+        path = save_tensor_dump(mask, str(tmp_path / "mask.npy"))
+        np.testing.assert_array_equal(_to_numpy(load_tensor_dump(path)), mask)
+
+    def test_extension_fixed(self, tmp_path):
+        path = save_tensor_dump(np.zeros((1, 2, 2, 3)), str(tmp_path / "out.png"))
+        assert path.endswith(".npy")
+
+    def test_mmap_is_copy_on_write(self, tmp_path):
+        path = save_tensor_dump(np.ones((1, 4, 4, 3), dtype=np.float32), str(tmp_path / "a.npy"))
+        loaded = _to_numpy(load_tensor_dump(path, mmap=True))
+        loaded[0, 0, 0, 0] = 0.0  # 修改不会写回文件
+
+        np.testing.assert_array_equal(_to_numpy(load_tensor_dump(path, mmap=False)), 1.0)
+
+    def test_non_contiguous_input(self, tmp_path):
+        data = np.arange(2 * 4 * 4 * 3, dtype=np.float32).reshape(2, 4, 4, 3)[:, ::2]
+        path = save_tensor_dump(data, str(tmp_path / "a.npy"))
+        np.testing.assert_array_equal(_to_numpy(load_tensor_dump(path)), data)
+
+    def test_rejects_pickled_objects(self, tmp_path):
+        path = str(tmp_path / "obj.npy")
+        np.save(path, np.array([{"a": 1}], dtype=object), allow_pickle=True)
+        with pytest.raises(ValueError):
+            load_tensor_dump(path)
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_tensor_dump(str(tmp_path / "missing.npy"))
+
+    def test_torch_roundtrip(self, tmp_path):
+        torch = pytest.importorskip("torch")
+        batch = torch.rand(2, 8, 8, 3)
+        path = save_tensor_dump(batch, str(tmp_path / "a.npy"))
+        loaded = load_tensor_dump(path)
+        assert isinstance(loaded, torch.Tensor)
+        assert torch.equal(loaded, batch)
+
+    def test_bfloat16_roundtrip(self, tmp_path):
+        torch = pytest.importorskip("torch")
+        batch = torch.rand(2, 8, 8, 3).to(torch.bfloat16)
+        path = save_tensor_dump(batch, str(tmp_path / "a.npy"))
+        loaded = load_tensor_dump(path)
+        assert loaded.dtype == torch.bfloat16
+        assert torch.equal(loaded, batch)
+
+    def test_bfloat16_without_torch(self, tmp_path, monkeypatch):
+        # bfloat16 转储：float32 的高 16 位，以结构化 dtype 标记
+        values = np.array([[1.0, -2.5], [0.15625, 3.0e38]], dtype=np.float32)
+        bits = (values.view(np.uint32) >> 16).astype(np.uint16).view(np.int16)
+        path = str(tmp_path / "bf16.npy")
+        np.save(path, bits.view(np.dtype([("bfloat16", "<i2")])))
+
+        monkeypatch.setitem(sys.modules, "torch", None)
+        loaded = load_tensor_dump(path)
+        assert loaded.dtype == np.float32
+        expected = (bits.view(np.uint16).astype(np.uint32) << 16).view(np.float32)
+        np.testing.assert_array_equal(loaded, expected)
+        np.testing.assert_allclose(loaded, values, rtol=1e-2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
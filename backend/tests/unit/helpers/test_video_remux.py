@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""视频直通/封装转换测试
+
+测试容器编码兼容性判断、数据源获取、直通复制和 PyAV 封装转换
+"""
+
+import io
+import os
+import sys
+import tempfile
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.video_remux import (
+    get_video_source,
+    is_remux_compatible,
+    probe_stream_codecs,
+    remux_video,
+)
+
+
+class _FakeVideoFromFile:
+    def __init__(self, source, start_time=0, duration=0):
+        self._source = source
+        self._VideoFromFile__start_time = start_time
+        self._VideoFromFile__duration = duration
+
+    def get_stream_source(self):
+        return self._source
+
+
+class TestIsRemuxCompatible:
+    """测试编码兼容性判断"""
+
+    def test_h264_aac_to_mp4(self):
+        assert is_remux_compatible("mp4", [("video", "h264"), ("audio", "aac")])
+
+    def test_h264_to_webm_is_incompatible(self):
+        assert not is_remux_compatible("webm", [("video", "h264")])
+
+    def test_audio_codec_checked(self):
+        assert not is_remux_compatible("mp4", [("video", "h264"), ("audio", "vorbis")])
+
+    def test_requires_video_stream(self):
+        assert not is_remux_compatible("mp4", [("audio", "aac")])
+
+    def test_unknown_container(self):
+        assert not is_remux_compatible("flv", [("video", "h264")])
+
+
+class TestGetVideoSource:
+    """测试数据源获取"""
+
+    def test_path_source(self):
+        assert get_video_source(_FakeVideoFromFile("/tmp/a.mov")) == "/tmp/a.mov"
+
+    def test_bytes_source(self):
+        buffer = io.BytesIO(b"data")
+        assert get_video_source(_FakeVideoFromFile(buffer)) is buffer
+
+    def test_trimmed_video_has_no_source(self):
+        assert get_video_source(_FakeVideoFromFile("/tmp/a.mov", start_time=1.5)) is None
+        assert get_video_source(_FakeVideoFromFile("/tmp/a.mov", duration=3.0)) is None
+
+    def test_unknown_trim_state_has_no_source(self):
+        video = _FakeVideoFromFile("/tmp/a.mov")
+        del video._VideoFromFile__duration
+        assert get_video_source(video) is None
+
+    def test_components_have_no_source(self):
+        class _Components:
+            images = None
+            frame_rate = 24
+
+        assert get_video_source(_Components()) is None
+
+
+class TestRemuxVideo:
+    """测试直通复制和封装转换"""
+
+    def test_passthrough_copy_for_same_container(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "clip.mp4")
+            with open(source, "wb") as f:
+                f.write(b"not decoded")
+
+            saved = remux_video(source, os.path.join(tmp, "out", "copy"), "mp4")
+
+            assert saved == os.path.join(tmp, "out", "copy.mp4")
+            with open(saved, "rb") as f:
+                assert f.read() == b"not decoded"
+
+    def test_remux_mkv_to_mp4(self):
+        av = pytest.importorskip("av")
+        np = pytest.importorskip("numpy")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "clip.mkv")
+            with av.open(source, mode="w") as container:
+                stream = container.add_stream("mpeg4", rate=24)
+                stream.width, stream.height, stream.pix_fmt = 64, 48, "yuv420p"
+                for i in range(12):
+                    frame = av.VideoFrame.from_ndarray(
+                        np.full((48, 64, 3), i * 10, dtype=np.uint8), format="rgb24"
+                    )
+                    for packet in stream.encode(frame):
+                        container.mux(packet)
+                for packet in stream.encode():
+                    container.mux(packet)
+
+            saved = remux_video(source, os.path.join(tmp, "clip.mp4"), "mp4")
+
+            assert saved.endswith("clip.mp4")
+            assert probe_stream_codecs(saved) == [("video", "mpeg4")]
+            with av.open(saved) as container:
+                assert sum(1 for _ in container.decode(video=0)) == 12
+
+    def test_incompatible_codec_returns_none(self):
+        av = pytest.importorskip("av")
+        np = pytest.importorskip("numpy")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "clip.mkv")
+            with av.open(source, mode="w") as container:
+                stream = container.add_stream("mpeg4", rate=24)
+                stream.width, stream.height, stream.pix_fmt = 64, 48, "yuv420p"
+                frame = av.VideoFrame.from_ndarray(
+                    np.zeros((48, 64, 3), dtype=np.uint8), format="rgb24"
+                )
+                for packet in stream.encode(frame):
+                    container.mux(packet)
+                for packet in stream.encode():
+                    container.mux(packet)
+
+            assert remux_video(source, os.path.join(tmp, "clip.webm"), "webm") is None
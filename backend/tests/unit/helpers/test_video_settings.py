@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""视频编码设置测试
+
+测试 resolve_video_settings 的默认值与校验，以及 build_video_writer_kwargs 生成的编码参数
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers.video_settings import (
+    build_video_writer_kwargs,
+    resolve_video_settings,
+    DEFAULT_VIDEO_SETTINGS,
+)
+
+
+class TestResolveVideoSettings:
+    """测试设置合并与校验"""
+
+    def test_defaults(self):
+        assert resolve_video_settings() == DEFAULT_VIDEO_SETTINGS
+
+    def test_none_values_use_defaults(self):
+        assert resolve_video_settings({"preset": None})["preset"] == "medium"
+
+    def test_invalid_preset(self):
+        with pytest.raises(ValueError):
+            resolve_video_settings({"preset": "instant"})
+
+    def test_invalid_pixel_format(self):
+        with pytest.raises(ValueError):
+            resolve_video_settings({"pixel_format": "rgb24"})
+
+
+class TestBuildVideoWriterKwargs:
+    """测试 imageio 写入器参数"""
+
+    def test_default_matches_legacy_quality(self):
+        kwargs = build_video_writer_kwargs("libx264", 24)
+        assert kwargs["quality"] == 8
+        assert kwargs["pixelformat"] == "yuv420p"
+        assert kwargs["ffmpeg_params"] == ["-preset", "medium"]
+
+        vp9 = build_video_writer_kwargs("libvpx-vp9", 24)
+        assert vp9["quality"] == 9
+        assert "ffmpeg_params" not in vp9
+
+    def test_x264_preset_crf_threads_gop(self):
+        kwargs = build_video_writer_kwargs(
+            "libx264", 30, {"preset": "ultrafast", "crf": 23, "threads": 8, "gop": 48}
+        )
+        assert kwargs["quality"] is None
+        assert kwargs["fps"] == 30.0
+        assert kwargs["ffmpeg_params"] == [
+            "-preset",
+            "ultrafast",
+            "-crf",
+            "23",
+            "-threads",
+            "8",
+            "-g",
+            "48",
+        ]
+
+    def test_bitrate_overrides_crf(self):
+        kwargs = build_video_writer_kwargs("libx264", 24, {"crf": 23, "bitrate": "8M"})
+        assert kwargs["bitrate"] == "8M"
+        assert kwargs["quality"] is None
+        assert "-crf" not in kwargs["ffmpeg_params"]
+
+    def test_vp9_maps_preset_and_constant_quality(self):
+        params = build_video_writer_kwargs("libvpx-vp9", 24, {"preset": "veryfast", "crf": 31})[
+            "ffmpeg_params"
+        ]
+        assert params[:4] == ["-deadline", "realtime", "-cpu-used", "6"]
+        assert params[params.index("-crf") : params.index("-crf") + 4] == [
+            "-crf",
+            "31",
+            "-b:v",
+            "0",
+        ]
+
+    def test_mpeg4_ignores_preset_and_crf(self):
+        kwargs = build_video_writer_kwargs("mpeg4", 24, {"preset": "ultrafast", "crf": 20})
+        assert kwargs["quality"] == 8
+        assert "ffmpeg_params" not in kwargs
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""多实例认领测试
+
+测试多个实例认领互不重叠、保存端确认完成、再次认领时释放未确认的文件、后台写入的延迟确认、租期刷新、过期认领接管、
+遗留认领重新认领和多进程并发认领
+"""
+
+import os
+import sys
+import time
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers import work_claim
+from backend.helpers.work_claim import (
+    begin_claimed_write,
+    claim_files,
+    complete_claimed_file,
+    complete_claims,
+    finish_claimed_write,
+    get_spool_dir,
+    get_spool_stats,
+    release_claims,
+)
+
+
+def _reset():
+    work_claim._outstanding.clear()
+    work_claim._sources.clear()
+    work_claim._leases.clear()
+    work_claim._in_flight.clear()
+    work_claim._failed_writes.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_outstanding():
+    _reset()
+    yield
+    _reset()
+
+
+@pytest.fixture
+def source(tmp_path):
+    base = tmp_path / "images"
+    base.mkdir()
+    for i in range(20):
+        (base / f"{i:03d}.png").write_bytes(b"x")
+    return base
+
+
+def _claim_until_empty(base_dir: str, worker_id: str) -> list:
+    """子进程：反复认领直到没有剩余文件，返回认领过的全部文件"""
+    claimed = []
+    while True:
+        batch = claim_files(base_dir, "*.png", worker_id=worker_id, limit=3)
+        if not batch:
+            return claimed
+        claimed.extend(batch)
+        complete_claims(base_dir, "*.png", worker_id, rel_paths=batch)
+
+
+class TestClaim:
+    """测试认领与完成"""
+
+    def test_workers_get_disjoint_batches(self, source):
+        first = claim_files(str(source), "*.png", worker_id="w1", limit=5)
+        second = claim_files(str(source), "*.png", worker_id="w2", limit=5)
+        assert first == [f"{i:03d}.png" for i in range(5)]
+        assert second == [f"{i:03d}.png" for i in range(5, 10)]
+
+    def test_unconfirmed_batch_released_not_completed(self, source):
+        first = claim_files(str(source), "*.png", worker_id="w1", limit=5)
+        # 下游出错：没有确认完成，再次认领时释放并重新认领
+        assert claim_files(str(source), "*.png", worker_id="w1", limit=5) == first
+        stats = get_spool_stats(str(source), "*.png")
+        assert stats["done"] == 0
+        assert stats["claimed"] == 5
+
+    def test_confirmed_files_not_claimed_again(self, source):
+        first = claim_files(str(source), "*.png", worker_id="w1", limit=5)
+        for rel_path in first:
+            assert complete_claimed_file(os.path.join(str(source), rel_path))
+        assert get_spool_stats(str(source), "*.png")["done"] == 5
+        assert not set(first) & set(claim_files(str(source), "*.png", worker_id="w2"))
+
+    def test_confirm_unknown_file(self, source):
+        assert not complete_claimed_file(str(source / "000.png"))
+
+    def test_all_done(self, source):
+        batch = claim_files(str(source), "*.png", worker_id="w1")
+        assert len(batch) == 20
+        assert complete_claims(str(source), "*.png", "w1") == 20
+        assert claim_files(str(source), "*.png", worker_id="w1") == []
+        assert get_spool_stats(str(source), "*.png")["done"] == 20
+
+    def test_spool_stored_next_to_source(self, source):
+        claim_files(str(source), "*.png", worker_id="w1", limit=1)
+        spool_dir = get_spool_dir(str(source), "*.png")
+        assert spool_dir.startswith(str(source.parent))
+        assert not spool_dir.startswith(str(source) + os.sep)
+        assert os.path.isdir(spool_dir)
+
+    def test_explicit_complete(self, source):
+        batch = claim_files(str(source), "*.png", worker_id="w1", limit=4)
+        assert complete_claims(str(source), "*.png", "w1", rel_paths=batch[:2]) == 2
+        # 未确认的两个释放后重新认领，排在新文件之前
+        assert claim_files(str(source), "*.png", worker_id="w1", limit=4) == batch[2:] + [
+            "004.png",
+            "005.png",
+        ]
+        assert get_spool_stats(str(source), "*.png")["done"] == 2
+
+    def test_release(self, source):
+        batch = claim_files(str(source), "*.png", worker_id="w1", limit=4)
+        assert release_claims(str(source), "*.png", "w1") == 4
+        assert claim_files(str(source), "*.png", worker_id="w2", limit=4) == batch
+
+
+class TestAsyncWrite:
+    """测试后台写入的延迟确认"""
+
+    def test_confirmation_after_next_claim(self, source):
+        first = claim_files(str(source), "*.png", worker_id="w1", limit=2)
+        claim = begin_claimed_write(os.path.join(str(source), first[0]))
+        assert claim is not None
+
+        # 下一个排队的任务先于写入完成再次认领：写入中的文件不释放、不重新认领
+        second = claim_files(str(source), "*.png", worker_id="w1", limit=2)
+        assert first[0] not in second
+        assert first[1] in second
+        assert get_spool_stats(str(source), "*.png")["workers"]["w1"] == 3
+
+        assert finish_claimed_write(claim, success=True)
+        assert get_spool_stats(str(source), "*.png")["done"] == 1
+        assert first[0] not in claim_files(str(source), "*.png", worker_id="w2")
+
+    def test_failed_write_released(self, source):
+        first = claim_files(str(source), "*.png", worker_id="w1", limit=1)
+        claim = begin_claimed_write(os.path.join(str(source), first[0]))
+        claim_files(str(source), "*.png", worker_id="w1", limit=1)
+
+        assert not finish_claimed_write(claim, success=False)
+        assert get_spool_stats(str(source), "*.png")["done"] == 0
+        assert claim_files(str(source), "*.png", worker_id="w2", limit=1) == first
+
+    def test_any_failed_write_releases(self, source):
+        first = claim_files(str(source), "*.png", worker_id="w1", limit=1)
+        path = os.path.join(str(source), first[0])
+        claims = [begin_claimed_write(path), begin_claimed_write(path)]
+        assert not finish_claimed_write(claims[0], success=False)
+        assert not finish_claimed_write(claims[1], success=True)
+        assert get_spool_stats(str(source), "*.png")["done"] == 0
+
+    def test_unclaimed_file(self, source):
+        assert begin_claimed_write(str(source / "000.png")) is None
+
+
+class TestRecovery:
+    """测试崩溃恢复与租期"""
+
+    def test_held_claims_renewed(self, source, monkeypatch):
+        monkeypatch.setattr(work_claim, "_MIN_RENEW_INTERVAL", 0.05)
+        claim_files(str(source), "*.png", worker_id="w1", limit=2, lease_seconds=0.3)
+        claims_dir = os.path.join(get_spool_dir(str(source), "*.png"), "claims")
+        old = time.time() - 7200
+        for name in os.listdir(claims_dir):
+            os.utime(os.path.join(claims_dir, name), (old, old))
+
+        time.sleep(0.5)
+        assert get_spool_stats(str(source), "*.png", lease_seconds=0.3)["stale"] == 0
+        assert claim_files(str(source), "*.png", worker_id="w2", limit=2, lease_seconds=0.3) == [
+            "002.png",
+            "003.png",
+        ]
+
+    def test_stale_claim_taken_over(self, source):
+        batch = claim_files(str(source), "*.png", worker_id="crashed", limit=2)
+        # 模拟进程崩溃：不再刷新租期
+        _reset()
+        old = time.time() - 7200
+        claims_dir = os.path.join(get_spool_dir(str(source), "*.png"), "claims")
+        for name in os.listdir(claims_dir):
+            os.utime(os.path.join(claims_dir, name), (old, old))
+
+        assert get_spool_stats(str(source), "*.png", lease_seconds=3600)["stale"] == 2
+        taken = claim_files(str(source), "*.png", worker_id="w2", limit=2, lease_seconds=3600)
+        assert taken == batch
+
+    def test_fresh_claim_not_taken_over(self, source):
+        batch = claim_files(str(source), "*.png", worker_id="w1", limit=2)
+        assert not set(batch) & set(claim_files(str(source), "*.png", worker_id="w2", limit=2))
+
+    def test_restarted_worker_reclaims_leftovers(self, source):
+        batch = claim_files(str(source), "*.png", worker_id="gpu0", limit=3)
+        # 模拟进程重启：进程内记录丢失，遗留的认领没有被完成
+        _reset()
+        assert claim_files(str(source), "*.png", worker_id="gpu0", limit=3) == batch
+        assert get_spool_stats(str(source), "*.png")["done"] == 0
+
+    def test_complete_after_takeover_is_ignored(self, source):
+        batch = claim_files(str(source), "*.png", worker_id="slow", limit=1)
+        # 租期刷新停止（如进程挂起）后被抢占
+        _reset()
+        claims_dir = os.path.join(get_spool_dir(str(source), "*.png"), "claims")
+        old = time.time() - 7200
+        for name in os.listdir(claims_dir):
+            os.utime(os.path.join(claims_dir, name), (old, old))
+        claim_files(str(source), "*.png", worker_id="fast", limit=1, lease_seconds=60)
+        assert complete_claims(str(source), "*.png", "slow", rel_paths=batch) == 0
+
+
+class TestConcurrency:
+    """测试多进程并发认领"""
+
+    def test_no_file_claimed_twice(self, source):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(_claim_until_empty, str(source), f"w{i}") for i in range(4)]
+            results = [future.result() for future in futures]
+
+        claimed = [path for result in results for path in result]
+        assert sorted(claimed) == sorted(f"{i:03d}.png" for i in range(20))
+        assert len(claimed) == len(set(claimed))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""后台写入队列测试
+
+测试 submit_write_job 的任务状态、写入字节统计、失败记录、完成回调和背压
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.helpers import write_queue
+from backend.helpers.write_queue import submit_write_job, get_job, wait_for_job
+
+
+def _write_text(path: str, content: str) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+def _fail(path: str) -> str:
+    raise IOError(f"磁盘已满: {path}")
+
+
+class TestSubmitWriteJob:
+    """测试任务提交与状态"""
+
+    def test_success_reports_paths_and_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tasks = [(os.path.join(tmp, f"{i}.txt"), "x" * (i + 1)) for i in range(5)]
+            job_id = submit_write_job(_write_text, tasks, {"target_path": tmp})
+
+            assert wait_for_job(job_id, timeout=10)
+            job = get_job(job_id)
+            assert job["status"] == "success"
+            assert job["completed"] == 5
+            assert job["failed"] == 0
+            assert job["bytes_written"] == 1 + 2 + 3 + 4 + 5
+            # 结果顺序与任务顺序一致
+            assert job["saved_paths"] == [task[0] for task in tasks]
+            assert job["target_path"] == tmp
+            assert job["finished_at"] is not None
+
+    def test_partial_failure(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ok.txt")
+            job_id = submit_write_job(
+                lambda p, fail: _fail(p) if fail else _write_text(p, "ok"),
+                [(path, False), (os.path.join(tmp, "bad.txt"), True)],
+            )
+
+            assert wait_for_job(job_id, timeout=10)
+            job = get_job(job_id)
+            assert job["status"] == "partial"
+            assert job["saved_paths"] == [path, None]
+            assert job["errors"][0]["index"] == 1
+            assert "磁盘已满" in job["errors"][0]["error"]
+
+    def test_multi_file_task(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, name) for name in ("a_0001.txt", "a_0002.txt")]
+            job_id = submit_write_job(lambda: [_write_text(p, "abc") for p in paths], [()])
+
+            assert wait_for_job(job_id, timeout=10)
+            job = get_job(job_id)
+            assert job["status"] == "success"
+            assert job["saved_paths"] == [paths]
+            assert job["bytes_written"] == 6
+
+    def test_all_failed(self):
+        job_id = submit_write_job(_fail, [("a",), ("b",)])
+        assert wait_for_job(job_id, timeout=10)
+        assert get_job(job_id)["status"] == "error"
+
+    def test_empty_job_finishes_immediately(self):
+        job_id = submit_write_job(_write_text, [])
+        assert wait_for_job(job_id, timeout=0)
+        assert get_job(job_id)["status"] == "success"
+
+    def test_on_finish_runs_before_job_finishes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            calls = []
+            tasks = [(os.path.join(tmp, f"{i}.txt"), "x") for i in range(3)]
+            job_id = submit_write_job(
+                _write_text, tasks, on_finish=lambda job: calls.append(job["status"])
+            )
+
+            assert wait_for_job(job_id, timeout=10)
+            assert calls == ["success"]
+
+    def test_on_finish_reports_failure(self):
+        calls = []
+        job_id = submit_write_job(_fail, [("a.txt",)], on_finish=lambda job: calls.append(job))
+
+        assert wait_for_job(job_id, timeout=10)
+        assert [job["status"] for job in calls] == ["error"]
+        assert calls[0]["errors"][0]["index"] == 0
+
+    def test_on_finish_for_empty_job(self):
+        calls = []
+        job_id = submit_write_job(
+            _write_text, [], on_finish=lambda job: calls.append(job["status"])
+        )
+        assert wait_for_job(job_id, timeout=0)
+        assert calls == ["success"]
+
+    def test_unknown_job(self):
+        assert get_job("missing") is None
+        assert wait_for_job("missing", timeout=0) is False
+
+    def test_snapshot_is_a_copy(self):
+        job_id = submit_write_job(_fail, [("a",)])
+        wait_for_job(job_id, timeout=10)
+        get_job(job_id)["errors"].clear()
+        assert len(get_job(job_id)["errors"]) == 1
+
+
+class TestBackpressure:
+    """测试队列满时的阻塞"""
+
+    def test_submit_blocks_when_queue_is_full(self, monkeypatch):
+        # 使用独立的小队列和单个写入线程
+        monkeypatch.setattr(write_queue, "_queue", None)
+        monkeypatch.setattr(write_queue, "_writers", [])
+        monkeypatch.setattr(write_queue, "DEFAULT_QUEUE_SIZE", 1)
+        monkeypatch.setattr(write_queue, "DEFAULT_WRITER_COUNT", 1)
+
+        gate = threading.Event()
+        submitted = threading.Event()
+
+        def _blocked(value):
+            gate.wait(10)
+            return None
+
+        def _submit():
+            # 1 个任务被写入线程取走，1 个占满队列，第 3 个必须等待
+            submit_write_job(_blocked, [(i,) for i in range(3)])
+            submitted.set()
+
+        thread = threading.Thread(target=_submit, daemon=True)
+        thread.start()
+
+        assert not submitted.wait(0.3)
+        gate.set()
+        assert submitted.wait(10)
+        thread.join(10)
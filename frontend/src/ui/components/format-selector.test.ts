@@ -61,6 +61,10 @@ describe('TYPE_FORMATS', () => {
   it('should have formats for LATENT type', () => {
     expect(TYPE_FORMATS['LATENT']).toEqual(['latent'])
   })
+
+  it('should default CONDITIONING to the lossless cond format', () => {
+    expect(TYPE_FORMATS['CONDITIONING'][0]).toBe('cond')
+  })
 })
 
 describe('createFormatSelector', () => {
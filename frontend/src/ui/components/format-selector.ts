@@ -20,6 +20,7 @@ export const FORMAT_TYPE_MAP: Record<string, { type: string; label: string; desc
     flac: { type: 'AUDIO', label: 'FLAC 音频', description: '无损压缩音频' },
     ogg: { type: 'AUDIO', label: 'OGG 音频', description: '开源音频格式' },
     latent: { type: 'LATENT', label: 'Latent', description: 'ComfyUI Latent 数据' },
+    cond: { type: 'CONDITIONING', label: 'Conditioning', description: '无损 Conditioning 数据' },
     json: { type: 'DATA', label: 'JSON', description: '通用数据格式' },
     txt: { type: 'DATA', label: '文本', description: '纯文本格式' },
   }
@@ -33,7 +34,7 @@ export const TYPE_FORMATS: Record<string, string[]> = {
   AUDIO: ['mp3', 'wav', 'flac', 'ogg'],
   LATENT: ['latent'],
   MASK: ['png'],
-  CONDITIONING: ['json'],
+  CONDITIONING: ['cond', 'json'],
   STRING: ['txt', 'json'],
 }
 